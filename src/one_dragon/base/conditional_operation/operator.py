@@ -2,7 +2,7 @@ import time
 from abc import abstractmethod
 from concurrent.futures import Future, ThreadPoolExecutor
 from functools import cached_property
-from threading import Lock
+from threading import Condition, Lock
 from typing import Optional
 
 from one_dragon.base.conditional_operation.atomic_op import AtomicOp
@@ -22,6 +22,9 @@ from one_dragon.utils.log_utils import log
 # 当前运行的场景一个 打断的新场景一个 处理事件更新状态一个
 _od_conditional_op_executor = ThreadPoolExecutor(thread_name_prefix='od_conditional_op', max_workers=4)
 
+SCHEDULER_MAX_WAIT_SECONDS: float = 1  # 主循环最长的等待时间 兜底没有经过状态服务直接修改的状态
+SCHEDULER_MIN_WAIT_SECONDS: float = 0.001  # 主循环最短的等待时间 避免时间边界上的空转
+
 
 class ConditionalOperator(ConditionalOperatorLoader):
 
@@ -55,6 +58,7 @@ class ConditionalOperator(ConditionalOperatorLoader):
         
         self._inited: bool = False
         self._task_lock: Lock = Lock()
+        self._scheduler_cond: Condition = Condition(self._task_lock)  # 主循环等待 状态更新、任务结束、停止运行时唤醒
 
     def init(self) -> None:
         """
@@ -78,6 +82,7 @@ class ConditionalOperator(ConditionalOperatorLoader):
         self.trigger_2_scene = {}
         self.normal_scene = None
         self.last_trigger_time = {}
+        self.__dict__.pop('usage_states', None)  # 场景变化后重新计算
 
         for scene in self.scenes:
             scene.build(
@@ -127,56 +132,74 @@ class ConditionalOperator(ConditionalOperatorLoader):
     def _normal_scene_loop(self) -> None:
         """
         主循环
+        不再定时轮询 而是等待以下事件后重新判断
+        - 主循环场景用到的状态有更新
+        - 正在运行的任务结束
+        - 到达场景冷却时间 或状态的时间区间可能变化的时间
         :return:
         """
-        normal_scene_id = id(self.normal_scene)
-        while self.is_running:
-            if self.running_executor_cnt.get() > 0:
-                # 有其它场景在运行 等待
-                time.sleep(0.02)
-                continue
+        normal_scene = self.normal_scene
+        normal_scene_id = id(normal_scene)
 
-            # log.debug('开始等待新的主循环')
-            to_sleep: Optional[float] = None
-
-            # 上锁后确保运行状态不会被篡改
-            with self._task_lock:
-                if not self.is_running:
-                    # 已经被stop_running中断了 不继续
-                    break
+        # 上锁后确保运行状态不会被篡改 等待时会释放锁
+        with self._scheduler_cond:
+            while self.is_running:
+                if self.running_executor_cnt.get() > 0:
+                    # 有其它场景在运行 等待运行结束
+                    self._scheduler_cond.wait(SCHEDULER_MAX_WAIT_SECONDS)
+                    continue
 
                 trigger_time = time.time()
                 last_trigger_time = self.last_trigger_time.get(normal_scene_id, 0)
                 past_time = trigger_time - last_trigger_time
-                if past_time < self.normal_scene.interval_seconds:
-                    to_sleep = self.normal_scene.interval_seconds - past_time
-                else:
-                    new_execution_info = self.normal_scene.match_execution(trigger_time)
-                    if new_execution_info is not None:
-                        log.debug(f'当前场景 主循环 当前条件 {new_execution_info.expr_display}')
-                        new_execution_info.priority = self.normal_scene.priority
-                        self._emit_overlay_decision(
-                            trigger="主循环",
-                            expression=new_execution_info.expr_display,
-                            status="MATCHED",
-                            execution_info=new_execution_info,
-                        )
-
-                        self.current_execution_info = new_execution_info
-                        self.running_executor = OperationExecutor(
-                            op_list=new_execution_info.op_list,
-                            trigger_time=trigger_time,
-                        )
-                        self.last_trigger_time[normal_scene_id] = trigger_time
-                        self.running_executor_cnt.inc()
-                        future = self.running_executor.run_async()
-                        future.add_done_callback(self._on_task_done)
-
-            if to_sleep is not None:
-                # 等待时间不能写在锁里 要尽快释放锁
-                time.sleep(to_sleep)
-            else:  # 没有命中的状态 或者 提交执行了 那就自旋等待
-                time.sleep(0.02)
+                if past_time < normal_scene.interval_seconds:
+                    self._wait_scheduler(normal_scene.interval_seconds - past_time)
+                    continue
+
+                new_execution_info = normal_scene.match_execution(trigger_time)
+                if new_execution_info is None:
+                    # 没有命中的状态 等待状态更新 或者状态的时间区间变化
+                    next_change_time = normal_scene.next_change_time(trigger_time)
+                    if next_change_time is None:
+                        self._wait_scheduler(SCHEDULER_MAX_WAIT_SECONDS)
+                    else:
+                        self._wait_scheduler(next_change_time - trigger_time)
+                    continue
+
+                log.debug(f'当前场景 主循环 当前条件 {new_execution_info.expr_display}')
+                new_execution_info.priority = normal_scene.priority
+                self._emit_overlay_decision(
+                    trigger="主循环",
+                    expression=new_execution_info.expr_display,
+                    status="MATCHED",
+                    execution_info=new_execution_info,
+                )
+
+                self.current_execution_info = new_execution_info
+                self.running_executor = OperationExecutor(
+                    op_list=new_execution_info.op_list,
+                    trigger_time=trigger_time,
+                )
+                self.last_trigger_time[normal_scene_id] = trigger_time
+                self.running_executor_cnt.inc()
+                future = self.running_executor.run_async()
+                future.add_done_callback(self._on_task_done)
+
+    def _wait_scheduler(self, seconds: float) -> None:
+        """
+        主循环等待 需要在 self._scheduler_cond 中调用
+        :param seconds: 最长等待时间
+        :return:
+        """
+        seconds = min(max(seconds, SCHEDULER_MIN_WAIT_SECONDS), SCHEDULER_MAX_WAIT_SECONDS)
+        self._scheduler_cond.wait(seconds)
+
+    def _notify_scheduler(self) -> None:
+        """
+        唤醒主循环 需要在 self._task_lock 中调用
+        :return:
+        """
+        self._scheduler_cond.notify_all()
 
     def _trigger_scene(self, state_name: str) -> None:
         """
@@ -249,6 +272,7 @@ class ConditionalOperator(ConditionalOperatorLoader):
         with self._task_lock:
             self.is_running = False
             self._stop_running_task()
+            self._notify_scheduler()
 
     def _stop_running_task(self) -> None:
         """
@@ -263,6 +287,7 @@ class ConditionalOperator(ConditionalOperatorLoader):
                 # 如果 finish=False 则代表还有操作在继续。在这里要减少计数器而不是等_on_task_done 让无触发器场景尽早运行
                 self.running_executor_cnt.dec()
             self.running_executor = None
+            self._notify_scheduler()
 
     def _on_task_done(self, future: Future) -> None:
         """
@@ -275,6 +300,7 @@ class ConditionalOperator(ConditionalOperatorLoader):
                     self.running_executor_cnt.dec()
             except Exception:  # run_async里有callback打印日志
                 pass
+            self._notify_scheduler()
 
     @cached_property
     def usage_states(self) -> set[str]:
@@ -292,7 +318,7 @@ class ConditionalOperator(ConditionalOperatorLoader):
                 states = states.union(scene.usage_states)
         return states
 
-    def batch_update_states(self, state_records: list[StateRecord]) -> None:
+    def batch_update_states(self, state_records: list[StateRecord], changed_states: set[str] | None = None) -> None:
         """
         批量更新多个状态后的回调
         然后看是否需要触发对应的场景 清除状态的不进行触发
@@ -300,11 +326,20 @@ class ConditionalOperator(ConditionalOperatorLoader):
         多个相同优先级时 随机触发一个
         没有场景需要触发时 判断是否符合当前运行指令的打断 如果符合 则打断
         :param state_records: 状态记录列表
+        :param changed_states: 发生变化的全部状态 包括被互斥清除的 不传入时只使用状态记录中的
         :return:
         """
         if not self.is_running:
             return
 
+        if changed_states is None:
+            changed_states = {i.state_name for i in state_records}
+
+        # 主循环场景用到的状态有变化 唤醒主循环重新判断
+        if self.normal_scene is not None and not changed_states.isdisjoint(self.normal_scene.usage_states):
+            with self._task_lock:
+                self._notify_scheduler()
+
         top_priority_scene: Optional[Scene] = None
         top_priority_state: Optional[str] = None
 
@@ -344,7 +379,9 @@ class ConditionalOperator(ConditionalOperatorLoader):
             with self._task_lock:
                 interrupt: bool = False
                 if (self.running_executor is not None and self.running_executor.running
-                        and self.current_execution_info.interrupt_cal_tree is not None):
+                        and self.current_execution_info.interrupt_cal_tree is not None
+                        # 只有中断条件用到的状态有变化时 才需要重新判断
+                        and not changed_states.isdisjoint(self.current_execution_info.interrupt_cal_tree.usage_states)):
                     now = time.time()
                     if self.current_execution_info.interrupt_cal_tree.in_time_range(now):
                         interrupt = True
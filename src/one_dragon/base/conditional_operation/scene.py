@@ -66,6 +66,23 @@ class Scene:
 
         return states
 
+    def next_change_time(self, now: float) -> float | None:
+        """
+        没有新的状态记录时 匹配结果最早可能在什么时候变化
+
+        Args:
+            now: 当前时间
+
+        Returns:
+            下一个可能变化的时间 不会再随时间变化时返回None
+        """
+        result: float | None = None
+        for handler in self.handlers:
+            handler_time = handler.next_change_time(now)
+            if handler_time is not None and (result is None or handler_time < result):
+                result = handler_time
+        return result
+
     def match_execution(self, trigger_time: float) -> ExecutionInfo | None:
         """
         根据触发时间和优先级 获取符合条件的场景下的执行信息
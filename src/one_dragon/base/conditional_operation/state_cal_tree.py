@@ -102,6 +102,34 @@ class StateCalNode:
 
         return False
 
+    def next_change_time(self, now: float) -> float | None:
+        """
+        没有新的状态记录时 判断结果最早可能在什么时候变化
+        只有状态的时间区间会随时间变化 值区间不会
+        :param now: 当前时间
+        :return: 下一个可能变化的时间 不会再随时间变化时返回None
+        """
+        if self.node_type == StateCalNodeType.OP:
+            result: float | None = None
+            for child in (self.left_child, self.right_child):
+                if child is None:
+                    continue
+                child_time = child.next_change_time(now)
+                if child_time is not None and (result is None or child_time < result):
+                    result = child_time
+            return result
+        elif self.node_type == StateCalNodeType.STATE:
+            last_record_time = self.state_recorder.last_record_time
+            if last_record_time <= 0:  # 未触发过或已被清除 时间差会一直很大
+                return None
+            # 进入区间的时间 和离开区间的时间
+            for change_time in (last_record_time + self.state_time_range_min, last_record_time + self.state_time_range_max):
+                if change_time > now:
+                    return change_time
+            return None
+
+        return None
+
     @cached_property
     def usage_states(self) -> set[str]:
         """
@@ -63,19 +63,24 @@ class StateRecordService(ABC):
         批量更新多个状态
         更新后触发 操作器相应的动作
         """
+        changed_states: set[str] = set()
         for state_record in state_records:
-            self._update_state_recorder(state_record)
+            self._update_state_recorder(state_record, changed_states)
 
+        # 只通知用到了这些状态的操作器
         for op in self.op_list:
-            f: Future = _state_record_service_executor.submit(op.batch_update_states, state_records)
+            if changed_states.isdisjoint(op.usage_states):
+                continue
+            f: Future = _state_record_service_executor.submit(op.batch_update_states, state_records, changed_states)
             f.add_done_callback(thread_utils.handle_future_result)
 
-    def _update_state_recorder(self, new_record: StateRecord) -> StateRecorder | None:
+    def _update_state_recorder(self, new_record: StateRecord, changed_states: set[str] | None = None) -> StateRecorder | None:
         """
         更新一个状态记录
 
         Args:
             new_record: 新的状态记录
+            changed_states: 传入时 记录发生变化的状态 包括被互斥清除的
 
         Returns:
             更新后的状态记录器
@@ -84,6 +89,9 @@ class StateRecordService(ABC):
         if recorder is None:
             return None
 
+        if changed_states is not None:
+            changed_states.add(new_record.state_name)
+
         if new_record.is_clear:
             recorder.clear_state_record()
         else:
@@ -94,6 +102,8 @@ class StateRecordService(ABC):
                     if mutex_recorder is None:
                         continue
                     mutex_recorder.clear_state_record()
+                    if changed_states is not None:
+                        changed_states.add(mutex_state)
 
         return recorder
 
@@ -1,6 +1,9 @@
+import atexit
 import copy
 import os
 import shutil
+import threading
+import time
 
 import yaml
 
@@ -9,6 +12,203 @@ from one_dragon.utils.log_utils import log
 
 cached_yaml_data: dict[str, tuple[float, dict | list]] = {}
 
+DEFAULT_WRITE_BEHIND_INTERVAL: float = 1  # 延迟写入的默认间隔 秒
+REPLACE_RETRY_TIMES: int = 3  # 替换文件失败时的重试次数 Windows下文件可能被其它程序短暂占用
+
+
+def atomic_write_text(file_path: str, text: str, fsync: bool = False) -> None:
+    """
+    先写入临时文件 再替换目标文件 避免写入中途退出时留下不完整的文件
+    :param file_path: 目标文件
+    :param text: 文本
+    :param fsync: 替换前是否确保临时文件已写入磁盘
+    :return:
+    """
+    temp_path = f'{file_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(text)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+
+        for i in range(REPLACE_RETRY_TIMES):
+            try:
+                os.replace(temp_path, file_path)
+                return
+            except PermissionError:
+                if i == REPLACE_RETRY_TIMES - 1:
+                    break
+                time.sleep(0.05)
+
+        # 一直无法替换时 退回直接写入
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(text)
+    finally:
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+class YamlWriteBehind:
+
+    def __init__(self):
+        """
+        延迟写入yml文件
+        保存时只标记有改动 由后台线程按间隔合并写入 连续修改多个值时只写入一次
+        在程序退出 或调用 flush 时立刻写入
+        """
+        self.interval: float = 0  # 写入间隔 <=0 时不延迟 直接写入
+        self._pending: dict[int, YamlOperator] = {}  # 有改动未写入的文件 key=id(operator)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._atexit_registered: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def enable(self, interval: float = DEFAULT_WRITE_BEHIND_INTERVAL) -> None:
+        """
+        开启延迟写入
+        :param interval: 写入间隔 秒 <=0 时关闭
+        :return:
+        """
+        if interval <= 0:
+            self.disable()
+            return
+        with self._lock:
+            self.interval = interval
+            if not self._atexit_registered:
+                atexit.register(self.disable)
+                self._atexit_registered = True
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='one_dragon_yaml_write_behind', daemon=True)
+                self._thread.start()
+
+    def disable(self) -> None:
+        """
+        关闭延迟写入 并写入所有未保存的改动
+        :return:
+        """
+        with self._lock:
+            self.interval = 0
+        self._wakeup.set()
+        self.flush()
+
+    def mark_dirty(self, operator: 'YamlOperator') -> bool:
+        """
+        标记有改动
+        :param operator: yml文件的操作器
+        :return: 是否已延迟写入 未开启时返回False 需要调用方直接写入
+        """
+        with self._lock:
+            if self.interval <= 0:
+                return False
+            self._pending[id(operator)] = operator
+            return True
+
+    def discard(self, operator: 'YamlOperator') -> None:
+        """
+        放弃未写入的改动 用于文件被删除或被其它方式覆盖时
+        :param operator: yml文件的操作器
+        :return:
+        """
+        with self._lock:
+            self._pending.pop(id(operator), None)
+
+    def is_pending(self, operator: 'YamlOperator') -> bool:
+        with self._lock:
+            return id(operator) in self._pending
+
+    def flush(self, operator: 'YamlOperator | None' = None) -> None:
+        """
+        立刻写入未保存的改动
+        :param operator: 只写入这个文件 不传入时写入全部
+        :return:
+        """
+        with self._lock:
+            if operator is None:
+                to_write_list = list(self._pending.values())
+                self._pending.clear()
+            else:
+                to_write_list = [operator] if self._pending.pop(id(operator), None) is not None else []
+
+        for i in to_write_list:
+            self._write(i)
+
+    def flush_file(self, file_path: str) -> None:
+        """
+        立刻写入某个文件的改动 读取文件前使用
+        :param file_path: 文件路径
+        :return:
+        """
+        with self._lock:
+            if len(self._pending) == 0:
+                return
+            to_write_list = [i for i in self._pending.values() if i.file_path == file_path]
+            for i in to_write_list:
+                self._pending.pop(id(i), None)
+
+        for i in to_write_list:
+            self._write(i)
+
+    def _write(self, operator: 'YamlOperator') -> None:
+        try:
+            operator._write_to_file(fsync=True)
+        except Exception:
+            # 写入期间数据被其它线程修改等情况 下一轮重新写入
+            log.error(f'延迟写入失败 将稍后重试 {operator.file_path}', exc_info=True)
+            with self._lock:
+                if self.interval > 0:
+                    self._pending[id(operator)] = operator
+                    return
+            try:
+                operator._write_to_file(fsync=True)
+            except Exception:
+                log.error(f'写入失败 {operator.file_path}', exc_info=True)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                interval = self.interval
+            if interval <= 0:
+                break
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+write_behind = YamlWriteBehind()
+
+
+def enable_write_behind(interval: float = DEFAULT_WRITE_BEHIND_INTERVAL) -> None:
+    """
+    开启yml文件的延迟写入
+    :param interval: 写入间隔 秒 <=0 时关闭
+    :return:
+    """
+    write_behind.enable(interval)
+
+
+def flush_all() -> None:
+    """
+    立刻写入所有未保存的yml文件
+    :return:
+    """
+    write_behind.flush()
+
+
+def shutdown_write_behind() -> None:
+    """
+    关闭延迟写入 并写入所有未保存的改动 程序退出时使用
+    :return:
+    """
+    write_behind.disable()
+
 
 def read_cache_or_load(file_path: str) -> dict | list:
     cached = cached_yaml_data.get(file_path)
@@ -53,6 +253,9 @@ class YamlOperator:
         self.data: dict | list = {}
         """存放数据的地方"""
 
+        self._write_lock = threading.Lock()
+        """避免后台线程和调用方同时写入同一个文件"""
+
         self.__read_from_file()
 
     def __read_from_file(self) -> None:
@@ -62,6 +265,7 @@ class YamlOperator:
         """
         if self.file_path is None:
             return
+        write_behind.flush_file(self.file_path)  # 有未写入的改动时 先写入再读取
         if not os.path.exists(self.file_path):
             return
 
@@ -95,6 +299,11 @@ class YamlOperator:
         return self._write_file_path if self._write_file_path is not None else self.file_path
 
     def save(self):
+        """
+        保存到文件 开启延迟写入时只标记有改动 由后台线程写入
+        需要确保已写入磁盘时 再调用 flush
+        :return:
+        """
         if not self._ensure_write_path_ready():
             return
 
@@ -102,15 +311,37 @@ class YamlOperator:
         if write_path is None:
             return
 
-        with open(write_path, 'w', encoding='utf-8') as file:
-            yaml.dump(self.data, file, allow_unicode=True, sort_keys=False)
-        invalidate_cache(write_path)
-
         if self.file_path != write_path:
             self.file_path = write_path
             if hasattr(self, 'old_file_path'):
                 self.old_file_path = write_path
 
+        if write_behind.mark_dirty(self):
+            return
+
+        self._write_to_file()
+
+    def flush(self) -> None:
+        """
+        立刻写入未保存的改动
+        :return:
+        """
+        write_behind.flush(self)
+
+    def _write_to_file(self, fsync: bool = False) -> None:
+        """
+        把当前数据写入文件
+        :param fsync: 是否确保已写入磁盘
+        :return:
+        """
+        with self._write_lock:
+            write_path = self.file_path
+            if write_path is None:
+                return
+            text = yaml.dump(self.data, allow_unicode=True, sort_keys=False)
+            atomic_write_text(write_path, text, fsync=fsync)
+            invalidate_cache(write_path)
+
     def save_diy(self, text: str):
         """
         按自定义的文本格式
@@ -124,9 +355,10 @@ class YamlOperator:
         if write_path is None:
             return
 
-        with open(write_path, "w", encoding="utf-8") as file:
-            file.write(text)
-        invalidate_cache(write_path)
+        write_behind.discard(self)  # 自定义文本覆盖之前未写入的改动
+        with self._write_lock:
+            atomic_write_text(write_path, text)
+            invalidate_cache(write_path)
 
         if self.file_path != write_path:
             self.file_path = write_path
@@ -154,6 +386,7 @@ class YamlOperator:
         """
         if self.file_path is None:
             return
+        write_behind.discard(self)
         if os.path.exists(self.file_path):
             os.remove(self.file_path)
             invalidate_cache(self.file_path)
@@ -3,6 +3,7 @@ import time
 from cv2.typing import MatLike
 
 from one_dragon.base.geometry.point import Point
+from one_dragon.base.screen.screen_frame_cache import ScreenFrameCache
 
 
 class ScreenshotWithTime:
@@ -23,6 +24,7 @@ class ControllerBase:
         self.screenshot_history: list[ScreenshotWithTime] = []
         self.screenshot_alive_seconds: float = screenshot_alive_seconds  # 截图在内存的存活时间
         self.max_screenshot_cnt: int = max_screenshot_cnt  # 内存中最多保持的截图数量
+        self.frame_cache: ScreenFrameCache = ScreenFrameCache()  # 最新一帧截图上的区域识别结果
 
     def init_before_context_run(self) -> bool:
         """
@@ -61,11 +63,12 @@ class ControllerBase:
         截图并保存在内存中
         """
         self.before_screenshot()
-        screenshot_time = time.time()
-        screen = self.get_screenshot(independent)
+        screenshot_time, screen = self.get_screenshot_with_time(independent)
         if screen is None:
             return screenshot_time, None
         fix_screen = self.fill_uid_black(screen)
+        if not independent:
+            self.frame_cache.new_frame(screenshot_time, fix_screen)
 
         if self.max_screenshot_cnt > 0:
             self.screenshot_history.append(ScreenshotWithTime(fix_screen, screenshot_time))
@@ -92,6 +95,15 @@ class ControllerBase:
         """
         pass
 
+    def get_screenshot_with_time(self, independent: bool = False) -> tuple[float, MatLike | None]:
+        """
+        截图 并返回开始截图的时间
+        后台截图时 返回的是截取这一帧的时间 由子类实现
+        :return: 截图时间 缩放到默认分辨率的截图
+        """
+        screenshot_time = time.time()
+        return screenshot_time, self.get_screenshot(independent)
+
     def fill_uid_black(self, screen: MatLike) -> MatLike:
         """
         遮挡UID 由子类实现
@@ -39,7 +39,8 @@ class PcControllerBase(ControllerBase):
     def __init__(self,
                  screenshot_method: str,
                  standard_width: int = 1920,
-                 standard_height: int = 1080):
+                 standard_height: int = 1080,
+                 background_screenshot_fps: float = 0):
         ControllerBase.__init__(self)
         self.standard_width: int = standard_width
         self.standard_height: int = standard_height
@@ -52,6 +53,7 @@ class PcControllerBase(ControllerBase):
         self.btn_controller: PcButtonController = self.keyboard_controller
         self.screenshot_controller: PcScreenshotController = PcScreenshotController(self.game_win, standard_width, standard_height)
         self.screenshot_method: str = screenshot_method
+        self.background_screenshot_fps: float = background_screenshot_fps  # 后台截图的帧率 <=0 时不使用后台截图
         self.background_mode: bool = False
         self.mouse_flash_duration: float = 0.05  # 闪切键鼠模式时每步等待时长
         self.gamepad_action_keys: dict[str, list[str]] = {}
@@ -66,6 +68,7 @@ class PcControllerBase(ControllerBase):
         self.game_win.init_win()
         if self.is_game_window_ready:
             self.screenshot_controller.init_screenshot(self.screenshot_method)
+            self._start_background_screenshot()
             return True
         else:
             return False
@@ -123,6 +126,7 @@ class PcControllerBase(ControllerBase):
             self._send_activate()
             self._ensure_gamepad_mode()
         self.btn_controller.tap(key)
+        self.screenshot_controller.mark_input()
 
     def btn_press(self, key: str, press_time: float | None = None) -> None:
         """按住键。后台模式下先发 WM_ACTIVATE 再确保手柄输入模式。"""
@@ -130,10 +134,12 @@ class PcControllerBase(ControllerBase):
             self._send_activate()
             self._ensure_gamepad_mode()
         self.btn_controller.press(key, press_time)
+        self.screenshot_controller.mark_input()
 
     def btn_release(self, key: str) -> None:
         """释放键。"""
         self.btn_controller.release(key)
+        self.screenshot_controller.mark_input()
 
     @property
     def is_game_window_ready(self) -> bool:
@@ -155,10 +161,28 @@ class PcControllerBase(ControllerBase):
             # 确保截图器已初始化
             if not independent and self.screenshot_controller.active_strategy_name is None:
                 self.screenshot_controller.init_screenshot(self.screenshot_method)
+                self._start_background_screenshot()
             return self.screenshot_controller.get_screenshot(independent)
         else:
             raise RuntimeError('游戏窗口未就绪')
 
+    def get_screenshot_with_time(self, independent: bool = False) -> tuple[float, MatLike | None]:
+        if not independent and self.is_game_window_ready:
+            frame = self.screenshot_controller.next_background_frame()
+            if frame is not None:
+                return frame.capture_time, frame.image
+        return ControllerBase.get_screenshot_with_time(self, independent)
+
+    def _start_background_screenshot(self) -> None:
+        """
+        开启了后台截图时 使用当前的截图方法开始后台截图
+        """
+        if self.background_screenshot_fps <= 0:
+            return
+        if self.screenshot_controller.active_strategy_name is None:
+            return
+        self.screenshot_controller.start_background_capture(self.background_screenshot_fps)
+
     def enable_foreground_mode(self) -> None:
         """
         启用前台模式 (默认):
@@ -283,10 +307,13 @@ class PcControllerBase(ControllerBase):
         """
         if self.background_mode:
             if gamepad_key:
-                return self._gamepad_click(gamepad_key)
-            return self._background_click(pos, press_time)
-
-        return self._foreground_click(pos, press_time, pc_alt)
+                result = self._gamepad_click(gamepad_key)
+            else:
+                result = self._background_click(pos, press_time)
+        else:
+            result = self._foreground_click(pos, press_time, pc_alt)
+        self.screenshot_controller.mark_input()
+        return result
 
 
     def _foreground_click(self, pos: Point | None, press_time: float = 0, pc_alt: bool = False) -> bool:
@@ -406,9 +433,10 @@ class PcControllerBase(ControllerBase):
             start = get_current_mouse_pos()
 
         if self.background_mode:
-            return self._background_drag(start, end, duration)
-
-        return self._foreground_drag(start, end, duration)
+            self._background_drag(start, end, duration)
+        else:
+            self._foreground_drag(start, end, duration)
+        self.screenshot_controller.mark_input()
 
     def _foreground_drag(self, start: Point, end: Point, duration: float = 0.5) -> None:
         """前台拖拽：通过 pyautogui 按住拖动。
@@ -501,6 +529,7 @@ class PcControllerBase(ControllerBase):
             log.error('滚动位置不在游戏窗口区域 (%s)', pos)
             return
         win_scroll(down, win_pos)
+        self.screenshot_controller.mark_input()
 
     def input_str(self, to_input: str, interval: float = 0.1) -> None:
         """输入文本 需要自己先选择好输入框。
@@ -509,6 +538,7 @@ class PcControllerBase(ControllerBase):
             to_input: 文本
         """
         self.keyboard_controller.keyboard.type(to_input)
+        self.screenshot_controller.mark_input()
 
     def mouse_move(self, game_pos: Point) -> None:
         """
@@ -517,6 +547,7 @@ class PcControllerBase(ControllerBase):
         win_pos = self.game_win.game2win_pos(game_pos)
         if win_pos is not None:
             pyautogui.moveTo(win_pos.x, win_pos.y)
+            self.screenshot_controller.mark_input()
 
     @property
     def center_point(self) -> Point:
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from one_dragon.utils.log_utils import log
+
+if TYPE_CHECKING:
+    from one_dragon.base.controller.pc_screenshot.screencapper_base import ScreencapperBase
+    from one_dragon.base.geometry.rectangle import Rect
+
+DEFAULT_TARGET_FPS: float = 30  # 后台截图的目标帧率
+DEFAULT_BUFFER_SIZE: int = 3  # 环形缓冲区的帧数
+FAIL_WAIT_SECONDS: float = 0.1  # 截图失败后 等待这么久再重试
+
+
+class CapturedFrame:
+
+    def __init__(self, frame_id: int, capture_time: float, image: MatLike):
+        """
+        后台截取的一帧
+
+        Args:
+            frame_id: 帧编号 从1开始递增
+            capture_time: 开始截图的时间 与 time.time() 一致
+            image: 截图 已缩放到标准分辨率
+        """
+        self.frame_id: int = frame_id
+        self.capture_time: float = capture_time
+        self.image: MatLike = image
+
+
+class ScreenshotRingBuffer:
+
+    def __init__(self, buffer_size: int, width: int, height: int):
+        """
+        保存最近几帧截图的环形缓冲区
+        每个槽位预先分配好标准分辨率的数组 写入时复制或直接缩放到槽位中 不再每帧申请新的内存
+        读取时默认复制一份 槽位之后会被覆盖 不能把槽位本身交给使用方长期持有
+
+        Args:
+            buffer_size: 帧数 至少2 保证读取时不会与正在写入的槽位冲突
+            width: 标准宽度
+            height: 标准高度
+        """
+        self.buffer_size: int = max(2, buffer_size)
+        self.width: int = width
+        self.height: int = height
+
+        self._slot_list: list[np.ndarray] = [
+            np.empty((height, width, 3), dtype=np.uint8)
+            for _ in range(self.buffer_size)
+        ]
+        self._slot_frame_id: list[int] = [0] * self.buffer_size
+        self._slot_time: list[float] = [0] * self.buffer_size
+
+        self.latest_frame_id: int = 0  # 最新一帧的编号 0 表示还没有截图
+        self._cond = threading.Condition()
+
+    def put(self, image: MatLike, capture_time: float) -> int:
+        """
+        写入一帧截图 尺寸与标准分辨率不一致时缩放
+
+        Args:
+            image: 截图 RGB
+            capture_time: 开始截图的时间
+
+        Returns:
+            int: 帧编号
+        """
+        with self._cond:
+            frame_id = self.latest_frame_id + 1
+            idx = frame_id % self.buffer_size
+            self._slot_frame_id[idx] = 0  # 写入期间标记为无效
+            slot = self._slot_list[idx]
+
+        # 写入时不持有锁 读取方只会读取已经写完的槽位
+        if image.shape == slot.shape and image.dtype == slot.dtype:
+            np.copyto(slot, image)
+        elif image.ndim == 3 and image.shape[2] == 3 and image.dtype == slot.dtype:
+            cv2.resize(image, (self.width, self.height), dst=slot)
+        else:  # 非常规的截图 直接替换槽位
+            slot = cv2.resize(image, (self.width, self.height))
+            self._slot_list[idx] = slot
+
+        with self._cond:
+            self._slot_frame_id[idx] = frame_id
+            self._slot_time[idx] = capture_time
+            self.latest_frame_id = frame_id
+            self._cond.notify_all()
+        return frame_id
+
+    def latest(self, max_age: float | None = None, copy: bool = True) -> CapturedFrame | None:
+        """
+        获取最新一帧
+
+        Args:
+            max_age: 最多允许截图过去多少秒 None 时不限制
+            copy: 是否复制图片 不复制时图片会在之后被覆盖 只能立刻使用
+
+        Returns:
+            CapturedFrame | None: 最新一帧 没有截图或截图太旧时返回None
+        """
+        with self._cond:
+            return self._get_latest(max_age, copy)
+
+    def wait_newer(self, after_frame_id: int, timeout: float, max_age: float | None = None,
+                   copy: bool = True, after_time: float = 0) -> CapturedFrame | None:
+        """
+        等待比指定编号更新的一帧
+
+        Args:
+            after_frame_id: 已经使用过的帧编号
+            timeout: 最长等待时间 秒
+            max_age: 最多允许截图过去多少秒 None 时不限制
+            copy: 是否复制图片
+            after_time: 只接受在这个时间之后开始截取的帧
+
+        Returns:
+            CapturedFrame | None: 更新的一帧 超时时返回None
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._is_latest_newer(after_frame_id, after_time), timeout=timeout)
+            if not self._is_latest_newer(after_frame_id, after_time):
+                return None
+            return self._get_latest(max_age, copy)
+
+    def _is_latest_newer(self, after_frame_id: int, after_time: float) -> bool:
+        """
+        最新一帧是否比指定编号和时间都新 需要持有锁
+        """
+        frame_id = self.latest_frame_id
+        if frame_id <= after_frame_id:
+            return False
+        return self._slot_time[frame_id % self.buffer_size] > after_time
+
+    def _get_latest(self, max_age: float | None, copy: bool) -> CapturedFrame | None:
+        """
+        获取最新一帧 需要持有锁
+        """
+        frame_id = self.latest_frame_id
+        if frame_id == 0:
+            return None
+        idx = frame_id % self.buffer_size
+        if self._slot_frame_id[idx] != frame_id:
+            return None
+        capture_time = self._slot_time[idx]
+        if max_age is not None and time.time() - capture_time > max_age:
+            return None
+        slot = self._slot_list[idx]
+        return CapturedFrame(frame_id, capture_time, slot.copy() if copy else slot)
+
+    def clear(self) -> None:
+        with self._cond:
+            self._slot_frame_id = [0] * self.buffer_size
+            self._cond.notify_all()
+
+
+class BackgroundScreencapper:
+
+    def __init__(
+        self,
+        capturer: ScreencapperBase,
+        rect_getter: Callable[[], Rect | None],
+        standard_width: int,
+        standard_height: int,
+        target_fps: float = DEFAULT_TARGET_FPS,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        capture_lock: threading.Lock | None = None,
+    ):
+        """
+        在后台线程中按目标帧率持续截图 写入环形缓冲区
+        指令线程直接取最新一帧 截图与画面识别可以同时进行 不需要每轮都等待截图
+
+        Args:
+            capturer: 任意截图方法
+            rect_getter: 获取截图区域 返回None时跳过本次截图
+            standard_width: 标准宽度
+            standard_height: 标准高度
+            target_fps: 目标帧率
+            buffer_size: 环形缓冲区的帧数
+            capture_lock: 与其它线程共用截图方法时 截图时持有的锁
+        """
+        self.capturer: ScreencapperBase = capturer
+        self.rect_getter: Callable[[], Rect | None] = rect_getter
+        self.target_fps: float = target_fps
+        self.buffer: ScreenshotRingBuffer = ScreenshotRingBuffer(buffer_size, standard_width, standard_height)
+        self._capture_lock: threading.Lock = capture_lock if capture_lock is not None else threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self.capture_count: int = 0  # 成功截图的次数
+        self.fail_count: int = 0  # 截图失败的次数
+        self.last_capture_seconds: float = 0  # 最近一次截图的耗时
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        开始后台截图
+        """
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='one_dragon_background_screenshot', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 1) -> None:
+        """
+        停止后台截图
+
+        Args:
+            timeout: 等待线程结束的时间
+        """
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+        self._thread = None
+        self.buffer.clear()
+
+    def capture_once(self) -> int | None:
+        """
+        截图一次并写入缓冲区
+
+        Returns:
+            int | None: 帧编号 失败时返回None
+        """
+        rect = self.rect_getter()
+        if rect is None or rect.width <= 0 or rect.height <= 0:
+            return None
+
+        capture_time = time.time()
+        start_time = time.perf_counter()
+        with self._capture_lock:
+            image = self.capturer.capture(rect)
+        if image is None:
+            return None
+        frame_id = self.buffer.put(image, capture_time)
+        self.last_capture_seconds = time.perf_counter() - start_time
+        return frame_id
+
+    def _run(self) -> None:
+        interval = 1.0 / self.target_fps if self.target_fps > 0 else 0
+        next_time = time.perf_counter()
+        while not self._stop_event.is_set():
+            try:
+                frame_id = self.capture_once()
+            except Exception:
+                log.debug('后台截图失败', exc_info=True)
+                frame_id = None
+
+            if frame_id is None:
+                self.fail_count += 1
+                self._stop_event.wait(FAIL_WAIT_SECONDS)
+                next_time = time.perf_counter()
+                continue
+
+            self.capture_count += 1
+            next_time += interval
+            wait_seconds = next_time - time.perf_counter()
+            if wait_seconds > 0:
+                self._stop_event.wait(wait_seconds)
+            else:  # 截图比目标帧率慢 不追赶落下的帧
+                next_time = time.perf_counter()
+
+    def latest_frame(self, max_age: float | None = None) -> CapturedFrame | None:
+        """
+        获取最新一帧
+
+        Args:
+            max_age: 最多允许截图过去多少秒 None 时不限制
+
+        Returns:
+            CapturedFrame | None: 最新一帧 没有截图或截图太旧时返回None
+        """
+        return self.buffer.latest(max_age)
+
+    def next_frame(self, after_frame_id: int, timeout: float, max_age: float | None = None,
+                   after_time: float = 0) -> CapturedFrame | None:
+        """
+        获取比指定编号更新的一帧 还没有时等待
+
+        Args:
+            after_frame_id: 已经使用过的帧编号
+            timeout: 最长等待时间 秒
+            max_age: 最多允许截图过去多少秒 None 时不限制
+            after_time: 只接受在这个时间之后开始截取的帧
+
+        Returns:
+            CapturedFrame | None: 更新的一帧 超时时返回None
+        """
+        return self.buffer.wait_newer(after_frame_id, timeout, max_age, after_time=after_time)
@@ -1,7 +1,15 @@
+import threading
+import time
+
 import cv2
 from cv2.typing import MatLike
 
 from one_dragon.base.controller.pc_game_window import PcGameWindow
+from one_dragon.base.controller.pc_screenshot.background_screencapper import (
+    DEFAULT_BUFFER_SIZE,
+    BackgroundScreencapper,
+    CapturedFrame,
+)
 from one_dragon.base.controller.pc_screenshot.bitblt_screencapper import (
     BitBltScreencapper,
 )
@@ -37,6 +45,11 @@ class PcScreenshotController:
         }
         self.active_strategy_name: str | None = None
 
+        self._capture_lock = threading.Lock()  # 后台截图与指令线程共用截图方法
+        self.background_capturer: BackgroundScreencapper | None = None
+        self._last_frame_id: int = 0  # 上一次返回的后台截图帧编号
+        self._last_input_time: float = 0  # 上一次键鼠输入结束的时间 在这之前开始的后台截图不再使用
+
     def get_screenshot(self, independent: bool = False, resize: bool = True) -> MatLike | None:
         """根据初始化的方法获取截图
 
@@ -68,7 +81,8 @@ class PcScreenshotController:
                 if not strategy:
                     continue
 
-                result = strategy.capture(rect, independent)
+                with self._capture_lock:
+                    result = strategy.capture(rect, independent)
                 if result is None:
                     continue
 
@@ -84,6 +98,86 @@ class PcScreenshotController:
                 continue
         return None
 
+    def start_background_capture(
+        self,
+        target_fps: float,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        capturer: ScreencapperBase | None = None,
+    ) -> bool:
+        """开始后台截图 使用 latest_frame 或 next_background_frame 获取后台截取的帧
+        get_screenshot 仍然同步截图 与后台截图共用截图方法时互斥
+
+        Args:
+            target_fps: 目标帧率
+            buffer_size: 环形缓冲区的帧数
+            capturer: 使用的截图方法 默认使用已初始化的截图方法
+
+        Returns:
+            是否成功开始
+        """
+        self.stop_background_capture()
+        if capturer is None:
+            capturer = self.strategies.get(self.active_strategy_name) if self.active_strategy_name else None
+        if capturer is None:
+            log.error("截图方法尚未初始化，无法开始后台截图")
+            return False
+
+        self.background_capturer = BackgroundScreencapper(
+            capturer=capturer,
+            rect_getter=lambda: self.game_win.win_rect,
+            standard_width=self.standard_width,
+            standard_height=self.standard_height,
+            target_fps=target_fps,
+            buffer_size=buffer_size,
+            capture_lock=self._capture_lock,
+        )
+        self._last_frame_id = 0
+        self.background_capturer.start()
+        return True
+
+    def stop_background_capture(self) -> None:
+        """停止后台截图"""
+        if self.background_capturer is not None:
+            self.background_capturer.stop()
+            self.background_capturer = None
+
+    def latest_frame(self, max_age: float | None = None) -> CapturedFrame | None:
+        """获取后台截取的最新一帧
+
+        Args:
+            max_age: 最多允许截图过去多少秒 None 时不限制
+
+        Returns:
+            最新一帧 没有后台截图或截图太旧时返回 None
+        """
+        capturer = self.background_capturer
+        if capturer is None or not capturer.is_running:
+            return None
+        return capturer.latest_frame(max_age)
+
+    def mark_input(self) -> None:
+        """记录一次键鼠输入 之后只使用在输入结束后才开始截取的后台截图"""
+        self._last_input_time = time.time()
+
+    def next_background_frame(self) -> CapturedFrame | None:
+        """获取还没有使用过的后台截图
+        识别耗时比截图间隔长时 新的一帧已经准备好 直接返回
+        否则最多等待两个截图间隔 等不到时返回 None 由调用方同步截图
+        在上一次键鼠输入之前开始截取的帧看不到输入的结果 不会返回
+
+        Returns:
+            新的一帧 没有后台截图时返回 None
+        """
+        capturer = self.background_capturer
+        if capturer is None or not capturer.is_running:
+            return None
+        interval = 1.0 / capturer.target_fps if capturer.target_fps > 0 else 0
+        frame = capturer.next_frame(self._last_frame_id, timeout=interval * 2, max_age=interval * 2,
+                                    after_time=self._last_input_time)
+        if frame is not None:
+            self._last_frame_id = frame.frame_id
+        return frame
+
     def init_screenshot(self, method: str) -> str | None:
         """初始化截图方法，带有回退机制
 
@@ -116,6 +210,7 @@ class PcScreenshotController:
 
     def cleanup_resources(self):
         """清理所有截图策略的资源"""
+        self.stop_background_capture()
         for strategy in self.strategies.values():
             strategy.cleanup()
         self.active_strategy_name = None
@@ -1,5 +1,6 @@
 # coding: utf-8
 import os
+import threading
 from typing import List, Dict, Type
 
 import cv2
@@ -61,6 +62,11 @@ class CvService:
             'OCR识别': CvStepOcr,
         }
 
+        # 已编译的流水线 key=流水线名称 value=(文件修改时间和大小, 流水线)
+        # 文件修改后自动重新加载 只给 run_pipeline 使用 load_pipeline 仍返回新的实例供编辑
+        self._compiled_pipeline_map: Dict[str, tuple[tuple[int, int], CvPipeline]] = {}
+        self._compiled_pipeline_lock = threading.Lock()
+
         if not os.path.exists(self.PIPELINE_DIR):
             os.makedirs(self.PIPELINE_DIR)
         if not os.path.exists(self.TEMPLATE_DIR):
@@ -76,7 +82,7 @@ class CvService:
         :param timeout: 允许的执行时间（秒），None表示无限制
         :return: 包含所有结果的上下文
         """
-        pipeline = self.load_pipeline(pipeline_name)
+        pipeline = self.get_compiled_pipeline(pipeline_name)
         if pipeline is None:
             ctx = CvPipelineContext(image, service=self, debug_mode=debug_mode, start_time=start_time, timeout=timeout)
             ctx.error_str = f"流水线 {pipeline_name} 加载失败"
@@ -205,6 +211,7 @@ class CvService:
         file_path = os.path.join(self.PIPELINE_DIR, f"{name}.yml")
         with open(file_path, 'w', encoding='utf-8') as f:
             yaml.dump(data_to_save, f, allow_unicode=True, sort_keys=False)
+        self.invalidate_compiled_pipeline(name)  # 修改时间的精度不足时 也能保证下次运行使用新的流水线
 
         return True
 
@@ -237,11 +244,51 @@ class CvService:
         pipeline.steps = new_steps
         return pipeline
 
+    def get_compiled_pipeline(self, name: str) -> CvPipeline | None:
+        """
+        获取已编译的流水线 文件有修改时重新加载
+        返回的实例会被多次运行共用 不应修改
+        :param name: 流水线名称
+        :return:
+        """
+        file_path = os.path.join(self.PIPELINE_DIR, f"{name}.yml")
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self.invalidate_compiled_pipeline(name)
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._compiled_pipeline_lock:
+            cached = self._compiled_pipeline_map.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        pipeline = self.load_pipeline(name)
+        with self._compiled_pipeline_lock:
+            if pipeline is None:
+                self._compiled_pipeline_map.pop(name, None)
+            else:
+                self._compiled_pipeline_map[name] = (version, pipeline)
+        return pipeline
+
+    def invalidate_compiled_pipeline(self, name: str | None = None) -> None:
+        """
+        清除已编译的流水线
+        :param name: 流水线名称 为None时清除全部
+        """
+        with self._compiled_pipeline_lock:
+            if name is None:
+                self._compiled_pipeline_map.clear()
+            else:
+                self._compiled_pipeline_map.pop(name, None)
+
     def delete_pipeline(self, name: str):
         """
         删除一个流水线文件
         :param name: 流水线名称
         """
+        self.invalidate_compiled_pipeline(name)
         file_path = os.path.join(self.PIPELINE_DIR, f"{name}.yml")
         if os.path.exists(file_path):
             os.remove(file_path)
@@ -255,6 +302,8 @@ class CvService:
         if not old_name or not new_name or old_name == new_name:
             return
 
+        self.invalidate_compiled_pipeline(old_name)
+        self.invalidate_compiled_pipeline(new_name)
         old_file_path = os.path.join(self.PIPELINE_DIR, f"{old_name}.yml")
         new_file_path = os.path.join(self.PIPELINE_DIR, f"{new_name}.yml")
 
@@ -18,7 +18,9 @@ class CvPipelineContext:
         self.source_image: np.ndarray = source_image  # 原始输入图像 (只读)
         self.service: 'CvService' = service
         self.debug_mode: bool = debug_mode  # 是否为调试模式
-        self.display_image: np.ndarray = source_image.copy()  # 用于UI显示的主图像，可被修改
+        # 用于UI显示的主图像，可被修改
+        # 非调试模式不复制原图 步骤只能生成新图片 不能在 display_image 上原地绘制
+        self.display_image: np.ndarray = source_image.copy() if debug_mode else source_image
         self.crop_offset: tuple[int, int] = (0, 0)  # display_image 左上角相对于 source_image 的坐标偏移
         self.mask_image: np.ndarray = None  # 二值掩码图像
         self.contours: List[np.ndarray] = []  # 检测到的轮廓列表
@@ -57,8 +57,9 @@ class CvStepCropByTemplate(CvStep):
                 context.analysis_results.append(
                     f"模板匹配成功，置信度: {best_match.confidence:.4f} at {best_match.left_top}"
                 )
-                # 在裁剪后的图上画出匹配位置
-                cv2.rectangle(context.display_image, (best_match.x, best_match.y), (best_match.x + best_match.w, best_match.y + best_match.h), (0, 255, 255), 2)
+                # 在裁剪后的图上画出匹配位置 非调试模式下 display_image 是原图的一部分 不能绘制
+                if context.debug_mode:
+                    cv2.rectangle(context.display_image, (best_match.x, best_match.y), (best_match.x + best_match.w, best_match.y + best_match.h), (0, 255, 255), 2)
             else:
                 context.success = False
                 if best_match is not None:
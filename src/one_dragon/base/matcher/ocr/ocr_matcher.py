@@ -2,6 +2,7 @@ from collections.abc import Callable
 
 from cv2.typing import MatLike
 
+from one_dragon.base.geometry.point import Point
 from one_dragon.base.geometry.rectangle import Rect
 from one_dragon.base.matcher.match_result import MatchResultList
 from one_dragon.base.matcher.ocr.ocr_match_result import OcrMatchResult
@@ -81,6 +82,55 @@ class OcrMatcher:
         """
         raise NotImplementedError('由具体的OCR实现提供')
 
+    def ocr_batch(
+            self,
+            image_list: list[MatLike],
+            threshold: float = 0,
+            offset_list: list[Point | None] | None = None,
+    ) -> list[list[OcrMatchResult]]:
+        """
+        对多张图片进行OCR 返回每张图片各自的识别结果
+        默认逐张识别 具体实现可以合并成一次推理
+
+        Args:
+            image_list: 图片列表
+            threshold: 匹配阈值
+            offset_list: 每张图片在原图中的偏移 只用于 overlay 显示 识别结果仍是图片内的坐标
+
+        Returns:
+            ocr_result_list_list: 与 image_list 一一对应的识别结果列表
+        """
+        bus = getattr(self, 'overlay_debug_bus', None)
+        result_list: list[list[OcrMatchResult]] = []
+        for idx, image in enumerate(image_list):
+            offset = offset_list[idx] if offset_list is not None else None
+            if bus is not None and offset is not None:
+                bus.set_crop_offset(offset.x, offset.y)
+            try:
+                result_list.append(self.ocr(image, threshold))
+            finally:
+                if bus is not None and offset is not None:
+                    bus.reset_crop_offset()
+        return result_list
+
+    def ocr_without_det_batch(
+            self,
+            image_list: list[MatLike],
+            threshold: float = 0,
+    ) -> list[OcrMatchResult | None]:
+        """
+        不使用检测模型 把每张图片都当作单行文本直接识别
+        识别结果的区域为整张图片
+
+        Args:
+            image_list: 图片列表 每张图片只包含一行文本
+            threshold: 匹配阈值
+
+        Returns:
+            ocr_result_list: 与 image_list 一一对应的识别结果 不支持或低于阈值时为None
+        """
+        return [None for _ in image_list]
+
     def crop_and_run_ocr(
             self,
             image: MatLike,
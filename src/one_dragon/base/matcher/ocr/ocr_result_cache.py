@@ -0,0 +1,131 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from cv2.typing import MatLike
+
+from one_dragon.base.matcher.ocr.ocr_match_result import OcrMatchResult
+
+OCR_RESULT_BYTES: int = 256  # 每个识别结果大约占用的内存 不含文本
+
+
+def get_image_key(image: MatLike, *extra) -> str:
+    """
+    按图片内容计算缓存键 内容相同的不同图片对象得到相同的键
+    :param image: 图片
+    :param extra: 其它会影响识别结果的参数 例如颜色范围和阈值
+    :return:
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((image.shape, image.dtype.str, extra)).encode('utf-8'))
+    h.update(memoryview(np.ascontiguousarray(image)).cast('B'))
+    return h.hexdigest()
+
+
+def estimate_ocr_result_list_bytes(ocr_result_list: list[OcrMatchResult]) -> int:
+    """
+    估算一组识别结果占用的内存
+    :param ocr_result_list: 识别结果列表
+    :return: 字节数
+    """
+    total = OCR_RESULT_BYTES  # 缓存键和列表本身
+    for i in ocr_result_list:
+        total += OCR_RESULT_BYTES + len(i.data or '') * 4
+    return total
+
+
+def copy_ocr_result_list(ocr_result_list: list[OcrMatchResult]) -> list[OcrMatchResult]:
+    """
+    复制识别结果 调用方会对结果加偏移 缓存里需要保存独立的一份
+    :param ocr_result_list: 识别结果列表
+    :return:
+    """
+    return [
+        OcrMatchResult(i.confidence, i.x, i.y, i.w, i.h, template_scale=i.template_scale, data=i.data)
+        for i in ocr_result_list
+    ]
+
+
+class OcrResultCache:
+
+    def __init__(self, max_bytes: int):
+        """
+        按图片内容缓存的OCR结果 保存的是识别图片内的坐标
+        画面上静态的文本(标题 按钮等)在像素不变时 可以跨截图复用
+        超出内存预算时淘汰最久没使用的结果
+        :param max_bytes: 内存预算 <=0 时不缓存
+        """
+        self.max_bytes: int = max_bytes
+        self.hit_count: int = 0  # 命中次数
+        self.miss_count: int = 0  # 未命中次数
+        self._data: OrderedDict[str, tuple[list[OcrMatchResult], int]] = OrderedDict()
+        self._total_bytes: int = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> list[OcrMatchResult] | None:
+        """
+        获取缓存的识别结果 并标记为最近使用
+        :param key: 缓存键 见 get_image_key
+        :return: 识别结果的副本 没有缓存时返回None
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.miss_count += 1
+                return None
+            self._data.move_to_end(key)
+            self.hit_count += 1
+            return copy_ocr_result_list(item[0])
+
+    def put(self, key: str, ocr_result_list: list[OcrMatchResult]) -> None:
+        """
+        保存识别结果
+        :param key: 缓存键 见 get_image_key
+        :param ocr_result_list: 识别结果 保存前会复制一份
+        :return:
+        """
+        if self.max_bytes <= 0:
+            return
+        item_bytes = estimate_ocr_result_list_bytes(ocr_result_list)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._data[key] = (copy_ocr_result_list(ocr_result_list), item_bytes)
+            self._total_bytes += item_bytes
+            while self._total_bytes > self.max_bytes and len(self._data) > 0:
+                _, (_, removed_bytes) = self._data.popitem(last=False)
+                self._total_bytes -= removed_bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._total_bytes = 0
+
+    def reset_stats(self) -> None:
+        """
+        重置命中统计
+        """
+        with self._lock:
+            self.hit_count = 0
+            self.miss_count = 0
+
+    @property
+    def total_bytes(self) -> int:
+        """
+        当前缓存占用的内存
+        """
+        return self._total_bytes
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        命中率
+        """
+        total = self.hit_count + self.miss_count
+        return self.hit_count / total if total > 0 else 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
@@ -1,18 +1,23 @@
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 import cv2
 import numpy as np
 from cv2.typing import MatLike
 
+from one_dragon.base.geometry.point import Point
 from one_dragon.base.geometry.rectangle import Rect
 from one_dragon.base.matcher.match_result import MatchResultList
 from one_dragon.base.matcher.ocr.ocr_match_result import OcrMatchResult
 from one_dragon.base.matcher.ocr.ocr_matcher import OcrMatcher
+from one_dragon.base.matcher.ocr.ocr_result_cache import OcrResultCache, get_image_key
 from one_dragon.utils import cal_utils, cv2_utils, str_utils
 from one_dragon.utils.i18_utils import gt
 from one_dragon.utils.log_utils import log
 
+DEFAULT_CONTENT_CACHE_MAX_BYTES: int = 2 * 1024 * 1024  # 按内容缓存OCR结果的默认内存预算
+SINGLE_LINE_MIN_CONFIDENCE: float = 0.8  # 单行识别的置信度低于这个值时 使用完整识别
+
 
 @dataclass(frozen=True)
 class OcrCacheEntry:
@@ -24,13 +29,23 @@ class OcrCacheEntry:
     color_range: list[list[int]] | None  # 颜色范围
     rect: Rect | None = None  # 识别区域
     crop_first: bool = True  # 先裁剪再识别 用于从连续文本中只提取特定区域的文本
+    single_line: bool = False  # 区域内只有单行文本 跳过文本检测
+
+
+@dataclass(frozen=True)
+class OcrRequest:
+    """批量OCR中的一个识别请求"""
+    rect: Rect | None = None  # 识别区域
+    color_range: list[list[int]] | None = None  # 颜色范围
+    crop_first: bool = True  # 先裁剪再识别 用于从连续文本中只提取特定区域的文本
+    single_line: bool = False  # 区域内只有单行文本 跳过文本检测直接识别 置信度低时再使用完整识别 需要 crop_first 和 rect
 
 
 class OcrService:
     """
     OCR服务
-    - 提供缓存
-    - 提供并发识别 (未实现)
+    - 提供缓存 同一张截图按图片对象缓存 不同截图按区域内容缓存
+    - 提供多区域批量识别 一次文本检测和一次文本识别
 
     缺点：
     - 全图识别后，识别得到的文本无法按选定区域进行精准切割。
@@ -41,6 +56,7 @@ class OcrService:
         self,
         ocr_matcher: OcrMatcher,
         max_cache_size: int = 5,
+        content_cache_max_bytes: int = DEFAULT_CONTENT_CACHE_MAX_BYTES,
     ):
         """
         初始化OCR服务
@@ -48,6 +64,7 @@ class OcrService:
         Args:
             ocr_matcher: OCR匹配器实例
             max_cache_size: 最大缓存条目数
+            content_cache_max_bytes: 按内容缓存的内存预算 <=0 时不使用
         """
         self.ocr_matcher = ocr_matcher
         self.max_cache_size = max_cache_size
@@ -56,6 +73,9 @@ class OcrService:
         self._cache: dict[int, list[OcrCacheEntry]] = {}
         self._cache_list: list[OcrCacheEntry] = []
 
+        # 按识别区域的像素内容缓存 像素不变的静态文本可以跨截图复用
+        self.content_cache: OcrResultCache = OcrResultCache(content_cache_max_bytes)
+
     def _clean_expired_cache(self) -> None:
         """
         清除过期缓存
@@ -102,6 +122,7 @@ class OcrService:
         color_range: list[list[int]] | None = None,
         rect: Rect | None = None,
         crop_first: bool = True,
+        single_line: bool = False,
     ) -> OcrCacheEntry | None:
         """
         从缓存中获取OCR结果
@@ -110,6 +131,7 @@ class OcrService:
             color_range: 颜色范围过滤 [[lower], [upper]]
             rect: 指定区域。识别结果后，筛选在指定区域中出现的结果，即文本所在的矩形有70%以上在指定区域内
             crop_first: 先裁剪再识别 用于从连续文本中只提取特定区域的文本
+            single_line: 区域内只有单行文本 跳过文本检测
 
         Returns:
             缓存条目
@@ -127,6 +149,8 @@ class OcrService:
                 continue
             if crop_first and cache_entry.rect != rect:
                 continue
+            if cache_entry.single_line != single_line:
+                continue
             return cache_entry
 
         return None
@@ -139,6 +163,7 @@ class OcrService:
         crop_first: bool = True,
         threshold: float = 0,
         merge_line_distance: float = -1,
+        single_line: bool = False,
     ) -> list[OcrMatchResult]:
         """
         获取全图OCR结果，优先从缓存获取
@@ -150,12 +175,14 @@ class OcrService:
             crop_first: 先裁剪再识别 用于从连续文本中只提取指定区域的文本
             threshold: OCR阈值
             merge_line_distance: 行合并距离
+            single_line: 区域内只有单行文本 跳过文本检测直接识别 置信度低时再使用完整识别 需要 crop_first 和 rect
 
         Returns:
             ocr_result_list: OCR识别结果列表
         """
-        # 生成缓存键
-        image_id = id(image)
+        if single_line and crop_first and rect is not None:
+            request = OcrRequest(rect=rect, color_range=color_range, crop_first=crop_first, single_line=True)
+            return self.get_ocr_result_list_batch(image, [request], threshold=threshold)[0]
 
         cache_entity = self._get_ocr_result_list_from_cache(
             image=image,
@@ -168,56 +195,255 @@ class OcrService:
         if cache_entity is not None:
             ocr_result_list = cache_entity.ocr_result_list
         else:
-            # 应用颜色过滤
-            processed_image = self._apply_color_filter(image, color_range)
-
-            # 执行OCR
+            # 颜色过滤是逐像素的 先裁剪再过滤结果一样 且更快
             if crop_first and rect is not None:
-                crop_image, crop_rect = cv2_utils.crop_image(processed_image, rect)
+                crop_image, crop_rect = cv2_utils.crop_image(image, rect)
+                offset = crop_rect.left_top
+            else:
+                crop_image, offset = image, None
+
+            # 整张截图几乎不会重复 只对裁剪后的区域按内容缓存 避免每次都计算整张图的哈希
+            content_key = None
+            if offset is not None:
+                content_key = get_image_key(crop_image, color_range, threshold, merge_line_distance, False)
+            ocr_result_list = self.content_cache.get(content_key) if content_key is not None else None
+            if ocr_result_list is None:
+                # 应用颜色过滤
+                processed_image = self._apply_color_filter(crop_image, color_range)
+
+                # 执行OCR
                 bus = getattr(self.ocr_matcher, 'overlay_debug_bus', None)
-                if bus is not None:
-                    bus.set_crop_offset(crop_rect.x1, crop_rect.y1)
+                if bus is not None and offset is not None:
+                    bus.set_crop_offset(offset.x, offset.y)
                 ocr_result_list = self.ocr_matcher.ocr(
-                    crop_image,
+                    processed_image,
                     threshold,
                     merge_line_distance,
                 )
-                if bus is not None:
+                if bus is not None and offset is not None:
                     bus.reset_crop_offset()
+                if content_key is not None:
+                    self.content_cache.put(content_key, ocr_result_list)
+
+            if offset is not None:
                 for ocr_result in ocr_result_list:
-                    ocr_result.add_offset(crop_rect.left_top)
-            else:
-                ocr_result_list = self.ocr_matcher.ocr(processed_image, threshold, merge_line_distance)
+                    ocr_result.add_offset(offset)
 
             # 存储到缓存
-            cache_entry = OcrCacheEntry(
-                ocr_result_list=ocr_result_list,
-                create_time=time.time(),
-                color_range=color_range,
-                image_id=image_id,
+            self._add_cache(image, ocr_result_list, color_range, rect, crop_first)
+
+        return self._filter_by_rect(ocr_result_list, rect)
+
+    def get_ocr_result_list_batch(
+        self,
+        image: MatLike,
+        request_list: list[OcrRequest],
+        threshold: float = 0,
+        merge_line_distance: float = -1,
+    ) -> list[list[OcrMatchResult]]:
+        """
+        对同一张图片的多个区域进行OCR，优先从缓存获取
+        没有缓存的区域会拼到同一张画布上做一次文本检测 再合并成一次文本识别
+        识别到的文本与逐个调用 get_ocr_result_list 基本相同 但画布的缩放比例不同
+        文本框的坐标和置信度可能有细微差别 个别边缘的文本可能检测结果不同
+        需要合并行时 拼接后无法按区域合并 退回逐个调用 get_ocr_result_list
+
+        Args:
+            image: 输入图片
+            request_list: 识别请求列表
+            threshold: OCR阈值
+            merge_line_distance: 行合并距离 -1为不合并
+
+        Returns:
+            ocr_result_list_list: 与 request_list 一一对应的OCR识别结果列表
+        """
+        if merge_line_distance != -1:
+            return [
+                self.get_ocr_result_list(
+                    image,
+                    color_range=request.color_range,
+                    rect=request.rect,
+                    crop_first=request.crop_first,
+                    threshold=threshold,
+                    merge_line_distance=merge_line_distance,
+                    single_line=request.single_line,
+                )
+                for request in request_list
+            ]
+
+        result_list: list[list[OcrMatchResult] | None] = [None] * len(request_list)
+
+        to_ocr_request_list: list[OcrRequest] = []  # 需要识别的请求 已去重
+        to_ocr_image_list: list[MatLike] = []  # 颜色过滤后的图片
+        to_ocr_offset_list: list[Point | None] = []
+        to_ocr_idx_list: list[list[int]] = []  # 每个需要识别的请求 对应 request_list 中的下标
+        to_ocr_key_list: list[str | None] = []  # 每个需要识别的请求 按内容缓存的键 不裁剪时为 None
+        filtered_image_map: dict[str, MatLike] = {}  # 不裁剪时 同一颜色范围只过滤一次
+
+        for idx, request in enumerate(request_list):
+            if request.single_line and not (request.crop_first and request.rect is not None):
+                request = replace(request, single_line=False)  # 单行识别只对裁剪后的区域生效
+
+            cache_entity = self._get_ocr_result_list_from_cache(
                 image=image,
-                rect=rect,
-                crop_first=crop_first,
+                color_range=request.color_range,
+                rect=request.rect,
+                crop_first=request.crop_first,
+                single_line=request.single_line,
             )
-            if image_id not in self._cache:
-                self._cache[image_id] = []
-            self._cache[image_id].append(cache_entry)
-            self._cache_list.append(cache_entry)
-            self._clean_expired_cache()
-
-        if rect is not None:
-            # 过滤出指定区域内的结果
-            area_result_list: list[OcrMatchResult] = []
-
-            for ocr_result in ocr_result_list:
-                # 检查匹配结果是否和指定区域重叠
-                if cal_utils.cal_overlap_percent(ocr_result.rect, rect, base=ocr_result.rect) > 0.7:
-                    area_result_list.append(ocr_result)
-
-            return area_result_list
-        else:
+            if cache_entity is not None:
+                result_list[idx] = cache_entity.ocr_result_list
+                continue
+
+            same_idx = next((i for i, r in enumerate(to_ocr_request_list) if self._is_same_request(r, request)), None)
+            if same_idx is not None:
+                to_ocr_idx_list[same_idx].append(idx)
+                continue
+
+            if request.crop_first and request.rect is not None:
+                # 颜色过滤是逐像素的 先裁剪再过滤结果一样 且更快
+                crop_image, crop_rect = cv2_utils.crop_image(image, request.rect)
+                offset = crop_rect.left_top
+            else:
+                crop_image, offset = image, None
+
+            content_key = None  # 整张截图不按内容缓存
+            if offset is not None:
+                content_key = get_image_key(crop_image, request.color_range, threshold, -1, request.single_line)
+            ocr_result_list = self.content_cache.get(content_key) if content_key is not None else None
+            if ocr_result_list is not None:
+                if offset is not None:
+                    for ocr_result in ocr_result_list:
+                        ocr_result.add_offset(offset)
+                self._add_cache(image, ocr_result_list, request.color_range, request.rect, request.crop_first,
+                                request.single_line)
+                result_list[idx] = ocr_result_list
+                continue
+
+            if offset is not None:
+                to_ocr_image_list.append(self._apply_color_filter(crop_image, request.color_range))
+            else:
+                color_key = str(request.color_range)
+                if color_key not in filtered_image_map:
+                    filtered_image_map[color_key] = self._apply_color_filter(image, request.color_range)
+                to_ocr_image_list.append(filtered_image_map[color_key])
+            to_ocr_offset_list.append(offset)
+            to_ocr_request_list.append(request)
+            to_ocr_idx_list.append([idx])
+            to_ocr_key_list.append(content_key)
+
+        # 单行区域 先跳过文本检测直接识别 置信度足够的不再进行完整识别
+        ocr_result_list_list: list[list[OcrMatchResult] | None] = [None] * len(to_ocr_request_list)
+        single_line_idx_list = [i for i, r in enumerate(to_ocr_request_list) if r.single_line]
+        if len(single_line_idx_list) > 0:
+            single_line_result_list = self.ocr_matcher.ocr_without_det_batch(
+                [to_ocr_image_list[i] for i in single_line_idx_list],
+                threshold=threshold,
+            )
+            for i, ocr_result in zip(single_line_idx_list, single_line_result_list):
+                if ocr_result is not None and ocr_result.confidence >= SINGLE_LINE_MIN_CONFIDENCE:
+                    ocr_result_list_list[i] = [ocr_result]
+
+        full_idx_list = [i for i, r in enumerate(ocr_result_list_list) if r is None]
+        if len(full_idx_list) > 0:
+            full_result_list = self.ocr_matcher.ocr_batch(
+                [to_ocr_image_list[i] for i in full_idx_list],
+                threshold=threshold,
+                offset_list=[to_ocr_offset_list[i] for i in full_idx_list],
+            )
+            for i, ocr_result_list in zip(full_idx_list, full_result_list):
+                ocr_result_list_list[i] = ocr_result_list
+
+        for request, offset, idx_list, content_key, ocr_result_list in zip(
+                to_ocr_request_list, to_ocr_offset_list, to_ocr_idx_list, to_ocr_key_list, ocr_result_list_list):
+            if content_key is not None:
+                self.content_cache.put(content_key, ocr_result_list)
+            if offset is not None:
+                for ocr_result in ocr_result_list:
+                    ocr_result.add_offset(offset)
+            self._add_cache(image, ocr_result_list, request.color_range, request.rect, request.crop_first,
+                            request.single_line)
+            for idx in idx_list:
+                result_list[idx] = ocr_result_list
+
+        return [
+            self._filter_by_rect(ocr_result_list, request.rect)
+            for request, ocr_result_list in zip(request_list, result_list)
+        ]
+
+    def _is_same_request(self, r1: OcrRequest, r2: OcrRequest) -> bool:
+        """
+        两个请求是否可以共用一次识别结果 与缓存的判断一致
+        """
+        if r1.color_range != r2.color_range:
+            return False
+        if r1.crop_first != r2.crop_first:
+            return False
+        if r1.crop_first and r1.rect != r2.rect:
+            return False
+        if r1.single_line != r2.single_line:
+            return False
+        return True
+
+    def _add_cache(
+        self,
+        image: MatLike,
+        ocr_result_list: list[OcrMatchResult],
+        color_range: list[list[int]] | None,
+        rect: Rect | None,
+        crop_first: bool,
+        single_line: bool = False,
+    ) -> None:
+        """
+        存储OCR结果到缓存
+
+        Args:
+            image: 输入图片
+            ocr_result_list: OCR识别结果
+            color_range: 颜色范围过滤 [[lower], [upper]]
+            rect: 指定区域
+            crop_first: 先裁剪再识别
+            single_line: 区域内只有单行文本 跳过文本检测
+        """
+        image_id = id(image)
+        cache_entry = OcrCacheEntry(
+            ocr_result_list=ocr_result_list,
+            create_time=time.time(),
+            color_range=color_range,
+            image_id=image_id,
+            image=image,
+            rect=rect,
+            crop_first=crop_first,
+            single_line=single_line,
+        )
+        if image_id not in self._cache:
+            self._cache[image_id] = []
+        self._cache[image_id].append(cache_entry)
+        self._cache_list.append(cache_entry)
+        self._clean_expired_cache()
+
+    def _filter_by_rect(self, ocr_result_list: list[OcrMatchResult], rect: Rect | None) -> list[OcrMatchResult]:
+        """
+        过滤出指定区域内的结果 即文本所在的矩形有70%以上在指定区域内
+
+        Args:
+            ocr_result_list: OCR识别结果列表
+            rect: 指定区域 为None时不过滤
+
+        Returns:
+            ocr_result_list: 过滤后的OCR识别结果列表
+        """
+        if rect is None:
             return ocr_result_list
 
+        area_result_list: list[OcrMatchResult] = []
+        for ocr_result in ocr_result_list:
+            # 检查匹配结果是否和指定区域重叠
+            if cal_utils.cal_overlap_percent(ocr_result.rect, rect, base=ocr_result.rect) > 0.7:
+                area_result_list.append(ocr_result)
+
+        return area_result_list
+
     def get_ocr_result_map(
         self,
         image: MatLike,
@@ -303,7 +529,24 @@ class OcrService:
         target_idx = str_utils.find_best_match_by_difflib(target_word, ocr_word_list, cutoff=threshold)
         return target_idx is not None and target_idx >= 0
 
+    def get_cache_stats(self) -> dict[str, float]:
+        """
+        按内容缓存的统计信息
+
+        Returns:
+            hit: 命中次数 miss: 未命中次数 hit_rate: 命中率 bytes: 占用内存 size: 条目数
+        """
+        return {
+            'hit': self.content_cache.hit_count,
+            'miss': self.content_cache.miss_count,
+            'hit_rate': self.content_cache.hit_rate,
+            'bytes': self.content_cache.total_bytes,
+            'size': len(self.content_cache),
+        }
+
     def clear_cache(self) -> None:
         """清空所有缓存"""
         self._cache.clear()
+        self._cache_list.clear()
+        self.content_cache.clear()
         log.debug("OCR缓存已清空")
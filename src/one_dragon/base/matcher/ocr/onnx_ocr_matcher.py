@@ -3,8 +3,11 @@ import time
 from logging import DEBUG
 from typing import Callable, List, Optional
 
+import cv2
+import numpy as np
 from cv2.typing import MatLike
 
+from one_dragon.base.geometry.point import Point
 from one_dragon.base.matcher.match_result import MatchResult, MatchResultList
 from one_dragon.base.matcher.ocr import ocr_utils
 from one_dragon.base.matcher.ocr.ocr_match_result import OcrMatchResult
@@ -19,6 +22,7 @@ from one_dragon.utils.log_utils import log
 DEFAULT_OCR_MODEL_NAME: str = 'ppocrv5'
 GITHUB_DOWNLOAD_URL: str = 'https://github.com/OneDragon-Anything/OneDragon-Env/releases/download'
 GITEE_DOWNLOAD_URL: str = 'https://gitee.com/OneDragon-Anything/OneDragon-Env/releases/download'
+OCR_BATCH_GAP: int = 32  # 批量OCR拼图时 图片之间的间隔 防止检测框跨越两张图片
 
 
 def get_ocr_model_dir(ocr_model_name: str) -> str:
@@ -53,6 +57,64 @@ def get_final_file_list(ocr_model_name: str) -> list[str]:
     ]
 
 
+class _OcrBatchCanvas:
+
+    def __init__(self):
+        """
+        批量OCR时 拼接多张图片用于一次文本检测的画布
+        """
+        self.placement_list: list[tuple[int, int, int]] = []  # (图片下标, x, y)
+        self.width: int = 0
+        self.height: int = 0
+
+
+def _pack_ocr_batch_canvas(size_list: list[tuple[int, int] | None],
+                           max_side: int, gap: int) -> list[_OcrBatchCanvas]:
+    """
+    按行把多张图片排列到画布上 画布不超过检测模型的长边限制 避免检测前被缩小
+    超过限制的图片单独一张画布
+    :param size_list: 每张图片的 (高, 宽) 为None时跳过
+    :param max_side: 画布的长边限制
+    :param gap: 图片之间的间隔
+    :return: 画布列表
+    """
+    canvas_list: list[_OcrBatchCanvas] = []
+    current: _OcrBatchCanvas | None = None
+    row_x: int = 0
+    row_y: int = 0
+    row_height: int = 0
+
+    order = [i for i in range(len(size_list)) if size_list[i] is not None]
+    order.sort(key=lambda i: size_list[i][0], reverse=True)  # 先放高的 每行高度更接近
+    for idx in order:
+        h, w = size_list[idx]
+        if h > max_side or w > max_side:
+            canvas = _OcrBatchCanvas()
+            canvas.placement_list.append((idx, 0, 0))
+            canvas.width, canvas.height = w, h
+            canvas_list.append(canvas)
+            continue
+
+        if current is not None and row_x + w > max_side:  # 换行
+            row_x = 0
+            row_y += row_height + gap
+            row_height = 0
+        if current is None or row_y + h > max_side:  # 换画布
+            current = _OcrBatchCanvas()
+            canvas_list.append(current)
+            row_x = 0
+            row_y = 0
+            row_height = 0
+
+        current.placement_list.append((idx, row_x, row_y))
+        current.width = max(current.width, row_x + w)
+        current.height = max(current.height, row_y + h)
+        row_x += w + gap
+        row_height = max(row_height, h)
+
+    return canvas_list
+
+
 class OnnxOcrParam:
     """
     OCR配置实体类，包含OCR引擎的各项参数设置
@@ -446,6 +508,175 @@ class OnnxOcrMatcher(OcrMatcher, ZipDownloader):
 
         return ocr_result_list
 
+    def ocr_batch(
+            self,
+            image_list: list[MatLike],
+            threshold: float = 0,
+            offset_list: list[Point | None] | None = None,
+    ) -> list[list[OcrMatchResult]]:
+        """
+        对多张图片进行OCR 返回每张图片各自的识别结果
+        所有图片拼到同一张画布上只做一次文本检测 再把所有文本行合并成一次文本识别
+
+        Args:
+            image_list: 图片列表
+            threshold: 匹配阈值
+            offset_list: 每张图片在原图中的偏移 只用于 overlay 显示 识别结果仍是图片内的坐标
+
+        Returns:
+            ocr_result_list_list: 与 image_list 一一对应的识别结果列表
+        """
+        result_list: list[list[OcrMatchResult]] = [[] for _ in image_list]
+        if len(image_list) == 0:
+            return result_list
+        if self._model is None and not self.init_model():
+            return result_list
+
+        from onnxocr.predict_system import sorted_boxes
+        from onnxocr.utils import get_rotate_crop_image
+
+        start_time = time.time()
+
+        # 识别模型要求3通道 这里统一转换
+        rgb_list: list[MatLike | None] = []
+        for image in image_list:
+            if image is None or image.size == 0:
+                rgb_list.append(None)
+            elif image.ndim == 2:
+                rgb_list.append(cv2.cvtColor(image, cv2.COLOR_GRAY2RGB))
+            else:
+                rgb_list.append(image)
+
+        # 文本检测 每张画布一次
+        box_list_per_image: list[list] = [[] for _ in image_list]
+        size_list = [(i.shape[0], i.shape[1]) if i is not None else None for i in rgb_list]
+        for canvas in _pack_ocr_batch_canvas(size_list, int(self._ocr_param.det_limit_side_len), OCR_BATCH_GAP):
+            if len(canvas.placement_list) == 1:
+                canvas_image = rgb_list[canvas.placement_list[0][0]]
+            else:
+                canvas_image = np.zeros((canvas.height, canvas.width, 3), dtype=np.uint8)
+                for idx, x, y in canvas.placement_list:
+                    h, w = size_list[idx]
+                    canvas_image[y:y + h, x:x + w] = rgb_list[idx]
+
+            dt_boxes = self._model.text_detector(canvas_image)
+            if isinstance(dt_boxes, tuple) or dt_boxes is None:  # 检测失败时返回 (None, 0)
+                continue
+
+            for box in dt_boxes:
+                center = np.mean(box, axis=0)
+                for idx, x, y in canvas.placement_list:
+                    h, w = size_list[idx]
+                    if x <= center[0] < x + w and y <= center[1] < y + h:
+                        local_box = np.array(box, dtype=np.float32)
+                        local_box[:, 0] = np.clip(local_box[:, 0] - x, 0, w - 1)
+                        local_box[:, 1] = np.clip(local_box[:, 1] - y, 0, h - 1)
+                        box_list_per_image[idx].append(local_box)
+                        break
+
+        # 文本识别 所有图片的文本行合并成一次
+        line_owner_list: list[int] = []
+        line_box_list: list = []
+        line_image_list: list[MatLike] = []
+        for idx, box_list in enumerate(box_list_per_image):
+            if len(box_list) == 0:
+                continue
+            for box in sorted_boxes(np.array(box_list)):
+                line_owner_list.append(idx)
+                line_box_list.append(box)
+                line_image_list.append(get_rotate_crop_image(rgb_list[idx], np.array(box, dtype=np.float32)))
+
+        rec_res = self._model.text_recognizer(line_image_list) if len(line_image_list) > 0 else []
+
+        drop_score = self._model.drop_score
+        for idx, box, rec_result in zip(line_owner_list, line_box_list, rec_res):
+            anchor_text, anchor_score = rec_result
+            if anchor_score < drop_score or anchor_score < threshold:
+                continue
+            rect = self._rect_from_anchor(box.tolist())
+            if rect is None:
+                continue
+            result_list[idx].append(
+                OcrMatchResult(
+                    anchor_score,
+                    rect[0],
+                    rect[1],
+                    rect[2],
+                    rect[3],
+                    data=anchor_text,
+                )
+            )
+
+        elapsed_ms = (time.time() - start_time) * 1000.0
+        item_count = sum(len(i) for i in result_list)
+        bus = getattr(self, "overlay_debug_bus", None)
+        for idx, ocr_result_list in enumerate(result_list):
+            offset = offset_list[idx] if offset_list is not None else None
+            if bus is not None and offset is not None:
+                bus.set_crop_offset(offset.x, offset.y)
+            try:
+                self._emit_overlay_vision_from_ocr_results(ocr_result_list)
+            finally:
+                if bus is not None and offset is not None:
+                    bus.reset_crop_offset()
+        self._emit_overlay_perf_and_timeline(elapsed_ms, item_count)
+
+        if log.isEnabledFor(DEBUG):
+            log.debug('批量OCR结果 %s 耗时 %.2f', [[i.data for i in r] for r in result_list], time.time() - start_time)
+
+        return result_list
+
+    def ocr_without_det_batch(
+            self,
+            image_list: list[MatLike],
+            threshold: float = 0,
+    ) -> list[OcrMatchResult | None]:
+        """
+        不使用检测模型 把每张图片都当作单行文本直接识别 所有图片只做一次文本识别
+        识别结果的区域为整张图片
+
+        Args:
+            image_list: 图片列表 每张图片只包含一行文本
+            threshold: 匹配阈值
+
+        Returns:
+            ocr_result_list: 与 image_list 一一对应的识别结果 低于阈值时为None
+        """
+        result_list: list[OcrMatchResult | None] = [None for _ in image_list]
+        if self._model is None and not self.init_model():
+            return result_list
+
+        start_time = time.time()
+        idx_list: list[int] = []
+        rgb_list: list[MatLike] = []
+        for idx, image in enumerate(image_list):
+            if image is None or image.size == 0:
+                continue
+            idx_list.append(idx)
+            rgb_list.append(cv2.cvtColor(image, cv2.COLOR_GRAY2RGB) if image.ndim == 2 else image)
+
+        if len(rgb_list) == 0:
+            return result_list
+
+        rec_res = self._model.text_recognizer(rgb_list)
+        for idx, image, rec_result in zip(idx_list, rgb_list, rec_res):
+            anchor_text, anchor_score = rec_result
+            if len(anchor_text) == 0 or anchor_score < threshold:
+                continue
+            result_list[idx] = OcrMatchResult(
+                anchor_score,
+                0,
+                0,
+                image.shape[1],
+                image.shape[0],
+                data=anchor_text,
+            )
+
+        if log.isEnabledFor(DEBUG):
+            log.debug('单行OCR结果 %s 耗时 %.2f',
+                      [None if i is None else i.data for i in result_list], time.time() - start_time)
+        return result_list
+
     def _emit_overlay_vision(
         self,
         result_map: dict[str, MatchResultList],
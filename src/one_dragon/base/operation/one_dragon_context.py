@@ -8,6 +8,7 @@ from pathlib import Path
 import cv2
 from pynput import keyboard
 
+from one_dragon.base.config import yaml_operator
 from one_dragon.base.config.basic_model_config import BasicModelConfig
 from one_dragon.base.config.custom_config import UILanguageEnum
 from one_dragon.base.controller.controller_base import ControllerBase
@@ -248,6 +249,7 @@ class OneDragonContext(ContextEventBus, OneDragonEnvContext):
                 i18_utils.update_default_lang(self.custom_config.ui_language)
 
             log_utils.set_log_level(logging.DEBUG if self.env_config.is_debug else logging.INFO)
+            yaml_operator.enable_write_behind(self.env_config.config_write_interval)
 
             if not self._application_registered:  # 只需要注册一次
                 self.register_application_factory()
@@ -494,3 +496,4 @@ class OneDragonContext(ContextEventBus, OneDragonEnvContext):
         self.run_context.after_app_shutdown()
         self.push_service.after_app_shutdown()
         self.overlay_debug_bus.clear()
+        yaml_operator.shutdown_write_behind()  # 最后写入所有未保存的配置
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import difflib
 import inspect
+import threading
 import time
 from collections.abc import Callable
 from functools import cached_property
@@ -80,6 +81,32 @@ class NodeStateProxy:
         return self.result.is_fail if self.result is not None else False
 
 
+class OperationNetwork:
+
+    def __init__(
+            self,
+            start_node: OperationNode,
+            node_map: dict[str, OperationNode],
+            node_edges_map: dict[str, list[OperationEdge]],
+    ):
+        """
+        从注解构建的节点网络 按类缓存 同一个类的实例共用
+        实例使用时需要复制 不能修改这里的集合
+
+        Args:
+            start_node: 起始节点
+            node_map: 节点集合 key=节点名称
+            node_edges_map: 节点的边集合 key=节点名称
+        """
+        self.start_node: OperationNode = start_node
+        self.node_map: dict[str, OperationNode] = node_map
+        self.node_edges_map: dict[str, list[OperationEdge]] = node_edges_map
+
+
+_operation_network_cache: dict[type, OperationNetwork] = {}  # 每个类的节点网络
+_operation_network_lock = threading.Lock()
+
+
 class Operation(OperationBase):
 
     STATUS_TIMEOUT: ClassVar[str] = '执行超时'
@@ -215,7 +242,8 @@ class Operation(OperationBase):
 
         self.handle_init()
 
-    def _analyse_node_annotations(self) -> tuple[OperationNode, list[OperationNode], list[OperationEdge]]:
+    @classmethod
+    def _analyse_node_annotations(cls) -> tuple[OperationNode, list[OperationNode], list[OperationEdge]]:
         """
         扫描类方法的操作节点和边注解
         Returns:
@@ -228,7 +256,8 @@ class Operation(OperationBase):
         node_name_map: dict[str, OperationNode] = {}
         edge_desc_list: list[OperationEdgeDesc] = []
 
-        for name, method in inspect.getmembers(self, predicate=inspect.ismethod):
+        # 节点注解附加在类的函数上 不需要扫描实例 也避免了触发实例上的property
+        for name, method in inspect.getmembers(cls, predicate=inspect.isfunction):
             # 从方法对象上直接获取 @operation_node 附加的节点信息
             node: OperationNode = getattr(method, 'operation_node_annotation', None)
             if node is None:
@@ -269,32 +298,30 @@ class Operation(OperationBase):
 
         return start_node, node_list, edge_list
 
-    def _init_network(self) -> None:
-        """初始化操作节点网络。
-
-        此方法通过以下步骤构建操作图：
-        1. 从注解添加节点和边
-        2. 从子类实现添加节点和边
-        3. 构建用于图遍历的内部数据结构
-        4. 确定起始节点
+    @classmethod
+    def _compile_network(cls) -> OperationNetwork:
         """
-        # 初始化节点和边集合
-        self._node_edges_map.clear()
-        self._node_map.clear()
-
-        start_node, node_list, edge_list = self._analyse_node_annotations()
+        根据注解构建类的节点网络 不包含游戏窗口检查节点
+        Returns:
+            OperationNetwork: 节点网络
+        """
+        start_node, node_list, edge_list = cls._analyse_node_annotations()
 
         # 添加节点
+        node_map: dict[str, OperationNode] = {}
         for node in node_list:
-            self._add_node(node)
+            if node.cn in node_map:
+                raise ValueError(f'存在重复的节点 {node.cn}')
+            node_map[node.cn] = node
 
         # 添加边
+        node_edges_map: dict[str, list[OperationEdge]] = {}
         op_in_map: dict[str, int] = {}  # 入度
         for edge in edge_list:
             from_id = edge.node_from.cn
-            if from_id not in self._node_edges_map:
-                self._node_edges_map[from_id] = []
-            self._node_edges_map[from_id].append(edge)
+            if from_id not in node_edges_map:
+                node_edges_map[from_id] = []
+            node_edges_map[from_id].append(edge)
 
             to_id = edge.node_to.cn
             if to_id not in op_in_map:
@@ -312,7 +339,41 @@ class Operation(OperationBase):
         if start_node is None:
             raise ValueError('找不到起始节点')
 
-        start_node = self._add_check_game_node(start_node)
+        return OperationNetwork(start_node, node_map, node_edges_map)
+
+    @classmethod
+    def get_network(cls) -> OperationNetwork:
+        """
+        获取类的节点网络 每个类只构建一次
+        节点和边只依赖类上的注解 节点的处理函数在运行时传入实例调用 所以同一个类的实例可以共用
+        Returns:
+            OperationNetwork: 节点网络
+        """
+        network = _operation_network_cache.get(cls)
+        if network is not None:
+            return network
+        with _operation_network_lock:
+            network = _operation_network_cache.get(cls)
+            if network is None:
+                network = cls._compile_network()
+                _operation_network_cache[cls] = network
+            return network
+
+    def _init_network(self) -> None:
+        """初始化操作节点网络。
+
+        此方法通过以下步骤构建操作图：
+        1. 获取按类缓存的节点网络 首次使用时从注解构建
+        2. 复制到当前实例 增加游戏窗口检查节点
+        3. 确定起始节点
+        """
+        network = self.get_network()
+
+        # 复制一份 游戏窗口检查节点只属于当前实例
+        self._node_map = dict(network.node_map)
+        self._node_edges_map = dict(network.node_edges_map)
+
+        start_node = self._add_check_game_node(network.start_node)
         # 初始化开始节点
         self._start_node = start_node
         self._current_node = start_node
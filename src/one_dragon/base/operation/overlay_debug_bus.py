@@ -26,6 +26,7 @@ class VisionDrawItem:
     created: float = 0.0
     ttl_seconds: float = 1.8
     meta: dict[str, Any] = field(default_factory=dict)
+    seq: int = 0
 
 
 @dataclass(slots=True)
@@ -38,6 +39,7 @@ class DecisionTraceItem:
     created: float = 0.0
     ttl_seconds: float = 30.0
     meta: dict[str, Any] = field(default_factory=dict)
+    seq: int = 0
 
 
 @dataclass(slots=True)
@@ -49,6 +51,7 @@ class TimelineItem:
     level: str = "INFO"
     ttl_seconds: float = 60.0
     meta: dict[str, Any] = field(default_factory=dict)
+    seq: int = 0
 
 
 @dataclass(slots=True)
@@ -59,6 +62,7 @@ class PerfMetricSample:
     created: float = 0.0
     ttl_seconds: float = 30.0
     meta: dict[str, Any] = field(default_factory=dict)
+    seq: int = 0
 
 
 @dataclass(slots=True)
@@ -68,6 +72,71 @@ class OverlayDebugSnapshot:
     decision_items: list[DecisionTraceItem]
     timeline_items: list[TimelineItem]
     performance_items: list[PerfMetricSample]
+    cursor: int = 0
+
+
+@dataclass(slots=True)
+class OverlayDebugStreamDelta:
+    """Changes of one stream since a cursor.
+
+    Items only ever leave a stream from its head (expiry or maxlen overflow),
+    so removals are described by a watermark instead of a list.
+    """
+
+    added: list[Any]
+    expired_before: int  # items with seq < expired_before are gone
+    reset: bool = False  # cursor is unknown to the bus, drop everything first
+    modified: bool = False  # items already delivered were changed in place, repaint them
+
+
+@dataclass(slots=True)
+class OverlayDebugDelta:
+    created: float
+    cursor: int  # pass to the next snapshot_since call
+    vision: OverlayDebugStreamDelta
+    decision: OverlayDebugStreamDelta
+    timeline: OverlayDebugStreamDelta
+    performance: OverlayDebugStreamDelta
+
+
+class OverlayDebugStreamCache:
+    """
+    Consumer side copy of one stream, kept in sync by applying deltas.
+
+    Not thread-safe, meant to be owned by the UI thread.
+    """
+
+    def __init__(self, maxlen: int | None = None):
+        self._items: deque = deque(maxlen=maxlen)
+
+    def apply(self, delta: OverlayDebugStreamDelta) -> bool:
+        """Apply a delta and return whether the stream changed."""
+        changed = delta.modified
+        if delta.reset and self._items:
+            self._items.clear()
+            changed = True
+        items = self._items
+        while items and items[0].seq < delta.expired_before:
+            items.popleft()
+            changed = True
+        if delta.added:
+            items.extend(delta.added)
+            changed = True
+        return changed
+
+    def reset(self, items: list[Any]) -> None:
+        """Replace the content with a full snapshot of the stream."""
+        self._items.clear()
+        self._items.extend(items)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def items(self) -> list[Any]:
+        return list(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
 
 
 class OverlayDebugBus:
@@ -90,6 +159,8 @@ class OverlayDebugBus:
         self._timeline_items: deque[TimelineItem] = deque(maxlen=max_timeline_items)
         self._performance_items: deque[PerfMetricSample] = deque(maxlen=max_perf_items)
         self._thread_local = threading.local()
+        self._seq: int = 0  # last assigned sequence number, shared by all streams
+        self._vision_modified_seq: int = 0  # seq at the last in-place change of vision items
 
     def set_crop_offset(self, x: int, y: int) -> None:
         self._thread_local.crop_offset = (x, y)
@@ -104,22 +175,33 @@ class OverlayDebugBus:
     def add_vision(self, item: VisionDrawItem) -> None:
         item.created = _normalize_created(item.created)
         with self._lock:
-            self._vision_items.append(item)
+            self._append(self._vision_items, item)
 
     def add_decision(self, item: DecisionTraceItem) -> None:
         item.created = _normalize_created(item.created)
         with self._lock:
-            self._decision_items.append(item)
+            self._append(self._decision_items, item)
 
     def add_timeline(self, item: TimelineItem) -> None:
         item.created = _normalize_created(item.created)
         with self._lock:
-            self._timeline_items.append(item)
+            self._append(self._timeline_items, item)
 
     def add_performance(self, item: PerfMetricSample) -> None:
         item.created = _normalize_created(item.created)
         with self._lock:
-            self._performance_items.append(item)
+            self._append(self._performance_items, item)
+
+    def _append(self, items: deque, item: Any) -> None:
+        self._seq += 1
+        item.seq = self._seq
+        items.append(item)
+
+    @property
+    def cursor(self) -> int:
+        """Latest sequence number, taken by added items and in-place changes."""
+        with self._lock:
+            return self._seq
 
     def clear(self) -> None:
         with self._lock:
@@ -132,11 +214,14 @@ class OverlayDebugBus:
         """Shift x/y of recent VisionDrawItems matching *source*.
 
         Used by run_ocr_with_offset to correct crop-relative coords
-        that were already pushed by _emit_overlay_vision.
+        that were already pushed by _emit_overlay_vision. The items may
+        already be delivered, so the change is announced by taking a new
+        sequence number that later deltas report as ``modified``.
         """
         if dx == 0 and dy == 0:
             return
         now = time.time()
+        shifted = False
         with self._lock:
             for item in reversed(self._vision_items):
                 if item.source != source:
@@ -148,6 +233,10 @@ class OverlayDebugBus:
                 item.y1 += dy
                 item.x2 += dx
                 item.y2 += dy
+                shifted = True
+            if shifted:
+                self._seq += 1
+                self._vision_modified_seq = self._seq
 
     def snapshot(self) -> OverlayDebugSnapshot:
         now = time.time()
@@ -159,8 +248,43 @@ class OverlayDebugBus:
                 decision_items=list(self._decision_items),
                 timeline_items=list(self._timeline_items),
                 performance_items=list(self._performance_items),
+                cursor=self._seq,
+            )
+
+    def snapshot_since(self, cursor: int) -> OverlayDebugDelta:
+        """Return only what changed since *cursor*.
+
+        Pass 0 for the first call to get every live item, then pass the
+        returned ``cursor`` back on the next call. Work done under the lock
+        is proportional to the number of new and expired items.
+        """
+        now = time.time()
+        with self._lock:
+            self._drop_expired(now)
+            reset = cursor > self._seq
+            if reset:
+                cursor = 0
+            return OverlayDebugDelta(
+                created=now,
+                cursor=self._seq,
+                vision=self._stream_delta(self._vision_items, cursor, reset, self._vision_modified_seq),
+                decision=self._stream_delta(self._decision_items, cursor, reset),
+                timeline=self._stream_delta(self._timeline_items, cursor, reset),
+                performance=self._stream_delta(self._performance_items, cursor, reset),
             )
 
+    def _stream_delta(self, items: deque, cursor: int, reset: bool,
+                      modified_seq: int = 0) -> OverlayDebugStreamDelta:
+        added = []
+        for item in reversed(items):
+            if item.seq <= cursor:
+                break
+            added.append(item)
+        added.reverse()
+        expired_before = items[0].seq if items else self._seq + 1
+        return OverlayDebugStreamDelta(added=added, expired_before=expired_before, reset=reset,
+                                       modified=modified_seq > cursor)
+
     def _drop_expired(self, now: float) -> None:
         self._drop_expired_from_deque(self._vision_items, now)
         self._drop_expired_from_deque(self._decision_items, now)
@@ -3,6 +3,7 @@ import json
 import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 
@@ -96,7 +97,7 @@ class AiBotK(PushChannel):
 
             # 发送请求
             headers = {"Content-Type": "application/json"}
-            response = requests.post(url, data=json.dumps(data).encode("utf-8"), headers=headers, timeout=15)
+            response = push_http.post(url, data=json.dumps(data).encode("utf-8"), headers=headers, timeout=15)
 
             if response.status_code == 200:
                 result = response.json()
@@ -1,7 +1,7 @@
 import json
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 
@@ -144,7 +144,7 @@ class Bark(PushChannel):
 
             # 发送请求
             headers = {"Content-Type": "application/json;charset=utf-8"}
-            response = requests.post(
+            response = push_http.post(
                 url=url,
                 data=json.dumps(data),
                 headers=headers,
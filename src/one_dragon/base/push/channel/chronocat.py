@@ -8,9 +8,9 @@ import json
 import re
 from typing import List
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -221,7 +221,7 @@ class Chronocat(PushChannel):
             bool: 是否发送成功
         """
         try:
-            response = requests.post(url, headers=headers, data=json.dumps(data), timeout=15)
+            response = push_http.post(url, headers=headers, data=json.dumps(data), timeout=15)
             return response.status_code == 200
         except Exception:
             log.error("Chronocat 推送异常", exc_info=True)
@@ -3,9 +3,9 @@ import hashlib
 import hmac
 import time
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 
@@ -108,7 +108,7 @@ class DingDingBot(PushChannel):
                 "timestamp": timestamp,
                 "sign": sign,
             }
-            response = requests.post(
+            response = push_http.post(
                 webhook_base,
                 params=params,
                 json=message_data,
@@ -6,9 +6,9 @@ Discord 机器人推送渠道
 
 import json
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -98,7 +98,7 @@ class Discord(PushChannel):
             dm_headers["Content-Type"] = "application/json"
             dm_payload = json.dumps({"recipient_id": user_id})
 
-            response = requests.post(
+            response = push_http.post(
                 create_dm_url,
                 headers=dm_headers,
                 data=dm_payload,
@@ -132,7 +132,7 @@ class Discord(PushChannel):
                 data = json.dumps(message_payload)
                 headers["Content-Type"] = "application/json"
 
-            response = requests.post(message_url, headers=headers, data=data, files=files, timeout=30)
+            response = push_http.post(message_url, headers=headers, data=data, files=files, timeout=30)
             response.raise_for_status()
 
             return True, "推送成功"
@@ -3,9 +3,9 @@ import hashlib
 import hmac
 import time
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -153,7 +153,7 @@ class FeiShu(PushChannel):
 
             # 发送消息
             url = f'https://{base_url}/open-apis/bot/v2/hook/{key}'
-            response = requests.post(url, json=message_data, timeout=15)
+            response = push_http.post(url, json=message_data, timeout=15)
             response.raise_for_status()
             result = response.json()
 
@@ -184,7 +184,7 @@ class FeiShu(PushChannel):
             auth_headers = {
                 "Content-Type": "application/json; charset=utf-8"
             }
-            auth_response = requests.post(
+            auth_response = push_http.post(
                 auth_endpoint,
                 headers=auth_headers,
                 json={
@@ -211,7 +211,7 @@ class FeiShu(PushChannel):
                 'image_type': (None, 'message')
             }
 
-            image_response = requests.post(
+            image_response = push_http.post(
                 image_endpoint,
                 headers=image_headers,
                 files=files,
@@ -4,6 +4,7 @@ from typing import Any
 import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -91,7 +92,7 @@ class Gotify(PushChannel):
             full_url = f"{url}/message?token={token}"
 
             try:
-                response = requests.post(full_url, data=data, timeout=15)
+                response = push_http.post(full_url, data=data, timeout=15)
                 response.raise_for_status()
                 result = response.json()
 
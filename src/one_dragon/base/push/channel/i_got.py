@@ -4,9 +4,9 @@ iGot 推送渠道
 提供通过 iGot 服务发送消息的功能。
 """
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -69,7 +69,7 @@ class IGot(PushChannel):
             headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
             # 发送请求
-            response = requests.post(url, data=data, headers=headers, timeout=15)
+            response = push_http.post(url, data=data, headers=headers, timeout=15)
             response.raise_for_status()
             response_json = response.json()
 
@@ -2,9 +2,9 @@ import base64
 import json
 from typing import Any
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -149,7 +149,7 @@ class Ntfy(PushChannel):
         success_cnt = 0
         try:
             for data in data_list:
-                response = requests.post(full_url, data=data, headers=headers, timeout=15)
+                response = push_http.post(full_url, data=data, headers=headers, timeout=15)
                 response.raise_for_status()
 
                 if response.status_code == 200:
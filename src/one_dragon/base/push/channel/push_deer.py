@@ -4,9 +4,9 @@ PushDeer 推送渠道
 提供通过 PushDeer 服务发送消息的功能，支持自定义服务地址。
 """
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -84,7 +84,7 @@ class PushDeer(PushChannel):
             url = custom_url if custom_url else "https://api2.pushdeer.com/message/push"
 
             # 发送请求
-            response = requests.post(url, data=data, timeout=15)
+            response = push_http.post(url, data=data, timeout=15)
             response.raise_for_status()
             response_json = response.json()
 
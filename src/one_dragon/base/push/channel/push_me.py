@@ -4,9 +4,9 @@ PushMe 推送渠道
 提供通过 PushMe 服务发送消息的功能，支持自定义服务地址。
 """
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -85,7 +85,7 @@ class PushMe(PushChannel):
             url = custom_url if custom_url else "https://push.i-i.me/"
 
             # 发送请求
-            response = requests.post(url, data=data, timeout=15)
+            response = push_http.post(url, data=data, timeout=15)
 
             # 检查响应结果
             if response.status_code == 200 and response.text == "success":
@@ -4,9 +4,9 @@ Qmsg 酱推送渠道
 提供通过 Qmsg 酱服务发送消息的功能，支持个人消息和群消息。
 """
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -82,7 +82,7 @@ class QMsg(PushChannel):
             payload = {"msg": message_content.encode("utf-8")}
 
             # 发送请求
-            response = requests.post(url=url, params=payload, timeout=15)
+            response = push_http.post(url=url, params=payload, timeout=15)
             response.raise_for_status()
             response_json = response.json()
 
@@ -1,8 +1,8 @@
 import re
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import (
     FieldTypeEnum,
@@ -78,7 +78,7 @@ class ServerChan(PushChannel):
 
             # 发送请求
             headers = {'Content-Type': 'application/json;charset=utf-8'}
-            response = requests.post(url, json=message_data, headers=headers, timeout=10)
+            response = push_http.post(url, json=message_data, headers=headers, timeout=10)
 
             if response.status_code == 200:
                 result = response.json()
@@ -6,9 +6,9 @@ Synology Chat 推送渠道
 
 import json
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -83,7 +83,7 @@ class SynologyChat(PushChannel):
             data = "payload=" + json.dumps(payload_data)
 
             # 发送请求
-            response = requests.post(full_url, data=data, timeout=15)
+            response = push_http.post(full_url, data=data, timeout=15)
 
             # 检查响应状态码
             if response.status_code == 200:
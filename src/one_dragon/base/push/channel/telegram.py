@@ -4,6 +4,7 @@ from typing import Any
 import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -99,7 +100,7 @@ class Telegram(PushChannel):
                         'chat_id': (None, str(user_id)),
                         'caption': (None, f"{title}\n{content}")
                     }
-                    response = requests.post(photo_url, files=files, proxies=proxies, timeout=30)
+                    response = push_http.post(photo_url, files=files, proxies=proxies, timeout=30)
                 else:
                     # 发送消息
                     headers = {"Content-Type": "application/x-www-form-urlencoded"}
@@ -107,7 +108,7 @@ class Telegram(PushChannel):
                         "chat_id": str(user_id),
                         "text": f"{title}\n{content}",
                     }
-                    response = requests.post(url, data=payload, proxies=proxies, timeout=15)
+                    response = push_http.post(url, data=payload, proxies=proxies, timeout=15)
 
                 response.raise_for_status()
                 result = response.json()
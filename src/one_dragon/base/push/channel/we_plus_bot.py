@@ -4,9 +4,9 @@
 提供通过微加机器人服务发送消息的功能，支持自动模板选择。
 """
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -99,7 +99,7 @@ class WePlusBot(PushChannel):
             # 发送请求
             url = "https://www.weplusbot.com/send"
             headers = {"Content-Type": "application/json"}
-            response = requests.post(url=url, json=data, headers=headers, timeout=15)
+            response = push_http.post(url=url, json=data, headers=headers, timeout=15)
             response.raise_for_status()
             response_json = response.json()
 
@@ -1,4 +1,3 @@
-import base64
 import datetime
 import json
 import time
@@ -7,6 +6,7 @@ import urllib.parse
 import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -133,10 +133,7 @@ class Webhook(PushChannel):
                 image_base64 = ""
                 if image is not None:  # image是MatLike，可能具有多个参数，此时if image会歧义
                     try:
-                        image_bytes = self.image_to_bytes(image)
-                        if image_bytes:
-                            image_bytes.seek(0)
-                            image_base64 = base64.b64encode(image_bytes.getvalue()).decode('utf-8')
+                        image_base64 = self.image_to_base64(image) or ""
                     except Exception as e:
                         log.error(f"图片处理失败: {e}")
                         image_base64 = ""
@@ -161,7 +158,7 @@ class Webhook(PushChannel):
             # GET 请求通常不包含 body
             request_data = None if method == "GET" else processed_body.encode("utf-8")
             # 发送请求
-            response = requests.request(
+            response = push_http.request(
                 method=method,
                 url=processed_url,
                 headers=headers,
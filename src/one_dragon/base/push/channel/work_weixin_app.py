@@ -7,12 +7,12 @@
 
 import json
 import time
-import requests
 import threading
 from typing import Optional, Tuple
 
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -97,7 +97,7 @@ class WorkWeixinApp(PushChannel):
                 "corpsecret": corpsecret,
             }
             try:
-                response = requests.get(get_token_url, params=params, proxies=proxies, timeout=10)
+                response = push_http.get(get_token_url, params=params, proxies=proxies, timeout=10)
                 response.raise_for_status()
                 data = response.json()
 
@@ -138,7 +138,7 @@ class WorkWeixinApp(PushChannel):
             'media': ('image.jpg', image_bytes, 'image/jpeg')
         }
         try:
-            response = requests.post(upload_url, files=files, proxies=proxies, timeout=30)
+            response = push_http.post(upload_url, files=files, proxies=proxies, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -176,7 +176,7 @@ class WorkWeixinApp(PushChannel):
             'media': ('image.jpg', image_bytes, 'image/jpeg') # filename, content, content-type
         }
         try:
-            response = requests.post(upload_url, files=files, proxies=proxies, timeout=30)
+            response = push_http.post(upload_url, files=files, proxies=proxies, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -201,7 +201,7 @@ class WorkWeixinApp(PushChannel):
         headers = {"Content-Type": "application/json; charset=utf-8"}
 
         try:
-            response = requests.post(
+            response = push_http.post(
                 send_url,
                 data=json.dumps(message_payload).encode("utf-8"),
                 headers=headers,
@@ -2,9 +2,9 @@ import base64
 import hashlib
 import json
 
-import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 from one_dragon.utils.log_utils import log
@@ -79,7 +79,7 @@ class WorkWeixinBot(PushChannel):
             # 1. 先发文字
             text_data = {"msgtype": "text", "text": {"content": f"{title}\n{content}"}}
             try:
-                resp_obj = requests.post(url, data=json.dumps(text_data), headers=headers, timeout=15)
+                resp_obj = push_http.post(url, data=json.dumps(text_data), headers=headers, timeout=15)
                 resp_obj.raise_for_status()
 
                 status = resp_obj.status_code
@@ -154,7 +154,7 @@ class WorkWeixinBot(PushChannel):
             "image": {"base64": img_base64, "md5": img_md5}
         }
 
-        resp_obj = requests.post(url, data=json.dumps(img_data), headers=headers, timeout=15)
+        resp_obj = push_http.post(url, data=json.dumps(img_data), headers=headers, timeout=15)
         status = resp_obj.status_code
         body_snip = (resp_obj.text or "")[:300] if hasattr(resp_obj, "text") else ""
 
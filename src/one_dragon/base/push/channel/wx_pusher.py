@@ -1,6 +1,7 @@
 import requests
 from cv2.typing import MatLike
 
+from one_dragon.base.push import push_http
 from one_dragon.base.push.push_channel import PushChannel
 from one_dragon.base.push.push_channel_config import PushChannelConfigField, FieldTypeEnum
 
@@ -110,7 +111,7 @@ class WxPusher(PushChannel):
             # 发送请求
             url = "https://wxpusher.zjiecode.com/api/send/message"
             headers = {"Content-Type": "application/json"}
-            response = requests.post(url=url, json=data, headers=headers, timeout=15)
+            response = push_http.post(url=url, json=data, headers=headers, timeout=15)
 
             if response.status_code == 200:
                 result = response.json()
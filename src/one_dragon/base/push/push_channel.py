@@ -1,6 +1,10 @@
 import base64
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
 from io import BytesIO
+from typing import Any
 
 import cv2
 from cv2.typing import MatLike
@@ -8,6 +12,68 @@ from cv2.typing import MatLike
 from one_dragon.base.operation.notify_pool import NotifyPoolItem
 from one_dragon.base.push.push_channel_config import PushChannelConfigField
 
+PUSH_IMAGE_CACHE_SIZE: int = 8  # 最多保留的已编码图片数量
+
+
+class PushImageCache:
+
+    def __init__(self, max_size: int = PUSH_IMAGE_CACHE_SIZE):
+        """
+        推送图片的编码结果 同一张图片推送到多个渠道时只编码一次
+        按图片对象区分 同时保留图片的引用 防止图片被回收后出现相同的ID
+
+        Args:
+            max_size: 最多保留的图片编码数量
+        """
+        self.max_size: int = max_size
+        self._entry_map: OrderedDict[tuple, tuple[MatLike, Any]] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, image: MatLike, key: tuple, encoder: Callable[[], Any]) -> Any:
+        """
+        获取图片的编码结果 没有时使用 encoder 编码
+        编码时持有锁 多个渠道同时推送时 只有第一个渠道编码 其余等待后复用
+
+        Args:
+            image: 图片
+            key: 编码方式
+            encoder: 编码方法
+
+        Returns:
+            Any: 编码结果
+        """
+        entry_key = (id(image), key)
+        with self._lock:
+            entry = self._entry_map.get(entry_key)
+            if entry is not None and entry[0] is image:
+                self._entry_map.move_to_end(entry_key)
+                return entry[1]
+
+            value = encoder()
+            self._entry_map[entry_key] = (image, value)
+            while len(self._entry_map) > self.max_size:
+                self._entry_map.popitem(last=False)
+            return value
+
+    def release(self, image: MatLike) -> None:
+        """
+        删除一张图片的所有编码结果 推送完成后使用
+
+        Args:
+            image: 图片
+        """
+        with self._lock:
+            to_remove = [k for k, v in self._entry_map.items() if v[0] is image]
+            for k in to_remove:
+                self._entry_map.pop(k)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entry_map.clear()
+
+
+push_image_cache = PushImageCache()
+
 
 class PushChannel(ABC):
 
@@ -98,18 +164,32 @@ class PushChannel(ABC):
         Returns:
             BytesIO: 图片数据 统一jpeg格式
         """
+        data = push_image_cache.get(image, ('jpg', max_bytes), lambda: self._encode_image(image, max_bytes))
+        if data is None:
+            return None
+        return BytesIO(data)
+
+    def _encode_image(self, image: MatLike, max_bytes: int | None = None) -> bytes | None:
+        """
+        将图片编码为jpeg
+
+        Args:
+            image: 图片 RGB格式
+            max_bytes: 图片最大字节数 超过时压缩
+
+        Returns:
+            bytes: 图片数据
+        """
         bgr_image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
         retval, buffer = cv2.imencode('.jpg', bgr_image)
 
         if retval:
-            image_bytes = BytesIO(buffer.tobytes())
-            if max_bytes is not None:
-                img_bytes = image_bytes.getvalue()
-                orig_size = len(img_bytes)
-                if orig_size > max_bytes:
-                    return self._compress_image_bytes(bgr_image, max_bytes)
-
-            return image_bytes
+            img_bytes = buffer.tobytes()
+            if max_bytes is not None and len(img_bytes) > max_bytes:
+                compressed = self._compress_image_bytes(bgr_image, max_bytes)
+                return None if compressed is None else compressed.getvalue()
+
+            return img_bytes
         else:
             return None
 
@@ -160,10 +240,12 @@ class PushChannel(ABC):
         Returns:
             str: 图片 base64 字符串
         """
+        return push_image_cache.get(image, ('base64', max_bytes), lambda: self._encode_base64(image, max_bytes))
+
+    def _encode_base64(self, image: MatLike, max_bytes: int | None = None) -> str | None:
         image_bytes = self.image_to_bytes(image, max_bytes=max_bytes)
         if image_bytes is None:
             return None
-        image_bytes.seek(0)
         return base64.b64encode(image_bytes.getvalue()).decode('utf-8')
 
     def get_proxy(self, proxy_url: str) -> dict | None:
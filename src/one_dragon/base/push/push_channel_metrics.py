@@ -0,0 +1,115 @@
+import threading
+
+
+class PushChannelMetrics:
+
+    def __init__(self, channel_id: str):
+        """
+        单个推送渠道的耗时和失败统计
+
+        Args:
+            channel_id: 推送渠道ID
+        """
+        self.channel_id: str = channel_id
+        self.push_count: int = 0  # 推送次数
+        self.fail_count: int = 0  # 失败次数 包括超时
+        self.timeout_count: int = 0  # 超时次数
+        self.total_seconds: float = 0  # 已完成推送的总耗时
+        self.last_seconds: float = 0  # 最近一次推送的耗时
+        self.max_seconds: float = 0  # 最长的一次推送耗时
+        self.last_error: str = ''  # 最近一次失败的原因
+
+    @property
+    def avg_seconds(self) -> float:
+        """
+        已完成推送的平均耗时
+        """
+        finished = self.push_count - self.timeout_count
+        if finished <= 0:
+            return 0
+        return self.total_seconds / finished
+
+    def __repr__(self) -> str:
+        return (f'{self.channel_id} 次数 {self.push_count} 失败 {self.fail_count} 超时 {self.timeout_count}'
+                f' 平均 {self.avg_seconds:.3f}s 最近 {self.last_seconds:.3f}s 最长 {self.max_seconds:.3f}s')
+
+
+class PushMetricsRecorder:
+
+    def __init__(self):
+        """
+        记录所有推送渠道的统计 推送在多个线程中并行进行
+        """
+        self._metrics_map: dict[str, PushChannelMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, channel_id: str) -> PushChannelMetrics:
+        metrics = self._metrics_map.get(channel_id)
+        if metrics is None:
+            metrics = PushChannelMetrics(channel_id)
+            self._metrics_map[channel_id] = metrics
+        return metrics
+
+    def record(self, channel_id: str, seconds: float, ok: bool, msg: str) -> None:
+        """
+        记录一次完成的推送
+
+        Args:
+            channel_id: 推送渠道ID
+            seconds: 耗时
+            ok: 是否成功
+            msg: 失败时的错误信息
+        """
+        with self._lock:
+            metrics = self._get(channel_id)
+            metrics.push_count += 1
+            metrics.total_seconds += seconds
+            metrics.last_seconds = seconds
+            metrics.max_seconds = max(metrics.max_seconds, seconds)
+            if not ok:
+                metrics.fail_count += 1
+                metrics.last_error = msg
+
+    def record_timeout(self, channel_id: str, seconds: float) -> None:
+        """
+        记录一次超时的推送 超时的推送仍在后台进行 完成后不再重复记录
+
+        Args:
+            channel_id: 推送渠道ID
+            seconds: 等待的时间
+        """
+        with self._lock:
+            metrics = self._get(channel_id)
+            metrics.push_count += 1
+            metrics.fail_count += 1
+            metrics.timeout_count += 1
+            metrics.last_seconds = seconds
+            metrics.max_seconds = max(metrics.max_seconds, seconds)
+            metrics.last_error = f'推送超时 {seconds:.0f}秒'
+
+    def get(self, channel_id: str) -> PushChannelMetrics | None:
+        """
+        获取推送渠道的统计副本
+
+        Args:
+            channel_id: 推送渠道ID
+
+        Returns:
+            PushChannelMetrics | None: 统计 未推送过时返回None
+        """
+        with self._lock:
+            metrics = self._metrics_map.get(channel_id)
+            if metrics is None:
+                return None
+            copied = PushChannelMetrics(channel_id)
+            copied.__dict__.update(metrics.__dict__)
+            return copied
+
+    def get_all(self) -> dict[str, PushChannelMetrics]:
+        """
+        Returns:
+            dict[str, PushChannelMetrics]: 所有推送过的渠道的统计副本
+        """
+        with self._lock:
+            channel_id_list = list(self._metrics_map.keys())
+        return {i: self.get(i) for i in channel_id_list}
@@ -0,0 +1,103 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_CONNECTIONS: int = 4  # 每个会话缓存的连接池数量 使用代理时每个代理一个连接池
+POOL_MAXSIZE: int = 8  # 每个连接池保留的连接数量
+
+_session_map: dict[str, requests.Session] = {}  # 协议+主机 -> 会话
+_session_lock = threading.Lock()
+
+
+def _get_host_key(url: str) -> str:
+    """
+    会话按 协议+主机+端口 区分
+    Args:
+        url: 请求地址
+
+    Returns:
+        str: 会话的键
+    """
+    parts = urlsplit(url)
+    return f'{parts.scheme.lower()}://{parts.netloc.lower()}'
+
+
+def _new_session() -> requests.Session:
+    """
+    创建一个带连接池的会话
+    不保存服务器返回的 cookie 每次请求的效果与直接使用 requests.post 一致 只是复用了连接
+
+    Returns:
+        requests.Session: 会话
+    """
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    获取请求地址对应主机的共享会话 同一个主机的多次推送可以复用连接
+
+    Args:
+        url: 请求地址
+
+    Returns:
+        requests.Session: 会话
+    """
+    key = _get_host_key(url)
+    session = _session_map.get(key)
+    if session is not None:
+        return session
+    with _session_lock:
+        session = _session_map.get(key)
+        if session is None:
+            session = _new_session()
+            _session_map[key] = session
+        return session
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    使用共享会话发送请求 参数与 requests.request 一致
+
+    Args:
+        method: HTTP 方法
+        url: 请求地址
+        **kwargs: 其它请求参数
+
+    Returns:
+        requests.Response: 响应
+    """
+    return get_session(url).request(method=method, url=url, **kwargs)
+
+
+def get(url: str, params=None, **kwargs) -> requests.Response:
+    """
+    使用共享会话发送 GET 请求 参数与 requests.get 一致
+    """
+    return request('GET', url, params=params, **kwargs)
+
+
+def post(url: str, data=None, json=None, **kwargs) -> requests.Response:
+    """
+    使用共享会话发送 POST 请求 参数与 requests.post 一致
+    """
+    return request('POST', url, data=data, json=json, **kwargs)
+
+
+def close_all() -> None:
+    """
+    关闭所有共享会话 脚本退出时使用
+    """
+    with _session_lock:
+        session_list = list(_session_map.values())
+        _session_map.clear()
+    for session in session_list:
+        session.close()
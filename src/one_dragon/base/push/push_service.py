@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, wait
 from functools import cached_property
 from typing import TYPE_CHECKING
 
@@ -33,8 +34,10 @@ from one_dragon.base.push.channel.webhook import Webhook
 from one_dragon.base.push.channel.work_weixin_app import WorkWeixinApp
 from one_dragon.base.push.channel.work_weixin_bot import WorkWeixinBot
 from one_dragon.base.push.channel.wx_pusher import WxPusher
-from one_dragon.base.push.push_channel import PushChannel
+from one_dragon.base.push import push_http
+from one_dragon.base.push.push_channel import PushChannel, push_image_cache
 from one_dragon.base.push.push_channel_config import PushChannelConfigField
+from one_dragon.base.push.push_channel_metrics import PushChannelMetrics, PushMetricsRecorder
 from one_dragon.base.push.push_config import PushConfig, PushProxy
 from one_dragon.utils import thread_utils
 from one_dragon.utils.log_utils import log
@@ -42,6 +45,9 @@ from one_dragon.utils.log_utils import log
 if TYPE_CHECKING:
     from one_dragon.base.operation.one_dragon_context import OneDragonContext
 
+PUSH_CHANNEL_TIMEOUT_SECONDS: float = 60  # 并行推送时 每个渠道的最长等待时间
+PUSH_FAN_OUT_MAX_WORKERS: int = 32  # 并行推送的线程数 不少于渠道数量 保证所有渠道同时开始
+
 
 class PushService:
 
@@ -51,6 +57,11 @@ class PushService:
         self._executor = ThreadPoolExecutor(
             thread_name_prefix="one_dragon_push_service", max_workers=1
         )
+        self._fan_out_executor = ThreadPoolExecutor(
+            thread_name_prefix="one_dragon_push_channel", max_workers=PUSH_FAN_OUT_MAX_WORKERS
+        )
+        self.channel_timeout_seconds: float = PUSH_CHANNEL_TIMEOUT_SECONDS
+        self._metrics = PushMetricsRecorder()
 
         self._init_lock = threading.Lock()
         self._inited: bool = False
@@ -145,52 +156,22 @@ class PushService:
         if not self.push_config.send_image:
             image = None
 
-        any_ok: bool = False
-        err_msg: str = ''
-        if channel_id is None:
-            any_push = False
-            for channel_id, channel in self._id_2_channels.items():
-                channel_config = self.get_channel_config(channel_id)
-                ok, msg = channel.validate_config(channel_config)
-                if not ok:
-                    continue
-
-                any_push = True
-
-                ok, msg = channel.push(
-                    config=channel_config,
-                    title=title,
-                    content=content,
-                    image=image,
-                    proxy_url=self.get_proxy(),
-                )
-                if not ok:
-                    log.error(f'推送失败: {channel_id} {msg}')
-                    err_msg += f'{channel_id} {msg}\n'
-                    continue
-
-                any_ok = True
-                log.info(f'推送成功: {channel_id}')
-
-            if not any_push:
-                return False, '没有可用的推送渠道'
-        else:
-            channel = self._id_2_channels.get(channel_id)
-            if channel is None:
-                return False, f'推送渠道不存在: {channel_id}'
-            channel_config = self.get_channel_config(channel_id)
-            ok, msg = channel.validate_config(channel_config)
-            if not ok:
-                return False, msg
-            any_ok, err_msg = channel.push(
+        proxy_url = self.get_proxy()
+
+        def _push(channel: PushChannel, channel_config: dict[str, str]) -> tuple[bool, str]:
+            return channel.push(
                 config=channel_config,
                 title=title,
                 content=content,
                 image=image,
-                proxy_url=self.get_proxy(),
+                proxy_url=proxy_url,
             )
 
-        return any_ok, err_msg
+        try:
+            return self._push_to_channels(_push, channel_id, '推送')
+        finally:
+            if image is not None:
+                push_image_cache.release(image)
 
     def get_channel_config(self, channel_id: str) -> dict[str, str]:
         """
@@ -264,35 +245,42 @@ class PushService:
         if not self.push_config.send_image:
             items = [NotifyPoolItem(content=item.content) for item in items]
 
-        any_ok: bool = False
-        err_msg: str = ''
-        if channel_id is None:
-            any_push = False
-            for cid, channel in self._id_2_channels.items():
-                channel_config = self.get_channel_config(cid)
-                ok, msg = channel.validate_config(channel_config)
-                if not ok:
-                    continue
-
-                any_push = True
-
-                ok, msg = channel.push_merged(
-                    config=channel_config,
-                    title=title,
-                    items=items,
-                    proxy_url=self.get_proxy(),
-                )
-                if not ok:
-                    log.error(f'合并推送失败: {cid} {msg}')
-                    err_msg += f'{cid} {msg}\n'
-                    continue
-
-                any_ok = True
-                log.info(f'合并推送成功: {cid}')
-
-            if not any_push:
-                return False, '没有可用的推送渠道'
-        else:
+        proxy_url = self.get_proxy()
+
+        def _push_merged(channel: PushChannel, channel_config: dict[str, str]) -> tuple[bool, str]:
+            return channel.push_merged(
+                config=channel_config,
+                title=title,
+                items=items,
+                proxy_url=proxy_url,
+            )
+
+        try:
+            return self._push_to_channels(_push_merged, channel_id, '合并推送')
+        finally:
+            for item in items:
+                if item.image is not None:
+                    push_image_cache.release(item.image)
+
+    def _push_to_channels(
+        self,
+        push_func: Callable[[PushChannel, dict[str, str]], tuple[bool, str]],
+        channel_id: str | None,
+        action_name: str,
+    ) -> tuple[bool, str]:
+        """
+        推送到指定渠道 或并行推送到所有能通过配置校验的渠道
+        并行时每个渠道单独等待 慢的渠道不会影响其它渠道 超时的渠道记为失败
+
+        Args:
+            push_func: 推送到单个渠道的方法
+            channel_id: 推送渠道ID 未传入时使用所有能通过配置校验的渠道
+            action_name: 日志中使用的名称
+
+        Returns:
+            tuple[bool, str]: 是否成功、错误信息
+        """
+        if channel_id is not None:
             channel = self._id_2_channels.get(channel_id)
             if channel is None:
                 return False, f'推送渠道不存在: {channel_id}'
@@ -300,15 +288,86 @@ class PushService:
             ok, msg = channel.validate_config(channel_config)
             if not ok:
                 return False, msg
-            any_ok, err_msg = channel.push_merged(
-                config=channel_config,
-                title=title,
-                items=items,
-                proxy_url=self.get_proxy(),
-            )
+            ok, msg, seconds = self._run_channel(push_func, channel, channel_config)
+            self._metrics.record(channel_id, seconds, ok, msg)
+            return ok, msg
+
+        future_list = []
+        for cid, channel in self._id_2_channels.items():
+            channel_config = self.get_channel_config(cid)
+            ok, msg = channel.validate_config(channel_config)
+            if not ok:
+                continue
+            future = self._fan_out_executor.submit(self._run_channel, push_func, channel, channel_config)
+            future_list.append((cid, future))
+
+        if len(future_list) == 0:
+            return False, '没有可用的推送渠道'
+
+        start_time = time.perf_counter()
+        wait([i[1] for i in future_list], timeout=self.channel_timeout_seconds)
+        wait_seconds = time.perf_counter() - start_time
+
+        any_ok: bool = False
+        err_msg: str = ''
+        for cid, future in future_list:  # 按渠道顺序汇总结果
+            if future.done():
+                ok, msg, seconds = future.result()
+                self._metrics.record(cid, seconds, ok, msg)
+            else:
+                ok, msg = False, f'推送超时 {self.channel_timeout_seconds}秒'
+                self._metrics.record_timeout(cid, wait_seconds)
+
+            if not ok:
+                log.error(f'{action_name}失败: {cid} {msg}')
+                err_msg += f'{cid} {msg}\n'
+                continue
+
+            any_ok = True
+            log.info(f'{action_name}成功: {cid}')
 
         return any_ok, err_msg
 
+    @staticmethod
+    def _run_channel(
+        push_func: Callable[[PushChannel, dict[str, str]], tuple[bool, str]],
+        channel: PushChannel,
+        channel_config: dict[str, str],
+    ) -> tuple[bool, str, float]:
+        """
+        推送到单个渠道 并记录耗时
+
+        Args:
+            push_func: 推送到单个渠道的方法
+            channel: 推送渠道
+            channel_config: 推送渠道配置
+
+        Returns:
+            tuple[bool, str, float]: 是否成功、错误信息、耗时
+        """
+        start_time = time.perf_counter()
+        try:
+            ok, msg = push_func(channel, channel_config)
+        except Exception as e:
+            log.error(f'推送异常: {channel.channel_id}', exc_info=True)
+            ok, msg = False, str(e)
+        return ok, msg, time.perf_counter() - start_time
+
+    def get_channel_metrics(self, channel_id: str | None = None) -> dict[str, PushChannelMetrics]:
+        """
+        获取推送渠道的耗时和失败统计
+
+        Args:
+            channel_id: 推送渠道ID 未传入时返回所有推送过的渠道
+
+        Returns:
+            dict[str, PushChannelMetrics]: 推送渠道ID -> 统计
+        """
+        if channel_id is None:
+            return self._metrics.get_all()
+        metrics = self._metrics.get(channel_id)
+        return {} if metrics is None else {channel_id: metrics}
+
     def push_merged_async(
         self,
         title: str,
@@ -348,3 +407,5 @@ class PushService:
         整个脚本运行结束后的清理
         """
         self._executor.shutdown(wait=True)
+        self._fan_out_executor.shutdown(wait=False, cancel_futures=True)
+        push_http.close_all()
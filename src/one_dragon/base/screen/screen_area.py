@@ -20,6 +20,7 @@ class ScreenArea:
         goto_list: list[str] | None = None,
         color_range: list[list[int]] | None = None,
         gamepad_key: str | None = None,
+        single_line: bool = False,
     ):
         self.area_name: str = area_name or ''
         self.pc_rect: Rect = pc_rect if pc_rect is not None else Rect(0, 0, 0, 0)
@@ -33,6 +34,7 @@ class ScreenArea:
         self.goto_list: list[str] = [] if goto_list is None else goto_list  # 交互后 可能会跳转的画面名称列表
         self.color_range: list[list[int]] | None = color_range  # 识别时候的筛选的颜色范围 文本时候有效
         self.gamepad_key: str | None = gamepad_key  # GamepadActionEnum 动作名 如 'menu', 'compendium'
+        self.single_line: bool = single_line  # 区域内只有单行文本 识别时跳过文本检测 文本时候有效
 
     @property
     def rect(self) -> Rect:
@@ -118,5 +120,7 @@ class ScreenArea:
         order_dict['goto_list'] = self.goto_list
         if self.gamepad_key:
             order_dict['gamepad_key'] = self.gamepad_key
+        if self.single_line:
+            order_dict['single_line'] = self.single_line
 
         return order_dict
@@ -0,0 +1,61 @@
+import threading
+from typing import Any
+
+from cv2.typing import MatLike
+
+
+class ScreenFrameCache:
+
+    def __init__(self):
+        """
+        当前截图上的区域识别结果
+        同一轮里对同一个区域的多次判断 直接复用结果
+        截取新的一帧时清空 只对最新一帧截图本身生效 传入其它图片时不使用缓存
+        """
+        self.frame_time: float = 0  # 当前帧的截图时间
+        self._frame: MatLike | None = None  # 当前帧 同时保留引用 防止图片被回收后出现相同的ID
+        self._result_map: dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def new_frame(self, frame_time: float, frame: MatLike | None) -> None:
+        """
+        截取了新的一帧
+        :param frame_time: 截图时间
+        :param frame: 截图
+        :return:
+        """
+        with self._lock:
+            self.frame_time = frame_time
+            self._frame = frame
+            self._result_map.clear()
+
+    def get(self, screen: MatLike, key: tuple) -> tuple[bool, Any]:
+        """
+        获取当前帧上的识别结果
+        :param screen: 识别使用的截图
+        :param key: 识别的键
+        :return: 是否有缓存 和缓存的结果
+        """
+        with self._lock:
+            if screen is None or screen is not self._frame or key not in self._result_map:
+                return False, None
+            return True, self._result_map[key]
+
+    def put(self, screen: MatLike, key: tuple, value: Any) -> None:
+        """
+        保存当前帧上的识别结果 截图不是当前帧时忽略
+        :param screen: 识别使用的截图
+        :param key: 识别的键
+        :param value: 识别结果
+        :return:
+        """
+        with self._lock:
+            if screen is None or screen is not self._frame:
+                return
+            self._result_map[key] = value
+
+    def clear(self) -> None:
+        with self._lock:
+            self.frame_time = 0
+            self._frame = None
+            self._result_map.clear()
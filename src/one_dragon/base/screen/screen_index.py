@@ -0,0 +1,130 @@
+import threading
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from one_dragon.base.geometry.rectangle import Rect
+from one_dragon.base.screen.screen_area import ScreenArea
+from one_dragon.base.screen.screen_info import ScreenInfo
+from one_dragon.utils import cv2_utils
+
+FINGERPRINT_MISMATCH_DISTANCE: int = 24  # 指纹的汉明距离超过这个值时 认为区域内容明显不同
+
+
+def get_id_mark_area_key(area: ScreenArea) -> str:
+    """
+    区域的识别键 识别方式完全相同的区域 在同一张截图上的识别结果也相同
+    不同画面共用的标识区域(例如同一个标题栏) 可以只识别一次
+    :param area: 区域
+    :return:
+    """
+    rect = area.rect
+    rect_key = f'{rect.x1},{rect.y1},{rect.x2},{rect.y2}'
+    if area.is_text_area:
+        return f'text|{rect_key}|{area.text}|{area.lcs_percent}|{area.color_range}|{area.single_line}'
+    elif area.is_template_area:
+        return f'template|{rect_key}|{area.template_sub_dir}|{area.template_id}|{area.template_match_threshold}'
+    else:
+        return f'none|{rect_key}'
+
+
+def cal_fingerprint(screen: MatLike, rect: Rect) -> int | None:
+    """
+    计算区域的差异哈希 用于快速判断区域内容是否与之前相似
+    :param screen: 游戏截图
+    :param rect: 区域
+    :return: 64位的指纹 区域为空时返回None
+    """
+    part = cv2_utils.crop_image_only(screen, rect)
+    if part is None or part.size == 0:
+        return None
+    gray = cv2.cvtColor(part, cv2.COLOR_RGB2GRAY) if part.ndim == 3 else part
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+class ScreenIndex:
+
+    def __init__(self, screen_info_list: list[ScreenInfo]):
+        """
+        画面识别的索引
+        - 按识别方式对所有画面的标识区域分组 同一张截图上每组只需要识别一次
+        - 记录每个标识区域在匹配成功时的指纹 识别未知画面时 指纹明显不吻合的画面放到最后再判断
+        指纹只影响判断的先后 是否目标画面仍由区域识别决定
+        :param screen_info_list: 画面列表
+        """
+        self.screen_area_key_map: dict[str, list[str]] = {}  # 画面名称 -> 标识区域的识别键
+        self.area_map: dict[str, ScreenArea] = {}  # 识别键 -> 其中一个区域
+        self.area_screen_map: dict[str, list[str]] = {}  # 识别键 -> 使用这个区域作为标识的画面名称
+
+        self._fingerprint_map: dict[str, int] = {}  # 识别键 -> 上一次匹配成功时的指纹
+        self._lock = threading.Lock()
+
+        for screen_info in screen_info_list:
+            key_list: list[str] = []
+            for area in screen_info.area_list:
+                if not area.id_mark:
+                    continue
+                key = get_id_mark_area_key(area)
+                if key in key_list:
+                    continue
+                key_list.append(key)
+                if key not in self.area_map:
+                    self.area_map[key] = area
+                    self.area_screen_map[key] = []
+                self.area_screen_map[key].append(screen_info.screen_name)
+            self.screen_area_key_map[screen_info.screen_name] = key_list
+
+    def split_screen_name_list(self, screen: MatLike, screen_name_list: list[str]) -> tuple[list[str], list[str]]:
+        """
+        按指纹把候选画面分成先判断和后判断两组 组内保持原有顺序
+        标识区域的内容与上一次匹配成功时差别很大 这个画面大概率不是目标画面 放到后面再判断
+        上一次匹配时的背景或遮挡可能不同 所以不能直接跳过
+        :param screen: 游戏截图
+        :param screen_name_list: 候选画面名称
+        :return: 先判断的画面名称, 指纹明显不吻合 后判断的画面名称
+        """
+        with self._lock:
+            fingerprint_map = dict(self._fingerprint_map)
+        if len(fingerprint_map) == 0:
+            return list(screen_name_list), []
+
+        current_map: dict[str, int | None] = {}  # 同一个位置的指纹只计算一次
+        first_list: list[str] = []
+        mismatched_list: list[str] = []
+        for screen_name in screen_name_list:
+            mismatched: bool = False
+            for key in self.screen_area_key_map.get(screen_name, []):
+                recorded = fingerprint_map.get(key)
+                if recorded is None:
+                    continue
+                rect = self.area_map[key].rect
+                rect_key = f'{rect.x1},{rect.y1},{rect.x2},{rect.y2}'
+                if rect_key not in current_map:
+                    current_map[rect_key] = cal_fingerprint(screen, rect)
+                current = current_map[rect_key]
+                if current is not None and (current ^ recorded).bit_count() > FINGERPRINT_MISMATCH_DISTANCE:
+                    mismatched = True
+                    break
+            if mismatched:
+                mismatched_list.append(screen_name)
+            else:
+                first_list.append(screen_name)
+
+        return first_list, mismatched_list
+
+    def record_match(self, screen: MatLike, screen_name: str) -> None:
+        """
+        记录匹配成功的画面中 各个标识区域的指纹
+        :param screen: 游戏截图
+        :param screen_name: 画面名称
+        :return:
+        """
+        for key in self.screen_area_key_map.get(screen_name, []):
+            fingerprint = cal_fingerprint(screen, self.area_map[key].rect)
+            if fingerprint is None:
+                continue
+            with self._lock:
+                self._fingerprint_map[key] = fingerprint
@@ -35,6 +35,7 @@ class ScreenInfo:
                 id_mark=data_area.get('id_mark', False),
                 goto_list=data_area.get('goto_list', []),
                 gamepad_key=data_area.get('gamepad_key', ''),
+                single_line=data_area.get('single_line', False),
             )
             self.area_list.append(area)
 
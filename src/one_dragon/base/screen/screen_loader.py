@@ -4,6 +4,7 @@ from typing import Optional
 import yaml
 
 from one_dragon.base.screen.screen_area import ScreenArea
+from one_dragon.base.screen.screen_index import ScreenIndex
 from one_dragon.base.screen.screen_info import ScreenInfo
 from one_dragon.utils import os_utils, yaml_utils
 from one_dragon.utils.log_utils import log
@@ -51,6 +52,7 @@ class ScreenContext:
         self._screen_area_map: dict[str, ScreenArea] = {}
         self._id_2_screen: dict[str, ScreenInfo] = {}
         self.screen_route_map: dict[str, dict[str, ScreenRoute]] = {}
+        self.screen_index: ScreenIndex = ScreenIndex([])  # 画面识别的索引
 
         self.last_screen_name: Optional[str] = None  # 上一个画面名字
         self.current_screen_name: Optional[str] = None  # 当前的画面名字
@@ -130,6 +132,7 @@ class ScreenContext:
                     self._screen_area_map[f'{screen_info.screen_name}.{screen_area.area_name}'] = screen_area
 
         self.init_screen_route()
+        self.screen_index = ScreenIndex(self.screen_info_list)
 
     def get_screen(self, screen_name: str, copy: bool = False) -> ScreenInfo:
         """
@@ -7,7 +7,10 @@ from cv2.typing import MatLike
 
 from one_dragon.base.geometry.point import Point
 from one_dragon.base.matcher.match_result import MatchResult
+from one_dragon.base.matcher.ocr.ocr_service import OcrRequest
 from one_dragon.base.screen.screen_area import ScreenArea
+from one_dragon.base.screen.screen_frame_cache import ScreenFrameCache
+from one_dragon.base.screen.screen_index import get_id_mark_area_key
 from one_dragon.base.screen.screen_info import ScreenInfo
 from one_dragon.utils import cv2_utils, str_utils
 from one_dragon.utils.i18_utils import gt
@@ -31,6 +34,22 @@ class FindAreaResultEnum(Enum):
     AREA_NO_CONFIG = -2  # 区域配置找不到
 
 
+def _get_frame_cache(ctx: OneDragonContext) -> ScreenFrameCache | None:
+    """
+    获取最新一帧截图的识别结果缓存
+
+    Args:
+        ctx: 上下文
+
+    Returns:
+        ScreenFrameCache | None: 没有控制器时返回None
+    """
+    controller = getattr(ctx, 'controller', None)
+    if controller is None:
+        return None
+    return getattr(controller, 'frame_cache', None)
+
+
 def find_area(
     ctx: OneDragonContext,
     screen: MatLike,
@@ -101,6 +120,13 @@ def find_area_in_screen_binary(
     if area is None:
         return FindAreaResultEnum.AREA_NO_CONFIG
 
+    frame_cache = _get_frame_cache(ctx)
+    cache_key = ('find_area_binary', get_id_mark_area_key(area), binary_threshold, crop_first)
+    if frame_cache is not None:
+        cached, cache_result = frame_cache.get(screen, cache_key)
+        if cached:
+            return cache_result
+
     # 对屏幕进行二值化处理
     binary_screen = cv2_utils.to_binary(screen, threshold=binary_threshold)
 
@@ -111,6 +137,7 @@ def find_area_in_screen_binary(
             rect=area.rect,
             color_range=area.color_range,
             crop_first=crop_first,
+            single_line=area.single_line,
         )
 
         for ocr_result in ocr_result_list:
@@ -132,7 +159,10 @@ def find_area_in_screen_binary(
         )
         find = mrl.max is not None
 
-    return FindAreaResultEnum.TRUE if find else FindAreaResultEnum.FALSE
+    result = FindAreaResultEnum.TRUE if find else FindAreaResultEnum.FALSE
+    if frame_cache is not None:
+        frame_cache.put(screen, cache_key, result)
+    return result
 
 
 def find_area_in_screen(
@@ -156,6 +186,13 @@ def find_area_in_screen(
     if area is None:
         return FindAreaResultEnum.AREA_NO_CONFIG
 
+    frame_cache = _get_frame_cache(ctx)
+    cache_key = ('find_area', get_id_mark_area_key(area), crop_first)
+    if frame_cache is not None:
+        cached, cache_result = frame_cache.get(screen, cache_key)
+        if cached:
+            return cache_result
+
     find: bool = False
     if area.is_text_area:
         ocr_result_list = ctx.ocr_service.get_ocr_result_list(
@@ -163,6 +200,7 @@ def find_area_in_screen(
             rect=area.rect,
             color_range=area.color_range,
             crop_first=crop_first,
+            single_line=area.single_line,
         )
 
         for ocr_result in ocr_result_list:
@@ -176,7 +214,10 @@ def find_area_in_screen(
                                              threshold=area.template_match_threshold)
         find = mrl.max is not None
 
-    return FindAreaResultEnum.TRUE if find else FindAreaResultEnum.FALSE
+    result = FindAreaResultEnum.TRUE if find else FindAreaResultEnum.FALSE
+    if frame_cache is not None:
+        frame_cache.put(screen, cache_key, result)
+    return result
 
 
 def find_template_coord_in_area(
@@ -201,6 +242,16 @@ def find_template_coord_in_area(
     if area is None or not area.is_template_area:
         return None
 
+    frame_cache = _get_frame_cache(ctx)
+    cache_key = ('template_coord', get_id_mark_area_key(area))
+    if frame_cache is not None:
+        cached, cache_result = frame_cache.get(screen, cache_key)
+        if cached:
+            # 返回副本 防止调用方修改缓存的结果
+            return None if cache_result is None else MatchResult(
+                cache_result.confidence, cache_result.x, cache_result.y, cache_result.w, cache_result.h
+            )
+
     # 在裁剪区域内进行模板匹配
     mrl = ctx.tm.crop_and_match_template(
         screen,
@@ -212,17 +263,23 @@ def find_template_coord_in_area(
     )
 
     if mrl.max is None:
-        return None
-
-    # 将相对坐标转换为绝对坐标
-    result = MatchResult(
-        mrl.max.confidence,
-        mrl.max.x + area.rect.x1,
-        mrl.max.y + area.rect.y1,
-        mrl.max.w,
-        mrl.max.h
-    )
+        result = None
+    else:
+        # 将相对坐标转换为绝对坐标
+        result = MatchResult(
+            mrl.max.confidence,
+            mrl.max.x + area.rect.x1,
+            mrl.max.y + area.rect.y1,
+            mrl.max.w,
+            mrl.max.h
+        )
 
+    if frame_cache is not None:
+        frame_cache.put(
+            screen,
+            cache_key,
+            None if result is None else MatchResult(result.confidence, result.x, result.y, result.w, result.h),
+        )
     return result
 
 
@@ -257,6 +314,7 @@ def find_and_click_area(
             rect=area.rect,
             color_range=area.color_range,
             crop_first=crop_first,
+            single_line=area.single_line,
         )
 
         for ocr_result in ocr_result_list:
@@ -340,6 +398,7 @@ def get_match_screen_name(
 ) -> str | None:
     """
     根据游戏截图 匹配一个最合适的画面
+    同一个标识区域在所有候选画面中只识别一次
 
     Args:
         ctx: 上下文
@@ -350,26 +409,26 @@ def get_match_screen_name(
     Returns:
         str | None: 画面名称
     """
+    area_result: dict[str, FindAreaResultEnum] = {}
     if screen_name_list is not None:
-        for screen_info in ctx.screen_loader.screen_info_list:
-            if screen_info.screen_name not in screen_name_list:
-                continue
-            if is_target_screen(ctx, screen, screen_info=screen_info, crop_first=crop_first):
-                return screen_info.screen_name
+        to_check_list = [
+            i.screen_name
+            for i in ctx.screen_loader.screen_info_list
+            if i.screen_name in screen_name_list
+        ]
     elif ctx.screen_loader.current_screen_name is not None or ctx.screen_loader.last_screen_name is not None:
-        return get_match_screen_name_from_last(ctx, screen, crop_first=crop_first)
+        return get_match_screen_name_from_last(ctx, screen, crop_first=crop_first, area_result=area_result)
     else:
-        for screen_info in ctx.screen_loader.screen_info_list:
-            if is_target_screen(ctx, screen, screen_info=screen_info, crop_first=crop_first):
-                return screen_info.screen_name
+        to_check_list = [i.screen_name for i in ctx.screen_loader.screen_info_list]
 
-    return None
+    return _get_first_match_screen_name(ctx, screen, to_check_list, crop_first, area_result)
 
 
 def get_match_screen_name_from_last(
     ctx: OneDragonContext,
     screen: MatLike,
     crop_first: bool = True,
+    area_result: dict[str, FindAreaResultEnum] | None = None,
 ) -> str | None:
     """
     根据游戏截图 从上次记录的画面开始 匹配一个最合适的画面
@@ -377,10 +436,13 @@ def get_match_screen_name_from_last(
         ctx: 上下文
         screen: 游戏截图
         crop_first: 在传入区域时 是否先裁剪再进行文本识别
+        area_result: 本张截图上标识区域的识别结果 用于在多个画面之间复用
 
     Returns:
         str | None: 画面名称
     """
+    if area_result is None:
+        area_result = {}
     bfs_list = []
 
     if ctx.screen_loader.current_screen_name is not None:  # 如果有记录上次所在画面 则从这个画面开始搜索
@@ -396,7 +458,9 @@ def get_match_screen_name_from_last(
         current_screen_name = bfs_list[bfs_idx]
         bfs_idx += 1
 
-        if is_target_screen(ctx, screen, screen_name=current_screen_name, crop_first=crop_first):
+        if is_target_screen(ctx, screen, screen_name=current_screen_name, crop_first=crop_first,
+                            area_result=area_result):
+            ctx.screen_loader.screen_index.record_match(screen, current_screen_name)
             return current_screen_name
 
         screen_info = ctx.screen_loader.get_screen(current_screen_name)
@@ -410,23 +474,58 @@ def get_match_screen_name_from_last(
                     bfs_list.append(goto_screen)
 
     # 最后 尝试搜索中没有出现的画面
-    for screen_info in ctx.screen_loader.screen_info_list:
-        if screen_info.screen_name in bfs_list:
+    to_check_list = [
+        i.screen_name
+        for i in ctx.screen_loader.screen_info_list
+        if i.screen_name not in bfs_list
+    ]
+    return _get_first_match_screen_name(ctx, screen, to_check_list, crop_first, area_result)
+
+
+def _get_first_match_screen_name(
+    ctx: OneDragonContext,
+    screen: MatLike,
+    screen_name_list: list[str],
+    crop_first: bool,
+    area_result: dict[str, FindAreaResultEnum],
+) -> str | None:
+    """
+    逐个判断是否目标画面 画面索引中指纹明显不吻合的画面放到最后判断 其余按原有顺序
+
+    Args:
+        ctx: 上下文
+        screen: 游戏截图
+        screen_name_list: 候选画面
+        crop_first: 在传入区域时 是否先裁剪再进行文本识别
+        area_result: 本张截图上标识区域的识别结果 用于在多个画面之间复用
+
+    Returns:
+        str | None: 第一个匹配的画面名称
+    """
+    screen_index = ctx.screen_loader.screen_index
+    first_list, later_list = screen_index.split_screen_name_list(screen, screen_name_list)
+    for screen_name in first_list + later_list:
+        screen_info = ctx.screen_loader.screen_info_map.get(screen_name)
+        if screen_info is None:
             continue
-        if is_target_screen(ctx, screen, screen_info=screen_info, crop_first=crop_first):
-            return screen_info.screen_name
+        if is_target_screen(ctx, screen, screen_info=screen_info, crop_first=crop_first, area_result=area_result):
+            screen_index.record_match(screen, screen_name)
+            return screen_name
 
     return None
 
+
 def is_target_screen(
     ctx: OneDragonContext,
     screen: MatLike,
     screen_name: str | None = None,
     screen_info: ScreenInfo | None = None,
     crop_first: bool = True,
+    area_result: dict[str, FindAreaResultEnum] | None = None,
 ) -> bool:
     """
     根据游戏截图 判断是否目标画面
+    先判断模板区域 都符合后再对文本区域进行批量OCR
 
     Args:
         ctx: 上下文
@@ -434,6 +533,7 @@ def is_target_screen(
         screen_name: 目标画面名称
         screen_info: 目标画面信息 传入时优先使用
         crop_first: 在传入区域时 是否先裁剪再进行文本识别
+        area_result: 本张截图上标识区域的识别结果 用于在多个画面之间复用 key=识别键
 
     Returns:
         bool: 是否目标画面
@@ -445,18 +545,67 @@ def is_target_screen(
         if screen_info is None:
             return False
 
-    existed_id_mark: bool = False
-    fit_id_mark: bool = True
-    for screen_area in screen_info.area_list:
-        if not screen_area.id_mark:
+    if area_result is None:
+        area_result = {}
+
+    id_mark_area_list: list[ScreenArea] = [i for i in screen_info.area_list if i.id_mark]
+    if len(id_mark_area_list) == 0:
+        return False
+
+    key_list: list[str] = [f'{crop_first}|{get_id_mark_area_key(i)}' for i in id_mark_area_list]
+
+    # 模板匹配比OCR快 先判断非文本区域
+    for area, key in zip(id_mark_area_list, key_list):
+        if area.is_text_area:
             continue
-        existed_id_mark = True
+        if key not in area_result:
+            area_result[key] = find_area_in_screen(ctx, screen, area, crop_first)
+        if area_result[key] != FindAreaResultEnum.TRUE:
+            return False
 
-        if find_area_in_screen(ctx, screen, screen_area, crop_first) != FindAreaResultEnum.TRUE:
-            fit_id_mark = False
-            break
+    prefetch_ocr_areas(
+        ctx,
+        screen,
+        [area for area, key in zip(id_mark_area_list, key_list) if area.is_text_area and key not in area_result],
+        crop_first=crop_first,
+    )
 
-    return existed_id_mark and fit_id_mark
+    for area, key in zip(id_mark_area_list, key_list):
+        if not area.is_text_area:
+            continue
+        if key not in area_result:
+            area_result[key] = find_area_in_screen(ctx, screen, area, crop_first)
+        if area_result[key] != FindAreaResultEnum.TRUE:
+            return False
+
+    return True
+
+
+def prefetch_ocr_areas(
+    ctx: OneDragonContext,
+    screen: MatLike,
+    area_list: list[ScreenArea],
+    crop_first: bool = True,
+) -> None:
+    """
+    对多个文本区域进行一次批量OCR 结果写入OCR缓存
+    之后对这些区域逐个调用 find_area_in_screen 时直接使用缓存 不需要重复推理
+
+    Args:
+        ctx: 上下文
+        screen: 游戏截图
+        area_list: 区域列表 非文本区域会被忽略
+        crop_first: 在传入区域时 是否先裁剪再进行文本识别
+    """
+    request_list: list[OcrRequest] = [
+        OcrRequest(rect=area.rect, color_range=area.color_range, crop_first=crop_first,
+                   single_line=area.single_line)
+        for area in area_list
+        if area.is_text_area
+    ]
+    if len(request_list) < 2:  # 只有一个区域时 没有合并的收益
+        return
+    ctx.ocr_service.get_ocr_result_list_batch(image=screen, request_list=request_list)
 
 
 def find_by_ocr(
@@ -493,6 +642,7 @@ def find_by_ocr(
         rect=area.rect if area is not None else None,
         color_range=color_range,
         crop_first=crop_first,
+        single_line=area.single_line if area is not None else False,
     )
 
     to_click: Point | None = None
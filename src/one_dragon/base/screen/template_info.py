@@ -11,12 +11,12 @@ from one_dragon.base.config.config_item import ConfigItem
 from one_dragon.base.config.yaml_operator import YamlOperator
 from one_dragon.base.geometry.point import Point
 from one_dragon.base.geometry.rectangle import Rect
-from one_dragon.utils import os_utils, cal_utils, cv2_utils
+from one_dragon.utils import os_utils, cal_utils, cv2_utils, feature_cache_utils
 
 TEMPLATE_RAW_FILE_NAME = 'raw.png'
 TEMPLATE_MASK_FILE_NAME = 'mask.png'
 TEMPLATE_CONFIG_FILE_NAME = 'config.yml'
-TEMPLATE_FEATURES_FILE_NAME = 'features.xml'
+TEMPLATE_FEATURES_FILE_NAME = feature_cache_utils.FEATURES_CACHE_FILE_NAME
 
 
 class TemplateShapeEnum(Enum):
@@ -131,7 +131,14 @@ class TemplateInfo(YamlOperator):
         if self._kps is not None:
             return self._kps, self._desc
         if self.raw is not None:
-            self._kps, self._desc = cv2_utils.feature_detect_and_compute(self.raw, self.mask)
+            self._kps, self._desc = feature_cache_utils.detect_and_compute_with_cache(
+                self.raw, self.mask,
+                cache_path=get_template_features_path(self.sub_dir, self.template_id),
+                source_file_list=[
+                    get_template_raw_path(self.sub_dir, self.template_id),
+                    get_template_mask_path(self.sub_dir, self.template_id),
+                ]
+            )
         return self._kps, self._desc
 
     def make_template_dir(self) -> None:
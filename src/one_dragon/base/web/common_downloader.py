@@ -66,27 +66,87 @@ class CommonDownloader:
         if skip_if_existed and self.is_file_existed():
             return True
 
-        download_url: str = ''
-        if download_by_github and self.param.github_release_download_url is not None:
+        url_list = self.get_download_url_list(
+            download_by_github=download_by_github,
+            download_by_gitee=download_by_gitee,
+            download_by_mirror_chan=download_by_mirror_chan,
+            ghproxy_url=ghproxy_url,
+        )
+        if len(url_list) == 0:
+            log.error('没有指定下载方法或对应的下载地址')
+            return False
+
+        return self._download_file(
+            url_list=url_list,
+            proxy_url=proxy_url,
+            progress_signal=progress_signal,
+            progress_callback=progress_callback,
+        )
+
+    def get_download_url_list(
+            self,
+            download_by_github: bool = True,
+            download_by_gitee: bool = False,
+            download_by_mirror_chan: bool = False,
+            ghproxy_url: str | None = None,
+            ) -> list[str]:
+        """
+        获取下载地址 选择的下载源排在第一位 GitHub 和 Gitee 互为备用
+
+        Args:
+            download_by_github (bool): 是否使用 GitHub 下载
+            download_by_gitee (bool): 是否使用 Gitee 下载
+            download_by_mirror_chan (bool): 是否使用 Mirror酱 下载
+            ghproxy_url (Optional[str]): GitHub 代理地址
+
+        Returns:
+            list[str]: 按顺序尝试的下载地址
+        """
+        github_url_list: list[str] = []
+        if self.param.github_release_download_url is not None:
             if ghproxy_url is not None:
-                download_url=f'{ghproxy_url}/{self.param.github_release_download_url}'
-            else:
-                download_url = self.param.github_release_download_url
-        elif download_by_gitee and self.param.gitee_release_download_url is not None:
-            download_url = self.param.gitee_release_download_url
+                github_url_list.append(f'{ghproxy_url}/{self.param.github_release_download_url}')
+            github_url_list.append(self.param.github_release_download_url)
+        gitee_url_list: list[str] = []
+        if self.param.gitee_release_download_url is not None:
+            gitee_url_list.append(self.param.gitee_release_download_url)
+
+        if download_by_github and len(github_url_list) > 0:
+            return github_url_list + gitee_url_list
+        elif download_by_gitee and len(gitee_url_list) > 0:
+            return gitee_url_list + github_url_list
         elif download_by_mirror_chan and self.param.mirror_chan_download_url is not None:
-            download_url = self.param.mirror_chan_download_url
+            return [self.param.mirror_chan_download_url]
 
-        if download_url == '':
-            log.error('没有指定下载方法或对应的下载地址')
-            return False
+        return []
+
+    def _download_file(
+            self,
+            url_list: list[str],
+            proxy_url: str | None = None,
+            progress_signal: dict[str, str | None] | None = None,
+            progress_callback: Callable[[float, str], None] | None = None,
+            ) -> bool:
+        """
+        按顺序使用下载地址下载文件
 
+        Args:
+            url_list (list[str]): 下载地址
+            proxy_url (Optional[str]): 代理地址
+            progress_signal (Optional[dict]): 进度信号
+            progress_callback (Optional[Callable]): 进度回调
+
+        Returns:
+            bool: 是否下载成功
+        """
         return http_utils.download_file(
-            download_url=download_url,
+            download_url=url_list[0],
             save_file_path=os.path.join(self.param.save_file_path, self.param.save_file_name),
             proxy=proxy_url,
             progress_signal=progress_signal,
-            progress_callback=progress_callback)
+            progress_callback=progress_callback,
+            backup_url_list=url_list[1:],
+        )
 
     def is_file_existed(self) -> bool:
         """
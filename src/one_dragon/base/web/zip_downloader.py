@@ -5,7 +5,7 @@ from one_dragon.base.web.common_downloader import (
     CommonDownloader,
     CommonDownloaderParam,
 )
-from one_dragon.utils import file_utils
+from one_dragon.utils import file_utils, http_utils
 from one_dragon.utils.log_utils import log
 
 
@@ -63,6 +63,27 @@ class ZipDownloader(CommonDownloader):
         # 解压有可能失败 最后再判断一次解压产物是否已经存在
         return CommonDownloader.is_file_existed(self)
 
+    def _download_file(
+            self,
+            url_list: list[str],
+            proxy_url: str | None = None,
+            progress_signal: dict[str, str | None] | None = None,
+            progress_callback: Callable[[float, str], None] | None = None,
+            ) -> bool:
+        """
+        按顺序使用下载地址下载压缩包 下载的同时进行解压
+        """
+        unzip_dir = self.param.unzip_dir_path or self.param.save_file_path
+        return http_utils.download_file(
+            download_url=url_list[0],
+            save_file_path=os.path.join(self.param.save_file_path, self.param.save_file_name),
+            proxy=proxy_url,
+            progress_signal=progress_signal,
+            progress_callback=progress_callback,
+            backup_url_list=url_list[1:],
+            unzip_dir_path=unzip_dir,
+        )
+
     def unzip(self) -> bool:
         """
         对目标压缩包进行解压
@@ -0,0 +1,86 @@
+import inspect
+import time
+
+from one_dragon.base.operation.operation import Operation
+from one_dragon.base.operation.operation_edge import node_from
+from one_dragon.base.operation.operation_node import operation_node
+from one_dragon.base.operation.operation_round_result import OperationRoundResult
+
+
+class _BenchmarkOperation(Operation):
+    """
+    用于测试的指令 节点数量与常见的短指令相近
+    """
+
+    def __init__(self):
+        Operation.__init__(self, None, op_name='benchmark', need_check_game_win=False)
+
+    @operation_node(name='开始', is_start_node=True)
+    def step_1(self) -> OperationRoundResult:
+        return self.round_success()
+
+    @node_from(from_name='开始')
+    @operation_node(name='移动')
+    def step_2(self) -> OperationRoundResult:
+        return self.round_success()
+
+    @node_from(from_name='移动')
+    @node_from(from_name='移动', success=False)
+    @operation_node(name='识别画面')
+    def step_3(self) -> OperationRoundResult:
+        return self.round_success()
+
+    @node_from(from_name='识别画面', status='战斗')
+    @operation_node(name='战斗')
+    def step_4(self) -> OperationRoundResult:
+        return self.round_success()
+
+    @node_from(from_name='识别画面')
+    @node_from(from_name='战斗')
+    @operation_node(name='结束')
+    def step_5(self) -> OperationRoundResult:
+        return self.round_success()
+
+
+def _init_network_without_cache(op: Operation) -> None:
+    """
+    不使用缓存 每次都扫描实例上的所有成员 与原来的初始化方式相同
+    :param op: 指令
+    :return:
+    """
+    for _ in inspect.getmembers(op, predicate=inspect.ismethod):
+        pass
+    network = op._compile_network()
+    op._node_map = dict(network.node_map)
+    op._node_edges_map = dict(network.node_edges_map)
+
+
+def benchmark(op_cls: type[Operation] = _BenchmarkOperation, times: int = 10000) -> None:
+    """
+    测试每个指令在执行前的初始化耗时
+    :param op_cls: 指令类 需要可以无参数创建
+    :param times: 创建指令的次数
+    :return:
+    """
+    op_cls.get_network()  # 预热 构建缓存
+
+    start_time = time.perf_counter()
+    for _ in range(times):
+        op = op_cls()
+        _init_network_without_cache(op)
+    without_cache = (time.perf_counter() - start_time) / times
+
+    start_time = time.perf_counter()
+    for _ in range(times):
+        op = op_cls()
+        op._init_network()
+    with_cache = (time.perf_counter() - start_time) / times
+
+    print(f'{op_cls.__name__} 次数 {times}')
+    print(f'不使用缓存 每个指令 {without_cache * 1e6:.2f}us')
+    print(f'使用缓存 每个指令 {with_cache * 1e6:.2f}us')
+    print(f'加速 {without_cache / with_cache:.1f}x')
+
+
+if __name__ == '__main__':
+    benchmark()
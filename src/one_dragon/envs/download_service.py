@@ -38,13 +38,16 @@ class DownloadService:
         :return: 是否下载成功
         """
         proxy = None
+        backup_url_list = []
         if 'github.com' in download_url:
             if self.env_config.is_gh_proxy:
+                backup_url_list.append(download_url)  # 代理失败时直接下载
                 download_url = f'{self.env_config.gh_proxy_url}/{download_url}'
             elif self.env_config.is_personal_proxy:
                 proxy = self.env_config.personal_proxy
 
-        return http_utils.download_file(download_url, save_file_path, proxy, None, progress_callback)
+        return http_utils.download_file(download_url, save_file_path, proxy, None, progress_callback,
+                                        backup_url_list=backup_url_list)
 
     def download_and_extract_env_file(self, file_name: str, temp_dir: str, extract_dir: str,
                                       progress_callback: Optional[Callable[[float, str], None]] = None,
@@ -361,6 +361,23 @@ class EnvConfig(YamlConfig):
         """
         self.update('is_debug', new_value)
 
+    @property
+    def config_write_interval(self) -> float:
+        """
+        配置文件延迟写入的间隔 秒 <=0 时每次修改都直接写入
+        默认不开启 开启后文件不会马上写入磁盘 直接读取文件的地方可能读到旧内容 程序崩溃时会丢失未写入的改动
+        :return:
+        """
+        return self.get('config_write_interval', 0)
+
+    @config_write_interval.setter
+    def config_write_interval(self, new_value: float):
+        """
+        更新配置文件延迟写入的间隔
+        :return:
+        """
+        self.update('config_write_interval', new_value)
+
     @property
     def copy_screenshot(self) -> bool:
         """
@@ -388,6 +405,17 @@ class EnvConfig(YamlConfig):
     def screenshot_method(self, new_value: str) -> None:
         self.update('screenshot_method', new_value)
 
+    @property
+    def background_screenshot_fps(self) -> float:
+        """
+        后台截图的帧率 <=0 时不使用后台截图
+        """
+        return self.get('background_screenshot_fps', 0)
+
+    @background_screenshot_fps.setter
+    def background_screenshot_fps(self, new_value: float) -> None:
+        self.update('background_screenshot_fps', new_value)
+
     @property
     def key_start_running(self) -> str:
         """
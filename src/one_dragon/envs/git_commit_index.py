@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from pygit2 import Commit, Oid, Repository
+from pygit2.enums import SortMode
+
+INDEX_VERSION: int = 1  # 索引格式版本 不一致时重建
+INDEX_DIR_NAME: str = 'od_commit_index'  # 索引目录 放在 .git 目录下 不影响工作区
+
+_META_FILE = 'meta.json'  # 元数据 HEAD、提交数量、文件大小
+_IDX_FILE = 'commits.idx'  # 每个提交在 dat 中的偏移量 定长
+_DAT_FILE = 'commits.dat'  # 提交记录 变长
+
+_OFFSET = struct.Struct('<Q')
+_RECORD_HEAD = struct.Struct('<BqHH')  # oid长度 提交时间 作者长度 标题长度
+_MAX_TEXT_BYTES = 0xFFFF
+
+
+@dataclass
+class CommitIndexEntry:
+    """提交索引中的一条记录"""
+    commit_id: str
+    author: str
+    commit_time: int
+    subject: str
+
+
+def _truncate_text(text: str) -> bytes:
+    """编码为 utf-8 超长时按字符截断"""
+    data = text.encode('utf-8', errors='replace')
+    if len(data) > _MAX_TEXT_BYTES:
+        data = data[:_MAX_TEXT_BYTES].decode('utf-8', errors='ignore').encode('utf-8')
+    return data
+
+
+def _pack_commit(commit: Commit) -> bytes:
+    """将提交编码为一条记录"""
+    raw_id = commit.id.raw
+    author = _truncate_text(commit.author.name if commit.author and commit.author.name else '')
+    subject = _truncate_text(commit.message.splitlines()[0] if commit.message else '')
+    return b''.join([
+        _RECORD_HEAD.pack(len(raw_id), commit.commit_time, len(author), len(subject)),
+        raw_id, author, subject,
+    ])
+
+
+def _unpack_records(data: bytes, cnt: int) -> list[CommitIndexEntry]:
+    """从连续的记录中解码出 cnt 条"""
+    entries: list[CommitIndexEntry] = []
+    pos = 0
+    for _ in range(cnt):
+        oid_len, commit_time, author_len, subject_len = _RECORD_HEAD.unpack_from(data, pos)
+        pos += _RECORD_HEAD.size
+        commit_id = Oid(raw=data[pos:pos + oid_len])
+        pos += oid_len
+        author = data[pos:pos + author_len].decode('utf-8', errors='replace')
+        pos += author_len
+        subject = data[pos:pos + subject_len].decode('utf-8', errors='replace')
+        pos += subject_len
+        entries.append(CommitIndexEntry(str(commit_id), author, commit_time, subject))
+    return entries
+
+
+class GitCommitIndex:
+
+    def __init__(self, index_dir: str):
+        """
+        提交日志的本地索引 用于分页展示历史
+        - 按 HEAD 的提交ID 缓存 HEAD 不变时直接使用
+        - 旧的 HEAD 在新 HEAD 的第一父提交链上时 只遍历新增的提交并追加到文件末尾 其它情况重建
+        - 文件中按从旧到新的顺序保存 数量保存在元数据中 读取一页只需要读这一页的记录
+
+        Args:
+            index_dir: 索引文件所在目录
+        """
+        self.index_dir: Path = Path(index_dir)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def for_repo(repo: Repository) -> 'GitCommitIndex':
+        """使用仓库 .git 目录下的索引"""
+        return GitCommitIndex(os.path.join(repo.path, INDEX_DIR_NAME))
+
+    # ================== 私有辅助方法 ==================
+
+    def _path(self, name: str) -> Path:
+        return self.index_dir / name
+
+    def _load_meta(self) -> dict | None:
+        """读取元数据 文件缺失或与数据文件不匹配时返回 None"""
+        try:
+            meta = json.loads(self._path(_META_FILE).read_text(encoding='utf-8'))
+            if meta.get('version') != INDEX_VERSION:
+                return None
+            if self._path(_IDX_FILE).stat().st_size < meta['count'] * _OFFSET.size:
+                return None
+            if self._path(_DAT_FILE).stat().st_size < meta['dat_size']:
+                return None
+            return meta
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_meta(self, head: str, shallow: str, count: int, dat_size: int) -> None:
+        """原子地写入元数据 数据文件需要先写好"""
+        meta = {
+            'version': INDEX_VERSION,
+            'head': head,
+            'shallow': shallow,
+            'count': count,
+            'dat_size': dat_size,
+        }
+        temp_path = self._path(_META_FILE + '.tmp')
+        temp_path.write_text(json.dumps(meta), encoding='utf-8')
+        os.replace(temp_path, self._path(_META_FILE))
+
+    @staticmethod
+    def _get_shallow_digest(repo: Repository) -> str:
+        """浅克隆的边界 变化时历史会变长或变短 需要重建"""
+        try:
+            data = Path(repo.path, 'shallow').read_bytes()
+        except OSError:
+            return ''
+        return hashlib.md5(data).hexdigest()
+
+    @staticmethod
+    def _is_first_parent_ancestor(repo: Repository, head: Oid, old_head: Oid) -> bool:
+        """
+        旧的 HEAD 是否在新 HEAD 的第一父提交链上
+        只有这种情况 新增提交的拓扑顺序排在旧提交之前 可以直接追加
+        旧的 HEAD 是合并提交的其它父提交时 完整遍历的顺序会交错 需要重建
+        """
+        try:
+            commit = repo[head]
+            while True:
+                if commit.id == old_head:
+                    return True
+                parent_ids = commit.parent_ids
+                if len(parent_ids) == 0:
+                    return False
+                commit = repo[parent_ids[0]]
+        except (KeyError, ValueError):  # 浅克隆的边界 或提交已经不存在
+            return False
+
+    def _append(self, repo: Repository, head: Oid, hide: Oid | None,
+                count: int, dat_size: int) -> tuple[int, int]:
+        """
+        遍历 head 可达但 hide 不可达的提交 按从旧到新追加到数据文件末尾
+        文件中超出 count / dat_size 的部分是上次未完成的写入 先截断
+
+        Returns:
+            (追加后的数量, 追加后的数据文件大小)
+        """
+        walker = repo.walk(head, SortMode.TOPOLOGICAL)
+        if hide is not None:
+            walker.hide(hide)
+        records = [_pack_commit(commit) for commit in walker]
+        records.reverse()
+
+        offsets = bytearray()
+        data = bytearray()
+        for record in records:
+            offsets += _OFFSET.pack(dat_size + len(data))
+            data += record
+
+        mode = 'r+b' if count > 0 else 'wb'
+        with open(self._path(_IDX_FILE), mode) as idx_file, open(self._path(_DAT_FILE), mode) as dat_file:
+            idx_file.truncate(count * _OFFSET.size)
+            idx_file.seek(count * _OFFSET.size)
+            idx_file.write(offsets)
+            dat_file.truncate(dat_size)
+            dat_file.seek(dat_size)
+            dat_file.write(data)
+
+        return count + len(records), dat_size + len(data)
+
+    # ================== 公共 API ==================
+
+    def refresh(self, repo: Repository, build_if_missing: bool = True) -> bool:
+        """
+        使索引与仓库当前的 HEAD 一致
+
+        Args:
+            repo: 仓库
+            build_if_missing: 没有可用的索引时是否完整构建
+
+        Returns:
+            索引是否可用
+        """
+        with self._lock:
+            head = repo.head.target
+            shallow = self._get_shallow_digest(repo)
+            meta = self._load_meta()
+            if meta is not None and meta['head'] == str(head) and meta['shallow'] == shallow:
+                return True
+
+            can_append = False
+            if meta is not None and meta['shallow'] == shallow:
+                can_append = self._is_first_parent_ancestor(repo, head, Oid(hex=meta['head']))
+
+            if not can_append and not build_if_missing:
+                return False
+
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            if can_append:
+                count, dat_size = self._append(repo, head, Oid(hex=meta['head']), meta['count'], meta['dat_size'])
+            else:
+                self._path(_META_FILE).unlink(missing_ok=True)
+                count, dat_size = self._append(repo, head, None, 0, 0)
+            self._save_meta(str(head), shallow, count, dat_size)
+            return True
+
+    def count(self) -> int:
+        """提交总数 需要先 refresh"""
+        with self._lock:
+            meta = self._load_meta()
+            return meta['count'] if meta is not None else 0
+
+    def read_page(self, start: int, size: int) -> list[CommitIndexEntry]:
+        """
+        按从新到旧的顺序 读取一页提交 需要先 refresh
+
+        Args:
+            start: 从最新提交开始的序号
+            size: 数量
+
+        Returns:
+            提交列表
+        """
+        with self._lock:
+            meta = self._load_meta()
+            if meta is None:
+                return []
+            count = meta['count']
+            end = min(count, start + size)
+            if start < 0 or size <= 0 or start >= end:
+                return []
+
+            # 文件中按从旧到新保存 这一页对应 [count - end, count - start)
+            first = count - end
+            last = count - start
+            with open(self._path(_IDX_FILE), 'rb') as idx_file:
+                idx_file.seek(first * _OFFSET.size)
+                offset_data = idx_file.read((min(last + 1, count) - first) * _OFFSET.size)
+            offsets = [i[0] for i in _OFFSET.iter_unpack(offset_data)]
+            data_end = offsets[last - first] if last < count else meta['dat_size']
+
+            with open(self._path(_DAT_FILE), 'rb') as dat_file:
+                dat_file.seek(offsets[0])
+                data = dat_file.read(data_end - offsets[0])
+
+            entries = _unpack_records(data, last - first)
+            entries.reverse()
+            return entries
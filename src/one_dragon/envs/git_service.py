@@ -12,14 +12,14 @@ from pygit2 import (
     Oid,
     Remote,
     Repository,
-    Walker,
     discover_repository,
     init_repository,
     settings,
 )
-from pygit2.enums import CheckoutStrategy, ConfigLevel, ResetMode, SortMode
+from pygit2.enums import CheckoutStrategy, ConfigLevel, ResetMode
 
 from one_dragon.envs.env_config import EnvConfig, RepositoryTypeEnum
+from one_dragon.envs.git_commit_index import GitCommitIndex
 from one_dragon.envs.project_config import ProjectConfig
 from one_dragon.utils import os_utils
 from one_dragon.utils.i18_utils import gt
@@ -49,6 +49,7 @@ class GitService:
         self.repo_dir: str = repo_dir
 
         self._repo: Repository | None = None
+        self._commit_index: GitCommitIndex | None = None
         self._ensure_config_search_path()
 
     # ================== 私有辅助方法 ==================
@@ -265,21 +266,24 @@ class GitService:
 
         return True, ''
 
-    def _get_commit_walker(self, sort_mode: SortMode = SortMode.TOPOLOGICAL) -> Walker | None:
-        """获取commit遍历器
+    def _get_commit_index(self, build_if_missing: bool = True) -> GitCommitIndex | None:
+        """获取与当前 HEAD 一致的提交索引
 
         Args:
-            sort_mode: 排序模式
+            build_if_missing: 没有可用的索引时是否完整构建
 
         Returns:
-            commit遍历器，失败时返回None
+            提交索引，失败时返回None
         """
         try:
             repo = self._open_repo()
-            head_target = repo.head.target
-            return repo.walk(head_target, sort_mode)
+            if self._commit_index is None:
+                self._commit_index = GitCommitIndex.for_repo(repo)
+            if self._commit_index.refresh(repo, build_if_missing=build_if_missing):
+                return self._commit_index
+            return None
         except Exception:
-            log.error('获取commit遍历器失败', exc_info=True)
+            log.error('获取提交索引失败', exc_info=True)
             return None
 
     def _get_file_at_commit(self, commit_oid: Oid, file_path: str) -> bytes | None:
@@ -601,9 +605,14 @@ class GitService:
         更新最新的代码：不存在 .git 则克隆，存在则拉取并更新分支
         """
         if not self.check_repo_exists():
-            return self._clone_repository(progress_callback)
+            success, msg = self._clone_repository(progress_callback)
         else:
-            return self._fetch_and_checkout_latest_branch(progress_callback)
+            success, msg = self._fetch_and_checkout_latest_branch(progress_callback)
+
+        if success:
+            # 已有提交索引时 只追加这次更新的提交
+            self._get_commit_index(build_if_missing=False)
+        return success, msg
 
     def get_current_branch(self) -> str | None:
         """
@@ -653,8 +662,8 @@ class GitService:
         获取commit的总数。获取失败时返回0
         """
         log.info(gt('获取commit总数'))
-        walker = self._get_commit_walker()
-        return sum(1 for _ in walker) if walker else 0
+        commit_index = self._get_commit_index()
+        return commit_index.count() if commit_index else 0
 
     def fetch_page_commit(self, page_num: int, page_size: int) -> list[GitLog]:
         """获取分页commit
@@ -667,25 +676,25 @@ class GitService:
             GitLog列表
         """
         log.info(f"{gt('获取commit')} 第{page_num + 1}页")
-        walker = self._get_commit_walker()
-        if not walker:
+        commit_index = self._get_commit_index()
+        if not commit_index:
             return []
 
-        logs: list[GitLog] = []
-        for idx, commit in enumerate(walker):
-            if idx < page_num * page_size:
-                continue
-            if len(logs) >= page_size:
-                break
-
-            short_id = str(commit.id)[:7]
-            author = commit.author.name if commit.author and commit.author.name else ''
-            commit_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(commit.commit_time))
-            message = commit.message.splitlines()[0] if commit.message else ''
-
-            logs.append(GitLog(short_id, author, commit_time, message))
+        try:
+            entries = commit_index.read_page(page_num * page_size, page_size)
+        except Exception:
+            log.error('读取提交索引失败', exc_info=True)
+            return []
 
-        return logs
+        return [
+            GitLog(
+                entry.commit_id[:7],
+                entry.author,
+                time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.commit_time)),
+                entry.subject,
+            )
+            for entry in entries
+        ]
 
     def update_remote(self) -> None:
         """
@@ -726,8 +735,8 @@ class GitService:
         """
         获取当前代码版本
         """
-        logs = self.fetch_page_commit(0, 1)
-        return logs[0].commit_id if logs else None
+        commit_id = self.get_head_commit_id()
+        return commit_id[:7] if commit_id else None
 
     def get_latest_tag(self) -> tuple[str, str]:
         """获取最新tag，未找到时返回空字符串
@@ -656,14 +656,12 @@ def convert_to_standard(origin, mask, width: int = 51, height: int = 51, bg_colo
         min_x, min_y = 0, 0
         max_x, max_y = mask.shape[1], mask.shape[0]
     else:
-        white_pixel_coordinates = list(zip(bw[1], bw[0]))
-
         # 找到最大最小坐标值
-        max_x = max(white_pixel_coordinates, key=lambda i: i[0])[0]
-        max_y = max(white_pixel_coordinates, key=lambda i: i[1])[1]
+        max_x = int(bw[1].max())
+        max_y = int(bw[0].max())
 
-        min_x = min(white_pixel_coordinates, key=lambda i: i[0])[0]
-        min_y = min(white_pixel_coordinates, key=lambda i: i[1])[1]
+        min_x = int(bw[1].min())
+        min_y = int(bw[0].min())
 
         # 稍微扩大一下范围 why
         if max_x < mask.shape[1]:
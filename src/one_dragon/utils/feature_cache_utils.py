@@ -0,0 +1,103 @@
+import hashlib
+import os
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from one_dragon.utils import cv2_utils
+from one_dragon.utils.log_utils import log
+
+FEATURES_CACHE_FILE_NAME = 'features.npz'
+FEATURES_CACHE_VERSION = 'sift-1'  # 特征提取算法或存储格式变化时 修改这个值让旧的缓存失效
+
+
+def get_source_hash(source_file_list: List[str]) -> str:
+    """
+    计算特征来源文件的哈希 文件不存在时也参与计算 保证增删文件后缓存失效
+    :param source_file_list: 来源文件 例如 raw.png 和 mask.png
+    :return:
+    """
+    h = hashlib.sha1(FEATURES_CACHE_VERSION.encode('utf-8'))
+    for file_path in source_file_list:
+        h.update(os.path.basename(file_path).encode('utf-8'))
+        if not os.path.exists(file_path):
+            h.update(b'\0')
+            continue
+        with open(file_path, 'rb') as file:
+            while True:
+                chunk = file.read(1024 * 1024)
+                if not chunk:
+                    break
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def load_features(cache_path: str, source_hash: str) -> Optional[Tuple[List[cv2.KeyPoint], MatLike]]:
+    """
+    读取保存的特征点和描述子
+    :param cache_path: 缓存文件路径
+    :param source_hash: 来源文件的哈希 与保存时不一致时视为失效
+    :return: 特征点和描述子 没有可用的缓存时返回None
+    """
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            if str(data['source_hash']) != source_hash:
+                return None
+            kps = list(cv2_utils.feature_keypoints_from_np(data['kps']))
+            desc = data['desc'] if data['desc'].size > 0 else None
+            return kps, desc
+    except Exception:
+        log.error('读取特征缓存失败 %s', cache_path, exc_info=True)
+        return None
+
+
+def save_features(cache_path: str, source_hash: str,
+                  kps: List[cv2.KeyPoint], desc: Optional[MatLike]) -> None:
+    """
+    保存特征点和描述子 先写临时文件再替换 避免中断时留下损坏的缓存
+    :param cache_path: 缓存文件路径
+    :param source_hash: 来源文件的哈希
+    :param kps: 特征点
+    :param desc: 描述子
+    :return:
+    """
+    kps_np = cv2_utils.feature_keypoints_to_np(kps)
+    if kps_np.size == 0:
+        kps_np = np.zeros((0, 7), dtype=np.float64)
+    desc_np = desc if desc is not None else np.zeros((0, 128), dtype=np.float32)
+
+    temp_path = cache_path + '.tmp'
+    try:
+        with open(temp_path, 'wb') as file:
+            np.savez(file, source_hash=np.array(source_hash), kps=kps_np, desc=desc_np)
+        os.replace(temp_path, cache_path)
+    except Exception:
+        log.error('保存特征缓存失败 %s', cache_path, exc_info=True)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def detect_and_compute_with_cache(img: MatLike, mask: Optional[MatLike],
+                                  cache_path: str,
+                                  source_file_list: List[str]) -> Tuple[List[cv2.KeyPoint], MatLike]:
+    """
+    提取特征点和描述子 优先使用保存在图片旁边的缓存
+    来源文件有变化时 重新提取并覆盖缓存
+    :param img: 图片
+    :param mask: 掩码
+    :param cache_path: 缓存文件路径
+    :param source_file_list: 来源文件 用于判断缓存是否失效
+    :return: 特征点和描述子
+    """
+    source_hash = get_source_hash(source_file_list)
+    cached = load_features(cache_path, source_hash)
+    if cached is not None:
+        return cached
+
+    kps, desc = cv2_utils.feature_detect_and_compute(img, mask)
+    save_features(cache_path, source_hash, kps, desc)
+    return kps, desc
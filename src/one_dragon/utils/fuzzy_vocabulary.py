@@ -0,0 +1,145 @@
+import threading
+from collections import Counter
+from collections.abc import Callable
+from typing import Optional
+
+from one_dragon.utils import i18_utils
+
+
+def lcs_length_by_mask(word: str, char_mask: dict[str, int], full_mask: int, target_len: int) -> int:
+    """
+    位并行计算最长公共子序列长度 结果与动态规划一致
+    目标词的每个字符对应一个位掩码 每处理候选词的一个字符只需要几次整数运算
+    :param word: 候选词
+    :param char_mask: 目标词中 字符 -> 出现位置的位掩码
+    :param full_mask: 目标词长度的全1掩码
+    :param target_len: 目标词长度
+    :return: 长度
+    """
+    v = full_mask
+    for ch in word:
+        m = char_mask.get(ch)
+        if m is None:
+            continue
+        u = v & m
+        v = ((v + u) | (v - u)) & full_mask
+    return target_len - v.bit_count()
+
+
+class FuzzyVocabulary:
+
+    def __init__(self, word_list: list[str]):
+        """
+        用于OCR结果匹配的词表 构建一次后可以重复使用
+        匹配规则与 str_utils.find_best_match_by_lcs 完全一致
+        - 预先计算每个目标词的字符位掩码 使用位并行计算LCS
+        - 按字符建立倒排索引 只计算有公共字符的目标词
+        - 用公共字符数估计LCS比例的上限 按上限从高到低计算 上限不可能超过当前最佳时提前结束
+        :param word_list: 目标词列表
+        """
+        self.word_list: list[str] = list(word_list)
+
+        self._char_mask_list: list[dict[str, int]] = []  # 每个目标词中 字符 -> 位掩码
+        self._char_count_list: list[Counter] = []  # 每个目标词中 字符 -> 出现次数
+        self._char_index: dict[str, list[int]] = {}  # 字符 -> 包含这个字符的目标词下标
+
+        for idx, target_word in enumerate(self.word_list):
+            char_mask: dict[str, int] = {}
+            for pos, ch in enumerate(target_word):
+                char_mask[ch] = char_mask.get(ch, 0) | (1 << pos)
+            self._char_mask_list.append(char_mask)
+            self._char_count_list.append(Counter(target_word))
+            for ch in char_mask:
+                if ch not in self._char_index:
+                    self._char_index[ch] = []
+                self._char_index[ch].append(idx)
+
+    def lcs_length(self, word: str, idx: int) -> int:
+        """
+        候选词与某个目标词的最长公共子序列长度
+        :param word: 候选词
+        :param idx: 目标词下标
+        :return: 长度
+        """
+        target_len = len(self.word_list[idx])
+        return lcs_length_by_mask(word, self._char_mask_list[idx], (1 << target_len) - 1, target_len)
+
+    def find_best_match(self, word: str, lcs_percent_threshold: Optional[float] = None) -> Optional[int]:
+        """
+        在目标词中，找出LCS比例最大的 比例相同时取下标最小的
+        :param word: 候选词
+        :param lcs_percent_threshold: 要求的LCS阈值
+        :return: 最符合的目标词的下标
+        """
+        if word is None or len(word) == 0:
+            return None
+
+        # 公共字符数 是LCS长度的上限
+        word_count = Counter(word)
+        common_map: dict[int, int] = {}
+        for ch, cnt in word_count.items():
+            for idx in self._char_index.get(ch, []):
+                common_map[idx] = common_map.get(idx, 0) + min(cnt, self._char_count_list[idx][ch])
+
+        candidate_list: list[tuple[float, int]] = [
+            (common * 1.0 / len(self.word_list[idx]), idx)
+            for idx, common in common_map.items()
+        ]
+        candidate_list.sort(key=lambda i: (-i[0], i[1]))
+
+        target_idx: Optional[int] = None
+        target_lcs_percent: Optional[float] = None
+        for upper_percent, idx in candidate_list:
+            if lcs_percent_threshold is not None and upper_percent < lcs_percent_threshold:
+                break
+            if target_idx is not None:
+                if upper_percent < target_lcs_percent:
+                    break
+                if upper_percent == target_lcs_percent and idx > target_idx:
+                    continue
+
+            lcs = self.lcs_length(word, idx)
+            lcs_percent = lcs * 1.0 / len(self.word_list[idx])
+            if lcs_percent_threshold is not None and lcs_percent < lcs_percent_threshold:
+                continue
+            if (target_idx is None
+                    or lcs_percent > target_lcs_percent
+                    or (lcs_percent == target_lcs_percent and idx < target_idx)):
+                target_idx = idx
+                target_lcs_percent = lcs_percent
+
+        return target_idx
+
+    def __len__(self) -> int:
+        return len(self.word_list)
+
+
+_vocabulary_map: dict[tuple[str, str], FuzzyVocabulary] = {}
+_vocabulary_lock = threading.Lock()
+
+
+def get_vocabulary(name: str, word_list_getter: Callable[[], list[str]]) -> FuzzyVocabulary:
+    """
+    获取当前语言下的词表 每种语言只构建一次
+    :param name: 词表名称
+    :param word_list_getter: 构建词表时使用 返回翻译后的目标词列表
+    :return:
+    """
+    key = (name, i18_utils.get_default_lang())
+    vocabulary = _vocabulary_map.get(key)
+    if vocabulary is not None:
+        return vocabulary
+    with _vocabulary_lock:
+        vocabulary = _vocabulary_map.get(key)
+        if vocabulary is None:
+            vocabulary = FuzzyVocabulary(word_list_getter())
+            _vocabulary_map[key] = vocabulary
+        return vocabulary
+
+
+def clear_vocabulary() -> None:
+    """
+    清除所有已构建的词表 目标词变化时使用
+    """
+    with _vocabulary_lock:
+        _vocabulary_map.clear()
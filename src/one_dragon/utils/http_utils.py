@@ -1,55 +1,65 @@
-import time
-import urllib.request
 from collections.abc import Callable
 
+from one_dragon.utils import range_downloader
 from one_dragon.utils.i18_utils import gt
 from one_dragon.utils.log_utils import log
+from one_dragon.utils.range_downloader import DownloadCancelledError
 
 
 def download_file(download_url: str, save_file_path: str,
                   proxy: str | None = None, progress_signal: dict[str, str | None] | None = None,
-                  progress_callback: Callable[[float, str], None] | None = None) -> bool:
+                  progress_callback: Callable[[float, str], None] | None = None,
+                  backup_url_list: list[str] | None = None,
+                  sha256: str | None = None,
+                  unzip_dir_path: str | None = None,
+                  segment_cnt: int = range_downloader.DEFAULT_SEGMENT_CNT) -> bool:
     """
-    下载文件
+    下载文件 支持断点续传和分段并行下载
     :param download_url: 下载的url
     :param save_file_path: 保存的文件路径，包含文件名
     :param proxy: 使用的代理地址
     :param progress_signal: 进度信号字典，当字典中 'signal' 键的值为 'cancel' 时会取消下载
     :param progress_callback: 下载进度的回调，进度发生改变时，通过该方法通知调用方。
+    :param backup_url_list: 备用的下载地址，download_url 下载失败时按顺序尝试
+    :param sha256: 文件的 SHA-256，为空时不校验
+    :param unzip_dir_path: 下载的是 zip 时，边下载边解压到这个目录
+    :param segment_cnt: 并行分段数
     :return: 是否下载成功
     """
-    if proxy is not None:
-        proxy_handler = urllib.request.ProxyHandler(
-            {'http': proxy, 'https': proxy})
-        opener = urllib.request.build_opener(proxy_handler)
-        urllib.request.install_opener(opener)
+    url_list = [download_url]
+    for url in backup_url_list or []:
+        if url not in url_list:
+            url_list.append(url)
 
-    last_log_time = time.time()
-
-    def log_download_progress(block_num, block_size, total_size):
-        nonlocal last_log_time
-        # 检查是否需要取消下载
-        if progress_signal is not None and progress_signal.get('signal') == 'cancel':
-            raise DownloadCancelledError("下载已取消")
-
-        now = time.time()
-        if now - last_log_time < 1:
-            return
-        last_log_time = now
-        downloaded = block_num * block_size / 1024.0 / 1024.0
-        total_size_mb = total_size / 1024.0 / 1024.0
-        progress = downloaded / total_size_mb
-        msg = f"{gt('正在下载')} {downloaded:.2f}/{total_size_mb:.2f} MB ({progress * 100:.2f}%)"
+    def log_download_progress(downloaded: int, total: int) -> None:
+        downloaded_mb = downloaded / 1024.0 / 1024.0
+        if total > 0:
+            total_size_mb = total / 1024.0 / 1024.0
+            progress = downloaded / total
+            msg = f"{gt('正在下载')} {downloaded_mb:.2f}/{total_size_mb:.2f} MB ({progress * 100:.2f}%)"
+        else:
+            progress = 0
+            msg = f"{gt('正在下载')} {downloaded_mb:.2f} MB"
         log.info(msg)
         if progress_callback is not None:
             progress_callback(progress, msg)
 
+    def is_cancelled() -> bool:
+        return progress_signal is not None and progress_signal.get('signal') == 'cancel'
+
     try:
         msg = f"{gt('开始下载')} {download_url}"
         log.info(msg)
         if progress_callback is not None:
             progress_callback(0, msg)
-        _, __ = urllib.request.urlretrieve(download_url, save_file_path, log_download_progress)
+        downloader = range_downloader.RangeDownloader(segment_cnt=segment_cnt, proxy=proxy, logger=log)
+        downloader.download(
+            url_list, save_file_path,
+            sha256=sha256,
+            unzip_dir_path=unzip_dir_path,
+            on_progress=log_download_progress,
+            is_cancelled=is_cancelled,
+        )
         msg = f"{gt('下载完成')} {save_file_path}"
         log.info(msg)
         if progress_callback is not None:
@@ -67,6 +77,3 @@ def download_file(download_url: str, save_file_path: str,
             progress_callback(0, msg)
         log.error(msg, exc_info=True)
         return False
-
-class DownloadCancelledError(Exception):
-    pass
@@ -0,0 +1,539 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import urllib.request
+import zlib
+import zipfile
+from collections.abc import Callable
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+DEFAULT_SEGMENT_CNT: int = 4  # 默认的并行分段数
+MIN_SEGMENT_SIZE: int = 2 * 1024 * 1024  # 每个分段的最小大小 小文件不分段
+CHUNK_SIZE: int = 64 * 1024  # 每次从连接读取的大小
+CONSUME_CHUNK_SIZE: int = 1024 * 1024  # 校验和解压时每次读取的大小
+TIMEOUT_SECONDS: float = 15  # 连接和读取的超时时间
+RETRY_TIMES: int = 3  # 每个分段在同一个地址上的重试次数
+REPORT_INTERVAL: float = 1  # 进度回调和保存下载状态的间隔 秒
+
+PART_SUFFIX: str = '.part'  # 下载中的文件后缀
+STATE_SUFFIX: str = '.part.json'  # 下载状态的文件后缀 用于断点续传
+
+_CONTENT_RANGE_PATTERN = re.compile(r'bytes\s+(?:\d+-\d+|\*)/(\d+)')
+
+# zip 本地文件头
+_ZIP_LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+_ZIP_LOCAL_HEADER_SIG = 0x04034b50
+_ZIP_CENTRAL_DIR_SIG = 0x02014b50
+_ZIP_END_SIGS = {_ZIP_CENTRAL_DIR_SIG, 0x06054b50, 0x06064b50, 0x05054b50}
+_ZIP_FLAG_ENCRYPTED = 0x01
+_ZIP_FLAG_DATA_DESCRIPTOR = 0x08
+_ZIP_FLAG_UTF8 = 0x800
+
+
+class DownloadCancelledError(Exception):
+    pass
+
+
+class DownloadError(Exception):
+    pass
+
+
+class _RangeNotSupportedError(Exception):
+    pass
+
+
+class _Segment:
+
+    def __init__(self, start: int, end: int, done: int = 0):
+        """
+        文件的一个分段 [start, end) end 为 -1 时表示文件大小未知 读到连接结束为止
+        """
+        self.start: int = start
+        self.end: int = end
+        self.done: int = done
+
+    @property
+    def pos(self) -> int:
+        return self.start + self.done
+
+    @property
+    def finished(self) -> bool:
+        return self.end >= 0 and self.pos >= self.end
+
+
+class _StreamUnzipper:
+
+    def __init__(self, unzip_dir_path: str):
+        """
+        按顺序接收 zip 文件的数据 边下载边解压
+        只能处理本地文件头中带有大小的条目 遇到数据描述符、zip64、加密等情况时放弃 由下载完成后整体解压
+        先解压到解压目录旁边的临时目录 全部校验通过后再移动到解压目录 失败时不影响解压目录中原有的文件
+
+        Args:
+            unzip_dir_path: 解压目录
+        """
+        self.unzip_dir_path: str = unzip_dir_path
+        self.fallback: bool = False  # 是否需要下载完成后整体解压
+        self.temp_dir_path: str | None = None  # 临时解压目录 第一次写入时创建
+
+        self._entry_name: str = ''  # 当前条目的名称
+
+        self._header = bytearray()  # 未凑齐的文件头
+        self._ended: bool = False  # 已经到达中央目录
+        self._remaining: int = 0  # 当前条目剩余的压缩数据
+        self._crc: int = 0
+        self._expected_crc: int = 0
+        self._expected_size: int = 0
+        self._size: int = 0
+        self._decompressor = None
+        self._file = None
+
+    def feed(self, data: bytes) -> None:
+        """
+        接收下一段数据
+
+        Args:
+            data: 紧接着上一次的数据
+        """
+        view = memoryview(data)
+        while len(view) > 0 and not self.fallback and not self._ended:
+            if self._remaining > 0 or self._file is not None:
+                n = min(len(view), self._remaining)
+                self._write_entry(view[:n])
+                view = view[n:]
+                self._remaining -= n
+                if self._remaining == 0:
+                    self._finish_entry()
+                continue
+
+            if len(self._header) >= 4:
+                sig = int.from_bytes(self._header[:4], 'little')
+                if sig in _ZIP_END_SIGS:
+                    self._ended = True
+                    break
+                if sig != _ZIP_LOCAL_HEADER_SIG:
+                    self._give_up()
+                    break
+
+            need = _ZIP_LOCAL_HEADER.size
+            if len(self._header) >= _ZIP_LOCAL_HEADER.size:
+                fields = _ZIP_LOCAL_HEADER.unpack_from(self._header)
+                need += fields[9] + fields[10]  # 文件名和扩展字段
+                if len(self._header) == need:
+                    self._start_entry()
+                    continue
+
+            n = min(len(view), need - len(self._header))
+            self._header += view[:n]
+            view = view[n:]
+
+    def _start_entry(self) -> None:
+        """文件头已经完整 准备写入这个条目"""
+        _, _, flags, method, _, _, crc, compress_size, file_size, name_len, _ = \
+            _ZIP_LOCAL_HEADER.unpack_from(self._header)
+        name_bytes = bytes(self._header[_ZIP_LOCAL_HEADER.size:_ZIP_LOCAL_HEADER.size + name_len])
+        self._header.clear()
+
+        if (flags & (_ZIP_FLAG_ENCRYPTED | _ZIP_FLAG_DATA_DESCRIPTOR)
+                or method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+                or compress_size == 0xFFFFFFFF or file_size == 0xFFFFFFFF):
+            self._give_up()
+            return
+
+        name = name_bytes.decode('utf-8' if flags & _ZIP_FLAG_UTF8 else 'cp437')
+        self._entry_name = name
+        self._remaining = compress_size
+        self._file = None
+        self._decompressor = None
+        if name.endswith('/'):  # 目录
+            dir_path = self._get_target_path(name)
+            if dir_path is not None:
+                os.makedirs(dir_path, exist_ok=True)
+            return
+
+        target_path = self._get_target_path(name)
+        if target_path is None:  # 不安全的路径 跳过数据
+            return
+
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        self._file = open(target_path, 'wb')
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS) if method == zipfile.ZIP_DEFLATED else None
+        self._crc = 0
+        self._size = 0
+        self._expected_crc = crc
+        self._expected_size = file_size
+        if compress_size == 0:
+            self._finish_entry()
+
+    def _get_target_path(self, name: str) -> str | None:
+        """与 zipfile 一样去掉盘符和 . .. 防止写到临时解压目录以外"""
+        arc_name = os.path.splitdrive(name.replace('\\', '/'))[1]
+        parts = [i for i in arc_name.split('/') if i not in ('', '.', '..')]
+        if len(parts) == 0:
+            return None
+        return os.path.join(self._get_temp_dir_path(), *parts)
+
+    def _get_temp_dir_path(self) -> str:
+        """临时解压目录 与解压目录放在同一个文件夹下 保证可以直接移动"""
+        if self.temp_dir_path is None:
+            unzip_dir_path = os.path.abspath(self.unzip_dir_path)
+            parent_dir = os.path.dirname(unzip_dir_path)
+            os.makedirs(parent_dir, exist_ok=True)
+            self.temp_dir_path = tempfile.mkdtemp(prefix=f'.{os.path.basename(unzip_dir_path)}.unzip_',
+                                                  dir=parent_dir)
+        return self.temp_dir_path
+
+    def _write_entry(self, data: memoryview) -> None:
+        """写入当前条目的一段压缩数据"""
+        if self._file is None:
+            return
+        if self._decompressor is not None:
+            data = self._decompressor.decompress(data)
+        self._write_output(data)
+
+    def _write_output(self, data) -> None:
+        """写入当前条目解压后的数据"""
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        self._file.write(data)
+
+    def _finish_entry(self) -> None:
+        if self._file is None:
+            return
+        if self._decompressor is not None:
+            self._write_output(self._decompressor.flush())
+        self._file.close()
+        self._file = None
+        self._decompressor = None
+        if self._crc != self._expected_crc or self._size != self._expected_size:
+            raise DownloadError(f'解压校验失败 {self._entry_name}')
+
+    def _give_up(self) -> None:
+        """无法流式解压 下载完成后整体解压"""
+        self.fallback = True
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self, zip_file_path: str) -> None:
+        """
+        数据接收完毕 必要时整体解压 再把临时目录中的文件移动到解压目录
+
+        Args:
+            zip_file_path: 完整的压缩包路径 已经通过校验
+        """
+        if not self.fallback and (self._file is not None or self._remaining > 0 or not self._ended):
+            self._give_up()  # 数据不完整 交给 zipfile 报错
+        if self.fallback:
+            self.cleanup()  # 边下载边解压的部分不再使用
+            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+                zip_ref.extractall(self._get_temp_dir_path())
+
+        temp_dir_path = self._get_temp_dir_path()
+        for dir_path, _, file_names in os.walk(temp_dir_path):
+            target_dir = os.path.join(self.unzip_dir_path, os.path.relpath(dir_path, temp_dir_path))
+            os.makedirs(target_dir, exist_ok=True)
+            for file_name in file_names:
+                os.replace(os.path.join(dir_path, file_name), os.path.join(target_dir, file_name))
+        self.cleanup()
+
+    def cleanup(self) -> None:
+        """删除临时解压目录 解压目录中的文件不受影响"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.temp_dir_path is not None:
+            shutil.rmtree(self.temp_dir_path, ignore_errors=True)
+            self.temp_dir_path = None
+
+
+class RangeDownloader:
+
+    def __init__(
+            self,
+            segment_cnt: int = DEFAULT_SEGMENT_CNT,
+            min_segment_size: int = MIN_SEGMENT_SIZE,
+            proxy: str | None = None,
+            timeout: float = TIMEOUT_SECONDS,
+            retry_times: int = RETRY_TIMES,
+            logger: logging.Logger | None = None,
+    ):
+        """
+        支持断点续传的分段下载器
+        - 服务器支持 Range 时 按分段并行下载 下载状态保存在 .part.json 中 中断后从已下载的位置继续
+        - 多个下载地址时 一个地址失败后换下一个 已下载的部分继续使用
+        - 下载的同时按顺序计算 SHA-256 和解压 zip 不需要下载完成后再完整读一次
+
+        Args:
+            segment_cnt: 并行分段数
+            min_segment_size: 每个分段的最小大小
+            proxy: 代理地址 为空时使用环境变量中的代理
+            timeout: 连接和读取的超时时间
+            retry_times: 每个分段在同一个地址上的重试次数
+            logger: 日志
+        """
+        self.segment_cnt: int = max(1, segment_cnt)
+        self.min_segment_size: int = max(1, min_segment_size)
+        self.timeout: float = timeout
+        self.retry_times: int = retry_times
+        self.log: logging.Logger | None = logger
+
+        if proxy:
+            self._opener = urllib.request.build_opener(urllib.request.ProxyHandler({'http': proxy, 'https': proxy}))
+        else:
+            self._opener = urllib.request.build_opener()
+
+    def download(
+            self,
+            url_list: list[str],
+            save_file_path: str,
+            sha256: str | None = None,
+            unzip_dir_path: str | None = None,
+            on_progress: Callable[[int, int], None] | None = None,
+            is_cancelled: Callable[[], bool] | None = None,
+    ) -> str:
+        """
+        下载文件 按顺序尝试每个下载地址
+
+        Args:
+            url_list: 下载地址 需要是同一个文件
+            save_file_path: 保存的文件路径
+            sha256: 文件的 SHA-256 为空时不校验
+            unzip_dir_path: 下载的是 zip 时 边下载边解压到这个目录
+            on_progress: 进度回调 参数为已下载的字节数和总字节数 总字节数未知时为 -1
+            is_cancelled: 是否取消下载
+
+        Returns:
+            成功下载使用的地址
+
+        Raises:
+            DownloadCancelledError: 取消下载
+            DownloadError: 所有地址都下载失败
+        """
+        error_list: list[str] = []
+        for url in url_list:
+            try:
+                self._download_from(url, save_file_path, sha256, unzip_dir_path, on_progress, is_cancelled)
+                return url
+            except DownloadCancelledError:
+                raise
+            except Exception as e:
+                error_list.append(f'{url} {e}')
+                if self.log is not None:
+                    self.log.warning(f'下载失败 {url} {e}')
+
+        raise DownloadError('; '.join(error_list) if error_list else '没有下载地址')
+
+    def _probe(self, url: str) -> tuple[int, bool, str]:
+        """
+        获取文件大小和是否支持 Range
+
+        Returns:
+            (文件大小 未知时为 -1, 是否支持 Range, ETag)
+        """
+        request = urllib.request.Request(url, headers={'Range': 'bytes=0-0'})
+        with self._opener.open(request, timeout=self.timeout) as response:
+            etag = response.headers.get('ETag', '')
+            if response.status == 206:
+                match = _CONTENT_RANGE_PATTERN.match(response.headers.get('Content-Range', ''))
+                if match is not None:
+                    return int(match.group(1)), True, etag
+                return -1, False, etag
+            length = response.headers.get('Content-Length')
+            return (int(length) if length is not None else -1), False, etag
+
+    def _plan_segments(self, size: int, ranged: bool) -> list[_Segment]:
+        if not ranged or size < 0:
+            return [_Segment(0, size)]
+        cnt = max(1, min(self.segment_cnt, size // self.min_segment_size))
+        step = size // cnt
+        return [_Segment(i * step, size if i == cnt - 1 else (i + 1) * step) for i in range(cnt)]
+
+    @staticmethod
+    def _load_state(state_path: str, part_path: str, url: str, size: int, sha256: str | None,
+                    etag: str) -> list[_Segment] | None:
+        """读取上次的下载状态 与这次的文件不一致时返回 None"""
+        try:
+            with open(state_path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+            if state['size'] != size or state['sha256'] != sha256 or os.path.getsize(part_path) != size:
+                return None
+            if state['url'] == url and state['etag'] and etag and state['etag'] != etag:  # 同一个地址上的文件变了
+                return None
+            return [_Segment(*i) for i in state['segments']]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _save_state(state_path: str, url: str, size: int, sha256: str | None, etag: str,
+                    segments: list[_Segment], lock: threading.Lock) -> None:
+        with lock:
+            state = {
+                'url': url,
+                'size': size,
+                'sha256': sha256,
+                'etag': etag,
+                'segments': [[i.start, i.end, i.done] for i in segments],
+            }
+        temp_path = state_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(state, file)
+        os.replace(temp_path, state_path)
+
+    def _download_from(self, url: str, save_file_path: str, sha256: str | None, unzip_dir_path: str | None,
+                       on_progress: Callable[[int, int], None] | None,
+                       is_cancelled: Callable[[], bool] | None) -> None:
+        """从一个地址下载 失败时抛出异常 保留下载状态给下一次使用"""
+        part_path = save_file_path + PART_SUFFIX
+        state_path = save_file_path + STATE_SUFFIX
+        size, ranged, etag = self._probe(url)
+        resumable = ranged and size >= 0
+
+        segments = self._load_state(state_path, part_path, url, size, sha256, etag) if resumable else None
+        if segments is None:
+            segments = self._plan_segments(size, ranged)
+            save_dir = os.path.dirname(save_file_path)
+            if save_dir:
+                os.makedirs(save_dir, exist_ok=True)
+            with open(part_path, 'wb') as file:
+                if size > 0:
+                    file.truncate(size)
+        elif self.log is not None:
+            downloaded = sum(i.done for i in segments)
+            self.log.info(f'继续下载 {save_file_path} 已下载 {downloaded / 1024 / 1024:.2f} MB')
+
+        lock = threading.Lock()
+        stop_event = threading.Event()
+        hasher = hashlib.sha256() if sha256 else None
+        unzipper = _StreamUnzipper(unzip_dir_path) if unzip_dir_path else None
+        consumed = 0  # 已经校验和解压的位置
+
+        def consume(read_file) -> None:
+            """把已经连续下载好的部分 按顺序交给校验和解压"""
+            nonlocal consumed
+            with lock:
+                contiguous = 0
+                for segment in segments:
+                    contiguous = segment.pos
+                    if not segment.finished:
+                        break
+            while consumed < contiguous:
+                read_file.seek(consumed)
+                data = read_file.read(min(CONSUME_CHUNK_SIZE, contiguous - consumed))
+                if not data:
+                    break
+                consumed += len(data)
+                if hasher is not None:
+                    hasher.update(data)
+                if unzipper is not None:
+                    unzipper.feed(data)
+
+        def report() -> None:
+            if on_progress is None:
+                return
+            with lock:
+                downloaded = sum(i.done for i in segments)
+            on_progress(downloaded, size)
+
+        try:
+            with open(part_path, 'rb', buffering=0) as read_file:  # 不使用缓冲 避免读到预读的旧数据
+                pending = [i for i in segments if not i.finished]
+                with ThreadPoolExecutor(max_workers=max(1, len(pending)), thread_name_prefix='range_downloader') as executor:
+                    futures = [
+                        executor.submit(self._download_segment, url, part_path, segment, ranged, lock, stop_event)
+                        for segment in pending
+                    ]
+                    try:
+                        last_report_time = 0.0
+                        while True:
+                            done, not_done = wait(futures, timeout=0.2, return_when=FIRST_EXCEPTION)
+                            consume(read_file)
+                            if is_cancelled is not None and is_cancelled():
+                                raise DownloadCancelledError('下载已取消')
+                            for future in done:
+                                if future.exception() is not None:
+                                    raise future.exception()
+                            if len(not_done) == 0:
+                                break
+                            now = time.time()
+                            if now - last_report_time >= REPORT_INTERVAL:
+                                last_report_time = now
+                                report()
+                                if resumable:
+                                    self._save_state(state_path, url, size, sha256, etag, segments, lock)
+                    finally:
+                        stop_event.set()
+
+                consume(read_file)
+            report()
+
+            if hasher is not None and hasher.hexdigest().lower() != sha256.lower():
+                raise DownloadError(f'SHA-256 校验失败 {hasher.hexdigest()}')
+
+            os.replace(part_path, save_file_path)
+            if os.path.exists(state_path):
+                os.remove(state_path)
+        except Exception as e:
+            if unzipper is not None:
+                unzipper.cleanup()
+            if isinstance(e, DownloadError) or not resumable:  # 下载的内容有问题 或者无法续传 不保留
+                for path in (part_path, state_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+            else:
+                self._save_state(state_path, url, size, sha256, etag, segments, lock)
+            raise
+
+        if unzipper is not None:
+            try:
+                unzipper.finish(save_file_path)
+            except Exception:
+                unzipper.cleanup()
+                raise
+
+    def _download_segment(self, url: str, part_path: str, segment: _Segment, ranged: bool,
+                          lock: threading.Lock, stop_event: threading.Event) -> None:
+        """下载一个分段 断开后从断开的位置重试"""
+        attempt = 0
+        while not segment.finished:
+            try:
+                headers = {}
+                if ranged:
+                    headers['Range'] = f'bytes={segment.pos}-{segment.end - 1}'
+                request = urllib.request.Request(url, headers=headers)
+                with self._opener.open(request, timeout=self.timeout) as response:
+                    if ranged and response.status != 206:
+                        raise _RangeNotSupportedError(f'服务器不支持断点续传 {response.status}')
+                    with open(part_path, 'r+b', buffering=0) as file:  # 不使用缓冲 写入后其它线程马上能读到
+                        file.seek(segment.pos)
+                        while not segment.finished:
+                            if stop_event.is_set():
+                                return
+                            to_read = CHUNK_SIZE if segment.end < 0 else min(CHUNK_SIZE, segment.end - segment.pos)
+                            data = response.read(to_read)
+                            if not data:
+                                if segment.end < 0:
+                                    segment.end = segment.pos  # 大小未知时 读到结束即完成
+                                    break
+                                raise ConnectionError('连接提前断开')
+                            view = memoryview(data)
+                            while len(view) > 0:
+                                view = view[file.write(view):]
+                            with lock:
+                                segment.done += len(data)
+            except (DownloadError, _RangeNotSupportedError):
+                raise
+            except Exception:
+                attempt += 1
+                # 不支持 Range 时无法从中间继续 交给下一个地址重新下载
+                if not ranged or attempt > self.retry_times or stop_event.is_set():
+                    raise
+                if stop_event.wait(min(2 ** attempt, 5)):
+                    return
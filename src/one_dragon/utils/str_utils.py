@@ -2,6 +2,7 @@ import difflib
 import re
 from typing import Optional, List, Tuple
 
+from one_dragon.utils.fuzzy_vocabulary import FuzzyVocabulary
 from one_dragon.utils.i18_utils import gt
 
 _WITH_CHINESE_PATTERN = re.compile(r'[\u4e00-\u9fff]+')
@@ -113,21 +114,8 @@ def find_best_match_by_lcs(word: str, target_word_list: List[str],
     :param lcs_percent_threshold: 要求的LCS阈值
     :return: 最符合的目标词的下标
     """
-    target_idx: Optional[int] = None
-    target_lcs_percent: Optional[float] = None
-
-    for idx, target_word in enumerate(target_word_list):
-        lcs = longest_common_subsequence_length(word, target_word)
-        if lcs == 0:  # 至少要有一个匹配
-            continue
-        lcs_percent = lcs * 1.0 / len(target_word)
-        if lcs_percent_threshold is not None and lcs_percent < lcs_percent_threshold:
-            continue
-        if target_idx is None or lcs_percent > target_lcs_percent:
-            target_idx = idx
-            target_lcs_percent = lcs_percent
-
-    return target_idx
+    # 同一个目标词列表需要多次匹配时 使用 fuzzy_vocabulary.get_vocabulary 复用词表
+    return FuzzyVocabulary(target_word_list).find_best_match(word, lcs_percent_threshold)
 
 
 def find_best_match_by_difflib(word: str, target_word_list: List[str], cutoff=0.6) -> Optional[int]:
@@ -1,11 +1,10 @@
 import os
-import time
-import urllib.request
 import zipfile
 from typing import Optional, List
 
 import onnxruntime as ort
 
+from one_dragon.utils.range_downloader import RangeDownloader
 from one_dragon.yolo.log_utils import log
 
 _GH_PROXY_URL = 'https://ghfast.top'
@@ -77,29 +76,32 @@ class OnnxModelLoader:
             os.mkdir(self.model_dir_path)
 
         download_url = f'{self.model_download_url}/{self.model_name}.zip'
+        url_list = [download_url]
         if self.personal_proxy is not None and len(self.personal_proxy) > 0:
             os.environ['http_proxy'] = self.personal_proxy
             os.environ['https_proxy'] = self.personal_proxy
         elif self.gh_proxy:
-            download_url = f'{self.gh_proxy_url}/{self.model_download_url}/{self.model_name}.zip'
-        log.info('开始下载 %s %s', self.model_name, download_url)
+            url_list.insert(0, f'{self.gh_proxy_url}/{download_url}')  # 代理失败时直接下载
+        log.info('开始下载 %s %s', self.model_name, url_list[0])
         zip_file_path = os.path.join(self.model_dir_path, f'{self.model_name}.zip')
-        last_log_time = time.time()
-
-        def log_download_progress(block_num, block_size, total_size):
-            nonlocal last_log_time
-            if time.time() - last_log_time < 1:
-                return
-            last_log_time = time.time()
-            downloaded = block_num * block_size / 1024.0 / 1024.0
-            total_size_mb = total_size / 1024.0 / 1024.0
-            progress = downloaded / total_size_mb * 100
-            log.info(f"正在下载 {self.model_name}: {downloaded:.2f}/{total_size_mb:.2f} MB ({progress:.2f}%)")
+
+        def log_download_progress(downloaded: int, total: int) -> None:
+            downloaded_mb = downloaded / 1024.0 / 1024.0
+            if total > 0:
+                total_size_mb = total / 1024.0 / 1024.0
+                progress = downloaded / total * 100
+                log.info(f"正在下载 {self.model_name}: {downloaded_mb:.2f}/{total_size_mb:.2f} MB ({progress:.2f}%)")
+            else:
+                log.info(f"正在下载 {self.model_name}: {downloaded_mb:.2f} MB")
 
         try:
-            _, _ = urllib.request.urlretrieve(download_url, zip_file_path, log_download_progress)
+            downloader = RangeDownloader(logger=log)
+            downloader.download(
+                url_list, zip_file_path,
+                unzip_dir_path=self.model_dir_path,  # 边下载边解压
+                on_progress=log_download_progress,
+            )
             log.info('下载完成 %s', self.model_name)
-            self.unzip_model(zip_file_path)
             return True
         except Exception:
             log.error('下载失败模型失败', exc_info=True)
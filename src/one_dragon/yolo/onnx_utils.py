@@ -38,3 +38,58 @@ def scale_input_image_u(image: MatLike, onnx_input_width: int, onnx_input_height
     input_tensor = input_img[np.newaxis, :, :, :].astype(np.float32)
 
     return input_tensor, scale_height, scale_width
+
+
+LETTERBOX_FILL_VALUE: int = 114  # ultralytics 缩放后的填充值
+
+
+class ScaleInputBuffer:
+
+    def __init__(self, onnx_input_width: int, onnx_input_height: int):
+        """
+        按 ultralytics 的方式缩放图片时 重复使用的缓冲区
+        结果与 scale_input_image_u 一致 但每次识别不需要再申请内存
+        :param onnx_input_width: 模型需要的图片宽度
+        :param onnx_input_height: 模型需要的图片高度
+        """
+        self.onnx_input_width: int = onnx_input_width
+        self.onnx_input_height: int = onnx_input_height
+        self.letterbox: np.ndarray = np.full(shape=(onnx_input_height, onnx_input_width, 3),
+                                             fill_value=LETTERBOX_FILL_VALUE, dtype=np.uint8)
+        self.input_tensor: np.ndarray = np.empty(shape=(1, 3, onnx_input_height, onnx_input_width), dtype=np.float32)
+
+    def scale(self, image: MatLike) -> Tuple[np.ndarray, int, int]:
+        """
+        缩放图片并写入输入缓冲区
+        返回的张量在下一次调用时会被覆盖
+        :param image: 输入的图片 RBG通道
+        :return: 输入模型的张量 缩放后的高度 缩放后的宽度
+        """
+        img_height, img_width = image.shape[:2]
+        onnx_input_height = self.onnx_input_height
+        onnx_input_width = self.onnx_input_width
+
+        # 将图像缩放到模型的输入尺寸中较短的一边
+        min_scale = min(onnx_input_height / img_height, onnx_input_width / img_width)
+
+        # 未进行padding之前的尺寸
+        scale_height = int(round(img_height * min_scale))
+        scale_width = int(round(img_width * min_scale))
+
+        if onnx_input_height != img_height or onnx_input_width != img_width:  # 需要缩放
+            letterbox = self.letterbox
+            target = letterbox[0:scale_height, 0:scale_width, :]
+            scale_img = cv2.resize(image, (scale_width, scale_height), dst=target, interpolation=cv2.INTER_LINEAR)
+            if not np.may_share_memory(scale_img, letterbox):  # 没能直接写入缓冲区
+                target[:, :, :] = scale_img
+            # 上一次的缩放尺寸可能不同 重新填充空白部分
+            letterbox[scale_height:, :, :] = LETTERBOX_FILL_VALUE
+            letterbox[0:scale_height, scale_width:, :] = LETTERBOX_FILL_VALUE
+            input_img = letterbox
+        else:
+            input_img = image
+
+        # 与 scale_input_image_u 相同 按float64计算后再转为float32
+        np.divide(input_img.transpose(2, 0, 1), 255.0, out=self.input_tensor[0], casting='unsafe')
+
+        return self.input_tensor, scale_height, scale_width
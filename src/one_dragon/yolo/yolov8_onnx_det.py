@@ -3,6 +3,8 @@ import time
 import csv
 import numpy as np
 import os
+import threading
+from collections import deque
 from cv2.typing import MatLike
 from typing import Optional, List
 
@@ -10,6 +12,7 @@ from one_dragon.yolo import onnx_utils
 from one_dragon.yolo.detect_utils import DetectFrameResult, DetectClass, DetectContext, DetectObjectResult, xywh2xyxy, \
     multiclass_nms
 from one_dragon.yolo.onnx_model_loader import OnnxModelLoader
+from one_dragon.yolo.log_utils import log
 
 
 class Yolov8Detector(OnnxModelLoader):
@@ -47,7 +50,7 @@ class Yolov8Detector(OnnxModelLoader):
         )
 
         self.keep_result_seconds: float = keep_result_seconds  # 保留识别结果的秒数
-        self.run_result_history: List[DetectFrameResult] = []  # 历史识别结果
+        self.run_result_history: deque[DetectFrameResult] = deque()  # 历史识别结果 按识别时间从旧到新
         self.overlay_debug_bus = None
 
         self.idx_2_class: dict[int, DetectClass] = {}  # 分类
@@ -55,6 +58,14 @@ class Yolov8Detector(OnnxModelLoader):
         self.category_2_idx: dict[str, List[int]] = {}
         self._load_detect_classes(self.model_dir_path)
 
+        # 推理时重复使用的缓冲区 模型重新加载后重建
+        self._run_lock = threading.Lock()  # 缓冲区只能同时给一次识别使用
+        self._buffer_session = None  # 创建缓冲区时使用的模型
+        self._input_buffer: Optional[onnx_utils.ScaleInputBuffer] = None
+        self._output_buffer: Optional[np.ndarray] = None
+        self._io_binding = None  # 为None时使用 session.run
+        self._class_idx_map: dict[tuple, Optional[np.ndarray]] = {}  # (标签, 分类) -> 需要保留的类别下标
+
     def run(
         self,
         image: MatLike,
@@ -85,14 +96,15 @@ class Yolov8Detector(OnnxModelLoader):
         context.label_list = label_list
         context.category_list = category_list
 
-        input_tensor = self.prepare_input(context)
-        t2 = time.time()
+        with self._run_lock:  # 输入输出缓冲区在下一次识别时会被覆盖
+            input_tensor = self.prepare_input(context)
+            t2 = time.time()
 
-        outputs = self.inference(input_tensor)
-        t3 = time.time()
+            outputs = self.inference(input_tensor)
+            t3 = time.time()
 
-        results = self.process_output(outputs, context)
-        t4 = time.time()
+            results = self.process_output(outputs, context)
+            t4 = time.time()
 
         # log.info(f'识别完毕 得到结果 {len(results)}个。预处理耗时 {t2 - t1:.3f}s, 推理耗时 {t3 - t2:.3f}s, 后处理耗时 {t4 - t3:.3f}s')
 
@@ -106,11 +118,49 @@ class Yolov8Detector(OnnxModelLoader):
         )
         return frame_result
 
+    def _prepare_buffers(self) -> None:
+        """
+        模型加载后 创建推理使用的缓冲区
+        输入使用固定的缓冲区 输出在第一次推理得到形状后 再通过 IOBinding 绑定固定的缓冲区
+        """
+        if self._buffer_session is self.session:
+            return
+        self._buffer_session = self.session
+        self._input_buffer = onnx_utils.ScaleInputBuffer(self.onnx_input_width, self.onnx_input_height)
+        self._output_buffer = None
+        self._io_binding = None
+
+    def _bind_output_buffer(self, output: np.ndarray) -> None:
+        """
+        按第一次推理的输出形状 创建固定的输出缓冲区并绑定
+        不支持 IOBinding 时 继续使用 session.run
+        :param output: 第一次推理的输出
+        """
+        try:
+            output_buffer = np.empty_like(output, dtype=np.float32)
+            io_binding = self.session.io_binding()
+            io_binding.bind_cpu_input(self.input_names[0], self._input_buffer.input_tensor)
+            io_binding.bind_output(
+                name=self.output_names[0],
+                device_type='cpu',
+                device_id=0,
+                element_type=np.float32,
+                shape=output_buffer.shape,
+                buffer_ptr=output_buffer.ctypes.data,
+            )
+            self._output_buffer = output_buffer
+            self._io_binding = io_binding
+        except Exception:
+            log.debug('无法使用IOBinding 使用普通推理', exc_info=True)
+            self._output_buffer = None
+            self._io_binding = None
+
     def prepare_input(self, context: DetectContext) -> np.ndarray:
         """
         推理前的预处理
         """
-        input_tensor, scale_height, scale_width = onnx_utils.scale_input_image_u(context.img, self.onnx_input_width, self.onnx_input_height)
+        self._prepare_buffers()
+        input_tensor, scale_height, scale_width = self._input_buffer.scale(context.img)
         context.scale_height = scale_height
         context.scale_width = scale_width
         return input_tensor
@@ -121,48 +171,84 @@ class Yolov8Detector(OnnxModelLoader):
         :param input_tensor: 输入模型的图片 RGB通道
         :return: onnx模型推理得到的结果
         """
+        if self._io_binding is not None and input_tensor is self._input_buffer.input_tensor:
+            try:
+                self.session.run_with_iobinding(self._io_binding)
+                return [self._output_buffer]
+            except Exception:
+                log.debug('IOBinding推理失败 使用普通推理', exc_info=True)
+                self._io_binding = None
+
         outputs = self.session.run(self.output_names, {self.input_names[0]: input_tensor})
+        if (self._io_binding is None and self._output_buffer is None
+                and self._input_buffer is not None and input_tensor is self._input_buffer.input_tensor):
+            self._bind_output_buffer(outputs[0])
         return outputs
 
+    def get_class_idx(self, label_list: Optional[List[str]], category_list: Optional[List[str]]) -> Optional[np.ndarray]:
+        """
+        需要保留的类别下标 按标签和分类缓存
+        :param label_list: 限定识别的标签
+        :param category_list: 限定识别的标签分类
+        :return: 升序的类别下标 不限定时返回None
+        """
+        if label_list is None and category_list is None:
+            return None
+        key = (
+            None if label_list is None else tuple(label_list),
+            None if category_list is None else tuple(category_list),
+        )
+        class_idx = self._class_idx_map.get(key)
+        if class_idx is not None:
+            return class_idx
+
+        idx_set: set[int] = set()
+        if label_list is not None:
+            for label in label_list:
+                idx = self.class_2_idx.get(label)
+                if idx is not None:
+                    idx_set.add(idx)
+        if category_list is not None:
+            for category in category_list:
+                for idx in self.category_2_idx.get(category, []):
+                    idx_set.add(idx)
+
+        class_idx = np.array(sorted(idx_set), dtype=np.int64)
+        self._class_idx_map[key] = class_idx
+        return class_idx
+
     def process_output(self, output, context: DetectContext) -> List[DetectObjectResult]:
         """
         :param output: 推理结果
         :param context: 上下文
         :return: 最终得到的识别结果
         """
-        predictions = np.squeeze(output[0]).T
-
-        keep = np.ones(shape=(predictions.shape[1]), dtype=bool)
-
-        if context.label_list is not None or context.category_list is not None:
-            keep[4:] = False  # 前4位是坐标 先把所有标签都设置为False
-            if context.label_list is not None:
-                for label in context.label_list:
-                    idx = self.class_2_idx.get(label)
-                    if idx is not None:
-                        keep[idx + 4] = True
+        raw = output[0][0]  # [4 + 类别数, 候选框数] 前4行是坐标
 
-            if context.category_list is not None:
-                for category in context.category_list:
-                    for idx in self.category_2_idx.get(category, []):
-                        keep[idx + 4] = True
-
-        predictions[:, keep == False] = 0
+        # 只计算需要的类别 不修改推理结果
+        class_idx = self.get_class_idx(context.label_list, context.category_list)
+        results: List[DetectObjectResult] = []
+        if class_idx is None:
+            class_scores = raw[4:]
+        elif len(class_idx) == 0:
+            return results
+        else:
+            class_scores = raw[class_idx + 4]
 
         # 按置信度阈值进行基本的过滤
-        scores = np.max(predictions[:, 4:], axis=1)
-        predictions = predictions[scores > context.conf, :]
-        scores = scores[scores > context.conf]
-
-        results: List[DetectObjectResult] = []
+        scores = np.max(class_scores, axis=0)
+        conf_mask = scores > context.conf
+        scores = scores[conf_mask]
         if len(scores) == 0:
             return results
 
         # 选择置信度最高的类别
-        class_ids = np.argmax(predictions[:, 4:], axis=1)
+        class_ids = np.argmax(class_scores[:, conf_mask], axis=0)
+        if class_idx is not None:
+            class_ids = class_idx[class_ids]
 
         # 提取Bounding box
-        boxes = predictions[:, :4]  # 原始推理结果 xywh
+        boxes = raw[:4, conf_mask].T  # 原始推理结果 xywh
         scale_shape = np.array([context.scale_width, context.scale_height, context.scale_width, context.scale_height])  # 缩放后图片的大小
         boxes = np.divide(boxes, scale_shape, dtype=np.float32)  # 转化到 0~1
         boxes *= np.array([context.img_width, context.img_height, context.img_width, context.img_height])  # 恢复到原图的坐标
@@ -192,9 +278,10 @@ class Yolov8Detector(OnnxModelLoader):
             results=results,
             run_time=context.run_time
         )
-        self.run_result_history.append(new_frame)
-        self.run_result_history = [i for i in self.run_result_history
-                                   if context.run_time - i.run_time <= self.keep_result_seconds]
+        history = self.run_result_history
+        history.append(new_frame)
+        while len(history) > 0 and context.run_time - history[0].run_time > self.keep_result_seconds:
+            history.popleft()
 
         return new_frame
 
@@ -271,7 +358,7 @@ class Yolov8Detector(OnnxModelLoader):
     @property
     def last_run_result(self) -> Optional[DetectFrameResult]:
         if len(self.run_result_history) > 0:
-            return self.run_result_history[len(self.run_result_history) - 1]
+            return self.run_result_history[-1]
         else:
             return None
 
@@ -8,6 +8,7 @@ from PySide6.QtCore import QObject, QPoint, QTimer, Signal, Qt
 from PySide6.QtGui import QGuiApplication
 
 from one_dragon.base.operation.context_event_bus import ContextEventItem
+from one_dragon.base.operation.overlay_debug_bus import OverlayDebugStreamCache
 from one_dragon.base.geometry.rectangle import Rect
 from one_dragon.utils.log_utils import log
 from one_dragon_qt.overlay.overlay_config import OverlayConfig
@@ -56,6 +57,11 @@ class OverlayManager(QObject):
         self._toggle_combo_pressed = False
         self._last_toggle_hotkey_time = 0.0
         self._last_game_qt_rect: Rect | None = None
+        # incremental debug bus sync, a full snapshot is taken when panels need a resync
+        self._debug_cursor = 0
+        self._debug_full_refresh = True
+        self._vision_cache = OverlayDebugStreamCache()
+        self._vision_filter_key: tuple | None = None
 
         self._signal_bridge = _OverlaySignalBridge()
         self._signal_bridge.log_received.connect(self._on_log_received_signal)
@@ -204,6 +210,8 @@ class OverlayManager(QObject):
         self._log_panel.append_log(payload)
 
     def _ensure_overlay_window(self) -> OverlayWindow:
+        if None in (self._overlay_window, self._decision_panel, self._timeline_panel, self._performance_panel):
+            self._debug_full_refresh = True  # new panels start empty
         if self._overlay_window is None:
             self._overlay_window = OverlayWindow()
             self._overlay_window.set_standard_resolution(
@@ -556,6 +564,7 @@ class OverlayManager(QObject):
         self._ctrl_interaction = False
         self._toggle_combo_pressed = False
         self._last_game_qt_rect = None
+        self._debug_full_refresh = True
         if self._overlay_window is not None:
             self._overlay_window.set_vision_items([])
             self._overlay_window.set_overlay_visible(False)
@@ -611,16 +620,48 @@ class OverlayManager(QObject):
         if bus is None:
             return
 
-        snapshot = bus.snapshot()
-        if self._overlay_window is not None:
-            self._overlay_window.set_vision_items(self._filter_vision_items(snapshot.vision_items))
+        if self._performance_panel is not None:
+            self._performance_panel.set_enabled_metric_map(self.config.performance_metric_enabled_map)
+
+        if self._debug_full_refresh:
+            self._debug_full_refresh = False
+            snapshot = bus.snapshot()
+            self._debug_cursor = snapshot.cursor
+            self._vision_cache.reset(snapshot.vision_items)
+            self._vision_filter_key = None
+            self._refresh_vision_items(True)
+            if self._decision_panel is not None:
+                self._decision_panel.update_items(snapshot.decision_items)
+            if self._timeline_panel is not None:
+                self._timeline_panel.update_items(snapshot.timeline_items)
+            if self._performance_panel is not None:
+                self._performance_panel.update_items(snapshot.performance_items)
+            return
+
+        delta = bus.snapshot_since(self._debug_cursor)
+        self._debug_cursor = delta.cursor
+        self._refresh_vision_items(self._vision_cache.apply(delta.vision))
         if self._decision_panel is not None:
-            self._decision_panel.update_items(snapshot.decision_items)
+            self._decision_panel.apply_delta(delta.decision)
         if self._timeline_panel is not None:
-            self._timeline_panel.update_items(snapshot.timeline_items)
+            self._timeline_panel.apply_delta(delta.timeline)
         if self._performance_panel is not None:
-            self._performance_panel.set_enabled_metric_map(self.config.performance_metric_enabled_map)
-            self._performance_panel.update_items(snapshot.performance_items)
+            self._performance_panel.apply_delta(delta.performance)
+
+    def _refresh_vision_items(self, changed: bool) -> None:
+        if self._overlay_window is None:
+            return
+        filter_key = (
+            self.config.vision_layer_enabled,
+            self.config.vision_yolo_enabled,
+            self.config.vision_ocr_enabled,
+            self.config.vision_template_enabled,
+            self.config.vision_cv_enabled,
+        )
+        if not changed and filter_key == self._vision_filter_key:
+            return
+        self._vision_filter_key = filter_key
+        self._overlay_window.set_vision_items(self._filter_vision_items(self._vision_cache.items()))
 
     def _emit_overlay_refresh_perf(self, start_time: float) -> None:
         bus = getattr(self.ctx, "overlay_debug_bus", None)
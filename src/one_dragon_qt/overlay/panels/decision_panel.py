@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import heapq
 import html
 import time
 
-from one_dragon.base.operation.overlay_debug_bus import DecisionTraceItem
+from one_dragon.base.operation.overlay_debug_bus import (
+    DecisionTraceItem,
+    OverlayDebugStreamCache,
+    OverlayDebugStreamDelta,
+)
 from one_dragon_qt.overlay.panels.resizable_panel import ResizablePanel
 from one_dragon_qt.widgets.overlay_text_widget import OverlayTextWidget
 
@@ -18,6 +23,10 @@ class DecisionPanel(ResizablePanel):
         )
         self.set_title_visible(False)
         self._text_color = "#f2f2f2"
+        # every live item, the newest 24 by (created, seq) are shown
+        self._items = OverlayDebugStreamCache()
+        self._row_cache: dict[int, str] = {}  # seq -> row html, rows are built once per item
+        self._dirty = False
 
         self._text_widget = OverlayTextWidget(self)
         self._edit_text_widget = self._text_widget
@@ -28,26 +37,48 @@ class DecisionPanel(ResizablePanel):
     def set_text_color(self, color: str) -> None:
         self._text_color = str(color or "").strip() or "#f2f2f2"
         self._text_widget.set_text_color(self._text_color)
+        self._row_cache.clear()
+        if len(self._items) > 0:
+            self._render()
 
     def update_items(self, items: list[DecisionTraceItem]) -> None:
+        self._items.reset(items)
+        self._render()
+
+    def apply_delta(self, delta: OverlayDebugStreamDelta) -> None:
+        changed = self._items.apply(delta)
+        if changed or self._dirty:
+            self._render()
+
+    def _render(self) -> None:
         if self._edit_mode:
+            self._dirty = True
             return
-        rows: list[str] = []
-        for item in sorted(items, key=lambda x: x.created)[-24:]:
-            t = time.strftime("%H:%M:%S", time.localtime(item.created))
-            source = html.escape(item.source)
-            trigger = html.escape(item.trigger)
-            expr = html.escape(item.expression)
-            action = html.escape(item.operation)
-            status = html.escape(item.status)
-            rows.append(
-                f"<span style='color:#9d9d9d'>[{t}]</span> "
-                f"<span style='color:#67d6ff'>[{source}]</span> "
-                f"<span style='color:#ffc66d'>{trigger}</span> "
-                f"<span style='color:#a7a7a7'>=></span> "
-                f"<span style='color:#d8e27f'>{expr}</span> "
-                f"<span style='color:#a7a7a7'>/</span> "
-                f"<span style='color:{self._text_color}'>{action}</span> "
-                f"<span style='color:#8be28b'>[{status}]</span>"
-            )
-        self._text_widget.setHtml("<br>".join(rows))
+        self._dirty = False
+        # same rows as sorting all items by created and keeping the last 24
+        shown = heapq.nlargest(24, self._items.items(), key=lambda x: (x.created, x.seq))
+        shown.reverse()
+        row_cache = {}
+        for item in shown:
+            row = self._row_cache.get(item.seq)
+            row_cache[item.seq] = row if row is not None else self._build_row(item)
+        self._row_cache = row_cache
+        self._text_widget.setHtml("<br>".join(row_cache[item.seq] for item in shown))
+
+    def _build_row(self, item: DecisionTraceItem) -> str:
+        t = time.strftime("%H:%M:%S", time.localtime(item.created))
+        source = html.escape(item.source)
+        trigger = html.escape(item.trigger)
+        expr = html.escape(item.expression)
+        action = html.escape(item.operation)
+        status = html.escape(item.status)
+        return (
+            f"<span style='color:#9d9d9d'>[{t}]</span> "
+            f"<span style='color:#67d6ff'>[{source}]</span> "
+            f"<span style='color:#ffc66d'>{trigger}</span> "
+            f"<span style='color:#a7a7a7'>=></span> "
+            f"<span style='color:#d8e27f'>{expr}</span> "
+            f"<span style='color:#a7a7a7'>/</span> "
+            f"<span style='color:{self._text_color}'>{action}</span> "
+            f"<span style='color:#8be28b'>[{status}]</span>"
+        )
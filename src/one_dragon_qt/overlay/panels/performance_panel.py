@@ -3,7 +3,10 @@ from __future__ import annotations
 import html
 import time
 
-from one_dragon.base.operation.overlay_debug_bus import PerfMetricSample
+from one_dragon.base.operation.overlay_debug_bus import (
+    OverlayDebugStreamDelta,
+    PerfMetricSample,
+)
 from one_dragon_qt.overlay.panels.resizable_panel import ResizablePanel
 from one_dragon_qt.widgets.overlay_text_widget import OverlayTextWidget
 
@@ -27,6 +30,7 @@ class PerformancePanel(ResizablePanel):
         self.set_title_visible(False)
         self._text_color = "#f2f2f2"
         self._enabled_metric_map: dict[str, bool] = {}
+        self._latest_by_metric: dict[str, PerfMetricSample] = {}
 
         self._text_widget = OverlayTextWidget(self)
         self._edit_text_widget = self._text_widget
@@ -42,12 +46,34 @@ class PerformancePanel(ResizablePanel):
         self._enabled_metric_map = dict(metric_map or {})
 
     def update_items(self, items: list[PerfMetricSample]) -> None:
+        self._latest_by_metric.clear()
+        self._merge_samples(items)
+        self._render()
+
+    def apply_delta(self, delta: OverlayDebugStreamDelta) -> None:
+        if delta.reset:
+            self._latest_by_metric.clear()
+        expired = [
+            key for key, sample in self._latest_by_metric.items()
+            if sample.seq < delta.expired_before
+        ]
+        for key in expired:
+            del self._latest_by_metric[key]
+        self._merge_samples(delta.added)
+        # age text changes every tick, always render
+        self._render()
+
+    def _merge_samples(self, items: list[PerfMetricSample]) -> None:
+        latest_by_metric = self._latest_by_metric
+        for item in items:
+            latest = latest_by_metric.get(item.metric)
+            if latest is None or (item.created, item.seq) >= (latest.created, latest.seq):
+                latest_by_metric[item.metric] = item
+
+    def _render(self) -> None:
         if self._edit_mode:
             return
-        latest_by_metric: dict[str, PerfMetricSample] = {}
-        for item in sorted(items, key=lambda x: x.created):
-            latest_by_metric[item.metric] = item
-
+        latest_by_metric = self._latest_by_metric
         metric_keys = self._sorted_metric_keys(latest_by_metric.keys())
 
         now = time.time()
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import heapq
 import html
 import time
 
-from one_dragon.base.operation.overlay_debug_bus import TimelineItem
+from one_dragon.base.operation.overlay_debug_bus import (
+    OverlayDebugStreamCache,
+    OverlayDebugStreamDelta,
+    TimelineItem,
+)
 from one_dragon_qt.overlay.panels.resizable_panel import ResizablePanel
 from one_dragon_qt.widgets.overlay_text_widget import OverlayTextWidget
 
@@ -25,6 +30,10 @@ class TimelinePanel(ResizablePanel):
         )
         self.set_title_visible(False)
         self._text_color = "#f2f2f2"
+        # every live item, the newest 28 by (created, seq) are shown
+        self._items = OverlayDebugStreamCache()
+        self._row_cache: dict[int, str] = {}  # seq -> row html, rows are built once per item
+        self._dirty = False
 
         self._text_widget = OverlayTextWidget(self)
         self._edit_text_widget = self._text_widget
@@ -35,20 +44,42 @@ class TimelinePanel(ResizablePanel):
     def set_text_color(self, color: str) -> None:
         self._text_color = str(color or "").strip() or "#f2f2f2"
         self._text_widget.set_text_color(self._text_color)
+        self._row_cache.clear()
+        if len(self._items) > 0:
+            self._render()
 
     def update_items(self, items: list[TimelineItem]) -> None:
+        self._items.reset(items)
+        self._render()
+
+    def apply_delta(self, delta: OverlayDebugStreamDelta) -> None:
+        changed = self._items.apply(delta)
+        if changed or self._dirty:
+            self._render()
+
+    def _render(self) -> None:
         if self._edit_mode:
+            self._dirty = True
             return
-        rows: list[str] = []
-        for item in sorted(items, key=lambda x: x.created)[-28:]:
-            t = time.strftime("%H:%M:%S", time.localtime(item.created))
-            level = (item.level or "INFO").upper()
-            level_color = _LEVEL_COLOR.get(level, "#d0d0d0")
-            rows.append(
-                f"<span style='color:#9d9d9d'>[{t}]</span> "
-                f"<span style='color:{level_color}'>[{html.escape(level)}]</span> "
-                f"<span style='color:#8ce6b0'>[{html.escape(item.category or '')}]</span> "
-                f"<span style='color:{self._text_color}'>{html.escape(item.title or '')}</span> "
-                f"<span style='color:{self._text_color}'>{html.escape(item.detail or '')}</span>"
-            )
-        self._text_widget.setHtml("<br>".join(rows))
+        self._dirty = False
+        # same rows as sorting all items by created and keeping the last 28
+        shown = heapq.nlargest(28, self._items.items(), key=lambda x: (x.created, x.seq))
+        shown.reverse()
+        row_cache = {}
+        for item in shown:
+            row = self._row_cache.get(item.seq)
+            row_cache[item.seq] = row if row is not None else self._build_row(item)
+        self._row_cache = row_cache
+        self._text_widget.setHtml("<br>".join(row_cache[item.seq] for item in shown))
+
+    def _build_row(self, item: TimelineItem) -> str:
+        t = time.strftime("%H:%M:%S", time.localtime(item.created))
+        level = (item.level or "INFO").upper()
+        level_color = _LEVEL_COLOR.get(level, "#d0d0d0")
+        return (
+            f"<span style='color:#9d9d9d'>[{t}]</span> "
+            f"<span style='color:{level_color}'>[{html.escape(level)}]</span> "
+            f"<span style='color:#8ce6b0'>[{html.escape(item.category or '')}]</span> "
+            f"<span style='color:{self._text_color}'>{html.escape(item.title or '')}</span> "
+            f"<span style='color:{self._text_color}'>{html.escape(item.detail or '')}</span>"
+        )
@@ -0,0 +1,152 @@
+import math
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+from PySide6.QtCore import QPoint, QRect, QRectF, Qt
+from PySide6.QtGui import QImage, QPainter, QPixmap
+
+TILE_SIZE: int = 256  # 瓦片边长 物理像素
+MAX_CACHED_TILES: int = 256  # 最多缓存的瓦片数量 RGB32 下约 64MB
+
+
+def numpy_to_qimage(image: np.ndarray) -> Optional[QImage]:
+    """
+    将 RGB 或灰度的 numpy 数组转换为 QImage 会复制一份数据
+    :param image: 图片
+    :return: 转换失败时返回 None
+    """
+    if image is None:
+        return None
+    if image.dtype != np.uint8:
+        image = image.astype(np.uint8)
+    if not image.flags['C_CONTIGUOUS']:
+        image = np.ascontiguousarray(image)
+
+    if image.ndim == 3 and image.shape[2] == 3:
+        height, width, _ = image.shape
+        q_format = QImage.Format.Format_RGB888
+        bytes_per_line = 3 * width
+    elif image.ndim == 2:
+        height, width = image.shape
+        q_format = QImage.Format.Format_Grayscale8
+        bytes_per_line = width
+    else:
+        return None
+
+    return QImage(image.data, width, height, bytes_per_line, q_format).copy()
+
+
+class TiledImage:
+
+    def __init__(self, image: QImage, tile_size: int = TILE_SIZE, max_cached_tiles: int = MAX_CACHED_TILES):
+        """
+        分块的图片 用于显示很大的图片
+        - 按缩放比例使用不同的金字塔层级 第n层的一个瓦片覆盖原图 tile_size * 2^n 的范围
+        - 瓦片在第一次绘制时才从原图生成 使用LRU缓存 内存占用与原图缩放比例无关
+        - 绘制时只绘制与可见区域相交的瓦片
+        :param image: 原图
+        :param tile_size: 瓦片边长
+        :param max_cached_tiles: 最多缓存的瓦片数量
+        """
+        self.image: QImage = image
+        self.width: int = image.width()
+        self.height: int = image.height()
+        self.tile_size: int = tile_size
+        self.max_cached_tiles: int = max_cached_tiles
+
+        longest = max(self.width, self.height, 1)
+        self.max_level: int = max(0, math.ceil(math.log2(longest / tile_size))) if longest > tile_size else 0
+
+        self._cache: OrderedDict[Tuple[int, int, int], QPixmap] = OrderedDict()
+
+    def is_null(self) -> bool:
+        return self.image is None or self.image.isNull()
+
+    def level_for_scale(self, scale: float) -> int:
+        """
+        某个缩放比例下使用的层级 保证瓦片的分辨率不低于显示需要的分辨率
+        :param scale: 原图到屏幕物理像素的缩放比例
+        :return:
+        """
+        if scale >= 1 or scale <= 0:
+            return 0
+        return min(self.max_level, int(math.floor(math.log2(1 / scale))))
+
+    def get_tile(self, level: int, col: int, row: int) -> QPixmap:
+        """
+        获取瓦片 没有缓存时生成
+        :param level: 层级
+        :param col: 列
+        :param row: 行
+        :return:
+        """
+        key = (level, col, row)
+        tile = self._cache.get(key)
+        if tile is not None:
+            self._cache.move_to_end(key)
+            return tile
+
+        span = self.tile_size << level
+        x, y = col * span, row * span
+        src_rect = QRect(x, y, min(span, self.width - x), min(span, self.height - y))
+        part = self.image.copy(src_rect)
+        if level > 0:
+            part = part.scaled(
+                max(1, math.ceil(src_rect.width() / (1 << level))),
+                max(1, math.ceil(src_rect.height() / (1 << level))),
+                Qt.AspectRatioMode.IgnoreAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+        tile = QPixmap.fromImage(part)
+
+        self._cache[key] = tile
+        while len(self._cache) > self.max_cached_tiles:
+            self._cache.popitem(last=False)
+        return tile
+
+    def paint(self, painter: QPainter, offset: QPoint, scale: float, clip_rect: QRect,
+              device_pixel_ratio: float = 1.0) -> None:
+        """
+        绘制与可见区域相交的瓦片
+        :param painter: 画笔
+        :param offset: 原图左上角在控件上的位置
+        :param scale: 原图到控件逻辑像素的缩放比例
+        :param clip_rect: 需要绘制的控件区域
+        :param device_pixel_ratio: 设备像素比
+        :return:
+        """
+        if self.is_null() or scale <= 0:
+            return
+
+        level = self.level_for_scale(scale * device_pixel_ratio)
+        span = self.tile_size << level
+
+        # 可见区域对应的原图范围
+        x1 = max(0.0, (clip_rect.left() - offset.x()) / scale)
+        y1 = max(0.0, (clip_rect.top() - offset.y()) / scale)
+        x2 = min(float(self.width), (clip_rect.right() + 1 - offset.x()) / scale)
+        y2 = min(float(self.height), (clip_rect.bottom() + 1 - offset.y()) / scale)
+        if x1 >= x2 or y1 >= y2:
+            return
+
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, True)
+        for row in range(int(y1 // span), int(math.ceil(y2 / span))):
+            for col in range(int(x1 // span), int(math.ceil(x2 / span))):
+                tile = self.get_tile(level, col, row)
+                src_x, src_y = col * span, row * span
+                src_w = min(span, self.width - src_x)
+                src_h = min(span, self.height - src_y)
+                # 边缘取整 相邻瓦片共用同一条边 避免出现缝隙
+                left = round(offset.x() + src_x * scale)
+                top = round(offset.y() + src_y * scale)
+                right = round(offset.x() + (src_x + src_w) * scale)
+                bottom = round(offset.y() + (src_y + src_h) * scale)
+                painter.drawPixmap(
+                    QRectF(left, top, right - left, bottom - top),
+                    tile,
+                    QRectF(0, 0, tile.width(), tile.height()),
+                )
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
@@ -110,6 +110,8 @@ class DevtoolsScreenManageInterface(VerticalScrollInterface, HistoryMixin):
                    formatter=lambda v: ','.join(v) if v else ''),
         ColumnMeta('手柄键', 'gamepad_key', lambda x: x.strip() or None, 120,
                    formatter=lambda v: '' if v is None else str(v)),
+        ColumnMeta('单行文本', 'single_line', lambda x: x.strip().lower() in ('1', 'true', 'y', '是'), 70,
+                   formatter=lambda v: '是' if v else ''),
     ]
 
     AREA_FIELD_2_COLUMN: dict[str, int] = {col.display_name: idx for idx, col in enumerate(AREA_COLUMNS)}
@@ -1,7 +1,7 @@
-import contextlib
+from typing import Callable, Optional
 
 import numpy as np
-from PySide6.QtCore import QPoint, QRect, QSize, Qt, Signal
+from PySide6.QtCore import QPoint, QRect, Qt, Signal
 from PySide6.QtGui import (
     QColor,
     QDragEnterEvent,
@@ -20,7 +20,7 @@ from PySide6.QtGui import (
 )
 from PySide6.QtWidgets import QApplication, QLabel, QSizePolicy
 
-from one_dragon_qt.utils.image_utils import scale_pixmap_for_high_dpi
+from one_dragon_qt.utils.tiled_image import TiledImage, numpy_to_qimage
 
 
 class ZoomableClickImageLabel(QLabel):
@@ -40,8 +40,10 @@ class ZoomableClickImageLabel(QLabel):
         self.scale_factor = 1.0
         self.min_scale = 0.05
         self.max_scale = 8.0
-        self.original_pixmap: QPixmap = None
-        self.current_scaled_pixmap = QPixmap()  # 保存当前缩放级别的图像
+        self.original_pixmap: QPixmap = None  # 通过 QPixmap 设置时的原图
+        self.tiled_image: Optional[TiledImage] = None  # 分块的原图 只绘制可见部分 不再缩放整张图
+        # 叠加层 在原图坐标系中绘制 变化时不需要重新生成底图
+        self.overlay_painter: Optional[Callable[[QPainter], None]] = None
 
         # 拖动相关变量
         self.is_dragging = False
@@ -292,39 +294,36 @@ class ZoomableClickImageLabel(QLabel):
         old_pixmap = self.original_pixmap
         self.original_pixmap = pixmap
 
-        # 检查是否需要保留状态
-        should_preserve = (preserve_state and
-                          old_pixmap is not None and
-                          pixmap is not None and
-                          old_pixmap.size() == pixmap.size())
-
-        if not should_preserve:
-            self.image_offset = QPoint(0, 0)  # 重置偏移量
-            # 初始加载时，将图片宽度缩放到等于控件宽度
-            if self.width() > 0 and self.original_pixmap is not None:
-                self.scale_factor = self.width() / self.original_pixmap.width()
-                # 应用缩放上下限
-                self.scale_factor = max(self.min_scale, min(self.max_scale, self.scale_factor))
-            else:
-                self.scale_factor = 1.0
-
-        # 应用边界限制
-        self.image_offset = self._limit_image_bounds(self.image_offset)
-        # 更新缩放后的图像并触发重绘
-        self.update_scaled_pixmap()
+        if pixmap is None or pixmap.isNull():
+            self._set_tiled_image(None, preserve_state)
+        elif (old_pixmap is not None and self.tiled_image is not None
+              and old_pixmap.cacheKey() == pixmap.cacheKey()):
+            # 同一张图 沿用已经生成的瓦片
+            self._set_tiled_image(self.tiled_image, preserve_state)
+        else:
+            self._set_tiled_image(TiledImage(pixmap.toImage()), preserve_state)
 
     def setImage(self, image, preserve_state: bool = False):
         """
-        设置图像的接口，兼容Cv2Image和QPixmap
+        设置图像的接口，兼容Cv2Image、QPixmap和numpy数组(RGB)
         :param image: 图像对象
         :param preserve_state: 是否保留当前的缩放和位置状态
         """
         if image is None:
             self.original_pixmap = None
-            self.current_scaled_pixmap = QPixmap()
+            self.tiled_image = None
             self.update()
             return
 
+        if isinstance(image, np.ndarray):
+            # 直接由数组生成分块原图 不需要再转换一份完整的QPixmap
+            q_image = numpy_to_qimage(image)
+            if q_image is None:
+                return
+            self.original_pixmap = None
+            self._set_tiled_image(TiledImage(q_image), preserve_state)
+            return
+
         # 如果是Cv2Image对象，获取其QPixmap
         if hasattr(image, 'to_qpixmap'):
             pixmap = image.to_qpixmap()
@@ -339,11 +338,50 @@ class ZoomableClickImageLabel(QLabel):
 
         self.setPixmap(pixmap, preserve_state)
 
+    def set_overlay_painter(self, overlay_painter: Optional[Callable[[QPainter], None]]) -> None:
+        """
+        设置叠加层 只触发重绘 底图的瓦片不需要重新生成
+        :param overlay_painter: 绘制函数 画笔已经变换到原图坐标系
+        """
+        self.overlay_painter = overlay_painter
+        self.update()
+
+    def _set_tiled_image(self, tiled_image: Optional[TiledImage], preserve_state: bool) -> None:
+        """
+        更换分块原图 并按需重置缩放和位置
+        :param tiled_image: 分块原图
+        :param preserve_state: 是否保留当前的缩放和位置状态
+        """
+        old_tiled_image = self.tiled_image
+        self.tiled_image = tiled_image
+
+        # 检查是否需要保留状态
+        should_preserve = (preserve_state and
+                          old_tiled_image is not None and
+                          tiled_image is not None and
+                          old_tiled_image.width == tiled_image.width and
+                          old_tiled_image.height == tiled_image.height)
+
+        if not should_preserve:
+            self.image_offset = QPoint(0, 0)  # 重置偏移量
+            # 初始加载时，将图片宽度缩放到等于控件宽度
+            if self.width() > 0 and tiled_image is not None and tiled_image.width > 0:
+                self.scale_factor = self.width() / tiled_image.width
+                # 应用缩放上下限
+                self.scale_factor = max(self.min_scale, min(self.max_scale, self.scale_factor))
+            else:
+                self.scale_factor = 1.0
+
+        # 应用边界限制
+        self.image_offset = self._limit_image_bounds(self.image_offset)
+        # 更新缩放后的图像并触发重绘
+        self.update_scaled_pixmap()
+
     def wheelEvent(self, event: QWheelEvent):
         """
         实现以鼠标位置为基点的滚轮缩放
         """
-        if self.original_pixmap is None or self.original_pixmap.isNull():
+        if self.tiled_image is None or self.tiled_image.is_null():
             return
 
         # 获取鼠标在控件中的位置
@@ -383,7 +421,7 @@ class ZoomableClickImageLabel(QLabel):
         控件尺寸变化时，重新应用边界限制并更新显示
         """
         super().resizeEvent(event)
-        if self.original_pixmap is not None and not self.original_pixmap.isNull():
+        if self.tiled_image is not None and not self.tiled_image.is_null():
             # 应用边界限制
             self.image_offset = self._limit_image_bounds(self.image_offset)
             # 触发重绘以适应新尺寸
@@ -391,50 +429,43 @@ class ZoomableClickImageLabel(QLabel):
 
     def update_scaled_pixmap(self):
         """
-        根据缩放比例更新用于绘制的pixmap，并请求重绘。
-        这个函数只在缩放比例变化时调用。
+        缩放比例变化后请求重绘。
+        瓦片按需在 paintEvent 中生成和缓存，这里不再缩放整张图像。
         """
-        if self.original_pixmap is None or self.original_pixmap.isNull():
+        if self.tiled_image is None or self.tiled_image.is_null():
             return
 
-        # 计算目标逻辑尺寸
-        new_width = int(self.original_pixmap.width() * self.scale_factor)
-        new_height = int(self.original_pixmap.height() * self.scale_factor)
-        target_size = QSize(new_width, new_height)
-
-        self.current_scaled_pixmap = scale_pixmap_for_high_dpi(
-            self.original_pixmap,
-            target_size,
-            self.devicePixelRatio()
-        )
-
         # 请求重绘，让paintEvent来处理显示
         self.update()
 
     def paintEvent(self, event: QPaintEvent):
         """
         在控件上高效地绘制图像和选择矩形。
+        只绘制与需要重绘区域相交的瓦片。
         """
-        # 如果没有可绘制的图像，但存在原始图像，则尝试重新生成缩放后的 pixmap
-        if (self.current_scaled_pixmap.isNull()
-            and self.original_pixmap is not None
-            and not self.original_pixmap.isNull()
-        ):
-            # 尝试恢复 current_scaled_pixmap（防止在交互过程中被清空导致闪烁/消失）
-            with contextlib.suppress(Exception):
-                self.update_scaled_pixmap()
-
-        # 如果仍然没有可绘制的图像，调用父类的paintEvent
-        if self.current_scaled_pixmap.isNull():
+        # 如果没有可绘制的图像，调用父类的paintEvent
+        if self.tiled_image is None or self.tiled_image.is_null():
             super().paintEvent(event)
             return
 
         painter = QPainter(self)
         # 清空背景
-        painter.eraseRect(self.rect())
-
-        # 根据当前的偏移量，直接将缩放好的图像绘制到控件上
-        painter.drawPixmap(self.image_offset, self.current_scaled_pixmap)
+        painter.eraseRect(event.rect())
+
+        # 根据当前的偏移量和缩放比例，绘制可见的瓦片
+        self.tiled_image.paint(painter, self.image_offset, self.scale_factor, event.rect(),
+                               self.devicePixelRatio())
+
+        # 叠加层 使用原图坐标系绘制
+        if self.overlay_painter is not None:
+            painter.save()
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+            painter.translate(self.image_offset)
+            painter.scale(self.scale_factor, self.scale_factor)
+            try:
+                self.overlay_painter(painter)
+            finally:
+                painter.restore()
 
         # 如果正在进行矩形选择，绘制选择矩形
         if self.is_selecting:
@@ -472,7 +503,7 @@ class ZoomableClickImageLabel(QLabel):
         :param display_pos: 在控件上点击的坐标
         :return: 在原始图片上的坐标
         """
-        if self.original_pixmap is None:
+        if self.tiled_image is None:
             return None
 
         # 考虑图像偏移量，先减去偏移量得到在缩放图像上的真实坐标
@@ -504,12 +535,12 @@ class ZoomableClickImageLabel(QLabel):
         :param offset: 原始偏移量
         :return: 限制后的偏移量
         """
-        if self.original_pixmap is None:
+        if self.tiled_image is None:
             return offset
 
         # 获取缩放后的图像尺寸
-        scaled_width = int(self.original_pixmap.width() * self.scale_factor)
-        scaled_height = int(self.original_pixmap.height() * self.scale_factor)
+        scaled_width = int(self.tiled_image.width * self.scale_factor)
+        scaled_height = int(self.tiled_image.height * self.scale_factor)
 
         # 获取控件尺寸
         widget_width = self.width()
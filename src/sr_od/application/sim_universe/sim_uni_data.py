@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import Optional, List
 
-from one_dragon.utils import str_utils
+from one_dragon.utils.fuzzy_vocabulary import get_vocabulary
 from one_dragon.utils.i18_utils import gt
 
 
@@ -166,8 +166,8 @@ def path_of(path_str: str) -> Optional[SimUniPath]:
 
 def match_best_path_by_ocr(path_ocr: str) -> Optional[SimUniPath]:
     path_list = [path for path in SimUniPath]
-    target_path_list = [gt(path.value, 'ocr') for path in SimUniPath]
-    idx = str_utils.find_best_match_by_lcs(path_ocr, target_path_list)
+    vocabulary = get_vocabulary('sim_uni_path', lambda: [gt(path.value, 'ocr') for path in SimUniPath])
+    idx = vocabulary.find_best_match(path_ocr)
     if idx is None:
         return None
     else:
@@ -475,9 +475,12 @@ def match_best_bless_by_ocr(title_ocr: str, path_ocr: str) -> Optional[SimUniBle
         return None
 
     bless_list = PATH_BLESS_LIST[path.value]
-    target_title_list = [gt(bless.title, 'ocr') for bless in bless_list if bless.title != bless.path.value]
+    vocabulary = get_vocabulary(
+        f'sim_uni_bless_{path.value}',
+        lambda: [gt(bless.title, 'ocr') for bless in bless_list if bless.title != bless.path.value]
+    )
 
-    idx = str_utils.find_best_match_by_lcs(title_ocr, target_title_list)
+    idx = vocabulary.find_best_match(title_ocr)
     if idx is None:  # 未录入的祝福
         return bless_list[0]
     else:
@@ -576,8 +579,8 @@ def match_best_curio_by_ocr(name_ocr: str) -> Optional[SimUniCurio]:
     :param name_ocr: OCR得到的奇物名称
     :return:
     """
-    target_list = [gt(c.value.name, 'ocr') for c in SimUniCurioEnum.__members__.values()]
-    idx = str_utils.find_best_match_by_lcs(name_ocr, target_list)
+    vocabulary = get_vocabulary('sim_uni_curio', lambda: [gt(c.value.name, 'ocr') for c in SimUniCurioEnum.__members__.values()])
+    idx = vocabulary.find_best_match(name_ocr)
     if idx is not None:
         return SimUniCurioEnum['CURIO_%03d' % idx].value
     else:
@@ -96,6 +96,8 @@ class WorldPatrolApp(SrApplication):
         route = self.route_list[self.current_route_idx]
 
         self.current_route_start_time = time.time()
+        if self.current_route_idx + 1 < len(self.route_list):  # 后台预加载下一条路线的地图
+            self.ctx.map_data.prefetch_large_map_info(self.route_list[self.current_route_idx + 1].tp.region)
         op = WorldPatrolRunRoute(self.ctx, route)
         route_result = op.execute().success
 
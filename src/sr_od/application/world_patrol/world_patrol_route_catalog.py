@@ -0,0 +1,152 @@
+import hashlib
+import os
+import threading
+from typing import Optional
+
+from one_dragon.base.config.json_operator import JsonOperator
+from one_dragon.utils import i18_utils, os_utils
+
+ROUTE_CATALOG_VERSION: int = 1  # 目录格式的版本 变化时重新建立目录
+
+
+def get_route_catalog_path() -> str:
+    """
+    路线目录的文件路径
+    """
+    return os.path.join(os_utils.get_path_under_work_dir('config', 'world_patrol'), 'route_catalog.json')
+
+
+def cal_file_hash(file_path: str) -> str:
+    """
+    计算文件内容的哈希
+    :param file_path: 文件路径
+    :return:
+    """
+    with open(file_path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+class WorldPatrolRouteCatalog:
+
+    def __init__(self, file_path: Optional[str] = None):
+        """
+        路线文件的目录 记录每个路线文件匹配到的传送点
+        加载路线时 文件没有变化就直接使用记录的传送点 不需要读取路线文件再模糊匹配星球、区域、传送点
+        - 修改时间和大小都没变 认为文件没有变化
+        - 否则比较文件内容的哈希 内容相同时只更新修改时间
+        - 语言变化时 OCR使用的名称也会变化 整个目录重新建立
+        :param file_path: 目录的文件路径 不传入时不保存到磁盘
+        """
+        self._op: JsonOperator = JsonOperator(file_path)
+        self._lock = threading.Lock()
+        self._dirty: bool = False
+        self.check_version()
+
+    def check_version(self) -> None:
+        """
+        目录的版本或语言与当前不一致时 清空目录
+        """
+        lang = i18_utils.get_default_lang()
+        with self._lock:
+            data = self._op.data
+            if (data.get('version') == ROUTE_CATALOG_VERSION and data.get('lang') == lang
+                    and isinstance(data.get('routes'), dict)):
+                return
+            self._op.data = {
+                'version': ROUTE_CATALOG_VERSION,
+                'lang': lang,
+                'routes': {},
+            }
+            self._dirty = True
+
+    @property
+    def _routes(self) -> dict[str, dict]:
+        return self._op.data['routes']
+
+    def get_tp_id(self, unique_id: str, route_path: str, file_stat: os.stat_result) -> Optional[str]:
+        """
+        获取路线文件记录的传送点
+        :param unique_id: 路线的唯一标识
+        :param route_path: 路线文件路径
+        :param file_stat: 路线文件的状态
+        :return: 传送点的唯一标识 文件有变化或没有记录时返回None
+        """
+        with self._lock:
+            entry = self._routes.get(unique_id)
+            if entry is None:
+                return None
+            if entry.get('mtime_ns') == file_stat.st_mtime_ns and entry.get('size') == file_stat.st_size:
+                return entry.get('tp')
+
+            try:
+                file_hash = cal_file_hash(route_path)
+            except Exception:
+                return None
+            if entry.get('hash') != file_hash:
+                return None
+
+            # 内容没有变化 只是修改时间变了
+            entry['mtime_ns'] = file_stat.st_mtime_ns
+            entry['size'] = file_stat.st_size
+            self._dirty = True
+            return entry.get('tp')
+
+    def update(self, unique_id: str, route_path: str, file_stat: os.stat_result,
+               planet_id: str, region_id: str, tp_id: str) -> None:
+        """
+        记录路线文件匹配到的传送点
+        :param unique_id: 路线的唯一标识
+        :param route_path: 路线文件路径
+        :param file_stat: 路线文件的状态
+        :param planet_id: 星球 np_id
+        :param region_id: 区域 prl_id
+        :param tp_id: 传送点 unique_id
+        :return:
+        """
+        try:
+            file_hash = cal_file_hash(route_path)
+        except Exception:
+            return
+        with self._lock:
+            self._routes[unique_id] = {
+                'mtime_ns': file_stat.st_mtime_ns,
+                'size': file_stat.st_size,
+                'hash': file_hash,
+                'planet': planet_id,
+                'region': region_id,
+                'tp': tp_id,
+            }
+            self._dirty = True
+
+    def remove(self, unique_id: str) -> None:
+        """
+        删除一条路线的记录 记录的传送点已经不存在时使用
+        :param unique_id: 路线的唯一标识
+        :return:
+        """
+        with self._lock:
+            if self._routes.pop(unique_id, None) is not None:
+                self._dirty = True
+
+    def retain(self, unique_id_set: set[str]) -> None:
+        """
+        只保留存在的路线 扫描了全部路线文件夹之后使用
+        :param unique_id_set: 存在的路线
+        :return:
+        """
+        with self._lock:
+            to_remove = [i for i in self._routes if i not in unique_id_set]
+            for i in to_remove:
+                self._routes.pop(i)
+            if len(to_remove) > 0:
+                self._dirty = True
+
+    def save(self) -> None:
+        """
+        有变化时保存到磁盘
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._op.save()
+            self._dirty = False
@@ -9,13 +9,36 @@ from sr_od.application.world_patrol import world_patrol_route_utils
 from sr_od.sr_map.sr_map_data import SrMapData
 from sr_od.sr_map.sr_map_def import Planet, Region, SpecialPoint
 from sr_od.application.world_patrol.world_patrol_route import WorldPatrolRoute
+from sr_od.application.world_patrol.world_patrol_route_catalog import WorldPatrolRouteCatalog, get_route_catalog_path
 from sr_od.application.world_patrol.world_patrol_whitelist_config import WorldPatrolWhitelist, WorldPatrolWhiteListType
 
 
 class WorldPatrolRouteData:
 
-    def __init__(self, map_data: SrMapData):
+    def __init__(self, map_data: SrMapData, catalog_path: Optional[str] = None):
+        """
+        :param map_data: 地图数据
+        :param catalog_path: 路线目录的文件路径 不传入时使用默认路径
+        """
         self.map_data: SrMapData = map_data
+        self.catalog: WorldPatrolRouteCatalog = WorldPatrolRouteCatalog(
+            catalog_path if catalog_path is not None else get_route_catalog_path()
+        )
+
+        self._sp_map: dict[str, SpecialPoint] = {}  # 传送点 unique_id -> 传送点
+        self._sp_map_source: Optional[List[SpecialPoint]] = None  # 构建 _sp_map 时使用的传送点列表 地图数据重新加载后需要重建
+
+    def _get_sp_by_unique_id(self, tp_id: str) -> Optional[SpecialPoint]:
+        """
+        根据唯一标识获取传送点
+        :param tp_id: 传送点 unique_id
+        :return:
+        """
+        sp_list = self.map_data.sp_list
+        if self._sp_map_source is not sp_list:
+            self._sp_map = {sp.unique_id: sp for sp in sp_list}
+            self._sp_map_source = sp_list
+        return self._sp_map.get(tp_id)
 
     def load_all_route(self, whitelist: WorldPatrolWhitelist = None, finished: List[str] = None,
                        target_planet: Optional[Planet] = None,
@@ -34,9 +57,13 @@ class WorldPatrolRouteData:
         :return:
         """
         # 需要排除的部分
-        finished_unique_id = [] if finished is None else finished
+        finished_unique_id: set[str] = set() if finished is None else set(finished)
+        whitelist_id_set: Optional[set[str]] = None if whitelist is None else set(whitelist.list)
+        whitelist_type: Optional[str] = None if whitelist is None else whitelist.type
 
+        self.catalog.check_version()
         route_list: List[WorldPatrolRoute] = []
+        existed_unique_id: set[str] = set()
 
         for planet in self.map_data.planet_list:
             for is_public in [True, False]:
@@ -53,44 +80,94 @@ class WorldPatrolRouteData:
                         continue
 
                     route_path = os.path.join(planet_dir, route_filename)
-                    route = self.load_route_by_yaml_path(route_path,
-                                                         target_planet=target_planet,
-                                                         target_region=target_region,
-                                                         finished_unique_id=finished_unique_id,
-                                                         whitelist=whitelist)
+                    # 与 WorldPatrolRoute.unique_id 一致
+                    route_id = f'personal_{route_filename[:-4]}' if route_path.find('personal') != -1 else route_filename[:-4]
+                    existed_unique_id.add(route_id)
+
+                    # 不需要读取文件就能判断的筛选
+                    if route_id in finished_unique_id:
+                        continue
+                    if whitelist_id_set is not None:
+                        if whitelist_type == 'white' and route_id not in whitelist_id_set:
+                            continue
+                        if whitelist_type == 'black' and route_id in whitelist_id_set:
+                            continue
+
+                    route = self._load_route_with_catalog(route_path, route_id,
+                                                          target_planet=target_planet,
+                                                          target_region=target_region)
                     if route is not None:
                         route_list.append(route)
 
+        if include_public and include_personal:  # 扫描了所有路线文件夹 可以清理已删除的路线
+            self.catalog.retain(existed_unique_id)
+        self.catalog.save()
+
         log.info('最终加载 %d 条线路 过滤已完成 %d 条 使用名单 %s',
                  len(route_list), len(finished_unique_id), 'None' if whitelist is None else whitelist.name)
 
         # 白名单的情况下 按照白名单的顺序返回
-        if whitelist is not None and whitelist.type == WorldPatrolWhiteListType.WHITE.value.value:
-            sorted_route_list = []
-            for target_route_id in whitelist.list:
-                for route in route_list:
-                    if route.unique_id == target_route_id:
-                        sorted_route_list.append(route)
-                        break
-            return sorted_route_list
+        if whitelist is not None and whitelist_type == WorldPatrolWhiteListType.WHITE.value.value:
+            route_map: dict[str, WorldPatrolRoute] = {}
+            for route in route_list:
+                if route.unique_id not in route_map:
+                    route_map[route.unique_id] = route
+            return [route_map[i] for i in whitelist.list if i in route_map]
         else:
             return route_list
 
-    def load_route_by_yaml_path(self, yaml_path: str,
-                                target_planet: Optional[Planet] = None,
-                                target_region: Optional[Region] = None,
-                                finished_unique_id: List[str] = None,
-                                whitelist: WorldPatrolWhitelist = None) -> Optional[WorldPatrolRoute]:
+    def _load_route_with_catalog(self, yaml_path: str, route_id: str,
+                                 target_planet: Optional[Planet] = None,
+                                 target_region: Optional[Region] = None) -> Optional[WorldPatrolRoute]:
         """
+        优先使用路线目录中记录的传送点 不符合星球、区域筛选时不需要读取路线文件
+        目录中没有记录或文件有变化时 读取文件匹配传送点 并更新目录
         :param yaml_path: 路线文件路径
+        :param route_id: 路线的唯一标识
         :param target_planet: 传入后 筛选相同星球的路线
         :param target_region: 传入后 筛选相同区域的路线 忽略楼层
-        :param whitelist: 传入后 按名单筛选路线
-        :param finished_unique_id: 传入后 排除已经完成的路线
+        :return:
         """
+        try:
+            file_stat = os.stat(yaml_path)
+        except OSError:
+            return None
+
+        tp: Optional[SpecialPoint] = None
+        tp_id = self.catalog.get_tp_id(route_id, yaml_path, file_stat)
+        if tp_id is not None:
+            tp = self._get_sp_by_unique_id(tp_id)
+            if tp is None:  # 地图数据变化了 重新匹配
+                self.catalog.remove(route_id)
+
+        if tp is not None:
+            if target_planet is not None and target_planet.np_id != tp.planet.np_id:
+                return None
+            if target_region is not None and target_region.pr_id != tp.region.pr_id:
+                return None
+            yaml_op = YamlOperator(yaml_path)
+            return WorldPatrolRoute(tp, yaml_op.data, yaml_path)
+
         yaml_op = YamlOperator(yaml_path)
-        route_filename = os.path.basename(yaml_path)
+        tp = self._match_route_tp(yaml_op, os.path.basename(yaml_path))
+        if tp is None:
+            return None
+        self.catalog.update(route_id, yaml_path, file_stat,
+                            planet_id=tp.planet.np_id, region_id=tp.region.prl_id, tp_id=tp.unique_id)
 
+        if target_planet is not None and target_planet.np_id != tp.planet.np_id:
+            return None
+        if target_region is not None and target_region.pr_id != tp.region.pr_id:
+            return None
+        return WorldPatrolRoute(tp, yaml_op.data, yaml_path)
+
+    def _match_route_tp(self, yaml_op: YamlOperator, route_filename: str) -> Optional[SpecialPoint]:
+        """
+        根据路线文件中的名称 匹配传送点
+        :param yaml_op: 路线文件
+        :param route_filename: 路线文件名称 用于日志
+        :return:
+        """
         planet_name = yaml_op.get('planet', None)
         region_name = yaml_op.get('region', None)
         floor = yaml_op.get('floor', None)
@@ -99,35 +176,54 @@ class WorldPatrolRouteData:
         planet = self.map_data.best_match_planet_by_name(planet_name)
         if planet is None:
             log.error(f'路线 {route_filename} 无法匹配星球')
-            return
-
-        if target_planet is not None and target_planet.np_id != planet.np_id:
-            return
+            return None
 
         region = self.map_data.best_match_region_by_name(region_name, planet, target_floor=floor)
         if region is None:
             log.error(f'路线 {route_filename} 无法匹配区域')
-            return
-
-        if target_region is not None and target_region.pr_id != region.pr_id:
-            return
+            return None
 
         tp = self.map_data.best_match_sp_by_name(region, gt(tp_name, 'ocr'))
         if tp is None:
             log.error(f'路线 {route_filename} 无法匹配传送点')
-            return
+            return None
+
+        return tp
+
+    def load_route_by_yaml_path(self, yaml_path: str,
+                                target_planet: Optional[Planet] = None,
+                                target_region: Optional[Region] = None,
+                                finished_unique_id: List[str] = None,
+                                whitelist: WorldPatrolWhitelist = None) -> Optional[WorldPatrolRoute]:
+        """
+        :param yaml_path: 路线文件路径
+        :param target_planet: 传入后 筛选相同星球的路线
+        :param target_region: 传入后 筛选相同区域的路线 忽略楼层
+        :param whitelist: 传入后 按名单筛选路线
+        :param finished_unique_id: 传入后 排除已经完成的路线
+        """
+        yaml_op = YamlOperator(yaml_path)
+        tp = self._match_route_tp(yaml_op, os.path.basename(yaml_path))
+        if tp is None:
+            return None
+
+        if target_planet is not None and target_planet.np_id != tp.planet.np_id:
+            return None
+
+        if target_region is not None and target_region.pr_id != tp.region.pr_id:
+            return None
 
         route = WorldPatrolRoute(tp, yaml_op.data, yaml_path)
         route_id = route.unique_id
 
         if finished_unique_id is not None and route_id in finished_unique_id:
-            return
+            return None
 
         if whitelist is not None:
             if whitelist.type == 'white' and route_id not in whitelist.list:
-                return
+                return None
             if whitelist.type == 'black' and route_id in whitelist.list:
-                return
+                return None
 
         return route
 
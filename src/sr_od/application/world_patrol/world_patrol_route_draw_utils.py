@@ -1,7 +1,8 @@
 import time
 
 import cv2
-from typing import Tuple, Optional
+from cv2.typing import MatLike
+from typing import List, Tuple, Optional
 
 from one_dragon.base.geometry.point import Point
 from one_dragon.base.matcher.match_result import MatchResult
@@ -15,6 +16,41 @@ from sr_od.operations.move.cal_pos_utils import VerifyPosInfo
 from sr_od.sr_map import mini_map_utils, large_map_utils
 from sr_od.sr_map.sr_map_def import Region
 
+ROUTE_DRAW_CIRCLE: str = 'circle'  # 圆 thickness 为负数时填充
+ROUTE_DRAW_LINE: str = 'line'  # 线段
+ROUTE_DRAW_TEXT: str = 'text'  # 文本 pos 为左下角
+
+
+class RouteDrawItem:
+
+    def __init__(self, kind: str, pos: Tuple[int, int], color: Tuple[int, int, int], thickness: int = 1,
+                 radius: int = 0, end_pos: Optional[Tuple[int, int]] = None,
+                 text: Optional[str] = None, font_scale: float = 0.6):
+        """
+        路线上需要画出的一个图形 坐标为大地图坐标 颜色为RGB
+        同时用于 cv2 画到图片上 和 界面上单独的叠加层
+        """
+        self.kind: str = kind
+        self.pos: Tuple[int, int] = (int(pos[0]), int(pos[1]))
+        self.color: Tuple[int, int, int] = color
+        self.thickness: int = thickness
+        self.radius: int = radius
+        self.end_pos: Optional[Tuple[int, int]] = None if end_pos is None else (int(end_pos[0]), int(end_pos[1]))
+        self.text: Optional[str] = text
+        self.font_scale: float = font_scale
+
+    @staticmethod
+    def circle(pos, radius: int, color: Tuple[int, int, int], thickness: int) -> 'RouteDrawItem':
+        return RouteDrawItem(ROUTE_DRAW_CIRCLE, pos, color, thickness=thickness, radius=radius)
+
+    @staticmethod
+    def line(pos, end_pos, color: Tuple[int, int, int], thickness: int) -> 'RouteDrawItem':
+        return RouteDrawItem(ROUTE_DRAW_LINE, pos, color, thickness=thickness, end_pos=end_pos)
+
+    @staticmethod
+    def text(text: str, pos, font_scale: float, color: Tuple[int, int, int], thickness: int) -> 'RouteDrawItem':
+        return RouteDrawItem(ROUTE_DRAW_TEXT, pos, color, thickness=thickness, text=text, font_scale=font_scale)
+
 
 def can_change_tp(route: WorldPatrolRoute) -> bool:
     """
@@ -109,24 +145,24 @@ def cal_pos_by_screenshot(ctx: SrContext, route: WorldPatrolRoute, debug: bool =
         return None, None
 
 
-def get_route_image(ctx: SrContext, route: WorldPatrolRoute):
+def get_route_draw_items(ctx: SrContext, route: WorldPatrolRoute) -> Tuple[Region, List[RouteDrawItem]]:
     """
-    获取路线的图片
+    获取路线需要画出的图形 只画出最后一个区域内的部分
     :param ctx: 上下文
-    :param route: 路线 在传送点还没有选的时候 可能为空
-    :return:
+    :param route: 路线
+    :return: 需要显示的区域 和 图形列表
     """
     to_display_region, _ = get_last_pos(ctx, route)
     current_region = route.tp.region
 
-    display_image = ctx.map_data.get_large_map_info(to_display_region).raw.copy()
+    items: List[RouteDrawItem] = []
 
     last_point = None
     if route.tp is not None:
         last_point = route.tp.tp_pos.tuple()
         if current_region.pr_id == to_display_region.pr_id:  # 只画出最后一个区域的地图
-            cv2.circle(display_image, route.tp.lm_pos.tuple(), 15, color=(100, 255, 100), thickness=2)
-            cv2.circle(display_image, route.tp.tp_pos.tuple(), 5, color=(0, 255, 0), thickness=2)
+            items.append(RouteDrawItem.circle(route.tp.lm_pos.tuple(), 15, color=(100, 255, 100), thickness=2))
+            items.append(RouteDrawItem.circle(route.tp.tp_pos.tuple(), 5, color=(0, 255, 0), thickness=2))
     for route_item in route.route_list:
         if route_item.op in [operation_const.OP_MOVE, operation_const.OP_SLOW_MOVE, operation_const.OP_NO_POS_MOVE]:
             if route_item.op == operation_const.OP_NO_POS_MOVE:
@@ -134,36 +170,37 @@ def get_route_image(ctx: SrContext, route: WorldPatrolRoute):
             else:
                 pos = route_item.data
             if current_region.pr_id == to_display_region.pr_id:
-                cv2.circle(display_image, pos[:2], 5, color=(0, 0, 255), thickness=-1)
+                items.append(RouteDrawItem.circle(pos[:2], 5, color=(0, 0, 255), thickness=-1))
                 if last_point is not None:
-                    cv2.line(display_image, last_point[:2], pos[:2],
-                             color=(255, 0, 0) if route_item.op == operation_const.OP_MOVE else (255, 255, 0),
-                             thickness=2)
-                cv2.putText(display_image, str(route_item.idx), (pos[0] - 5, pos[1] - 13),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 1, cv2.LINE_AA)
+                    items.append(RouteDrawItem.line(
+                        last_point[:2], pos[:2],
+                        color=(255, 0, 0) if route_item.op == operation_const.OP_MOVE else (255, 255, 0),
+                        thickness=2))
+                items.append(RouteDrawItem.text(str(route_item.idx), (pos[0] - 5, pos[1] - 13),
+                                                font_scale=0.6, color=(0, 0, 255), thickness=1))
             last_point = pos
         elif route_item.op == operation_const.OP_PATROL:
             if current_region.pr_id == to_display_region.pr_id:
                 if last_point is not None:
-                    cv2.circle(display_image, last_point[:2], 10, color=(0, 255, 255), thickness=2)
+                    items.append(RouteDrawItem.circle(last_point[:2], 10, color=(0, 255, 255), thickness=2))
         elif route_item.op == operation_const.OP_DISPOSABLE:
             if current_region.pr_id == to_display_region.pr_id:
                 if last_point is not None:
-                    cv2.circle(display_image, last_point[:2], 10, color=(67, 34, 49), thickness=2)
+                    items.append(RouteDrawItem.circle(last_point[:2], 10, color=(67, 34, 49), thickness=2))
         elif route_item.op in [operation_const.OP_INTERACT, operation_const.OP_CATAPULT, operation_const.OP_GAMEPLAY_INTERACT]:
             if current_region.pr_id == to_display_region.pr_id:
                 if last_point is not None:
-                    cv2.circle(display_image, last_point[:2], 12, color=(255, 0, 255), thickness=2)
+                    items.append(RouteDrawItem.circle(last_point[:2], 12, color=(255, 0, 255), thickness=2))
         elif route_item.op == operation_const.OP_WAIT:
             if current_region.pr_id == to_display_region.pr_id:
                 if last_point is not None:
-                    cv2.circle(display_image, last_point[:2], 14, color=(255, 255, 255), thickness=2)
+                    items.append(RouteDrawItem.circle(last_point[:2], 14, color=(255, 255, 255), thickness=2))
         elif route_item.op == operation_const.OP_UPDATE_POS:
             pos = route_item.data
             if current_region.pr_id == to_display_region.pr_id:
-                cv2.circle(display_image, pos[:2], 5, color=(0, 0, 255), thickness=-1)
-                cv2.putText(display_image, str(route_item.idx), (pos[0] - 5, pos[1] - 13),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 1, cv2.LINE_AA)
+                items.append(RouteDrawItem.circle(pos[:2], 5, color=(0, 0, 255), thickness=-1))
+                items.append(RouteDrawItem.text(str(route_item.idx), (pos[0] - 5, pos[1] - 13),
+                                                font_scale=0.6, color=(0, 0, 255), thickness=1))
             last_point = pos
             if len(pos) > 2:
                 current_region = ctx.map_data.region_with_another_floor(current_region, int(pos[2]))
@@ -172,7 +209,37 @@ def get_route_image(ctx: SrContext, route: WorldPatrolRoute):
         elif route_item.op in [operation_const.OP_BAN_TECH, operation_const.OP_ALLOW_TECH]:
             pass
 
-    return display_image
+    return to_display_region, items
+
+
+def draw_route_items(image: MatLike, items: List[RouteDrawItem]) -> MatLike:
+    """
+    使用 cv2 把路线图形画到图片上
+    :param image: 图片 会直接修改
+    :param items: 图形列表
+    :return:
+    """
+    for item in items:
+        if item.kind == ROUTE_DRAW_CIRCLE:
+            cv2.circle(image, item.pos, item.radius, color=item.color, thickness=item.thickness)
+        elif item.kind == ROUTE_DRAW_LINE:
+            cv2.line(image, item.pos, item.end_pos, color=item.color, thickness=item.thickness)
+        elif item.kind == ROUTE_DRAW_TEXT:
+            cv2.putText(image, item.text, item.pos,
+                        cv2.FONT_HERSHEY_SIMPLEX, item.font_scale, item.color, item.thickness, cv2.LINE_AA)
+    return image
+
+
+def get_route_image(ctx: SrContext, route: WorldPatrolRoute):
+    """
+    获取路线的图片
+    :param ctx: 上下文
+    :param route: 路线 在传送点还没有选的时候 可能为空
+    :return:
+    """
+    to_display_region, items = get_route_draw_items(ctx, route)
+    display_image = ctx.map_data.get_large_map_info(to_display_region).raw.copy()
+    return draw_route_items(display_image, items)
 
 
 def add_move(ctx: SrContext, route: WorldPatrolRoute, x: int, y: int, floor: int):
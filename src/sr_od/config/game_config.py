@@ -235,6 +235,18 @@ class GameConfig(BasicGameConfig):
     def use_quirky_snacks_adapter(self) -> YamlConfigAdapter:
         return YamlConfigAdapter(self, 'use_quirky_snacks', True)
 
+    @property
+    def large_map_cache_mb(self) -> int:
+        """
+        大地图缓存的内存预算 单位MB 超出后淘汰最久没使用的地图 <=0 时不淘汰
+        :return:
+        """
+        return self.get('large_map_cache_mb', 1024)
+
+    @large_map_cache_mb.setter
+    def large_map_cache_mb(self, new_value: int):
+        self.update('large_map_cache_mb', new_value)
+
     @property
     def win_title(self) -> str:
         """
@@ -231,7 +231,8 @@ class SrContext(OneDragonContext):
             game_config=self.game_config,
             screenshot_method=self.env_config.screenshot_method,
             standard_width=self.project_config.screen_standard_width,
-            standard_height=self.project_config.screen_standard_height
+            standard_height=self.project_config.screen_standard_height,
+            background_screenshot_fps=self.env_config.background_screenshot_fps,
         )
         self.controller.set_window_title(self._get_win_title())
 
@@ -254,6 +255,7 @@ class SrContext(OneDragonContext):
 
         from sr_od.config.game_config import GameConfig
         self.game_config: GameConfig = GameConfig(self.current_instance_idx)
+        self.map_data.set_large_map_cache_mb(self.game_config.large_map_cache_mb)
         from one_dragon.base.config.game_account_config import GameAccountConfig
         self.game_account_config: GameAccountConfig = GameAccountConfig(self.current_instance_idx)
         from one_dragon.base.config.notify_config import NotifyConfig
@@ -20,11 +20,13 @@ class SrPcController(PcControllerBase):
     def __init__(self, game_config: GameConfig,
                  screenshot_method: str,
                  standard_width: int = 1920,
-                 standard_height: int = 1080):
+                 standard_height: int = 1080,
+                 background_screenshot_fps: float = 0):
         PcControllerBase.__init__(self,
                                   screenshot_method=screenshot_method,
                                   standard_width=standard_width,
-                                  standard_height=standard_height)
+                                  standard_height=standard_height,
+                                  background_screenshot_fps=background_screenshot_fps)
 
         self.game_config: GameConfig = game_config
         self.turn_dx: float = self.game_config.turn_dx
@@ -205,6 +207,7 @@ class SrPcController(PcControllerBase):
         if dx == 0 and dy == 0:
             return
         ctypes.windll.user32.mouse_event(self.MOUSEEVENTF_MOVE, int(dx), int(dy))
+        self.screenshot_controller.mark_input()
 
     def cal_move_distance_by_time(self, seconds: float):
         """
@@ -0,0 +1,481 @@
+import argparse
+import json
+import os
+import re
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from cv2.typing import MatLike
+
+from one_dragon.base.config.yaml_operator import YamlOperator
+from one_dragon.base.geometry.point import Point
+from one_dragon.base.geometry.rectangle import Rect
+from one_dragon.base.matcher.match_result import MatchResult
+from one_dragon.utils import cal_utils, cv2_utils, os_utils
+from one_dragon.utils.log_utils import log
+from sr_od.context.sr_context import SrContext
+from sr_od.operations.move import cal_pos_utils
+from sr_od.operations.move.cal_pos_utils import VerifyPosInfo
+from sr_od.sr_map import large_map_utils, mini_map_utils
+from sr_od.sr_map.large_map_info import LargeMapInfo
+from sr_od.sr_map.mini_map_info import MiniMapInfo
+from sr_od.sr_map.sr_map_def import Region
+
+CORPUS_GPS: str = 'gps'  # record_pos_utils.save_sample 保存的样例 有真实坐标
+CORPUS_CAL_POS_FAIL: str = 'cal_pos_fail'  # cal_pos_utils.save_as_test_case 保存的识别失败样例 只有校验信息
+
+METHOD_WORLD_PATROL: str = 'world_patrol'  # cal_pos_utils.cal_character_pos
+METHOD_SIM_UNI: str = 'sim_uni'  # cal_pos_utils.sim_uni_cal_pos
+
+DEFAULT_SEARCH_RADIUS: int = 50  # gps样例没有上一个坐标 以真实坐标为中心 按这个移动距离截取大地图
+DEFAULT_ERROR_THRESHOLD: float = 5  # 与真实坐标的距离不超过这个值时 认为识别正确
+
+_POINT_PATTERN = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+class ReplaySample:
+
+    def __init__(self, corpus: str, case_id: str, region: Region, mm: MatLike,
+                 truth_pos: Optional[Point] = None,
+                 verify: Optional[VerifyPosInfo] = None):
+        """
+        一个回放样例
+        :param corpus: 样例来源
+        :param case_id: 样例标识 区域/时间戳
+        :param region: 所属区域
+        :param mm: 小地图截图
+        :param truth_pos: 真实坐标 gps样例才有
+        :param verify: 校验信息 cal_pos_fail样例才有
+        """
+        self.corpus: str = corpus
+        self.case_id: str = case_id
+        self.region: Region = region
+        self.mm: MatLike = mm
+        self.truth_pos: Optional[Point] = truth_pos
+        self.verify: Optional[VerifyPosInfo] = verify
+
+    def get_possible_pos(self, search_radius: int) -> Optional[tuple]:
+        """
+        截取大地图使用的潜在位置 与移动中计算坐标时一致
+        :param search_radius: gps样例使用的移动距离 <=0 时使用整张大地图
+        :return:
+        """
+        if self.verify is not None and self.verify.last_pos is not None:
+            return self.verify.last_pos.x, self.verify.last_pos.y, self.verify.max_distance or 0
+        if self.truth_pos is not None and search_radius > 0:
+            return self.truth_pos.x, self.truth_pos.y, search_radius
+        return None
+
+
+def parse_point(value) -> Optional[Point]:
+    """
+    解析 verify.yml 中保存的坐标 格式为 Point 的字符串 (x, y)
+    :param value: 配置值
+    :return:
+    """
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)) and len(value) >= 2:
+        return Point(int(value[0]), int(value[1]))
+    num_list = _POINT_PATTERN.findall(str(value))
+    if len(num_list) < 2:
+        return None
+    return Point(int(float(num_list[0])), int(float(num_list[1])))
+
+
+def _list_case_dir(corpus_dir: str) -> List[tuple]:
+    """
+    列出样例文件夹 结构为 区域prl_id/时间戳
+    :param corpus_dir: 样例根目录
+    :return: (prl_id, 时间戳, 文件夹)
+    """
+    case_list = []
+    if not os.path.isdir(corpus_dir):
+        return case_list
+    for prl_id in sorted(os.listdir(corpus_dir)):
+        prl_dir = os.path.join(corpus_dir, prl_id)
+        if not os.path.isdir(prl_dir):
+            continue
+        for case_id in sorted(os.listdir(prl_dir)):
+            case_dir = os.path.join(prl_dir, case_id)
+            if os.path.isdir(case_dir):
+                case_list.append((prl_id, case_id, case_dir))
+    return case_list
+
+
+def load_samples(ctx: SrContext, corpus: str, corpus_dir: Optional[str] = None,
+                 max_cnt: Optional[int] = None) -> List[ReplaySample]:
+    """
+    读取某个来源的所有样例
+    :param ctx: 上下文
+    :param corpus: 样例来源
+    :param corpus_dir: 样例根目录 默认为 .debug 下对应的文件夹
+    :param max_cnt: 最多读取的数量
+    :return:
+    """
+    if corpus_dir is None:
+        corpus_dir = os.path.join(os_utils.get_work_dir(), '.debug', corpus)
+    region_map: Dict[str, Region] = {i.prl_id: i for i in ctx.map_data.region_list}
+
+    sample_list: List[ReplaySample] = []
+    for prl_id, case_id, case_dir in _list_case_dir(corpus_dir):
+        if max_cnt is not None and len(sample_list) >= max_cnt:
+            break
+        region = region_map.get(prl_id)
+        if region is None:
+            log.error('样例所属区域不存在 %s', case_dir)
+            continue
+        mm = cv2_utils.read_image(os.path.join(case_dir, 'mm.png'))
+        if mm is None:
+            continue
+
+        if corpus == CORPUS_GPS:
+            yml = YamlOperator(os.path.join(case_dir, 'pos.yml'))
+            pos = MatchResult(1, yml.get('x'), yml.get('y'), yml.get('w'), yml.get('h'),
+                              template_scale=yml.get('template_scale', 1))
+            sample_list.append(ReplaySample(corpus, f'{prl_id}/{case_id}', region, mm, truth_pos=pos.center))
+        else:
+            yml = YamlOperator(os.path.join(case_dir, 'verify.yml'))
+            max_distance = yml.get('max_distance')
+            verify = VerifyPosInfo(
+                last_pos=parse_point(yml.get('last_pos')),
+                max_distance=float(max_distance) if max_distance is not None else None,
+                line_p1=parse_point(yml.get('line_p1')),
+                line_p2=parse_point(yml.get('line_p2')),
+            )
+            if verify.last_pos is None or verify.max_distance is None:  # 无法校验
+                verify = None
+            sample_list.append(ReplaySample(corpus, f'{prl_id}/{case_id}', region, mm, verify=verify))
+
+    return sample_list
+
+
+def _get_strategy_list(method: str) -> List[tuple]:
+    """
+    计算坐标时 按顺序尝试的匹配方式
+    :param method: 计算坐标的方法
+    :return: (名称, 函数 是否需要缩放比例和校验信息)
+    """
+    if method == METHOD_SIM_UNI:
+        return [
+            ('gray', cal_pos_utils.sim_uni_cal_pos_by_gray, True),
+            ('raw', cal_pos_utils.sim_uni_cal_pos_by_raw, True),
+        ]
+    else:
+        return [
+            ('road_mask', cal_pos_utils.cal_character_pos_by_road_mask, True),
+            ('sp', cal_pos_utils.cal_character_pos_by_sp_result, False),
+            ('gray', cal_pos_utils.cal_character_pos_by_gray, True),
+            ('raw', cal_pos_utils.cal_character_pos_by_raw, True),
+        ]
+
+
+def _is_valid_strategy_result(name: str, result: Optional[MatchResult], verify: Optional[VerifyPosInfo]) -> bool:
+    """
+    与 cal_character_pos 中采纳某个匹配方式结果的判断一致
+    """
+    if name == 'sp':
+        return result is not None and 0.9 <= result.template_scale <= 1.3
+    return cal_pos_utils.is_valid_result(result, verify)
+
+
+def _pos_to_json(pos: Optional[Point]) -> Optional[list]:
+    return None if pos is None else [pos.x, pos.y]
+
+
+def replay_sample(ctx: SrContext, sample: ReplaySample, method: str,
+                  running: bool = False, real_move_time: float = 0,
+                  search_radius: int = DEFAULT_SEARCH_RADIUS) -> dict:
+    """
+    回放一个样例 计算完整的坐标识别耗时 以及每种匹配方式单独的结果
+    每次计算都使用新的小地图信息 避免模板缓存影响耗时
+    :param ctx: 上下文
+    :param sample: 样例
+    :param method: 计算坐标的方法
+    :param running: 是否在移动
+    :param real_move_time: 真正按住移动的时间
+    :param search_radius: gps样例截取大地图使用的移动距离
+    :return: 样例结果
+    """
+    lm_info: LargeMapInfo = ctx.map_data.get_large_map_info(sample.region)
+    possible_pos = sample.get_possible_pos(search_radius)
+    lm_rect: Optional[Rect] = large_map_utils.get_large_map_rect_by_pos(
+        lm_info.gray.shape, sample.mm.shape[:2], possible_pos)
+
+    start_time = time.perf_counter()
+    mm_info: MiniMapInfo = mini_map_utils.analyse_mini_map(sample.mm)
+    preprocess_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    if method == METHOD_SIM_UNI:
+        result = cal_pos_utils.sim_uni_cal_pos(ctx, lm_info, mm_info, lm_rect=lm_rect,
+                                               running=running, real_move_time=real_move_time,
+                                               verify=sample.verify)
+    else:
+        result = cal_pos_utils.cal_character_pos(ctx, lm_info, mm_info, lm_rect=lm_rect,
+                                                 retry_without_rect=False,
+                                                 running=running, real_move_time=real_move_time,
+                                                 verify=sample.verify)
+    match_seconds = time.perf_counter() - start_time
+
+    scale_list = cal_pos_utils.get_mini_map_scale_list(running, real_move_time, is_debug=ctx.env_config.is_debug)
+    strategy_map: Dict[str, dict] = {}
+    winner: Optional[str] = None
+    for name, func, with_scale in _get_strategy_list(method):
+        strategy_mm_info = mini_map_utils.analyse_mini_map(sample.mm)
+        start_time = time.perf_counter()
+        if with_scale:
+            r = func(ctx, lm_info, strategy_mm_info, lm_rect=lm_rect, scale_list=scale_list, verify=sample.verify)
+        else:
+            r = func(ctx, lm_info, strategy_mm_info, lm_rect=lm_rect)
+        seconds = time.perf_counter() - start_time
+
+        strategy_map[name] = {
+            'seconds': seconds,
+            'found': r is not None,
+            'valid': _is_valid_strategy_result(name, r, sample.verify),
+            'pos': _pos_to_json(r.center if r is not None else None),
+            'error': _cal_error(r, sample.truth_pos),
+        }
+        if winner is None and result is not None and r is not None and r.center == result.center:
+            winner = name
+
+    record = {
+        'corpus': sample.corpus,
+        'case_id': sample.case_id,
+        'method': method,
+        'preprocess_seconds': preprocess_seconds,
+        'match_seconds': match_seconds,
+        'total_seconds': preprocess_seconds + match_seconds,
+        'found': result is not None,
+        'pos': _pos_to_json(result.center if result is not None else None),
+        'truth_pos': _pos_to_json(sample.truth_pos),
+        'error': _cal_error(result, sample.truth_pos),
+        'strategy': winner,
+        'strategies': strategy_map,
+    }
+    if sample.verify is not None and result is not None:
+        record['distance_to_last_pos'] = cal_utils.distance_between(result.center, sample.verify.last_pos)
+    return record
+
+
+def _cal_error(result: Optional[MatchResult], truth_pos: Optional[Point]) -> Optional[float]:
+    """
+    识别坐标与真实坐标的距离
+    """
+    if result is None or truth_pos is None:
+        return None
+    return float(cal_utils.distance_between(result.center, truth_pos))
+
+
+def _percentile_ms(seconds_list: List[float]) -> dict:
+    """
+    耗时的分位数 单位毫秒
+    """
+    if len(seconds_list) == 0:
+        return {}
+    arr = np.array(seconds_list) * 1000
+    return {
+        'p50': float(np.percentile(arr, 50)),
+        'p90': float(np.percentile(arr, 90)),
+        'p99': float(np.percentile(arr, 99)),
+        'max': float(np.max(arr)),
+        'mean': float(np.mean(arr)),
+    }
+
+
+def _error_summary(error_list: List[float], error_threshold: float) -> dict:
+    """
+    坐标误差的统计
+    """
+    if len(error_list) == 0:
+        return {}
+    arr = np.array(error_list)
+    return {
+        'mean': float(np.mean(arr)),
+        'p90': float(np.percentile(arr, 90)),
+        'max': float(np.max(arr)),
+        'within_threshold_rate': float(np.mean(arr <= error_threshold)),
+    }
+
+
+def summarize(record_list: List[dict], error_threshold: float = DEFAULT_ERROR_THRESHOLD) -> dict:
+    """
+    按 方法/来源 汇总样例结果
+    :param record_list: 样例结果
+    :param error_threshold: 认为识别正确的最大误差
+    :return:
+    """
+    group_map: Dict[str, List[dict]] = {}
+    for record in record_list:
+        key = f"{record['method']}/{record['corpus']}"
+        group_map.setdefault(key, []).append(record)
+
+    summary = {}
+    for key, group in group_map.items():
+        cnt = len(group)
+        strategy_summary = {}
+        for name in group[0]['strategies'].keys():
+            strategy_records = [i['strategies'][name] for i in group]
+            strategy_summary[name] = {
+                'hit_rate': sum(1 for i in strategy_records if i['valid']) / cnt,
+                'found_rate': sum(1 for i in strategy_records if i['found']) / cnt,
+                'win_rate': sum(1 for i in group if i['strategy'] == name) / cnt,
+                'latency_ms': _percentile_ms([i['seconds'] for i in strategy_records]),
+                'error': _error_summary([i['error'] for i in strategy_records if i['error'] is not None],
+                                        error_threshold),
+            }
+        summary[key] = {
+            'count': cnt,
+            'found_rate': sum(1 for i in group if i['found']) / cnt,
+            'latency_ms': _percentile_ms([i['total_seconds'] for i in group]),
+            'preprocess_latency_ms': _percentile_ms([i['preprocess_seconds'] for i in group]),
+            'error': _error_summary([i['error'] for i in group if i['error'] is not None], error_threshold),
+            'strategies': strategy_summary,
+        }
+    return summary
+
+
+def replay(ctx: SrContext,
+           corpus_list: Optional[List[str]] = None,
+           method_list: Optional[List[str]] = None,
+           running: bool = False,
+           real_move_time: float = 0,
+           search_radius: int = DEFAULT_SEARCH_RADIUS,
+           error_threshold: float = DEFAULT_ERROR_THRESHOLD,
+           max_cnt: Optional[int] = None,
+           output_path: Optional[str] = None,
+           progress_callback: Optional[Callable[[int, int], None]] = None) -> dict:
+    """
+    回放所有样例 输出JSON报告 用于比较不同版本的识别速度和准确率
+    :param ctx: 上下文
+    :param corpus_list: 样例来源 默认全部
+    :param method_list: 计算坐标的方法 默认全部
+    :param running: 是否按移动中计算 移动中尝试的缩放比例更少
+    :param real_move_time: 真正按住移动的时间
+    :param search_radius: gps样例截取大地图使用的移动距离 <=0 时使用整张大地图
+    :param error_threshold: 认为识别正确的最大误差
+    :param max_cnt: 每个来源最多使用的样例数量
+    :param output_path: 报告路径 默认保存在 .debug/cal_pos_replay 下
+    :param progress_callback: 进度回调 (已完成, 总数)
+    :return: 报告
+    """
+    if corpus_list is None:
+        corpus_list = [CORPUS_GPS, CORPUS_CAL_POS_FAIL]
+    if method_list is None:
+        method_list = [METHOD_WORLD_PATROL, METHOD_SIM_UNI]
+
+    sample_list: List[ReplaySample] = []
+    for corpus in corpus_list:
+        sample_list.extend(load_samples(ctx, corpus, max_cnt=max_cnt))
+
+    mini_map_utils.preheat()
+    total = len(sample_list) * len(method_list)
+    record_list: List[dict] = []
+    for method in method_list:
+        for sample in sample_list:
+            try:
+                record_list.append(replay_sample(ctx, sample, method, running=running,
+                                                 real_move_time=real_move_time,
+                                                 search_radius=search_radius))
+            except Exception:
+                log.error('回放样例失败 %s %s', method, sample.case_id, exc_info=True)
+            if progress_callback is not None:
+                progress_callback(len(record_list), total)
+
+    report = {
+        'create_time': os_utils.now_timestamp_str(),
+        'config': {
+            'corpus_list': corpus_list,
+            'method_list': method_list,
+            'running': running,
+            'real_move_time': real_move_time,
+            'search_radius': search_radius,
+            'error_threshold': error_threshold,
+            'is_debug_scale_list': ctx.env_config.is_debug,
+        },
+        'summary': summarize(record_list, error_threshold),
+        'samples': record_list,
+    }
+
+    if output_path is None:
+        output_path = os.path.join(os_utils.get_path_under_work_dir('.debug', 'cal_pos_replay'),
+                                   f"{report['create_time']}.json")
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    log.info('回放报告已保存 %s', output_path)
+
+    return report
+
+
+def print_summary(report: dict, base_report: Optional[dict] = None) -> None:
+    """
+    打印报告的汇总 传入对比的报告时 同时打印差值
+    :param report: 报告
+    :param base_report: 用于对比的报告
+    :return:
+    """
+    base_summary = base_report.get('summary', {}) if base_report is not None else {}
+
+    def _fmt(value: Optional[float], base_value: Optional[float], fmt: str) -> str:
+        if value is None:
+            return '-'
+        text = fmt % value
+        if base_value is not None:
+            text += (' (%+' + fmt[1:] + ')') % (value - base_value)
+        return text
+
+    for key, group in report['summary'].items():
+        base = base_summary.get(key, {})
+        print(f"{key} 样例 {group['count']}")
+        print('  识别率 %s  耗时p50 %sms p90 %sms p99 %sms  误差均值 %s 正确率 %s' % (
+            _fmt(group['found_rate'], base.get('found_rate'), '%.3f'),
+            _fmt(group['latency_ms'].get('p50'), base.get('latency_ms', {}).get('p50'), '%.1f'),
+            _fmt(group['latency_ms'].get('p90'), base.get('latency_ms', {}).get('p90'), '%.1f'),
+            _fmt(group['latency_ms'].get('p99'), base.get('latency_ms', {}).get('p99'), '%.1f'),
+            _fmt(group['error'].get('mean'), base.get('error', {}).get('mean'), '%.2f'),
+            _fmt(group['error'].get('within_threshold_rate'), base.get('error', {}).get('within_threshold_rate'), '%.3f'),
+        ))
+        for name, strategy in group['strategies'].items():
+            base_strategy = base.get('strategies', {}).get(name, {})
+            print('  %-10s 命中率 %s 采用率 %s 耗时p50 %sms p90 %sms 误差均值 %s' % (
+                name,
+                _fmt(strategy['hit_rate'], base_strategy.get('hit_rate'), '%.3f'),
+                _fmt(strategy['win_rate'], base_strategy.get('win_rate'), '%.3f'),
+                _fmt(strategy['latency_ms'].get('p50'), base_strategy.get('latency_ms', {}).get('p50'), '%.1f'),
+                _fmt(strategy['latency_ms'].get('p90'), base_strategy.get('latency_ms', {}).get('p90'), '%.1f'),
+                _fmt(strategy['error'].get('mean'), base_strategy.get('error', {}).get('mean'), '%.2f'),
+            ))
+
+
+def __debug():
+    parser = argparse.ArgumentParser(description='离线回放坐标识别样例')
+    parser.add_argument('--corpus', nargs='*', default=None, choices=[CORPUS_GPS, CORPUS_CAL_POS_FAIL])
+    parser.add_argument('--method', nargs='*', default=None, choices=[METHOD_WORLD_PATROL, METHOD_SIM_UNI])
+    parser.add_argument('--running', action='store_true', help='按移动中计算坐标')
+    parser.add_argument('--real-move-time', type=float, default=0)
+    parser.add_argument('--search-radius', type=int, default=DEFAULT_SEARCH_RADIUS)
+    parser.add_argument('--error-threshold', type=float, default=DEFAULT_ERROR_THRESHOLD)
+    parser.add_argument('--max-cnt', type=int, default=None)
+    parser.add_argument('--output', default=None, help='报告路径')
+    parser.add_argument('--compare', default=None, help='用于对比的旧报告路径')
+    args = parser.parse_args()
+
+    ctx = SrContext()
+    report = replay(ctx, corpus_list=args.corpus, method_list=args.method,
+                    running=args.running, real_move_time=args.real_move_time,
+                    search_radius=args.search_radius, error_threshold=args.error_threshold,
+                    max_cnt=args.max_cnt, output_path=args.output,
+                    progress_callback=lambda done, total: print(f'\r{done}/{total}', end=''))
+    print()
+
+    base_report = None
+    if args.compare is not None:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            base_report = json.load(file)
+    print_summary(report, base_report)
+
+
+if __name__ == '__main__':
+    __debug()
@@ -0,0 +1,135 @@
+import glob
+import os
+import random
+import time
+from typing import List, Optional
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from one_dragon.base.matcher.match_result import MatchResult
+from one_dragon.utils import cv2_utils, os_utils
+from sr_od.sr_map import large_map_registration, large_map_utils
+from sr_od.sr_map.large_map_info import LargeMapInfo
+
+
+def _legacy_match(lm_info: LargeMapInfo, screen_part: MatLike) -> Optional[MatchResult]:
+    """
+    原来的匹配方式 整张大地图匹配
+    """
+    return cv2_utils.match_template(lm_info.raw, screen_part, 0.7).max
+
+
+def _current_match(lm_info: LargeMapInfo, screen_part: MatLike) -> Optional[MatchResult]:
+    """
+    当前的匹配方式 原图金字塔由粗到精匹配
+    """
+    return large_map_registration.match_in_large_map(lm_info, screen_part, 0.7)
+
+
+def _is_same_result(r1: Optional[MatchResult], r2: Optional[MatchResult]) -> bool:
+    if r1 is None or r2 is None:
+        return r1 is None and r2 is None
+    return (r1.x == r2.x and r1.y == r2.y and r1.w == r2.w and r1.h == r2.h
+            and abs(float(r1.confidence) - float(r2.confidence)) < 1e-4)
+
+
+def load_large_map_list(max_cnt: Optional[int] = None) -> List[LargeMapInfo]:
+    """
+    读取 assets/template/large_map 下所有区域的大地图原图
+    :param max_cnt: 最多读取的数量
+    :return:
+    """
+    pattern = os.path.join(os_utils.get_path_under_work_dir('assets', 'template', 'large_map'), '*', '*', 'raw.webp')
+    lm_list = []
+    for path in sorted(glob.glob(pattern))[:max_cnt]:
+        raw = cv2_utils.read_image(path)
+        if raw is None:
+            continue
+        lm_info = LargeMapInfo()
+        lm_info.dir_path = os.path.dirname(path)
+        lm_info.raw = raw
+        lm_list.append(lm_info)
+    return lm_list
+
+
+def make_screen_part(lm_info: LargeMapInfo, rng: random.Random) -> MatLike:
+    """
+    从大地图中随机截取屏幕大小的一块 并模拟屏幕上的噪声和按钮遮挡
+    :param lm_info: 大地图信息
+    :param rng: 随机数
+    :return:
+    """
+    rect = large_map_utils.CUT_MAP_RECT
+    lh, lw = lm_info.raw.shape[0], lm_info.raw.shape[1]
+    h, w = min(rect.height, lh), min(rect.width, lw)
+    x, y = rng.randint(0, lw - w), rng.randint(0, lh - h)
+    part = lm_info.raw[y:y + h, x:x + w].astype(np.int16)
+
+    noise = np.random.default_rng(rng.randint(0, 1 << 30)).integers(-6, 7, size=part.shape, dtype=np.int16)
+    part = np.clip(part + noise, 0, 255).astype(np.uint8)
+    bx, by = rng.randint(0, w - w // 5), rng.randint(0, h - h // 8)
+    cv2.rectangle(part, (bx, by), (bx + w // 5, by + h // 8), (30, 30, 30), -1)
+    return part
+
+
+def benchmark(case_per_map: int = 3, max_cnt: Optional[int] = None, seed: int = 0) -> None:
+    """
+    对比原来的整图匹配和金字塔匹配的耗时 并检查结果一致 不一致时抛出异常
+    :param case_per_map: 每张大地图随机截取的数量
+    :param max_cnt: 最多使用的大地图数量
+    :param seed: 随机种子
+    :return:
+    """
+    lm_list = load_large_map_list(max_cnt)
+    if len(lm_list) == 0:
+        print('没有找到大地图')
+        return
+
+    rng = random.Random(seed)
+    pyramid_seconds = 0
+    legacy_seconds = 0
+    current_seconds = 0
+    case_cnt = 0
+    found_cnt = 0
+    for lm_info in lm_list:
+        start_time = time.perf_counter()
+        _ = lm_info.raw_pyramid
+        _ = lm_info.raw_block_stats
+        pyramid_seconds += time.perf_counter() - start_time
+
+        map_legacy_seconds = 0
+        map_current_seconds = 0
+        for _ in range(case_per_map):
+            screen_part = make_screen_part(lm_info, rng)
+
+            start_time = time.perf_counter()
+            legacy = _legacy_match(lm_info, screen_part)
+            map_legacy_seconds += time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            current = _current_match(lm_info, screen_part)
+            map_current_seconds += time.perf_counter() - start_time
+
+            case_cnt += 1
+            if legacy is not None:
+                found_cnt += 1
+            assert _is_same_result(legacy, current), f'结果不一致 {lm_info.dir_path} 原来 {legacy} 现在 {current}'
+
+        legacy_seconds += map_legacy_seconds
+        current_seconds += map_current_seconds
+        print('%s %s 原来 %.1fms 现在 %.1fms' % (
+            os.path.relpath(lm_info.dir_path, os_utils.get_work_dir()), lm_info.raw.shape[:2],
+            map_legacy_seconds / case_per_map * 1000, map_current_seconds / case_per_map * 1000,
+        ))
+
+    print('大地图数量 %d 样例 %d 匹配成功 %d 结果全部一致' % (len(lm_list), case_cnt, found_cnt))
+    print('平均耗时 原来 %.1fms 现在 %.1fms 加速 %.1fx 金字塔和分块统计生成 %.1fms/张' % (
+        legacy_seconds / case_cnt * 1000, current_seconds / case_cnt * 1000,
+        legacy_seconds / current_seconds, pyramid_seconds / len(lm_list) * 1000,
+    ))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,219 @@
+import glob
+import os
+import time
+from typing import Callable, List
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from one_dragon.utils import cv2_utils, os_utils
+from sr_od.config import game_const
+from sr_od.sr_map import mini_map_utils
+from sr_od.sr_map.mini_map_info import MiniMapInfo
+
+
+def _legacy_get_arrow_mask(mm: MatLike):
+    """
+    原来的小箭头掩码 逐个连通块去除噪点
+    """
+    w, h = mm.shape[1], mm.shape[0]
+    cx, cy = w // 2, h // 2
+    d = game_const.TEMPLATE_ARROW_LEN
+    r = game_const.TEMPLATE_ARROW_R
+    center = mm[cy - r:cy + r, cx - r:cx + r]
+    arrow = mini_map_utils.extract_arrow(center)
+    _, mask = cv2.threshold(arrow, 180, 255, cv2.THRESH_BINARY)
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    large_components = []
+    for label in range(1, num_labels):
+        if stats[label, cv2.CC_STAT_AREA] < 50:
+            large_components.append(label)
+    for label in large_components:
+        mask[labels == label] = 0
+
+    whole_mask = np.zeros((h, w), dtype=np.uint8)
+    whole_mask[cy - r:cy + r, cx - r:cx + r] = mask
+    kernel = np.ones((5, 5), np.uint8)
+    cv2.dilate(src=whole_mask, dst=whole_mask, kernel=kernel, iterations=1)
+    arrow_mask, _ = cv2_utils.convert_to_standard(mask, mask, width=d, height=d)
+    return arrow_mask, whole_mask
+
+
+def _legacy_init_circle_mask(mm_info: MiniMapInfo):
+    """
+    原来的圆形掩码 每次重新画
+    """
+    h, w = mm_info.arrow_mask.shape[1], mm_info.arrow_mask.shape[0]
+    cx, cy = w // 2, h // 2
+
+    mm_info.circle_mask = np.zeros_like(mm_info.arrow_mask)
+    cv2.circle(mm_info.circle_mask, (cx, cy), h // 2 - 5, 255, -1)
+
+
+def _legacy_remove_radio(mm: MatLike, radio_to_del: MatLike) -> MatLike:
+    """
+    原来的去除雷达 使用uint16的中间结果
+    """
+    raw = mm.copy()
+    if radio_to_del is not None:
+        radius = radio_to_del.shape[0] // 2
+        d = radio_to_del.shape[0]
+
+        x1 = raw.shape[1] // 2 - radius
+        x2 = x1 + d
+        y1 = raw.shape[1] // 2 - radius
+        y2 = y1 + d
+
+        overlap = np.zeros_like(radio_to_del, dtype=np.uint16)
+        overlap[:, :] = raw[y1:y2, x1:x2]
+        overlap[:, :] -= radio_to_del
+        overlap[np.where(raw[y1:y2, x1:x2] < radio_to_del)] = 0
+        raw[y1:y2, x1:x2] = overlap.astype(dtype=np.uint8)
+    return raw
+
+
+def _legacy_init_road_mask(mm_info: MiniMapInfo, another_floor: bool = False):
+    """
+    原来的道路掩码 多次颜色筛选
+    """
+    mm_del_radio = mm_info.raw_del_radio
+    r, g, b = cv2.split(mm_del_radio)
+
+    l = 45
+    u = 70
+    lower_color = np.array([l, l, l], dtype=np.uint8)
+    upper_color = np.array([u, u, u], dtype=np.uint8)
+    road_mask_1 = cv2.inRange(mm_del_radio, lower_color, upper_color)
+
+    max_rgb = np.max(mm_del_radio, axis=2)
+    min_rgb = np.min(mm_del_radio, axis=2)
+    road_mask_cf = np.zeros(road_mask_1.shape, dtype=np.uint8)
+    road_mask_cf[(max_rgb - min_rgb) <= 1] = 255
+    b_g = None
+    if another_floor:
+        b_g = b - g
+        g_r = g - r
+        road_mask_af = np.zeros(road_mask_1.shape, dtype=np.uint8)
+        road_mask_af[(b_g >= 0) & (b_g <= 2) & (g_r >= 0) & (g_r <= 2)] = 255
+        road_mask_floor = cv2.bitwise_or(road_mask_cf, road_mask_af)
+    else:
+        road_mask_floor = road_mask_cf
+
+    road_mask_2 = cv2.bitwise_and(road_mask_1, road_mask_floor)
+
+    if b_g is None:
+        b_g = b - g
+    lower_color = np.array([80, 45, 45], dtype=np.uint8)
+    upper_color = np.array([255, 70, 70], dtype=np.uint8)
+    enemy_mask_1 = cv2.inRange(mm_del_radio, lower_color, upper_color)
+    enemy_mask_2 = np.zeros(road_mask_1.shape, dtype=np.uint8)
+    enemy_mask_2[(b_g <= 2) | (b_g >= -2)] = 255
+    enemy_mask = cv2.bitwise_and(enemy_mask_1, enemy_mask_2)
+
+    mm_info.road_mask = cv2.bitwise_or(road_mask_2, enemy_mask)
+    mm_info.road_mask = cv2.bitwise_and(mm_info.road_mask, mm_info.circle_mask)
+
+    lower_color = np.array([160, 160, 160], dtype=np.uint8)
+    upper_color = np.array([210, 210, 210], dtype=np.uint8)
+    edge_mask_rough = cv2.inRange(mm_del_radio, lower_color, upper_color)
+    edge_mask = cv2.bitwise_and(edge_mask_rough, road_mask_cf)
+    mm_info.road_mask_with_edge = cv2.bitwise_or(mm_info.road_mask, edge_mask)
+
+
+def _legacy_preprocess(raw: MatLike, angle: float, another_floor: bool) -> MiniMapInfo:
+    """
+    原来的完整预处理 不包括计算角度
+    """
+    info = MiniMapInfo()
+    info.raw = raw
+    info.angle = angle
+    info.center_arrow_mask, info.arrow_mask = _legacy_get_arrow_mask(raw)
+    info.raw_del_radio = _legacy_remove_radio(raw, mini_map_utils.get_radio_to_del(angle))
+    _legacy_init_circle_mask(info)
+    _legacy_init_road_mask(info, another_floor)
+    return info
+
+
+def _current_preprocess(raw: MatLike, angle: float, another_floor: bool) -> MiniMapInfo:
+    """
+    当前的完整预处理 不包括计算角度
+    """
+    info = MiniMapInfo()
+    info.raw = raw
+    info.angle = angle
+    info.center_arrow_mask, info.arrow_mask = mini_map_utils.get_arrow_mask(raw)
+    info.raw_del_radio = mini_map_utils.remove_radio(raw, mini_map_utils.get_radio_to_del(angle))
+    mini_map_utils.init_circle_mask(info)
+    mini_map_utils.init_road_mask_for_world_patrol(info, another_floor)
+    return info
+
+
+def load_mini_map_list(max_cnt: int = 100) -> List[MatLike]:
+    """
+    读取模拟宇宙地图中保存的小地图截图
+    :param max_cnt: 最多读取的数量
+    :return:
+    """
+    pattern = os.path.join(os_utils.get_path_under_work_dir('config', 'sim_uni', 'map'), '*', '*', 'mm.png')
+    mm_list = []
+    for path in sorted(glob.glob(pattern))[:max_cnt]:
+        mm = cv2_utils.read_image(path)
+        if mm is not None:
+            mm_list.append(mm)
+    return mm_list
+
+
+def _cost_us(func: Callable[[MatLike, float], object], mm_list: List[MatLike], angle_list: List[float],
+             times: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(times):
+        for mm, angle in zip(mm_list, angle_list):
+            func(mm, angle)
+    return (time.perf_counter() - start_time) / times / len(mm_list) * 1e6
+
+
+def benchmark(max_cnt: int = 100, times: int = 10) -> None:
+    """
+    对比原来的小地图预处理和 MiniMapPreprocessor 的耗时 并检查结果一致
+    角度计算两者相同 只计算一次
+    :param max_cnt: 最多使用的小地图数量
+    :param times: 重复次数
+    :return:
+    """
+    mm_list = load_mini_map_list(max_cnt)
+    if len(mm_list) == 0:
+        print('没有找到小地图截图')
+        return
+
+    mini_map_utils.preheat()
+    angle_list = [mini_map_utils.analyse_angle(mm) for mm in mm_list]
+
+    for another_floor in [False, True]:
+        all_same = True
+        for mm, angle in zip(mm_list, angle_list):
+            legacy = _legacy_preprocess(mm, angle, another_floor)
+            current = _current_preprocess(mm, angle, another_floor)
+            for field in ['center_arrow_mask', 'arrow_mask', 'raw_del_radio', 'circle_mask',
+                          'road_mask', 'road_mask_with_edge']:
+                if not np.array_equal(getattr(legacy, field), getattr(current, field)):
+                    all_same = False
+                    print(f'结果不一致 {field}')
+
+        print(f'小地图数量 {len(mm_list)} 多楼层 {another_floor} 结果一致 {all_same}')
+        cases = [
+            ('小箭头', lambda mm, angle: _legacy_get_arrow_mask(mm),
+             lambda mm, angle: mini_map_utils.get_arrow_mask(mm)),
+            ('去除雷达', lambda mm, angle: _legacy_remove_radio(mm, mini_map_utils.get_radio_to_del(angle)),
+             lambda mm, angle: mini_map_utils.remove_radio(mm, mini_map_utils.get_radio_to_del(angle))),
+            ('完整预处理', lambda mm, angle: _legacy_preprocess(mm, angle, another_floor),
+             lambda mm, angle: _current_preprocess(mm, angle, another_floor)),
+        ]
+        for name, legacy_func, current_func in cases:
+            legacy_us = _cost_us(legacy_func, mm_list, angle_list, times)
+            current_us = _cost_us(current_func, mm_list, angle_list, times)
+            print(f'{name} 原来 {legacy_us:.1f}us 现在 {current_us:.1f}us 加速 {legacy_us / current_us:.1f}x')
+
+
+if __name__ == '__main__':
+    benchmark()
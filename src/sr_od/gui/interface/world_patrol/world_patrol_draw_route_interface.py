@@ -1,8 +1,11 @@
 from typing import Optional, List
 
+import numpy as np
+
 import yaml
+from PySide6.QtCore import QPointF, Qt
+from PySide6.QtGui import QColor, QFont, QPainter, QPen
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout
-from cv2.typing import MatLike
 from qfluentwidgets import PushButton, PlainTextEdit, SettingCardGroup, ToolButton, FluentIcon, LineEdit
 
 from one_dragon.base.config.config_item import ConfigItem
@@ -11,11 +14,17 @@ from one_dragon.base.operation.one_dragon_context import ContextKeyboardEventEnu
 from one_dragon.utils import str_utils
 from one_dragon.utils.i18_utils import gt
 from one_dragon_qt.widgets.combo_box import ComboBox
-from one_dragon_qt.widgets.image_viewer_widget import ImageViewerWidget
 from one_dragon_qt.widgets.row import Row
 from one_dragon_qt.widgets.setting_card.switch_setting_card import SwitchSettingCard
 from one_dragon_qt.widgets.vertical_scroll_interface import VerticalScrollInterface
+from one_dragon_qt.widgets.zoomable_image_label import ZoomableClickImageLabel
 from sr_od.application.world_patrol import world_patrol_route_draw_utils
+from sr_od.application.world_patrol.world_patrol_route_draw_utils import (
+    ROUTE_DRAW_CIRCLE,
+    ROUTE_DRAW_LINE,
+    ROUTE_DRAW_TEXT,
+    RouteDrawItem,
+)
 from sr_od.application.world_patrol.world_patrol_app import WorldPatrolApp
 from sr_od.application.world_patrol.world_patrol_route import WorldPatrolRoute
 from sr_od.application.world_patrol.world_patrol_whitelist_config import WorldPatrolWhitelist
@@ -41,6 +50,7 @@ class WorldPatrolDrawRouteInterface(VerticalScrollInterface):
         self.chosen_region_with_level: Optional[Region] = None
         self.chosen_tp: Optional[SpecialPoint] = None
         self.chosen_route: Optional[WorldPatrolRoute] = None
+        self._shown_large_map: Optional[np.ndarray] = None  # 当前显示的底图 相同时不重新设置
 
     def get_content_widget(self) -> QWidget:
         """
@@ -297,8 +307,8 @@ class WorldPatrolDrawRouteInterface(VerticalScrollInterface):
 
         layout.addWidget(SettingCardGroup(gt('大地图')))
 
-        self.large_map_image = ImageViewerWidget()
-        self.large_map_image.point_clicked.connect(self.on_large_map_clicked)
+        self.large_map_image = ZoomableClickImageLabel()
+        self.large_map_image.left_clicked_with_pos.connect(self.on_large_map_clicked)
         layout.addWidget(self.large_map_image, 1)
 
         return layout
@@ -490,26 +500,63 @@ class WorldPatrolDrawRouteInterface(VerticalScrollInterface):
         self.existed_route_opt.set_items(config_list, self.chosen_route)
 
     def update_large_map_image(self) -> None:
-        img_to_show: MatLike | None = None
+        """
+        大地图作为底图 只在区域变化时重新设置
+        路线画在单独的叠加层上 修改路线时不需要重新生成底图
+        """
+        region: Optional[Region] = None
+        draw_items: List[RouteDrawItem] = []
         if self.chosen_route is None:
             if self.chosen_tp is None:
                 region = self.chosen_region_without_level
                 if self.chosen_region_with_level is not None:
                     region = self.chosen_region_with_level
-                if region is not None:
-                    lm_info = self.ctx.map_data.get_large_map_info(region)
-                    if lm_info.raw is not None:
-                        img_to_show = lm_info.raw.copy()
             else:
                 route = WorldPatrolRoute(self.chosen_tp, {
                     "author": [],
                     "route": []
                 }, '')
-                img_to_show = world_patrol_route_draw_utils.get_route_image(self.ctx, route)
+                region, draw_items = world_patrol_route_draw_utils.get_route_draw_items(self.ctx, route)
         else:
-            img_to_show = world_patrol_route_draw_utils.get_route_image(self.ctx, self.chosen_route)
+            region, draw_items = world_patrol_route_draw_utils.get_route_draw_items(self.ctx, self.chosen_route)
+
+        large_map: Optional[np.ndarray] = None
+        if region is not None:
+            large_map = self.ctx.map_data.get_large_map_info(region).raw
 
-        self.large_map_image.set_image(img_to_show)
+        if large_map is not self._shown_large_map:
+            self._shown_large_map = large_map
+            self.large_map_image.setImage(large_map, preserve_state=True)
+        self.large_map_image.set_overlay_painter(
+            (lambda painter: self._paint_route_items(painter, draw_items)) if len(draw_items) > 0 else None
+        )
+
+    @staticmethod
+    def _paint_route_items(painter: QPainter, draw_items: List[RouteDrawItem]) -> None:
+        """
+        在叠加层上画出路线 与 world_patrol_route_draw_utils.draw_route_items 画出的一致
+        :param painter: 画笔 已经变换到大地图坐标系
+        :param draw_items: 路线图形
+        """
+        font = QFont()
+        for item in draw_items:
+            color = QColor(*item.color)
+            if item.kind == ROUTE_DRAW_CIRCLE:
+                if item.thickness < 0:
+                    painter.setPen(Qt.PenStyle.NoPen)
+                    painter.setBrush(color)
+                else:
+                    painter.setPen(QPen(color, item.thickness))
+                    painter.setBrush(Qt.BrushStyle.NoBrush)
+                painter.drawEllipse(QPointF(*item.pos), item.radius, item.radius)
+            elif item.kind == ROUTE_DRAW_LINE:
+                painter.setPen(QPen(color, item.thickness))
+                painter.drawLine(QPointF(*item.pos), QPointF(*item.end_pos))
+            elif item.kind == ROUTE_DRAW_TEXT:
+                font.setPixelSize(max(1, round(item.font_scale * 22)))  # FONT_HERSHEY_SIMPLEX 的字高约为 22 * font_scale
+                painter.setFont(font)
+                painter.setPen(QPen(color, item.thickness))
+                painter.drawText(QPointF(*item.pos), item.text)
 
     def on_route_selected(self, idx: int) -> None:
         self.chosen_route = self.existed_route_opt.itemData(idx)
@@ -17,10 +17,19 @@ from sr_od.context.sr_context import SrContext
 from sr_od.sr_map import mini_map_utils
 from sr_od.sr_map.large_map_info import LargeMapInfo
 from sr_od.sr_map.mini_map_info import MiniMapInfo
+from sr_od.sr_map.mini_map_template_bank import MiniMapTemplateBank
 from sr_od.sr_map.sr_map_def import Region
 
 cal_pos_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix='sr_od_cal_pos')
 
+USE_PYRAMID_MATCH: bool = True  # 是否使用金字塔由粗到精的模板匹配
+PYRAMID_COARSE_SCALE: float = 0.5  # 粗匹配时原图和模板的缩小比例
+PYRAMID_PEAKS_PER_SCALE: int = 2  # 粗匹配时每个缩放比例保留的峰值数量
+PYRAMID_TOP_K: int = 5  # 粗匹配后保留多少个候选进行精匹配
+PYRAMID_REFINE_MARGIN: int = 6  # 精匹配时在候选位置周围额外搜索的像素 需要大于 1 / PYRAMID_COARSE_SCALE
+PYRAMID_MIN_SOURCE_RATIO: float = 1.5  # 原图边长至少是模板的多少倍时 才使用金字塔匹配
+PYRAMID_MIN_COARSE_TEMPLATE_LEN: int = 32  # 粗匹配时模板的最小边长 太小的话粗匹配结果不可信
+
 
 def get_mini_map_scale_list(running: bool, real_move_time: float = 0, is_debug: bool = False):
     """
@@ -175,7 +184,8 @@ def cal_character_pos(ctx: SrContext,
     r4 = None
 
     if result is None:  # 使用模板匹配 用道路掩码的
-        r1 = cal_character_pos_by_road_mask(ctx, lm_info, mm_info, lm_rect=lm_rect, scale_list=scale_list, show=show)
+        r1 = cal_character_pos_by_road_mask(ctx, lm_info, mm_info, lm_rect=lm_rect, scale_list=scale_list, show=show,
+                                            verify=verify)
         if is_valid_result(r1, verify):
             result = r1
 
@@ -188,12 +198,14 @@ def cal_character_pos(ctx: SrContext,
             result = r2
 
     if result is None:  # 使用模板匹配 用灰度图的
-        r3 = cal_character_pos_by_gray(ctx, lm_info, mm_info, lm_rect=lm_rect, scale_list=scale_list, show=show)
+        r3 = cal_character_pos_by_gray(ctx, lm_info, mm_info, lm_rect=lm_rect, scale_list=scale_list, show=show,
+                                       verify=verify)
         if is_valid_result(r3, verify):
             result = r3
 
     if result is None:  # 使用模板匹配 用原图的
-        r4 = cal_character_pos_by_raw(ctx, lm_info, mm_info, lm_rect=lm_rect, scale_list=scale_list, show=show)
+        r4 = cal_character_pos_by_raw(ctx, lm_info, mm_info, lm_rect=lm_rect, scale_list=scale_list, show=show,
+                                      verify=verify)
         if is_valid_result(r4, verify):
             result = r4
 
@@ -222,7 +234,8 @@ def cal_character_pos_by_gray(ctx: SrContext,
                               lm_info: LargeMapInfo, mm_info: MiniMapInfo,
                               lm_rect: Rect = None,
                               scale_list: List[float] = None,
-                              show: bool = False) -> Optional[MatchResult]:
+                              show: bool = False,
+                              verify: Optional[VerifyPosInfo] = None) -> Optional[MatchResult]:
     """
     使用模板匹配 在大地图上匹配小地图的位置 会对小地图进行缩放尝试
     使用灰度图进行匹配
@@ -232,6 +245,7 @@ def cal_character_pos_by_gray(ctx: SrContext,
     :param lm_rect: 圈定的大地图区域 传入后更准确
     :param scale_list: 缩放比例
     :param show: 是否显示调试结果
+    :param verify: 校验结果需要的信息
     :return:
     """
     source, lm_rect = cv2_utils.crop_image(lm_info.raw, lm_rect)
@@ -242,9 +256,12 @@ def cal_character_pos_by_gray(ctx: SrContext,
 
     mini_map_utils.init_road_mask_for_world_patrol(mm_info, another_floor=lm_info.region.another_floor)
     template_mask = mm_info.road_mask_with_edge
+    template_bank = get_template_bank(mm_info, 'gray', template, template_mask)
 
-    target: MatchResult = template_match_with_scale_list_parallely(ctx, source, template, template_mask,
-                                                                   scale_list, 0.3)
+    target: MatchResult = template_match_with_scale_list_pyramid(ctx, source, template, template_mask,
+                                                                 scale_list, 0.3,
+                                                                 lm_rect=lm_rect, verify=verify,
+                                                                 template_bank=template_bank)
 
     if show:
         scale = target.template_scale if target is not None else 1
@@ -269,7 +286,8 @@ def cal_character_pos_by_raw(ctx: SrContext,
                              lm_rect: Rect = None,
                              show: bool = False,
                              scale_list: List[float] = None,
-                             match_threshold: float = 0.3) -> Optional[MatchResult]:
+                             match_threshold: float = 0.3,
+                             verify: Optional[VerifyPosInfo] = None) -> Optional[MatchResult]:
     """
     使用模板匹配 在大地图上匹配小地图的位置 会对小地图进行缩放尝试
     使用小地图原图 - 需要到这一步 说明背景比较杂乱 因此道路掩码只使用中心点包含的连通块
@@ -280,6 +298,7 @@ def cal_character_pos_by_raw(ctx: SrContext,
     :param show: 是否显示调试结果
     :param scale_list: 缩放比例
     :param match_threshold: 模板匹配的阈值
+    :param verify: 校验结果需要的信息
     :return:
     """
     source, lm_rect = cv2_utils.crop_image(lm_info.raw, lm_rect)
@@ -287,9 +306,12 @@ def cal_character_pos_by_raw(ctx: SrContext,
     template = mm_info.raw_del_radio
     mini_map_utils.init_road_mask_for_world_patrol(mm_info, another_floor=lm_info.region.another_floor)
     template_mask = mm_info.road_mask_with_edge
+    template_bank = get_template_bank(mm_info, 'raw', template, template_mask)
 
-    target: MatchResult = template_match_with_scale_list_parallely(ctx, source, template, template_mask,
-                                                                   scale_list, match_threshold)
+    target: MatchResult = template_match_with_scale_list_pyramid(ctx, source, template, template_mask,
+                                                                 scale_list, match_threshold,
+                                                                 lm_rect=lm_rect, verify=verify,
+                                                                 template_bank=template_bank)
 
     if show:
         scale = target.template_scale if target is not None else 1
@@ -384,7 +406,8 @@ def cal_character_pos_by_road_mask(ctx: SrContext,
                                    lm_info: LargeMapInfo, mm_info: MiniMapInfo,
                                    lm_rect: Rect = None,
                                    show: bool = False,
-                                   scale_list: List[float] = None) -> Optional[MatchResult]:
+                                   scale_list: List[float] = None,
+                                   verify: Optional[VerifyPosInfo] = None) -> Optional[MatchResult]:
     """
     使用模板匹配 在大地图上匹配小地图的位置 会对小地图进行缩放尝试
     使用处理过后的道路掩码图
@@ -394,6 +417,7 @@ def cal_character_pos_by_road_mask(ctx: SrContext,
     :param lm_rect: 圈定的大地图区域 传入后更准确
     :param show: 是否显示调试结果
     :param scale_list: 缩放比例
+    :param verify: 校验结果需要的信息
     :return:
     """
     source, lm_rect = cv2_utils.crop_image(lm_info.mask, lm_rect)
@@ -401,10 +425,12 @@ def cal_character_pos_by_road_mask(ctx: SrContext,
     mini_map_utils.init_road_mask_for_world_patrol(mm_info, another_floor=lm_info.region.another_floor)
     template = cv2.bitwise_or(mm_info.road_mask, mm_info.arrow_mask)  # 需要把中心补上
     template_mask = mm_info.circle_mask
+    template_bank = get_template_bank(mm_info, 'road_mask', template, template_mask, is_circle_mask=True)
 
-    target: MatchResult = template_match_with_scale_list_parallely(ctx, source, template, template_mask,
-                                                                   scale_list,
-                                                                   0.4)
+    target: MatchResult = template_match_with_scale_list_pyramid(ctx, source, template, template_mask,
+                                                                 scale_list, 0.4,
+                                                                 lm_rect=lm_rect, verify=verify,
+                                                                 template_bank=template_bank)
 
     if show:
         scale = target.template_scale if target is not None else 1
@@ -424,6 +450,25 @@ def cal_character_pos_by_road_mask(ctx: SrContext,
         return None
 
 
+def get_template_bank(mm_info: MiniMapInfo, key: str,
+                      template: MatLike, template_mask: MatLike,
+                      is_circle_mask: bool = False) -> MiniMapTemplateBank:
+    """
+    获取小地图某种模板在各缩放比例下的缓存 同一个小地图只构建一次
+    :param mm_info: 小地图信息
+    :param key: 模板种类
+    :param template: 模板图
+    :param template_mask: 模板掩码
+    :param is_circle_mask: 掩码是否小地图圆形
+    :return:
+    """
+    template_bank = mm_info.template_bank.get(key)
+    if template_bank is None:
+        template_bank = MiniMapTemplateBank(template, template_mask, is_circle_mask=is_circle_mask)
+        mm_info.template_bank[key] = template_bank
+    return template_bank
+
+
 def merge_road_mask(road_mask, edge_mask):
     mask = np.full(road_mask.shape, fill_value=127, dtype=np.uint8)
     mask[np.where(road_mask > 0)] = 0
@@ -434,7 +479,8 @@ def merge_road_mask(road_mask, edge_mask):
 def template_match_with_scale_list_parallely(ctx: SrContext,
                                              source: MatLike, template: MatLike, template_mask: MatLike,
                                              scale_list: List[float],
-                                             threshold: float) -> MatchResult:
+                                             threshold: float,
+                                             template_bank: Optional[MiniMapTemplateBank] = None) -> MatchResult:
     """
     按一定缩放比例进行模板匹配，并行处理不同的缩放比例，返回置信度最高的结果
     :param ctx: 上下文
@@ -443,11 +489,15 @@ def template_match_with_scale_list_parallely(ctx: SrContext,
     :param template_mask: 模板掩码
     :param scale_list: 模板的缩放比例
     :param threshold: 匹配阈值
+    :param template_bank: 模板在各缩放比例下的缓存 不传入时临时构建
     :return: 置信度最高的结果
     """
+    if template_bank is None:
+        template_bank = MiniMapTemplateBank(template, template_mask)
     future_list: List[Future] = []
     for scale in scale_list:
-        f = cal_pos_executor.submit(template_match_with_scale, ctx, source, template, template_mask, scale, threshold)
+        f = cal_pos_executor.submit(template_match_with_scale, ctx, source, template, template_mask, scale, threshold,
+                                    template_bank)
         thread_utils.handle_future_result(f)
         future_list.append(f)
 
@@ -467,7 +517,8 @@ def template_match_with_scale_list_parallely(ctx: SrContext,
 
 def template_match_with_scale(ctx: SrContext,
                               source: MatLike, template: MatLike, template_mask: MatLike, scale: float,
-                              threshold: float) -> MatchResult:
+                              threshold: float,
+                              template_bank: Optional[MiniMapTemplateBank] = None) -> MatchResult:
     """
     按一定缩放比例进行模板匹配，返回置信度最高的结果
     :param ctx: 上下文
@@ -476,40 +527,176 @@ def template_match_with_scale(ctx: SrContext,
     :param template_mask: 模板掩码
     :param scale: 模板的缩放比例
     :param threshold: 匹配阈值
+    :param template_bank: 模板在各缩放比例下的缓存 不传入时临时构建
     :return:
     """
-    template_scale = cv2_utils.scale_image(template, scale, copy=False)
-    template_mask_scale = cv2_utils.scale_image(template_mask, scale, copy=False)
-
-    # 放大后 截取中心部分来匹配 防止放大后的图片超过了原图的范围
-    template_usage = np.zeros_like(template, dtype=np.uint8)
-    template_mask_usage = np.zeros_like(template_mask, dtype=np.uint8)
-
-    height, width = template.shape[:2]
-    scale_height, scale_width = template_scale.shape[:2]
-    cx = scale_width // 2
-    cy = scale_height // 2
-    sx = cx - width // 2
-    ex = sx + width
-    sy = cy - width // 2
-    ey = sy + height
-
-    template_usage[:, :] = template_scale[sy:ey, sx:ex]
-    template_mask_usage[:, :] = template_mask_scale[sy:ey, sx:ex]
+    if template_bank is None:
+        template_bank = MiniMapTemplateBank(template, template_mask)
+    scaled = template_bank.get(scale)
 
-    result: MatchResultList = cv2_utils.match_template(source, template_usage,
-                                                       mask=template_mask_usage, threshold=threshold,
+    result: MatchResultList = cv2_utils.match_template(source, scaled.template,
+                                                       mask=scaled.mask, threshold=threshold,
                                                        only_best=True, ignore_inf=True)
     if result.max is not None:
-        result.max.x -= sx
-        result.max.y -= sy
-        result.max.w = scale_width
-        result.max.h = scale_height
+        result.max.x -= scaled.sx
+        result.max.y -= scaled.sy
+        result.max.w = scaled.scale_width
+        result.max.h = scaled.scale_height
         result.max.template_scale = scale
 
     return result.max
 
 
+def template_match_with_scale_list_pyramid(ctx: SrContext,
+                                           source: MatLike, template: MatLike, template_mask: MatLike,
+                                           scale_list: List[float],
+                                           threshold: float,
+                                           lm_rect: Optional[Rect] = None,
+                                           verify: Optional[VerifyPosInfo] = None,
+                                           template_bank: Optional[MiniMapTemplateBank] = None) -> Optional[MatchResult]:
+    """
+    金字塔 由粗到精的模板匹配
+    1. 将原图和各缩放比例的模板缩小 在低分辨率下匹配所有缩放比例 每个比例保留若干个峰值
+    2. 所有比例的峰值中 只保留置信度最高的 PYRAMID_TOP_K 个候选
+    3. 在原分辨率下 只对候选位置附近的小范围进行精匹配
+    原图相对模板不够大时 粗匹配没有收益 退化为逐个缩放比例的全图匹配
+    :param ctx: 上下文
+    :param source: 原图
+    :param template: 模板图
+    :param template_mask: 模板掩码
+    :param scale_list: 模板的缩放比例
+    :param threshold: 匹配阈值 只用于精匹配
+    :param lm_rect: 原图在大地图上的区域 用于校验结果
+    :param verify: 校验结果需要的信息 有传入时 返回第一个通过校验的候选结果
+    :param template_bank: 模板在各缩放比例下的缓存 不传入时临时构建
+    :return: 原图上的匹配结果
+    """
+    if template_bank is None:
+        template_bank = MiniMapTemplateBank(template, template_mask)
+
+    source_h, source_w = source.shape[:2]
+    template_h, template_w = template.shape[:2]
+    coarse_template_len = int(min(template_h, template_w) * PYRAMID_COARSE_SCALE)
+    if (not USE_PYRAMID_MATCH
+            or source_h < template_h * PYRAMID_MIN_SOURCE_RATIO
+            or source_w < template_w * PYRAMID_MIN_SOURCE_RATIO
+            or coarse_template_len < PYRAMID_MIN_COARSE_TEMPLATE_LEN):
+        return template_match_with_scale_list_parallely(ctx, source, template, template_mask,
+                                                        scale_list, threshold, template_bank=template_bank)
+
+    coarse_source = cv2.resize(source, None, fx=PYRAMID_COARSE_SCALE, fy=PYRAMID_COARSE_SCALE,
+                               interpolation=cv2.INTER_AREA)
+
+    future_list: List[Future] = []
+    for scale in scale_list:
+        future_list.append(cal_pos_executor.submit(_pyramid_coarse_match, coarse_source,
+                                                   template_bank, scale))
+
+    # (置信度, 缩放比例, 原分辨率下的x, 原分辨率下的y)
+    coarse_list: List[Tuple[float, float, int, int]] = []
+    for future in future_list:
+        try:
+            coarse_list.extend(future.result(1))
+        except concurrent.futures.TimeoutError:
+            log.error('模板匹配超时', exc_info=True)
+        except Exception:
+            log.error('金字塔粗匹配失败', exc_info=True)
+
+    coarse_list.sort(key=lambda i: i[0], reverse=True)
+
+    refine_list: List[MatchResult] = []
+    for _, scale, x, y in coarse_list[:PYRAMID_TOP_K]:
+        result = _pyramid_refine_match(source, template_bank, scale, x, y, threshold)
+        if result is None:
+            continue
+        if any(i.x == result.x and i.y == result.y and i.template_scale == result.template_scale
+               for i in refine_list):
+            continue
+        refine_list.append(result)
+
+    if len(refine_list) == 0:
+        return None
+
+    refine_list.sort(key=lambda i: i.confidence, reverse=True)
+    if verify is not None:
+        offset_x = lm_rect.x1 if lm_rect is not None else 0
+        offset_y = lm_rect.y1 if lm_rect is not None else 0
+        for result in refine_list:
+            lm_result = MatchResult(result.confidence, result.x + offset_x, result.y + offset_y,
+                                    result.w, result.h, result.template_scale)
+            if is_valid_result(lm_result, verify):
+                return result
+
+    return refine_list[0]
+
+
+def _pyramid_coarse_match(coarse_source: MatLike, template_bank: MiniMapTemplateBank,
+                          scale: float) -> List[Tuple[float, float, int, int]]:
+    """
+    金字塔粗匹配 在低分辨率下匹配一个缩放比例 返回若干个峰值
+    :param coarse_source: 缩小后的原图
+    :param template_bank: 模板在各缩放比例下的缓存
+    :param scale: 模板的缩放比例
+    :return: 峰值列表 (置信度, 缩放比例, 原分辨率下的x, 原分辨率下的y)
+    """
+    coarse_template, coarse_mask = template_bank.get(scale).get_coarse(PYRAMID_COARSE_SCALE)
+    if (coarse_source.shape[0] < coarse_template.shape[0]
+            or coarse_source.shape[1] < coarse_template.shape[1]):
+        return []
+
+    result = cv2.matchTemplate(coarse_source, coarse_template, cv2.TM_CCOEFF_NORMED, mask=coarse_mask)
+    result[~np.isfinite(result)] = -1  # 全黑区域会产生无限大的结果
+
+    # 每找到一个峰值 就抹掉附近的区域 避免同一个位置重复作为候选
+    suppress_r = max(1, min(coarse_template.shape[:2]) // 4)
+    peak_list = []
+    for _ in range(PYRAMID_PEAKS_PER_SCALE):
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val <= -1:
+            break
+        x, y = max_loc
+        peak_list.append((max_val, scale,
+                          int(round(x / PYRAMID_COARSE_SCALE)), int(round(y / PYRAMID_COARSE_SCALE))))
+        result[max(0, y - suppress_r):y + suppress_r + 1, max(0, x - suppress_r):x + suppress_r + 1] = -1
+
+    return peak_list
+
+
+def _pyramid_refine_match(source: MatLike, template_bank: MiniMapTemplateBank,
+                          scale: float, x: int, y: int, threshold: float) -> Optional[MatchResult]:
+    """
+    金字塔精匹配 在原分辨率下 只匹配候选位置附近的区域
+    :param source: 原图
+    :param template_bank: 模板在各缩放比例下的缓存
+    :param scale: 模板的缩放比例
+    :param x: 粗匹配得到的x
+    :param y: 粗匹配得到的y
+    :param threshold: 匹配阈值
+    :return: 原图上的匹配结果 坐标和宽高的含义与 template_match_with_scale 一致
+    """
+    scaled = template_bank.get(scale)
+    template_h, template_w = scaled.template.shape[:2]
+    source_h, source_w = source.shape[:2]
+
+    margin = PYRAMID_REFINE_MARGIN
+    x1 = max(0, x - margin)
+    y1 = max(0, y - margin)
+    x2 = min(source_w, x + template_w + margin)
+    y2 = min(source_h, y + template_h + margin)
+    if x2 - x1 < template_w or y2 - y1 < template_h:
+        return None
+
+    result: MatchResultList = cv2_utils.match_template(source[y1:y2, x1:x2], scaled.template,
+                                                       mask=scaled.mask, threshold=threshold,
+                                                       only_best=True, ignore_inf=True)
+    if result.max is None:
+        return None
+
+    return MatchResult(result.max.confidence,
+                       result.max.x + x1 - scaled.sx, result.max.y + y1 - scaled.sy,
+                       scaled.scale_width, scaled.scale_height, template_scale=scale)
+
+
 def sim_uni_cal_pos(
         ctx: SrContext,
         lm_info: LargeMapInfo, mm_info: MiniMapInfo,
@@ -540,12 +727,14 @@ def sim_uni_cal_pos(
     # 模拟宇宙中 由于地图都是裁剪的 小地图缺块 不能直接使用道路掩码匹配（误报率非常高）
 
     if result is None:  # 使用模板匹配 灰度图
-        r1 = sim_uni_cal_pos_by_gray(ctx, lm_info, mm_info, lm_rect=lm_rect, scale_list=scale_list, show=show)
+        r1 = sim_uni_cal_pos_by_gray(ctx, lm_info, mm_info, lm_rect=lm_rect, scale_list=scale_list, show=show,
+                                     verify=verify)
         if is_valid_result(r1, verify):
             result = r1
 
     if result is None:  # 使用模板匹配 原图
-        r2 = sim_uni_cal_pos_by_raw(ctx, lm_info, mm_info, lm_rect=lm_rect, scale_list=scale_list, show=show)
+        r2 = sim_uni_cal_pos_by_raw(ctx, lm_info, mm_info, lm_rect=lm_rect, scale_list=scale_list, show=show,
+                                    verify=verify)
         if is_valid_result(r2, verify):
             result = r2
 
@@ -575,7 +764,8 @@ def sim_uni_cal_pos_by_gray(ctx: SrContext,
                             lm_rect: Rect = None,
                             show: bool = False,
                             scale_list: List[float] = None,
-                            match_threshold: float = 0.3) -> Optional[MatchResult]:
+                            match_threshold: float = 0.3,
+                            verify: Optional[VerifyPosInfo] = None) -> Optional[MatchResult]:
     """
     使用模板匹配 在大地图上匹配小地图的位置 会对小地图进行缩放尝试
     使用模拟宇宙专用的道路掩码图 + 灰度图
@@ -586,6 +776,7 @@ def sim_uni_cal_pos_by_gray(ctx: SrContext,
     :param show: 是否显示调试结果
     :param scale_list: 缩放比例
     :param match_threshold: 模板匹配的阈值
+    :param verify: 校验结果需要的信息
     :return:
     """
     source, lm_rect = cv2_utils.crop_image(lm_info.raw, lm_rect)
@@ -594,9 +785,12 @@ def sim_uni_cal_pos_by_gray(ctx: SrContext,
     template = cv2.cvtColor(mm_info.raw_del_radio, cv2.COLOR_BGR2GRAY)
     mini_map_utils.init_road_mask_for_sim_uni(mm_info)
     template_mask = mm_info.road_mask_with_edge  # 把白色边缘包括进来
+    template_bank = get_template_bank(mm_info, 'gray', template, template_mask)
 
-    target: MatchResult = template_match_with_scale_list_parallely(ctx, source, template, template_mask, scale_list,
-                                                                   match_threshold)
+    target: MatchResult = template_match_with_scale_list_pyramid(ctx, source, template, template_mask,
+                                                                 scale_list, match_threshold,
+                                                                 lm_rect=lm_rect, verify=verify,
+                                                                 template_bank=template_bank)
 
     if show:
         scale = target.template_scale if target is not None else 1
@@ -622,7 +816,8 @@ def sim_uni_cal_pos_by_raw(ctx: SrContext,
                            lm_rect: Rect = None,
                            show: bool = False,
                            scale_list: List[float] = None,
-                           match_threshold: float = 0.3) -> Optional[MatchResult]:
+                           match_threshold: float = 0.3,
+                           verify: Optional[VerifyPosInfo] = None) -> Optional[MatchResult]:
     """
     使用模板匹配 在大地图上匹配小地图的位置 会对小地图进行缩放尝试
     使用模拟宇宙专用的道路掩码图 + 原图
@@ -632,6 +827,7 @@ def sim_uni_cal_pos_by_raw(ctx: SrContext,
     :param lm_rect: 圈定的大地图区域 传入后更准确
     :param show: 是否显示调试结果
     :param scale_list: 缩放比例
+    :param verify: 校验结果需要的信息
     :return:
     """
     source, lm_rect = cv2_utils.crop_image(lm_info.raw, lm_rect)
@@ -639,10 +835,12 @@ def sim_uni_cal_pos_by_raw(ctx: SrContext,
     template = mm_info.raw_del_radio
     mini_map_utils.init_road_mask_for_sim_uni(mm_info)
     template_mask = mm_info.road_mask_with_edge
+    template_bank = get_template_bank(mm_info, 'raw', template, template_mask)
 
-    target: MatchResult = template_match_with_scale_list_parallely(ctx, source, template, template_mask,
-                                                                   scale_list,
-                                                                   threshold=match_threshold)
+    target: MatchResult = template_match_with_scale_list_pyramid(ctx, source, template, template_mask,
+                                                                 scale_list, match_threshold,
+                                                                 lm_rect=lm_rect, verify=verify,
+                                                                 template_bank=template_bank)
 
     if show:
         scale = target.template_scale if target is not None else 1
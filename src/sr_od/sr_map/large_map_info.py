@@ -1,21 +1,57 @@
+import os
 from typing import Optional, Tuple, List
 
 import cv2
+import numpy as np
 from cv2.typing import MatLike
 
-from one_dragon.utils import cv2_utils
+from one_dragon.utils import cv2_utils, feature_cache_utils
 from sr_od.sr_map.sr_map_def import Region
 
+RAW_PYRAMID_LEVELS: int = 3  # 原图金字塔的缩小次数 每次缩小一半 最粗一层为原图的1/8
+RAW_BLOCK_SIZE: int = 4  # 原图分块统计的块大小 用于估计模板匹配得分的上限
+_BLOCK_STRIP_ROWS: int = 256  # 分块统计时每次处理的行数 避免整张图转成浮点数占用太多内存
+
+
+
+def cal_block_stats(image: MatLike) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    图片按 RAW_BLOCK_SIZE 分块后 每块的像素和与平方和 宽高不足一块的部分补0
+    都是整数 使用 float32 可以精确保存
+    :param image: 图片
+    :return: 每块每个通道的像素和 (块行, 块列, 通道) 每块所有通道的平方和 (块行, 块列)
+    """
+    k = RAW_BLOCK_SIZE
+    ch = 1 if image.ndim == 2 else image.shape[2]
+    h, w = image.shape[0] + (-image.shape[0] % k), image.shape[1] + (-image.shape[1] % k)
+    block_sum = np.empty((h // k, w // k, ch), dtype=np.float32)
+    block_sq = np.empty((h // k, w // k), dtype=np.float32)
+    for y in range(0, h, _BLOCK_STRIP_ROWS):
+        strip_h = min(_BLOCK_STRIP_ROWS, h - y)
+        strip = np.zeros((strip_h, w, ch), dtype=np.float32)
+        part = image[y:y + strip_h]
+        strip[:part.shape[0], :part.shape[1]] = part.reshape(part.shape[0], part.shape[1], ch)
+        size = (w // k, strip_h // k)
+        # 整数倍缩小时 INTER_AREA 就是块内的平均值 乘回块的像素数即为块内的和
+        block_sum[y // k:(y + strip_h) // k] = \
+            cv2.resize(strip, size, interpolation=cv2.INTER_AREA).reshape(size[1], size[0], ch) * (k * k)
+        sq = np.square(strip).sum(axis=2, dtype=np.float32)
+        block_sq[y // k:(y + strip_h) // k] = cv2.resize(sq, size, interpolation=cv2.INTER_AREA) * (k * k)
+    return block_sum, block_sq
+
 
 class LargeMapInfo:
 
     def __init__(self):
         self.region: Optional[Region] = None  # 区域
+        self.dir_path: Optional[str] = None  # 地图文件夹 有的话特征点会缓存到文件夹中
         self.raw: MatLike = None  # 原图
         self._gray: MatLike = None  # 灰度图
         self.mask: MatLike = None  # 主体掩码 用于特征匹配
         self._kps = None  # 特征点 用于特征匹配
         self._desc = None  # 描述子 用于特征匹配
+        self._raw_pyramid: Optional[List[MatLike]] = None  # 原图金字塔 用于由粗到精的匹配
+        self._raw_block_stats: Optional[Tuple[np.ndarray, np.ndarray]] = None  # 原图分块统计 用于估计匹配得分的上限
 
     @property
     def gray(self) -> MatLike:
@@ -26,10 +62,48 @@ class LargeMapInfo:
         self._gray = cv2.cvtColor(self.raw, cv2.COLOR_RGB2GRAY)
         return self._gray
 
+    @property
+    def raw_pyramid(self) -> Optional[List[MatLike]]:
+        """
+        原图金字塔 第0层为原图 之后每层宽高减半
+        第一次使用时生成 之后缓存在大地图信息中
+        """
+        if self._raw_pyramid is not None:
+            return self._raw_pyramid
+        if self.raw is None:
+            return None
+        pyramid = [self.raw]
+        for _ in range(RAW_PYRAMID_LEVELS):
+            prev = pyramid[-1]
+            pyramid.append(cv2.resize(prev, (prev.shape[1] // 2, prev.shape[0] // 2), interpolation=cv2.INTER_AREA))
+        self._raw_pyramid = pyramid
+        return self._raw_pyramid
+
+    @property
+    def raw_block_stats(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        原图的分块统计 见 cal_block_stats
+        第一次使用时生成 之后缓存在大地图信息中
+        """
+        if self._raw_block_stats is not None:
+            return self._raw_block_stats
+        if self.raw is None:
+            return None
+        self._raw_block_stats = cal_block_stats(self.raw)
+        return self._raw_block_stats
+
     @property
     def features(self) -> Tuple[List[cv2.KeyPoint], MatLike]:
         if self._kps is not None:
             return self._kps, self._desc
-        if self.raw is not None:
+        if self.raw is None:
+            return self._kps, self._desc
+        if self.dir_path is not None:
+            self._kps, self._desc = feature_cache_utils.detect_and_compute_with_cache(
+                self.raw, self.mask,
+                cache_path=os.path.join(self.dir_path, feature_cache_utils.FEATURES_CACHE_FILE_NAME),
+                source_file_list=[os.path.join(self.dir_path, 'raw.webp'), os.path.join(self.dir_path, 'mask.png')]
+            )
+        else:
             self._kps, self._desc = cv2_utils.feature_detect_and_compute(self.raw, self.mask)
         return self._kps, self._desc
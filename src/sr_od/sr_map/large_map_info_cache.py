@@ -0,0 +1,140 @@
+import threading
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+from one_dragon.utils.log_utils import log
+from sr_od.sr_map.large_map_info import LargeMapInfo
+
+KEYPOINT_BYTES: int = 64  # 每个 cv2.KeyPoint 大约占用的内存
+
+
+def estimate_large_map_info_bytes(info: LargeMapInfo) -> int:
+    """
+    估算一张大地图占用的内存 包括原图、掩码、灰度图、特征点、原图金字塔和分块统计
+    灰度图、特征点、原图金字塔和分块统计是懒加载的 所以获取时需要重新估算
+    :param info: 大地图信息
+    :return: 字节数
+    """
+    arr_list = [info.raw, info.mask, info._gray, info._desc]
+    if info._raw_pyramid is not None:
+        arr_list.extend(info._raw_pyramid[1:])  # 第0层就是原图
+    if info._raw_block_stats is not None:
+        arr_list.extend(info._raw_block_stats)
+    total = 0
+    for arr in arr_list:
+        if arr is not None:
+            total += arr.nbytes
+    if info._kps is not None:
+        total += len(info._kps) * KEYPOINT_BYTES
+    return total
+
+
+class LargeMapInfoCache:
+
+    def __init__(self, max_bytes: int):
+        """
+        大地图的LRU缓存 按占用内存淘汰最久没使用的地图
+        最近使用的一张地图不会被淘汰 即使它本身已经超过了预算
+        用法与 dict[str, LargeMapInfo] 一致
+        :param max_bytes: 内存预算 <=0 时不淘汰
+        """
+        self.max_bytes: int = max_bytes
+        self._data: OrderedDict[str, LargeMapInfo] = OrderedDict()
+        self._bytes: dict[str, int] = {}  # 每张地图上次估算的内存
+        self._total_bytes: int = 0
+        self._lock = threading.RLock()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __getitem__(self, key: str) -> LargeMapInfo:
+        info = self.get(key)
+        if info is None:
+            raise KeyError(key)
+        return info
+
+    def __setitem__(self, key: str, info: LargeMapInfo) -> None:
+        self.put(key, info)
+
+    def put(self, key: str, info: LargeMapInfo, recent: bool = True) -> None:
+        """
+        放入一张地图 并检查预算
+        :param key: 区域的 prl_id
+        :param info: 大地图信息
+        :param recent: 是否标记为最近使用 预加载的地图传 False 放到最先淘汰的位置 避免挤走正在使用的地图
+        :return:
+        """
+        with self._lock:
+            self._data[key] = info
+            self._data.move_to_end(key, last=recent)
+            self._update_bytes(key, info)
+            self.shrink()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._data.keys()))
+
+    def get(self, key: str) -> Optional[LargeMapInfo]:
+        """
+        获取缓存的地图 并标记为最近使用
+        获取时重新估算这张地图并检查预算 因为懒加载的灰度图和特征点会让占用变大
+        :param key: 区域的 prl_id
+        :return:
+        """
+        with self._lock:
+            info = self._data.get(key)
+            if info is not None:
+                self._data.move_to_end(key)
+                if self._update_bytes(key, info):
+                    self.shrink()
+            return info
+
+    def pop(self, key: str, default: Optional[LargeMapInfo] = None) -> Optional[LargeMapInfo]:
+        with self._lock:
+            self._total_bytes -= self._bytes.pop(key, 0)
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes.clear()
+            self._total_bytes = 0
+
+    def _update_bytes(self, key: str, info: LargeMapInfo) -> bool:
+        """
+        重新估算一张地图占用的内存 并更新总数
+        :param key: 区域的 prl_id
+        :param info: 大地图信息
+        :return: 占用是否变大了
+        """
+        info_bytes = estimate_large_map_info_bytes(info)
+        old_bytes = self._bytes.get(key, 0)
+        self._bytes[key] = info_bytes
+        self._total_bytes += info_bytes - old_bytes
+        return info_bytes > old_bytes
+
+    @property
+    def total_bytes(self) -> int:
+        """
+        当前缓存占用的内存 按每张地图最后一次估算的结果
+        """
+        with self._lock:
+            return self._total_bytes
+
+    def shrink(self) -> None:
+        """
+        淘汰最久没使用的地图 直到满足内存预算
+        """
+        if self.max_bytes <= 0:
+            return
+        with self._lock:
+            while self._total_bytes > self.max_bytes and len(self._data) > 1:
+                key, info = self._data.popitem(last=False)
+                info_bytes = self._bytes.pop(key, 0)
+                self._total_bytes -= info_bytes
+                log.debug('大地图缓存超出预算 移除 %s 释放 %.1fMB', key, info_bytes / 1024 / 1024)
@@ -0,0 +1,298 @@
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from one_dragon.base.matcher.match_result import MatchResult
+from one_dragon.utils import cv2_utils
+from sr_od.sr_map.large_map_info import LargeMapInfo, RAW_BLOCK_SIZE, cal_block_stats
+
+COARSE_CANDIDATE_CNT: int = 4  # 最粗一层保留的候选位置数量 之后每细一层减半
+COARSE_SUPPRESS_RADIUS: int = 4  # 最粗一层选取候选位置时 抑制已选位置附近这个半径内的结果
+REFINE_MARGIN: int = 2  # 上一层的位置放大到这一层后 在周围这个半径内重新匹配
+MIN_COARSE_TEMPLATE_SIZE: int = 16  # 最粗一层的模板宽高不能小于这个值 否则直接全图匹配
+BOUND_TOLERANCE: float = 1e-3  # 得分上限与当前最高分比较时的容差 抵消 matchTemplate 的浮点误差
+MAX_VERIFY_RATIO: float = 0.1  # 需要在原图上确认的位置超过全部位置的这个比例时 直接全图匹配
+MAX_VERIFY_REGION_CNT: int = 4  # 需要在原图上确认的区域超过这个数量时 直接全图匹配
+VERIFY_MERGE_DISTANCE: int = 32  # 距离在这个格子数内的格子合并成一个区域确认 区域稍大一点匹配耗时差别不大
+MIN_SOURCE_TEMPLATE_RATIO: float = 4  # 原图面积不到模板的这个倍数时 整图匹配本身就很快 直接整图匹配
+
+
+def _build_template_pyramid(template: MatLike, levels: int) -> List[MatLike]:
+    """
+    模板金字塔 缩小方式与大地图的原图金字塔一致
+    :param template: 模板
+    :param levels: 缩小次数
+    :return:
+    """
+    pyramid = [template]
+    for _ in range(levels):
+        prev = pyramid[-1]
+        pyramid.append(cv2.resize(prev, (prev.shape[1] // 2, prev.shape[0] // 2), interpolation=cv2.INTER_AREA))
+    return pyramid
+
+
+def _top_candidates(result: MatLike, cnt: int) -> List[Tuple[int, int]]:
+    """
+    从匹配结果中选取得分最高的几个位置 已选位置附近的结果不再选取
+    :param result: matchTemplate 的结果
+    :param cnt: 数量
+    :return: 位置列表 (x, y)
+    """
+    result = result.copy()
+    r = COARSE_SUPPRESS_RADIUS
+    candidates = []
+    for _ in range(cnt):
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if not np.isfinite(max_val) or max_val <= -1:
+            break
+        candidates.append(max_loc)
+        x, y = max_loc
+        result[max(0, y - r):y + r + 1, max(0, x - r):x + r + 1] = -2
+    return candidates
+
+
+def _refine(source: MatLike, template: MatLike, x: int, y: int) -> Tuple[float, int, int]:
+    """
+    在位置附近重新匹配
+    :param source: 这一层的原图
+    :param template: 这一层的模板
+    :param x: 上一层位置放大后的横坐标
+    :param y: 上一层位置放大后的纵坐标
+    :return: 得分 横坐标 纵坐标
+    """
+    th, tw = template.shape[0], template.shape[1]
+    sh, sw = source.shape[0], source.shape[1]
+    x1 = min(max(0, x - REFINE_MARGIN), sw - tw)
+    y1 = min(max(0, y - REFINE_MARGIN), sh - th)
+    x2 = min(max(0, x + REFINE_MARGIN), sw - tw)
+    y2 = min(max(0, y + REFINE_MARGIN), sh - th)
+    result = cv2.matchTemplate(source[y1:y2 + th, x1:x2 + tw], template, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return max_val, x1 + max_loc[0], y1 + max_loc[1]
+
+
+def _window_sum(integral: np.ndarray, y: int, x: int, h: int, w: int, out_h: int, out_w: int) -> np.ndarray:
+    """
+    使用积分图 计算从 (y, x) 开始 宽高为 (w, h) 的窗口在每个偏移量下的和
+    :param integral: 积分图
+    :param y: 窗口相对偏移量的纵坐标
+    :param x: 窗口相对偏移量的横坐标
+    :param h: 窗口的高
+    :param w: 窗口的宽
+    :param out_h: 纵向偏移量的数量
+    :param out_w: 横向偏移量的数量
+    :return:
+    """
+    return (integral[y + h:y + h + out_h, x + w:x + w + out_w] - integral[y:y + out_h, x + w:x + w + out_w]
+            - integral[y + h:y + h + out_h, x:x + out_w] + integral[y:y + out_h, x:x + out_w])
+
+
+def _cell_upper_bound(block_stats: Tuple[np.ndarray, np.ndarray], source_shape: Tuple[int, ...],
+                      template: MatLike) -> Optional[np.ndarray]:
+    """
+    以 RAW_BLOCK_SIZE 为边长 把整图匹配结果的位置分成格子 计算每个格子内 TM_CCOEFF_NORMED 得分的上限
+    模板减去均值后记为 T 原图按块拆成块内均值 B 和块内残差 R 对于格子内偏移 d 的位置
+    - T 与 B 的相关 = 块均值与 T_d 的相关 T_d 为 T 在这个偏移下落在每块内的和
+      T_d 写成所有偏移的平均 T_c 加上差值 前者对整个格子只算一次 后者用柯西不等式放大
+    - T 与 R 的相关 R 在完整的块内和为0 所以 T 可以先减去块内均值 再用柯西不等式放大
+    - 分母使用所有偏移的窗口都包含的完整块的方差 不会比实际窗口的方差大
+    :param block_stats: 原图的分块统计
+    :param source_shape: 原图的形状
+    :param template: 模板
+    :return: 每个格子的得分上限 模板太小时返回None
+    """
+    k = RAW_BLOCK_SIZE
+    block_sum, block_sq = block_stats
+    ch = block_sum.shape[2]
+    th, tw = template.shape[0], template.shape[1]
+    inner_h, inner_w = th // k - 1, tw // k - 1  # 所有偏移下都完整落在窗口内的块
+    if inner_h <= 0 or inner_w <= 0:
+        return None
+
+    t = template.reshape(th, tw, ch).astype(np.float64)
+    t -= t.reshape(-1, ch).mean(axis=0)
+    t_norm = np.sqrt(np.square(t).sum())
+    if t_norm == 0:
+        return None
+
+    # 每个偏移下 模板落在每块内的和、平方和、像素数
+    mh, mw = (th + k - 2) // k + 1, (tw + k - 2) // k + 1
+    row_bound = np.clip(np.arange(mh + 1)[np.newaxis, :] * k - np.arange(k)[:, np.newaxis], 0, th)
+    col_bound = np.clip(np.arange(mw + 1)[np.newaxis, :] * k - np.arange(k)[:, np.newaxis], 0, tw)
+    rows = row_bound[:, np.newaxis, :, np.newaxis]
+    cols = col_bound[np.newaxis, :, np.newaxis, :]
+
+    def block_total(integral: np.ndarray) -> np.ndarray:
+        corner = integral[rows, cols]
+        return corner[:, :, 1:, 1:] - corner[:, :, :-1, 1:] - corner[:, :, 1:, :-1] + corner[:, :, :-1, :-1]
+
+    t_sum = block_total(cv2.integral(t, sdepth=cv2.CV_64F).reshape(th + 1, tw + 1, ch))
+    t_sq = block_total(cv2.integral(np.square(t).sum(axis=2), sdepth=cv2.CV_64F))
+    t_cnt = (np.diff(row_bound, axis=1)[:, np.newaxis, :, np.newaxis]
+             * np.diff(col_bound, axis=1)[np.newaxis, :, np.newaxis, :])
+
+    t_center = t_sum.mean(axis=(0, 1))
+    shift_norm = np.sqrt(np.square(t_sum - t_center).sum(axis=(2, 3, 4)).max())
+    residual_sq = np.where(t_cnt == k * k, t_sq - np.square(t_sum).sum(axis=-1) / (k * k), t_sq)
+    residual_norm = np.sqrt(max(0.0, residual_sq.sum(axis=(2, 3)).max()))
+
+    # 格子数量 以及覆盖所有格子需要的块
+    result_h, result_w = source_shape[0] - th + 1, source_shape[1] - tw + 1
+    qh, qw = (result_h + k - 1) // k, (result_w + k - 1) // k
+    nh, nw = qh + mh - 1, qw + mw - 1
+    src_sum = np.zeros((nh, nw, ch), dtype=np.float64)
+    src_sq = np.zeros((nh, nw), dtype=np.float64)
+    copy_h, copy_w = min(nh, block_sum.shape[0]), min(nw, block_sum.shape[1])
+    src_sum[:copy_h, :copy_w] = block_sum[:copy_h, :copy_w]
+    src_sq[:copy_h, :copy_w] = block_sq[:copy_h, :copy_w]
+    src_mean = src_sum / (k * k)
+
+    # T_c 与块均值的相关 T_c 每个通道的和为0 减去一个常数不影响结果 可以减小浮点误差
+    center_corr = cv2.matchTemplate((src_mean - 128).astype(np.float32), t_center.astype(np.float32),
+                                    cv2.TM_CCORR)[:qh, :qw].astype(np.float64)
+
+    mean_integral = cv2.integral(src_mean, sdepth=cv2.CV_64F).reshape(nh + 1, nw + 1, ch)
+    mean_sq_integral = cv2.integral(np.square(src_mean).sum(axis=2), sdepth=cv2.CV_64F)
+    mean_dev = (_window_sum(mean_sq_integral, 0, 0, mh, mw, qh, qw)
+                - np.square(_window_sum(mean_integral, 0, 0, mh, mw, qh, qw)).sum(axis=2) / (mh * mw))
+
+    residual = np.maximum(src_sq - np.square(src_sum).sum(axis=2) / (k * k), 0)
+    residual_sum = _window_sum(cv2.integral(residual, sdepth=cv2.CV_64F), 0, 0, mh, mw, qh, qw)
+
+    sum_integral = cv2.integral(src_sum, sdepth=cv2.CV_64F).reshape(nh + 1, nw + 1, ch)
+    sq_integral = cv2.integral(src_sq, sdepth=cv2.CV_64F)
+    inner_var = (_window_sum(sq_integral, 1, 1, inner_h, inner_w, qh, qw)
+                 - np.square(_window_sum(sum_integral, 1, 1, inner_h, inner_w, qh, qw)).sum(axis=2)
+                 / (inner_h * inner_w * k * k))
+
+    numerator = (center_corr
+                 + shift_norm * np.sqrt(np.maximum(mean_dev, 0))
+                 + residual_norm * np.sqrt(residual_sum))
+    denominator = t_norm * np.sqrt(np.maximum(inner_var, 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.inf)
+
+
+def _get_verify_region_list(cell_mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """
+    把需要确认的格子合并成区域 距离较近的格子合并在一起
+    :param cell_mask: 需要确认的格子
+    :return: 区域列表 每个区域为格子的 (x1, y1, x2, y2) 左闭右开
+    """
+    r = VERIFY_MERGE_DISTANCE
+    mask = cell_mask.astype(np.uint8)
+    merged = cv2.dilate(mask, cv2.getStructuringElement(cv2.MORPH_RECT, (2 * r + 1, 2 * r + 1)))
+    cnt, labels = cv2.connectedComponents(merged, connectivity=8)
+    labels[mask == 0] = 0
+    region_list = []
+    for i in range(1, cnt):
+        ys, xs = np.nonzero(labels == i)
+        if len(ys) == 0:
+            continue
+        region_list.append((int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1))
+    return region_list
+
+
+def _match_in_regions(source: MatLike, template: MatLike,
+                      region_list: List[Tuple[int, int, int, int]]) -> Optional[Tuple[float, int, int]]:
+    """
+    只在需要确认的区域内 在原图上匹配
+    :param source: 原图
+    :param template: 模板
+    :param region_list: 区域列表 见 _get_verify_region_list
+    :return: 得分 横坐标 纵坐标 得分相同时取先按行再按列的第一个 没有区域时返回None
+    """
+    k = RAW_BLOCK_SIZE
+    th, tw = template.shape[0], template.shape[1]
+    result_h, result_w = source.shape[0] - th + 1, source.shape[1] - tw + 1
+    best: Optional[Tuple[float, int, int]] = None
+    for cell_x1, cell_y1, cell_x2, cell_y2 in region_list:
+        x1, y1 = cell_x1 * k, cell_y1 * k
+        x2, y2 = min(result_w, cell_x2 * k), min(result_h, cell_y2 * k)
+        result = cv2.matchTemplate(source[y1:y2 + th - 1, x1:x2 + tw - 1], template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        current = (max_val, x1 + max_loc[0], y1 + max_loc[1])
+        if best is None or (current[0], -current[2], -current[1]) > (best[0], -best[2], -best[1]):
+            best = current
+    return best
+
+
+def match_template_coarse_to_fine(source_pyramid: List[MatLike], template: MatLike, threshold: float,
+                                  block_stats: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Optional[MatchResult]:
+    """
+    使用金字塔由粗到精匹配模板 结果与在原图上整图匹配取最大值一致
+    - 在最粗一层整图匹配 保留几个候选位置
+    - 逐层放大候选位置 只在附近重新匹配 保留得分高的一半 得到一个较高的得分
+    - 用原图的分块统计计算每个格子的得分上限 上限低于这个得分和阈值的格子不可能是结果
+    - 在剩下的格子内 在原图上匹配 取最高分
+    - 原图不比模板大很多 或剩下的格子太多太分散时 退回整图匹配
+    :param source_pyramid: 原图金字塔 第0层为原图
+    :param template: 模板
+    :param threshold: 阈值
+    :param block_stats: 原图的分块统计 见 cal_block_stats 为空时临时计算
+    :return: 匹配结果 没有超过阈值的结果时返回None
+    """
+    levels = len(source_pyramid) - 1
+    th, tw = template.shape[0], template.shape[1]
+    source = source_pyramid[0]
+    if (levels <= 0
+            or source.shape[0] * source.shape[1] < th * tw * MIN_SOURCE_TEMPLATE_RATIO
+            or (th >> levels) < MIN_COARSE_TEMPLATE_SIZE or (tw >> levels) < MIN_COARSE_TEMPLATE_SIZE
+            or th > source.shape[0] or tw > source.shape[1]):
+        return cv2_utils.match_template(source, template, threshold).max
+
+    template_pyramid = _build_template_pyramid(template, levels)
+    coarse_source = source_pyramid[levels]
+    coarse_template = template_pyramid[levels]
+    if (coarse_template.shape[0] > coarse_source.shape[0]
+            or coarse_template.shape[1] > coarse_source.shape[1]):
+        return cv2_utils.match_template(source, template, threshold).max
+
+    coarse_result = cv2.matchTemplate(coarse_source, coarse_template, cv2.TM_CCOEFF_NORMED)
+    candidates = _top_candidates(coarse_result, COARSE_CANDIDATE_CNT)
+
+    best: Optional[Tuple[float, int, int]] = None
+    for level in range(levels - 1, -1, -1):
+        refined = [_refine(source_pyramid[level], template_pyramid[level], cx * 2, cy * 2)
+                   for cx, cy in candidates]
+        # 得分相同时 取整图匹配中先遍历到的位置 即先按行再按列
+        refined.sort(key=lambda i: (-i[0], i[2], i[1]))
+        if len(refined) == 0:
+            break
+        best = refined[0]
+        keep_cnt = max(1, len(candidates) // 2) if level > 0 else 1
+        candidates = [(i[1], i[2]) for i in refined[:keep_cnt]]
+
+    if block_stats is None:
+        block_stats = cal_block_stats(source)
+    cell_bound = _cell_upper_bound(block_stats, source.shape, template)
+    if cell_bound is None:
+        return cv2_utils.match_template(source, template, threshold).max
+
+    min_score = threshold if best is None else max(threshold, best[0])
+    cell_mask = cell_bound >= min_score - BOUND_TOLERANCE
+    if np.count_nonzero(cell_mask) > cell_mask.size * MAX_VERIFY_RATIO:
+        return cv2_utils.match_template(source, template, threshold).max
+    region_list = _get_verify_region_list(cell_mask)
+    if (len(region_list) > MAX_VERIFY_REGION_CNT
+            or sum((i[2] - i[0]) * (i[3] - i[1]) for i in region_list) > cell_mask.size * MAX_VERIFY_RATIO):
+        return cv2_utils.match_template(source, template, threshold).max
+
+    best = _match_in_regions(source, template, region_list)
+    if best is None or not best[0] >= threshold:
+        return None
+
+    return MatchResult(best[0], best[1], best[2], tw, th)
+
+
+def match_in_large_map(lm_info: LargeMapInfo, template: MatLike, threshold: float) -> Optional[MatchResult]:
+    """
+    在大地图原图中匹配 使用大地图缓存的原图金字塔和分块统计
+    :param lm_info: 大地图信息
+    :param template: 模板 例如屏幕上截取的大地图部分
+    :param threshold: 阈值
+    :return: 匹配结果 没有超过阈值的结果时返回None
+    """
+    return match_template_coarse_to_fine(lm_info.raw_pyramid, template, threshold, lm_info.raw_block_stats)
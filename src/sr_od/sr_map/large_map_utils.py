@@ -7,12 +7,13 @@ from cv2.typing import MatLike
 
 from one_dragon.base.geometry.point import Point
 from one_dragon.base.geometry.rectangle import Rect
-from one_dragon.base.matcher.match_result import MatchResult, MatchResultList
+from one_dragon.base.matcher.match_result import MatchResult
 from one_dragon.base.screen.template_info import TemplateInfo
 from one_dragon.utils import cv2_utils
 from one_dragon.utils.log_utils import log
 from sr_od.config import game_const
 from sr_od.context.sr_context import SrContext
+from sr_od.sr_map import large_map_registration
 from sr_od.sr_map.large_map_info import LargeMapInfo
 from sr_od.sr_map.sr_map_def import Planet, Region
 
@@ -203,9 +204,10 @@ def match_screen_in_large_map(ctx: SrContext, screen: MatLike, region: Region) -
     screen_map_rect = get_screen_map_rect(region)
     screen_part = cv2_utils.crop_image_only(screen, screen_map_rect)
     lm_info = ctx.map_data.get_large_map_info(region)
-    result: MatchResultList = cv2_utils.match_template(lm_info.raw, screen_part, 0.7)
+    # 使用原图金字塔由粗到精匹配 结果与整图 cv2_utils.match_template 取最大值一致
+    result: Optional[MatchResult] = large_map_registration.match_in_large_map(lm_info, screen_part, 0.7)
 
-    return screen_part, result.max
+    return screen_part, result
 
 
 def drag_in_large_map(ctx: SrContext, dx: Optional[int] = None, dy: Optional[int] = None):
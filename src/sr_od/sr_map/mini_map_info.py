@@ -1,5 +1,7 @@
 from cv2.typing import MatLike
-from typing import Optional
+from typing import Dict, Optional
+
+from sr_od.sr_map.mini_map_template_bank import MiniMapTemplateBank
 
 
 class MiniMapInfo:
@@ -15,3 +17,4 @@ class MiniMapInfo:
         self.sp_result: Optional[dict] = None  # 匹配到的特殊点结果
         self.road_mask: Optional[MatLike] = None  # 道路掩码 不包含中间的小箭头 以及特殊点
         self.road_mask_with_edge: Optional[MatLike] = None  # 有边缘道路掩码 不包含中间的小箭头 以及特殊点 适用于灰度图和原图匹配
+        self.template_bank: Dict[str, MiniMapTemplateBank] = {}  # 各种匹配方法使用的模板 在各缩放比例下的缓存
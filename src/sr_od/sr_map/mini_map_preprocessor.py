@@ -0,0 +1,229 @@
+import threading
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from one_dragon.utils import cv2_utils
+from sr_od.config import game_const
+from sr_od.sr_map.mini_map_info import MiniMapInfo
+
+ARROW_NOISE_AREA: int = 50  # 小箭头掩码中 小于这个面积的连通块认为是噪点
+
+# 颜色分类的标记位
+_FLAG_ROAD = 1  # 三个通道都在道路背景色范围内
+_FLAG_EDGE = 2  # 三个通道都在道路边缘色范围内
+_FLAG_ENEMY = 4  # 敌人红点的颜色范围
+_FLAG_CURRENT_FLOOR = 8  # 三色差不超过1 当前层的道路
+_FLAG_ANOTHER_FLOOR = 16  # R<=G<=B 且差值在2以内 另一层的道路
+
+
+def _range_lut(lower: int, upper: int, flag: int) -> np.ndarray:
+    """
+    单个通道的颜色查找表 在范围内的值为标记位
+    :param lower: 下限 包含
+    :param upper: 上限 包含
+    :param flag: 标记位
+    :return:
+    """
+    lut = np.zeros(256, dtype=np.uint8)
+    lut[lower:upper + 1] = flag
+    return lut
+
+
+# 与 init_road_mask_for_world_patrol 原来使用的颜色范围一致
+_LUT_R = _range_lut(45, 70, _FLAG_ROAD) | _range_lut(160, 210, _FLAG_EDGE) | _range_lut(80, 255, _FLAG_ENEMY)
+_LUT_GB = _range_lut(45, 70, _FLAG_ROAD) | _range_lut(160, 210, _FLAG_EDGE) | _range_lut(45, 70, _FLAG_ENEMY)
+_LUT_CURRENT_FLOOR = _range_lut(0, 1, _FLAG_CURRENT_FLOOR)  # 输入为 max(rgb) - min(rgb)
+_LUT_ANOTHER_FLOOR = _range_lut(0, 2, _FLAG_ANOTHER_FLOOR)  # 输入为 uint8 下的 b-g 和 g-r 负数会回绕成大数
+
+
+def _build_mask_lut(another_floor: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    由颜色分类的标记位 得到道路掩码和边缘掩码的查找表
+    :param another_floor: 是否考虑另一层的道路
+    :return: 道路掩码的查找表 边缘掩码的查找表
+    """
+    code = np.arange(256)
+    floor = (code & _FLAG_CURRENT_FLOOR) > 0
+    if another_floor:
+        floor |= (code & _FLAG_ANOTHER_FLOOR) > 0
+    road = (((code & _FLAG_ROAD) > 0) & floor) | ((code & _FLAG_ENEMY) > 0)
+    edge = ((code & _FLAG_EDGE) > 0) & ((code & _FLAG_CURRENT_FLOOR) > 0)
+    return (road * 255).astype(np.uint8), (edge * 255).astype(np.uint8)
+
+
+_MASK_LUT = {
+    True: _build_mask_lut(True),
+    False: _build_mask_lut(False),
+}
+
+
+@lru_cache(maxsize=16)
+def get_circle_mask(height: int, width: int) -> MatLike:
+    """
+    小地图的圆形掩码 只跟小地图尺寸有关 因此全局缓存
+    返回结果为只读
+    :param height: 小地图高
+    :param width: 小地图宽
+    :return:
+    """
+    # 与原来 init_circle_mask 一致 由 arrow_mask.shape 取宽高 小地图是正方形所以没有影响
+    h, w = width, height
+    circle_mask = np.zeros((height, width), dtype=np.uint8)
+    cv2.circle(circle_mask, (w // 2, h // 2), h // 2 - 5, 255, -1)  # 忽略一点圆的边缘
+    circle_mask.flags.writeable = False
+    return circle_mask
+
+
+class _MiniMapBuffers:
+
+    def __init__(self, height: int, width: int):
+        """
+        某个小地图尺寸下 计算道路掩码使用的中间结果
+        """
+        shape = (height, width)
+        self.channels = [np.empty(shape, dtype=np.uint8) for _ in range(3)]  # r g b
+        self.flags = np.empty(shape, dtype=np.uint8)
+        self.temp_1 = np.empty(shape, dtype=np.uint8)
+        self.temp_2 = np.empty(shape, dtype=np.uint8)
+        self.temp_3 = np.empty(shape, dtype=np.uint8)
+
+
+class MiniMapPreprocessor:
+
+    def __init__(self):
+        """
+        小地图预处理 结果与原来的逐步处理完全一致
+        - 圆形掩码按尺寸缓存
+        - 颜色分类使用查找表 一次得到所有需要的标记位 再由标记位查表得到道路掩码和边缘掩码
+        - 中间结果使用按尺寸预先分配的缓冲区 每个线程独立 返回的掩码都是新的数组
+        """
+        self._local = threading.local()
+
+    def _get_buffers(self, height: int, width: int) -> _MiniMapBuffers:
+        """
+        获取当前线程在这个尺寸下的缓冲区
+        """
+        pool: Optional[dict] = getattr(self._local, 'pool', None)
+        if pool is None:
+            pool = {}
+            self._local.pool = pool
+        key = (height, width)
+        buffers = pool.get(key)
+        if buffers is None:
+            buffers = _MiniMapBuffers(height, width)
+            pool[key] = buffers
+        return buffers
+
+    def get_arrow_mask(self, mm: MatLike) -> Tuple[MatLike, MatLike]:
+        """
+        获取小地图的小箭头掩码
+        :param mm: 小地图
+        :return: 中心区域的掩码 和 整张图的掩码
+        """
+        h, w = mm.shape[0], mm.shape[1]
+        cx, cy = w // 2, h // 2
+        d = game_const.TEMPLATE_ARROW_LEN
+        r = game_const.TEMPLATE_ARROW_R
+        center = mm[cy - r:cy + r, cx - r:cx + r]
+        arrow = cv2_utils.color_similarity_2d(center, game_const.COLOR_ARROW_BGR)
+        _, mask = cv2.threshold(arrow, 180, 255, cv2.THRESH_BINARY)
+
+        # 做一个连通性检测 小于50个连通的认为是噪点 按连通块编号查表一次去除
+        num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        if num_labels > 1:
+            keep = np.where(stats[:, cv2.CC_STAT_AREA] >= ARROW_NOISE_AREA, 255, 0).astype(np.uint8)
+            keep[0] = 0
+            mask = keep[labels]
+
+        whole_mask = np.zeros((h, w), dtype=np.uint8)
+        whole_mask[cy - r:cy + r, cx - r:cx + r] = mask
+        # 黑色边缘线条采集不到 稍微膨胀一下
+        kernel = np.ones((5, 5), np.uint8)
+        cv2.dilate(src=whole_mask, dst=whole_mask, kernel=kernel, iterations=1)
+        arrow_mask, _ = cv2_utils.convert_to_standard(mask, mask, width=d, height=d)
+        return arrow_mask, whole_mask
+
+    def remove_radio(self, mm: MatLike, radio_to_del: Optional[MatLike]) -> MatLike:
+        """
+        减去中心的雷达颜色 小于0的部分为0
+        :param mm: 小地图
+        :param radio_to_del: 当前朝向下的雷达颜色
+        :return: 新的图片
+        """
+        raw = mm.copy()
+        if radio_to_del is not None:
+            radius = radio_to_del.shape[0] // 2
+            d = radio_to_del.shape[0]
+
+            x1 = raw.shape[1] // 2 - radius
+            x2 = x1 + d
+            y1 = raw.shape[1] // 2 - radius
+            y2 = y1 + d
+
+            part = raw[y1:y2, x1:x2]
+            cv2.subtract(part, radio_to_del, dst=part)  # uint8 饱和减法
+        return raw
+
+    def init_circle_mask(self, mm_info: MiniMapInfo) -> None:
+        """
+        设置小地图的圆形掩码 使用缓存的只读结果
+        :param mm_info: 小地图信息
+        :return:
+        """
+        mm_info.circle_mask = get_circle_mask(mm_info.arrow_mask.shape[0], mm_info.arrow_mask.shape[1])
+
+    def init_road_mask(self, mm_info: MiniMapInfo, another_floor: bool = False) -> None:
+        """
+        获取道路掩码 用于原图的模板匹配
+        :param mm_info: 小地图信息
+        :param another_floor: 可能有另一层的地图
+        :return:
+        """
+        mm_del_radio = mm_info.raw_del_radio
+        height, width = mm_del_radio.shape[:2]
+        buffers = self._get_buffers(height, width)
+        r, g, b = buffers.channels
+        flags = buffers.flags
+        temp_1 = buffers.temp_1
+        temp_2 = buffers.temp_2
+        temp_3 = buffers.temp_3
+
+        cv2.split(mm_del_radio, buffers.channels)
+
+        # 三个通道的范围标记 取交集
+        cv2.LUT(r, _LUT_R, dst=flags)
+        cv2.LUT(g, _LUT_GB, dst=temp_1)
+        cv2.bitwise_and(flags, temp_1, dst=flags)
+        cv2.LUT(b, _LUT_GB, dst=temp_1)
+        cv2.bitwise_and(flags, temp_1, dst=flags)
+
+        # 三色差
+        cv2.max(r, g, dst=temp_1)
+        cv2.max(temp_1, b, dst=temp_1)
+        cv2.min(r, g, dst=temp_2)
+        cv2.min(temp_2, b, dst=temp_2)
+        cv2.subtract(temp_1, temp_2, dst=temp_1)
+        cv2.LUT(temp_1, _LUT_CURRENT_FLOOR, dst=temp_1)
+        cv2.bitwise_or(flags, temp_1, dst=flags)
+
+        if another_floor:  # 多层地图时 另一层的颜色是递进的 R<=G<=B 且差值在2以内
+            np.subtract(b, g, out=temp_1)
+            np.subtract(g, r, out=temp_2)
+            cv2.LUT(temp_1, _LUT_ANOTHER_FLOOR, dst=temp_1)
+            cv2.LUT(temp_2, _LUT_ANOTHER_FLOOR, dst=temp_2)
+            cv2.bitwise_and(temp_1, temp_2, dst=temp_1)
+            cv2.bitwise_or(flags, temp_1, dst=flags)
+
+        road_lut, edge_lut = _MASK_LUT[another_floor]
+        cv2.LUT(flags, road_lut, dst=temp_3)
+        road_mask = cv2.bitwise_and(temp_3, mm_info.circle_mask)  # 只考虑圆形内部分
+        cv2.LUT(flags, edge_lut, dst=temp_3)
+        mm_info.road_mask = road_mask
+        mm_info.road_mask_with_edge = cv2.bitwise_or(road_mask, temp_3)
+
+
+mini_map_preprocessor = MiniMapPreprocessor()
@@ -0,0 +1,170 @@
+import threading
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+_resize_buffer_local = threading.local()  # 每个线程独立的缩放缓冲区 避免并行匹配时互相覆盖
+
+
+class ScaledTemplate:
+
+    def __init__(self, scale: float,
+                 template: MatLike, mask: MatLike,
+                 sx: int, sy: int,
+                 scale_width: int, scale_height: int):
+        """
+        小地图模板 按某个缩放比例缩放后 截取与原模板相同大小的中心部分
+        """
+        self.scale: float = scale  # 缩放比例
+        self.template: MatLike = template  # 截取后的模板
+        self.mask: MatLike = mask  # 截取后的掩码
+        self.sx: int = sx  # 截取部分在缩放后模板上的起始x
+        self.sy: int = sy  # 截取部分在缩放后模板上的起始y
+        self.scale_width: int = scale_width  # 缩放后模板的宽
+        self.scale_height: int = scale_height  # 缩放后模板的高
+
+        self.coarse_template: Optional[MatLike] = None  # 金字塔粗匹配用的缩小模板
+        self.coarse_mask: Optional[MatLike] = None  # 金字塔粗匹配用的缩小掩码
+        self.coarse_scale: Optional[float] = None  # 粗匹配模板的缩小比例
+
+    def get_coarse(self, coarse_scale: float) -> Tuple[MatLike, MatLike]:
+        """
+        获取金字塔粗匹配用的缩小模板和掩码 同一个缩小比例只计算一次
+        :param coarse_scale: 缩小比例
+        :return:
+        """
+        if self.coarse_template is None or self.coarse_scale != coarse_scale:
+            self.coarse_template = cv2.resize(self.template, None, fx=coarse_scale, fy=coarse_scale,
+                                              interpolation=cv2.INTER_AREA)
+            self.coarse_mask = cv2.resize(self.mask, None, fx=coarse_scale, fy=coarse_scale,
+                                          interpolation=cv2.INTER_NEAREST)
+            self.coarse_scale = coarse_scale
+        return self.coarse_template, self.coarse_mask
+
+
+class MiniMapTemplateBank:
+
+    def __init__(self, template: MatLike, template_mask: MatLike, is_circle_mask: bool = False):
+        """
+        一张小地图模板在各个缩放比例下的模板和掩码
+        每个 MiniMapInfo 的每种模板只构建一次 同一轮里的多次匹配都复用
+        :param template: 模板图
+        :param template_mask: 模板掩码
+        :param is_circle_mask: 掩码是否小地图圆形 是的话直接使用全局缓存的缩放结果
+        """
+        self.template: MatLike = template
+        self.template_mask: MatLike = template_mask
+        self.is_circle_mask: bool = is_circle_mask
+        self._scaled: Dict[float, ScaledTemplate] = {}
+
+    def get(self, scale: float) -> ScaledTemplate:
+        """
+        获取某个缩放比例下的模板
+        :param scale: 缩放比例
+        :return:
+        """
+        scaled = self._scaled.get(scale)
+        if scaled is None:
+            scaled = self._build(scale)
+            self._scaled[scale] = scaled
+        return scaled
+
+    def _build(self, scale: float) -> ScaledTemplate:
+        height, width = self.template.shape[:2]
+        scale_height, scale_width = _get_scaled_size(height, width, scale)
+        sx, sy = _get_crop_start(height, width, scale_height, scale_width)
+
+        template_usage = np.empty_like(self.template, dtype=np.uint8)
+        if scale_height == height and scale_width == width:
+            template_usage[:, :] = self.template
+        else:
+            template_scale = cv2.resize(self.template, (scale_width, scale_height),
+                                        dst=_get_resize_buffer(self.template, scale_height, scale_width))
+            template_usage[:, :] = template_scale[sy:sy + height, sx:sx + width]
+
+        if self.is_circle_mask:
+            mask_usage = get_scaled_circle_mask(height, width, scale)
+        else:
+            mask_usage = crop_scaled_mask(self.template_mask, scale)
+
+        return ScaledTemplate(scale, template_usage, mask_usage, sx, sy, scale_width, scale_height)
+
+
+def _get_scaled_size(height: int, width: int, scale: float) -> Tuple[int, int]:
+    """
+    与 cv2_utils.scale_image 保持一致的缩放尺寸
+    :return: 缩放后的高和宽
+    """
+    if scale == 1:
+        return height, width
+    # cv2_utils.scale_image 传给 cv2.resize 的是 (高, 宽) 小地图是正方形所以没有影响 这里保持一样的结果
+    return int(width * scale), int(height * scale)
+
+
+def _get_crop_start(height: int, width: int, scale_height: int, scale_width: int) -> Tuple[int, int]:
+    """
+    放大后 截取中心部分来匹配 防止放大后的图片超过了原图的范围
+    :return: 截取的起始x 起始y
+    """
+    cx = scale_width // 2
+    cy = scale_height // 2
+    sx = cx - width // 2
+    sy = cy - width // 2
+    return sx, sy
+
+
+def _get_resize_buffer(img: MatLike, scale_height: int, scale_width: int) -> MatLike:
+    """
+    获取当前线程的缩放缓冲区 同样尺寸只分配一次
+    """
+    pool: Optional[dict] = getattr(_resize_buffer_local, 'pool', None)
+    if pool is None:
+        pool = {}
+        _resize_buffer_local.pool = pool
+    key = (scale_height, scale_width) + img.shape[2:] + (img.dtype.str,)
+    buffer = pool.get(key)
+    if buffer is None:
+        buffer = np.empty((scale_height, scale_width) + img.shape[2:], dtype=img.dtype)
+        pool[key] = buffer
+    return buffer
+
+
+def crop_scaled_mask(mask: MatLike, scale: float) -> MatLike:
+    """
+    按比例缩放掩码 并截取与原掩码相同大小的中心部分
+    :param mask: 掩码
+    :param scale: 缩放比例
+    :return:
+    """
+    height, width = mask.shape[:2]
+    scale_height, scale_width = _get_scaled_size(height, width, scale)
+    mask_usage = np.empty_like(mask, dtype=np.uint8)
+    if scale_height == height and scale_width == width:
+        mask_usage[:, :] = mask
+        return mask_usage
+
+    sx, sy = _get_crop_start(height, width, scale_height, scale_width)
+    mask_scale = cv2.resize(mask, (scale_width, scale_height),
+                            dst=_get_resize_buffer(mask, scale_height, scale_width))
+    mask_usage[:, :] = mask_scale[sy:sy + height, sx:sx + width]
+    return mask_usage
+
+
+@lru_cache(maxsize=256)
+def get_scaled_circle_mask(height: int, width: int, scale: float) -> MatLike:
+    """
+    小地图圆形掩码在某个缩放比例下的结果 圆形掩码只跟小地图尺寸有关 因此全局缓存
+    返回结果为只读
+    :param height: 小地图高
+    :param width: 小地图宽
+    :param scale: 缩放比例
+    :return:
+    """
+    circle_mask = np.zeros((height, width), dtype=np.uint8)
+    cv2.circle(circle_mask, (height // 2, width // 2), width // 2 - 5, 255, -1)  # 与 mini_map_utils.init_circle_mask 一致
+    mask_usage = crop_scaled_mask(circle_mask, scale)
+    mask_usage.flags.writeable = False
+    return mask_usage
@@ -15,6 +15,7 @@ from sr_od.config.game_config import MiniMapPos
 from sr_od.context.sr_context import SrContext
 from sr_od.sr_map import mini_map_angle_alas
 from sr_od.sr_map.mini_map_info import MiniMapInfo
+from sr_od.sr_map.mini_map_preprocessor import mini_map_preprocessor
 
 
 def cal_little_map_pos(screen: MatLike) -> MiniMapPos:
@@ -88,29 +89,7 @@ def get_arrow_mask(mm: MatLike):
     :param mm: 小地图
     :return: 中心区域的掩码 和 整张图的掩码
     """
-    w, h = mm.shape[1], mm.shape[0]
-    cx, cy = w // 2, h // 2
-    d = game_const.TEMPLATE_ARROW_LEN
-    r = game_const.TEMPLATE_ARROW_R
-    center = mm[cy - r:cy + r, cx - r:cx + r]
-    arrow = extract_arrow(center)
-    _, mask = cv2.threshold(arrow, 180, 255, cv2.THRESH_BINARY)
-    # 做一个连通性检测 小于50个连通的认为是噪点
-    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
-    large_components = []
-    for label in range(1, num_labels):
-        if stats[label, cv2.CC_STAT_AREA] < 50:
-            large_components.append(label)
-    for label in large_components:
-        mask[labels == label] = 0
-
-    whole_mask = np.zeros((h,w), dtype=np.uint8)
-    whole_mask[cy-r:cy+r, cx-r:cx+r] = mask
-    # 黑色边缘线条采集不到 稍微膨胀一下
-    kernel = np.ones((5, 5), np.uint8)
-    cv2.dilate(src=whole_mask, dst=whole_mask, kernel=kernel, iterations=1)
-    arrow_mask, _ = cv2_utils.convert_to_standard(mask, mask, width=d, height=d)
-    return arrow_mask, whole_mask
+    return mini_map_preprocessor.get_arrow_mask(mm)
 
 
 def analyse_arrow_and_angle(mini_map: MatLike):
@@ -313,32 +292,16 @@ def analyse_mini_map(raw: MatLike) -> MiniMapInfo:
 
 
 def init_circle_mask(mm_info: MiniMapInfo):
-    h, w = mm_info.arrow_mask.shape[1], mm_info.arrow_mask.shape[0]
-    cx, cy = w // 2, h // 2
-
-    mm_info.circle_mask = np.zeros_like(mm_info.arrow_mask)
-    cv2.circle(mm_info.circle_mask, (cx, cy), h // 2 - 5, 255, -1)  # 忽略一点圆的边缘
+    """
+    小地图的圆形掩码 同一尺寸共用缓存的只读结果
+    :param mm_info: 小地图信息
+    :return:
+    """
+    mini_map_preprocessor.init_circle_mask(mm_info)
 
 
 def remove_radio(mm: MatLike, radio_to_del: MatLike) -> MatLike:
-    raw = mm.copy()
-    if radio_to_del is not None:
-        radius = radio_to_del.shape[0] // 2
-        d = radio_to_del.shape[0]
-
-        x1 = raw.shape[1] // 2 - radius
-        x2 = x1 + d
-        y1 = raw.shape[1] // 2 - radius
-        y2 = y1 + d
-
-        overlap = np.zeros_like(radio_to_del, dtype=np.uint16)
-        overlap[:, :] = raw[y1:y2, x1:x2]
-        overlap[:, :] -= radio_to_del
-        overlap[np.where(raw[y1:y2, x1:x2] < radio_to_del)] = 0
-        raw[y1:y2, x1:x2] = overlap.astype(dtype=np.uint8)
-
-    # cv2_utils.show_image(raw, win_name='raw')
-    return raw
+    return mini_map_preprocessor.remove_radio(mm, radio_to_del)
 
 
 def init_road_mask_for_world_patrol(mm_info: MiniMapInfo, another_floor: bool = False):
@@ -352,55 +315,7 @@ def init_road_mask_for_world_patrol(mm_info: MiniMapInfo, another_floor: bool =
     if mm_info.road_mask is not None:
         return
 
-    mm_del_radio = mm_info.raw_del_radio
-    r, g, b = cv2.split(mm_del_radio)
-
-    l = 45
-    u = 70  # 背景色 正常是55~60附近 太亮的时候会到达这个值 或者其它楼层也会达到这个值
-    lower_color = np.array([l, l, l], dtype=np.uint8)
-    upper_color = np.array([u, u, u], dtype=np.uint8)
-    road_mask_1 = cv2.inRange(mm_del_radio, lower_color, upper_color)  # 这是粗略的道路掩码
-    # cv2_utils.show_image(road_mask_1, win_name='road_mask_1')
-
-    max_rgb = np.max(mm_del_radio, axis=2)
-    min_rgb = np.min(mm_del_radio, axis=2)
-    road_mask_cf = np.zeros(road_mask_1.shape, dtype=np.uint8)
-    road_mask_cf[(max_rgb - min_rgb) <= 1] = 255  # rgb颜色差不超过1 当前层的道路就是这个颜色
-    # cv2_utils.show_image(road_mask_cf, win_name='road_mask_cf')
-    b_g = None
-    if another_floor:  # 多层地图时 另一层的颜色是递进的 R<=G<=B 且差值在2以内
-        b_g = b - g
-        g_r = g - r
-        road_mask_af = np.zeros(road_mask_1.shape, dtype=np.uint8)
-        road_mask_af[(b_g >= 0) & (b_g <= 2) & (g_r >= 0) & (g_r <= 2)] = 255
-        # cv2_utils.show_image(road_mask_af, win_name='road_mask_af')
-
-        road_mask_floor = cv2.bitwise_or(road_mask_cf, road_mask_af)
-    else:
-        road_mask_floor = road_mask_cf
-
-    road_mask_2 = cv2.bitwise_and(road_mask_1, road_mask_floor)  # 不同楼层的地图
-    # cv2_utils.show_image(road_mask_2, win_name='road_mask_2')
-
-    if b_g is None:
-        b_g = b - g
-    # 算敌人的掩码图
-    lower_color = np.array([80, 45, 45], dtype=np.uint8)
-    upper_color = np.array([255, 70, 70], dtype=np.uint8)
-    enemy_mask_1 = cv2.inRange(mm_del_radio, lower_color, upper_color)  # 这是粗略的敌人图
-    enemy_mask_2 = np.zeros(road_mask_1.shape, dtype=np.uint8)
-    enemy_mask_2[(b_g <= 2) | (b_g >= -2)] = 255  # 敌人的雷达图 g 约等于 b
-    enemy_mask = cv2.bitwise_and(enemy_mask_1, enemy_mask_2)
-    # cv2_utils.show_image(enemy_mask, win_name='enemy_mask')
-
-    mm_info.road_mask = cv2.bitwise_or(road_mask_2, enemy_mask)
-    mm_info.road_mask = cv2.bitwise_and(mm_info.road_mask, mm_info.circle_mask)  # 只考虑圆形内部分
-
-    lower_color = np.array([160, 160, 160], dtype=np.uint8)
-    upper_color = np.array([210, 210, 210], dtype=np.uint8)
-    edge_mask_rough = cv2.inRange(mm_del_radio, lower_color, upper_color)  # 这是粗略的边缘掩码
-    edge_mask = cv2.bitwise_and(edge_mask_rough, road_mask_cf)  # 三色差不超过1
-    mm_info.road_mask_with_edge = cv2.bitwise_or(mm_info.road_mask, edge_mask)
+    mini_map_preprocessor.init_road_mask(mm_info, another_floor=another_floor)
 
 
 def init_road_mask_for_sim_uni(mm_info: MiniMapInfo):
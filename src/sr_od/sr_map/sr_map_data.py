@@ -1,5 +1,7 @@
 import os
 import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Optional
 
 from cv2.typing import MatLike
@@ -8,16 +10,22 @@ from one_dragon.base.config.yaml_operator import YamlOperator
 from one_dragon.base.geometry.point import Point
 from one_dragon.base.geometry.rectangle import Rect
 from one_dragon.utils import os_utils, str_utils, cv2_utils, cal_utils
+from one_dragon.utils import i18_utils
 from one_dragon.utils.i18_utils import gt
 from one_dragon.utils.log_utils import log
 from sr_od.application.world_patrol import world_patrol_route_utils
 from sr_od.sr_map.large_map_info import LargeMapInfo
+from sr_od.sr_map.large_map_info_cache import LargeMapInfoCache
 from sr_od.sr_map.sr_map_def import Planet, Region, RegionSet, SpecialPoint
 
+_large_map_prefetch_executor = ThreadPoolExecutor(thread_name_prefix='sr_od_large_map_prefetch', max_workers=1)
+
+DEFAULT_LARGE_MAP_CACHE_MB: int = 1024  # 大地图缓存默认的内存预算
+
 
 class SrMapData:
 
-    def __init__(self):
+    def __init__(self, large_map_cache_mb: int = DEFAULT_LARGE_MAP_CACHE_MB):
         self.planet_list: List[Planet] = []
         self.region_list: List[Region] = []
         self.planet_2_region: dict[str, List[Region]] = {}  # key=np_id
@@ -28,9 +36,13 @@ class SrMapData:
         self.sp_list: List[SpecialPoint] = []
         self.region_2_sp: dict[str, List[SpecialPoint]] = {}
 
+        self._ocr_name_map: dict[tuple[str, str], List[str]] = {}  # (名称列表, 语言) -> 翻译后的名称 用于OCR匹配
+
         self.load_map_data()
 
-        self.large_map_info_map: dict[str, LargeMapInfo] = {}
+        self.large_map_info_map: LargeMapInfoCache = LargeMapInfoCache(large_map_cache_mb * 1024 * 1024)
+        self._large_map_loading: dict[str, Future] = {}  # 正在后台加载的大地图 key=prl_id
+        self._large_map_loading_lock = threading.Lock()
 
     def load_map_data(self) -> None:
         """
@@ -41,6 +53,7 @@ class SrMapData:
         self.load_region_set_data()
         self.load_region_data()
         self.load_special_point_data()
+        self._ocr_name_map = {}
 
     @staticmethod
     def get_map_data_dir() -> str:
@@ -423,13 +436,27 @@ class SrMapData:
                 return i
         return None
 
+    def _get_ocr_name_list(self, key: str, cn_list: List[str]) -> List[str]:
+        """
+        获取当前语言下翻译后的名称列表 每种语言只翻译一次
+        :param key: 名称列表的键
+        :param cn_list: 中文名称列表
+        :return:
+        """
+        cache_key = (key, i18_utils.get_default_lang())
+        name_list = self._ocr_name_map.get(cache_key)
+        if name_list is None:
+            name_list = [gt(i, 'ocr') for i in cn_list]
+            self._ocr_name_map[cache_key] = name_list
+        return name_list
+
     def best_match_planet_by_name(self, ocr_word: str) -> Optional[Planet]:
         """
         根据OCR结果匹配一个星球
         :param ocr_word: OCR结果
         :return:
         """
-        planet_names = [gt(p.cn, 'ocr') for p in self.planet_list]
+        planet_names = self._get_ocr_name_list('planet', [p.cn for p in self.planet_list])
         idx = str_utils.find_best_match_by_difflib(ocr_word, target_word_list=planet_names)
         if idx is None:
             return None
@@ -470,7 +497,8 @@ class SrMapData:
         to_check_region_list: List[Region] = []
         to_check_region_name_list: List[str] = []
 
-        for region in self.region_list:
+        region_name_list = self._get_ocr_name_list('region', [r.cn for r in self.region_list])
+        for region, region_name in zip(self.region_list, region_name_list):
             if planet is not None and planet.np_id != region.planet.np_id:
                 continue
 
@@ -478,7 +506,7 @@ class SrMapData:
                 continue
 
             to_check_region_list.append(region)
-            to_check_region_name_list.append(gt(region.cn, 'ocr'))
+            to_check_region_name_list.append(region_name)
 
         idx = str_utils.find_best_match_by_difflib(ocr_word, to_check_region_name_list)
         if idx is None:
@@ -537,7 +565,7 @@ class SrMapData:
             return None
 
         to_check_sp_list: List[SpecialPoint] = self.region_2_sp.get(region.pr_id, [])
-        to_check_sp_name_list: List[str] = [gt(i.cn, 'ocr') for i in to_check_sp_list]
+        to_check_sp_name_list: List[str] = self._get_ocr_name_list(f'sp_{region.pr_id}', [i.cn for i in to_check_sp_list])
 
         idx = str_utils.find_best_match_by_difflib(ocr_word, to_check_sp_name_list)
         if idx is None:
@@ -586,18 +614,20 @@ class SrMapData:
         """
         return self.planet_2_region.get(planet.np_id, [])
 
-    def load_large_map_info(self, region: Region) -> LargeMapInfo:
+    def load_large_map_info(self, region: Region, recent: bool = True) -> LargeMapInfo:
         """
         加载某张大地图到内存中
         :param region: 对应区域
+        :param recent: 是否在缓存中标记为最近使用 预加载时传 False
         :return: 地图图片
         """
         dir_path = SrMapData.get_large_map_dir_path(region)
         info = LargeMapInfo()
         info.region = region
+        info.dir_path = dir_path
         info.raw = cv2_utils.read_image(os.path.join(dir_path, 'raw.webp'))
         info.mask = cv2_utils.read_image(os.path.join(dir_path, 'mask.png'))
-        self.large_map_info_map[region.prl_id] = info
+        self.large_map_info_map.put(region.prl_id, info, recent=recent)
         return info
 
     def get_large_map_info(self, region: Region) -> LargeMapInfo:
@@ -606,11 +636,55 @@ class SrMapData:
         :param region: 区域
         :return: 地图图片
         """
-        if region.prl_id not in self.large_map_info_map:
-            # 尝试加载一次
-            return self.load_large_map_info(region)
-        else:
-            return self.large_map_info_map[region.prl_id]
+        info = self.large_map_info_map.get(region.prl_id)
+        if info is not None:
+            return info
+
+        with self._large_map_loading_lock:
+            future = self._large_map_loading.get(region.prl_id)
+        if future is not None:  # 正在预加载 等待结果即可
+            try:
+                info = future.result()
+                # 预加载的地图在缓存中是最先淘汰的 真正使用时再标记为最近使用
+                self.large_map_info_map[region.prl_id] = info
+                return info
+            except Exception:
+                log.error('预加载大地图失败 %s', region.prl_id, exc_info=True)
+
+        # 尝试加载一次
+        return self.load_large_map_info(region)
+
+    def prefetch_large_map_info(self, region: Optional[Region]) -> None:
+        """
+        在后台线程预加载某张大地图 用于提前加载下一条路线的地图
+        预加载的地图不会标记为最近使用 预算放不下两张地图时 淘汰的是预加载的地图而不是正在使用的
+        :param region: 区域
+        :return:
+        """
+        if region is None or region.prl_id in self.large_map_info_map:
+            return
+        with self._large_map_loading_lock:
+            if region.prl_id in self._large_map_loading:
+                return
+            future = _large_map_prefetch_executor.submit(self._prefetch_large_map_info, region)
+            self._large_map_loading[region.prl_id] = future
+
+    def _prefetch_large_map_info(self, region: Region) -> LargeMapInfo:
+        try:
+            log.debug('预加载大地图 %s', region.prl_id)
+            return self.load_large_map_info(region, recent=False)
+        finally:
+            with self._large_map_loading_lock:
+                self._large_map_loading.pop(region.prl_id, None)
+
+    def set_large_map_cache_mb(self, large_map_cache_mb: int) -> None:
+        """
+        更新大地图缓存的内存预算
+        :param large_map_cache_mb: 内存预算 单位MB <=0 时不淘汰
+        :return:
+        """
+        self.large_map_info_map.max_bytes = large_map_cache_mb * 1024 * 1024
+        self.large_map_info_map.shrink()
 
     @staticmethod
     def get_large_map_dir_path(region: Region):